@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+V30 배치 API 평가 (evaluate_v30.py --batch-mode)
+
+배경:
+- 정치인 1명 = 10개 카테고리 × 4개 AI × 10개씩 배치 → 수백 번의 동기 호출
+- Anthropic Message Batches / OpenAI Batch API는 비동기 처리 대신 비용 50% 할인,
+  레이트 리밋과 별도 (밤샘 전체 재평가용)
+
+흐름:
+1. 제출: 카테고리별 미평가 데이터 → 배치 프롬프트 (batch_packer_v30, 동기 모드와 같은 묶음) → 공급자 배치 형식으로 제출
+   - Claude: messages.batches.create (평가 기준은 system + cache_control)
+   - ChatGPT: Batch JSONL 파일 업로드 → batches.create (/v1/chat/completions)
+   - 출력 형식은 동기 모드와 같은 구조화 출력 (tool_use / response_format json_schema)
+2. 상태 저장: V30/.cache/batches/{politician_id}_{AI}_{카테고리 키}.json
+   (batch_id + custom_id별 collected_data_id 목록 → 중단 후 재실행 시 이어서 폴링)
+   - 카테고리 키: 전체면 "all", 일부면 카테고리 목록 해시 → --category가 다른 실행의 배치를 이어받지 않음
+3. 폴링: 완료될 때까지 poll_interval초 간격으로 확인 (--no-wait면 제출만 하고 종료)
+4. 수집: 결과 텍스트 → parse_evaluation_response → save_evaluations (동기 모드와 같은 검증)
+
+배치 API가 없는 AI (Gemini, Grok)는 기존 파이프라인(evaluate_all)으로 평가.
+
+로컬 테스트:
+    python ../utils/mock_batch_server_v30.py --port 8089
+    ANTHROPIC_BASE_URL=http://localhost:8089 OPENAI_BASE_URL=http://localhost:8089/v1 \\
+        python evaluate_v30.py --politician_id=62e7b453 --batch-mode --poll-interval=1
+
+사용법:
+    python evaluate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --batch-mode
+    python evaluate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --batch-mode --no-wait
+"""
+
+import os
+import io
+import json
+import time
+import hashlib
+import evaluate_v30 as ev
+from batch_packer_v30 import get_batch_packer
+from structured_output_v30 import EVALUATION_SCHEMA, request_kwargs, message_text
+
+BATCH_AIS = ["Claude", "ChatGPT"]
+DEFAULT_POLL_INTERVAL = 60
+STATE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "batches"
+)
+
+OPENAI_DONE_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def category_names(categories):
+    return sorted(cat_name.lower() for cat_name, _cat_korean in categories)
+
+
+def categories_key(categories):
+    """상태 파일 이름용 카테고리 집합 키 (전체면 "all", 일부면 목록 해시 8자리)"""
+    names = category_names(categories)
+    if names == category_names(ev.CATEGORIES):
+        return "all"
+    return hashlib.sha1(",".join(names).encode('utf-8')).hexdigest()[:8]
+
+
+def get_state_path(politician_id, ai_name, key):
+    return os.path.join(STATE_DIR, f"{politician_id}_{ai_name}_{key}.json")
+
+
+def get_legacy_state_path(politician_id, ai_name):
+    """카테고리 키 도입 전 상태 파일 경로"""
+    return os.path.join(STATE_DIR, f"{politician_id}_{ai_name}.json")
+
+
+def load_state(politician_id, ai_name, categories):
+    """같은 카테고리 집합으로 제출한 진행 중인 배치 상태 (없으면 None)"""
+    path = get_state_path(politician_id, ai_name, categories_key(categories))
+    if not os.path.exists(path):
+        return _load_legacy_state(politician_id, ai_name, categories)
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('categories') != category_names(categories):
+        print(f"  [{ai_name}] ⚠️ 상태 파일의 카테고리가 다름 → 이어받지 않음: {path}")
+        return None
+    return state
+
+
+def _load_legacy_state(politician_id, ai_name, categories):
+    """이전 형식 상태 파일: 요청 카테고리가 모두 이번 카테고리에 포함될 때만 이어받음 (새 경로로 옮김)"""
+    path = get_legacy_state_path(politician_id, ai_name)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    requested = {request['category'].lower() for request in state.get('requests', {}).values()}
+    if not requested <= set(category_names(categories)):
+        return None
+    state['categories'] = category_names(categories)
+    state['categories_key'] = categories_key(categories)
+    save_state(state)
+    os.remove(path)
+    return state
+
+
+def save_state(state):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    path = get_state_path(state['politician_id'], state['ai_name'], state['categories_key'])
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+
+def clear_state(state):
+    path = get_state_path(state['politician_id'], state['ai_name'], state['categories_key'])
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def build_batch_requests(ai_name, politician_id, politician_name, categories):
+    """미평가 데이터 → 배치 요청 목록 [(custom_id, category, prefix, prompt, ids, members)]
+
+    유사 중복 묶음은 대표만 요청, members = {대표 id: [구성원 id]} (결과 수집 시 복제)
+    """
+    requests_list = []
+    for cat_name, cat_korean in categories:
+        items = ev.get_pooled_data(politician_id, cat_name)
+        evaluated_ids = ev.get_evaluated_ids(politician_id, ai_name, cat_name)
+        pending = [item for item in items if item.get('id') not in evaluated_ids]
+        if not pending:
+            continue
+
+        representatives, members = ev.split_representatives(politician_id, cat_name, pending)
+        prefix = ev.build_evaluation_prefix(cat_name, politician_id, politician_name)
+        batches = get_batch_packer(ai_name).pack(representatives, cost=ev.item_prompt_tokens)
+        for i, batch in enumerate(batches):
+            custom_id = f"{cat_name}-{i:04d}"
+            ids = [item.get('id') for item in batch]
+            requests_list.append((
+                custom_id, cat_name, prefix, ev.build_batch_prompt(batch), ids,
+                {rep_id: members[rep_id] for rep_id in ids if rep_id in members}
+            ))
+        print(f"  [{ai_name}] {cat_korean}: {len(pending)}개 (대표 {len(representatives)}개) → "
+              f"{len(batches)}개 요청")
+    return requests_list
+
+
+def submit_claude(client, model, requests_list):
+    """Anthropic Message Batches 제출, batch_id 반환"""
+    structured = request_kwargs("Claude", ev.EVALUATION_OUTPUT_NAME, EVALUATION_SCHEMA)
+    batch = client.messages.batches.create(requests=[
+        {
+            "custom_id": custom_id,
+            "params": {
+                "model": model,
+                "max_tokens": 4096,
+                "system": [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}],
+                "messages": [{"role": "user", "content": prompt}],
+                **structured
+            }
+        }
+        for custom_id, _cat, prefix, prompt, _ids, _members in requests_list
+    ])
+    return batch.id
+
+
+def submit_openai(client, model, requests_list):
+    """OpenAI Batch JSONL 업로드 + 제출, batch_id 반환"""
+    structured = request_kwargs("ChatGPT", ev.EVALUATION_OUTPUT_NAME, EVALUATION_SCHEMA)
+    lines = []
+    for custom_id, _cat, prefix, prompt, _ids, _members in requests_list:
+        lines.append(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": prefix},
+                    {"role": "user", "content": prompt}
+                ],
+                "max_tokens": 4096,
+                "temperature": 0.7,
+                **structured
+            }
+        }, ensure_ascii=False))
+
+    jsonl = io.BytesIO(("\n".join(lines) + "\n").encode('utf-8'))
+    uploaded = client.files.create(file=("evaluations_v30_batch.jsonl", jsonl), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    return batch.id
+
+
+def submit_batch(ai_name, politician_id, politician_name, categories):
+    """배치 제출 후 상태 파일 저장 (제출할 요청이 없으면 None)"""
+    requests_list = build_batch_requests(ai_name, politician_id, politician_name, categories)
+    if not requests_list:
+        print(f"  [{ai_name}] ⏭️ 미평가 데이터 없음")
+        return None
+
+    client = ev.init_ai_client(ai_name)
+    model = ev.AI_CONFIGS[ai_name]['model']
+    if ai_name == "Claude":
+        batch_id = submit_claude(client, model, requests_list)
+    else:
+        batch_id = submit_openai(client, model, requests_list)
+
+    state = {
+        'politician_id': politician_id,
+        'politician_name': politician_name,
+        'ai_name': ai_name,
+        'categories': category_names(categories),
+        'categories_key': categories_key(categories),
+        'batch_id': batch_id,
+        'submitted_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'requests': {
+            custom_id: {'category': cat, 'ids': ids, 'members': members}
+            for custom_id, cat, _prefix, _prompt, ids, members in requests_list
+        }
+    }
+    save_state(state)
+    print(f"  [{ai_name}] 📤 배치 제출: {batch_id} ({len(requests_list)}개 요청)")
+    return state
+
+
+def is_batch_done(ai_name, client, batch_id):
+    if ai_name == "Claude":
+        return client.messages.batches.retrieve(batch_id).processing_status == "ended"
+    return client.batches.retrieve(batch_id).status in OPENAI_DONE_STATUSES
+
+
+def iter_batch_results(ai_name, client, batch_id):
+    """(custom_id, 응답 텍스트 또는 None) 순회"""
+    if ai_name == "Claude":
+        for entry in client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                usage = entry.result.message.usage
+                ev.record_usage(
+                    ai_name,
+                    usage.input_tokens + (getattr(usage, 'cache_read_input_tokens', 0) or 0),
+                    getattr(usage, 'cache_read_input_tokens', 0) or 0,
+                    usage.output_tokens,
+                    settle=False
+                )
+                yield entry.custom_id, message_text(entry.result.message)
+            else:
+                yield entry.custom_id, None
+        return
+
+    batch = client.batches.retrieve(batch_id)
+    if not batch.output_file_id:
+        print(f"  [{ai_name}] ⚠️ 결과 파일 없음 (status={batch.status})")
+        return
+    content = client.files.content(batch.output_file_id).text
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        response = row.get('response') or {}
+        if response.get('status_code') != 200:
+            yield row.get('custom_id'), None
+            continue
+        body = response.get('body', {})
+        usage = body.get('usage', {})
+        ev.record_usage(
+            ai_name,
+            usage.get('prompt_tokens', 0),
+            (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0),
+            usage.get('completion_tokens', 0),
+            settle=False
+        )
+        yield row.get('custom_id'), body['choices'][0]['message']['content']
+
+
+def ingest_batch(state):
+    """완료된 배치 결과 → evaluations_v30 저장, 저장 건수 반환"""
+    ai_name = state['ai_name']
+    client = ev.init_ai_client(ai_name)
+    saved = 0
+    failed = 0
+
+    for custom_id, content in iter_batch_results(ai_name, client, state['batch_id']):
+        request = state['requests'].get(custom_id)
+        if not request:
+            continue
+        if content is None:
+            failed += 1
+            continue
+        try:
+            evaluations = ev.parse_evaluation_response(content, [{'id': cid} for cid in request['ids']])
+        except json.JSONDecodeError:
+            failed += 1
+            continue
+        # 유사 중복 묶음 구성원에게 대표 평가 복제 (이전 버전 상태 파일에는 members 없음)
+        evaluations = ev.expand_cluster_evaluations(evaluations, request.get('members'))
+        saved += ev.save_evaluations(
+            state['politician_id'], state['politician_name'], request['category'], ai_name, evaluations
+        )
+
+    print(f"  [{ai_name}] 📥 배치 결과 저장: {saved}건 (실패 요청 {failed}개 → 재실행 시 다시 제출)")
+    return saved
+
+
+def run_batch_mode(politician_id, politician_name, target_ai=None, target_category=None,
+                   poll_interval=DEFAULT_POLL_INTERVAL, wait=True):
+    """배치 모드 실행: 제출(또는 기존 배치 이어받기) → 폴링 → 결과 저장"""
+    if not politician_name:
+        politician_name = ev.get_politician_name(politician_id)
+
+    ais = [target_ai] if target_ai else ev.EVALUATION_AIS
+    batch_ais = [ai for ai in ais if ai in BATCH_AIS]
+    sync_ais = [ai for ai in ais if ai not in BATCH_AIS]
+
+    categories = ev.CATEGORIES
+    if target_category:
+        if isinstance(target_category, str):
+            categories = [c for c in ev.CATEGORIES if c[0].lower() == target_category.lower()]
+        else:
+            categories = [ev.CATEGORIES[target_category - 1]]
+
+    print(f"\n{'#'*60}")
+    print(f"# V30 배치 API 평가: {politician_name} ({politician_id})")
+    print(f"# 배치 API: {', '.join(batch_ais) or '없음'} / 동기 평가: {', '.join(sync_ais) or '없음'}")
+    print(f"{'#'*60}")
+
+    # 1. 제출 (진행 중인 배치가 있으면 이어받기)
+    states = []
+    for ai_name in batch_ais:
+        state = load_state(politician_id, ai_name, categories)
+        if state:
+            print(f"  [{ai_name}] 🔁 진행 중인 배치 이어받기: {state['batch_id']}")
+        else:
+            state = submit_batch(ai_name, politician_id, politician_name, categories)
+        if state:
+            states.append(state)
+
+    # 2. 배치 API 미지원 AI는 기존 파이프라인으로
+    for ai_name in sync_ais:
+        ev.evaluate_all(politician_id, politician_name, target_ai=ai_name, target_category=target_category)
+
+    if not wait:
+        print(f"\n⏸️ 제출 완료 (--no-wait). 같은 명령을 다시 실행하면 결과를 저장합니다.")
+        return 0
+
+    # 3. 폴링 → 4. 결과 저장
+    total_saved = 0
+    pending = list(states)
+    while pending:
+        still_pending = []
+        for state in pending:
+            client = ev.init_ai_client(state['ai_name'])
+            if is_batch_done(state['ai_name'], client, state['batch_id']):
+                total_saved += ingest_batch(state)
+                clear_state(state)
+            else:
+                still_pending.append(state)
+        pending = still_pending
+        if pending:
+            names = ', '.join(s['ai_name'] for s in pending)
+            print(f"  ⏳ 배치 처리 대기 중 ({names}) - {poll_interval}초 후 재확인")
+            time.sleep(poll_interval)
+
+    print(f"\n✅ 배치 평가 완료: {total_saved}건 저장")
+    return total_saved
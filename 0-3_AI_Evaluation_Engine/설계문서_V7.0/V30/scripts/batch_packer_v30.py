@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+V30 평가 배치 패킹 (토큰 예산 + 모델별 적응형 배치 크기)
+
+기존 방식의 문제:
+- evaluate_category: 항목 길이와 모델에 상관없이 항상 10개씩 자름 (V28 방식, V26은 25개)
+- 배치마다 붙는 고정 프롬프트(평가 기준/프로필, ~450토큰 이상)가 10개에만 분산
+  (token_optimization_analysis.py 방안 4: 배치를 키우면 호출 수 / 입력 토큰 감소)
+- 반대로 무작정 키우면 출력 max_tokens(4096)에서 잘려 파싱 실패 / 누락 ID 증가
+
+V30 배치 패커:
+1. 토큰 예산 패킹: 항목별 추정 토큰(배치 프롬프트 조각)을 더해 input_budget을 넘기 전까지,
+   그리고 출력 예산(max_tokens / 항목당 출력 토큰)에 들어가는 개수까지만 한 배치에 담음
+2. 모델별 적응형 배치 크기 (AIMD, rate_limiter_v30과 같은 방식)
+   - 요청한 항목이 모두 평가됨: 크기 +1
+   - 파싱 실패 또는 누락 비율이 MISSING_TOLERANCE 초과: 크기 × 0.7 (min_size까지)
+3. 부분 응답: 누락된 ID만 현재(줄어든) 크기로 다시 묶어 재요청 (evaluate_v30.evaluate_batch)
+
+사용법:
+    from batch_packer_v30 import get_batch_packer
+
+    packer = get_batch_packer("Claude")
+    for batch in packer.pack(items, cost=item_prompt_tokens):
+        ...
+        packer.record(len(batch), len(evaluations))          # 파싱 실패면 parse_failed=True
+
+    # 한도 조정 (환경변수 V30_BATCH_LIMITS, JSON)
+    # V30_BATCH_LIMITS='{"Gemini": {"initial": 30, "input_budget": 12000}}'
+    # 고정 10개 (기존 방식): V30_ADAPTIVE_BATCH=off 또는 evaluate_v30.py --no-adaptive-batch
+"""
+
+import os
+import json
+import threading
+
+# 고정 배치 크기 (--no-adaptive-batch, V28 방식)
+FIXED_BATCH_SIZE = 10
+
+# 출력 예산: 평가 1개(id + rating + rationale) 약 100토큰 (token_optimization_analysis.py: 10개 1,000토큰)
+MAX_OUTPUT_TOKENS = 4096
+OUTPUT_TOKENS_PER_ITEM = 120
+OUTPUT_HEADROOM = 0.9
+
+# 배치 결과 중 누락 비율이 이보다 크면 배치 크기 감소
+MISSING_TOLERANCE = 0.1
+DECREASE_FACTOR = 0.7
+
+# 모델별 기본값 (initial: 시작 크기, V26 evaluate_batch 25개 기준)
+MODEL_DEFAULTS = {
+    "Claude": {"initial": 25, "min_size": 5, "input_budget": 8000},
+    "ChatGPT": {"initial": 25, "min_size": 5, "input_budget": 8000},
+    "Gemini": {"initial": 25, "min_size": 5, "input_budget": 10000},
+    "Grok": {"initial": 20, "min_size": 5, "input_budget": 8000},
+}
+
+_enabled = os.getenv('V30_ADAPTIVE_BATCH', 'on').lower() not in ('off', '0', 'false', 'none')
+
+
+def adaptive_batch_enabled():
+    return _enabled
+
+
+def disable_adaptive_batch():
+    """--no-adaptive-batch 옵션용 (항상 FIXED_BATCH_SIZE개씩)"""
+    global _enabled
+    _enabled = False
+
+
+class BatchPacker:
+    """AI 1개의 배치 크기 상태 (스레드 안전, 카테고리/배치 간 공유)"""
+
+    def __init__(self, name, initial=25, min_size=5, input_budget=8000,
+                 max_output_tokens=MAX_OUTPUT_TOKENS, output_tokens_per_item=OUTPUT_TOKENS_PER_ITEM):
+        self.name = name
+        # 출력 예산에 들어가는 최대 개수 (응답이 max_tokens에서 잘리지 않도록)
+        self.max_size = max(1, int(max_output_tokens * OUTPUT_HEADROOM) // output_tokens_per_item)
+        self.min_size = max(1, min(min_size, self.max_size))
+        self.size = float(min(max(initial, self.min_size), self.max_size))
+        self.input_budget = input_budget
+        self.lock = threading.Lock()
+        self.stats = {'batches': 0, 'items': 0, 'evaluated': 0, 'parse_failures': 0,
+                      'increases': 0, 'decreases': 0}
+
+    def current_size(self):
+        if not _enabled:
+            return FIXED_BATCH_SIZE
+        with self.lock:
+            return int(self.size)
+
+    def pack(self, items, cost=None):
+        """항목 순서를 유지한 채 배치 목록으로 나눔 (크기 한도 + 입력 토큰 예산)
+
+        cost: 항목 → 추정 토큰 (없으면 개수 한도만 적용)
+        """
+        limit = self.current_size()
+        batches = []
+        current = []
+        used = 0
+        for item in items:
+            tokens = cost(item) if (cost and _enabled) else 0
+            if current and (len(current) >= limit or used + tokens > self.input_budget):
+                batches.append(current)
+                current = []
+                used = 0
+            current.append(item)
+            used += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def record(self, requested, evaluated, parse_failed=False):
+        """배치 1회 결과 반영 (AIMD: 모두 평가 +1, 파싱 실패/누락 과다 × DECREASE_FACTOR)"""
+        if requested <= 0:
+            return
+        with self.lock:
+            self.stats['batches'] += 1
+            self.stats['items'] += requested
+            self.stats['evaluated'] += evaluated
+            missing_rate = 1.0 - min(evaluated, requested) / requested
+            if parse_failed:
+                self.stats['parse_failures'] += 1
+            if parse_failed or missing_rate > MISSING_TOLERANCE:
+                # 작은 배치(재요청 등)의 실패는 현재 크기보다 큰 쪽으로 되돌리지 않음
+                shrunk = max(float(self.min_size), min(self.size, float(requested)) * DECREASE_FACTOR)
+                if shrunk < self.size:
+                    self.size = shrunk
+                    self.stats['decreases'] += 1
+            elif evaluated >= requested and requested >= int(self.size) and self.size < self.max_size:
+                # 현재 크기만큼 채운 배치가 성공했을 때만 증가 (작은 꼬리 배치 성공으로 과대 증가 방지)
+                self.size = min(float(self.max_size), self.size + 1.0)
+                self.stats['increases'] += 1
+
+
+_packers = {}
+_packers_lock = threading.Lock()
+
+
+def _load_env_limits():
+    """V30_BATCH_LIMITS 환경변수 (JSON) 읽기"""
+    raw = os.getenv('V30_BATCH_LIMITS')
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        print(f"⚠️ V30_BATCH_LIMITS 파싱 실패 (JSON 형식 필요): {raw}")
+        return {}
+
+
+def get_batch_packer(ai_name):
+    """AI별 공유 배치 패커 (프로세스 내 싱글톤)"""
+    with _packers_lock:
+        if ai_name not in _packers:
+            limits = dict(MODEL_DEFAULTS.get(ai_name, {"initial": FIXED_BATCH_SIZE, "min_size": 5,
+                                                       "input_budget": 8000}))
+            limits.update(_load_env_limits().get(ai_name, {}))
+            _packers[ai_name] = BatchPacker(ai_name, **limits)
+        return _packers[ai_name]
+
+
+def get_packer_stats():
+    """AI별 배치 수 / 평가율 / 현재 배치 크기"""
+    with _packers_lock:
+        packers = list(_packers.items())
+    stats = {}
+    for name, packer in packers:
+        with packer.lock:
+            stats[name] = dict(packer.stats, size=int(packer.size) if _enabled else FIXED_BATCH_SIZE)
+    return stats
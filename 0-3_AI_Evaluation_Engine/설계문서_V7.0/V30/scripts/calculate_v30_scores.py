@@ -26,56 +26,54 @@ V30 점수 계산 스크립트
 - Tn (Tin): 280~359점
 - L (Lead): 200~279점
 
+계산 방식 (벡터화):
+- 평가 결과를 압축 배열로 한 번에 로드 (정치인/카테고리/AI 코드 + int8 점수)
+- (정치인, 카테고리, AI) 그룹 평균을 bincount로 계산 → 모든 점수/등급을 한 번에 산출
+- 저장은 유니크 키 기준 청크 upsert (명단 전체 재계산도 수 초, 중간 실패 시에도 기존 점수 유지)
+- --from-aggregates: 원본 평가 대신 evaluation_aggregates_v30(트리거가 유지하는 합계/건수)에서 계산
+  (정치인 × 카테고리 × AI 최대 40행 → 평가 건수와 무관)
+
 사용법:
     python calculate_v30_scores.py --politician_id=62e7b453 --politician_name="오세훈"
+
+    # 명단 전체 재계산 (평가 기준 변경 후)
+    python calculate_v30_scores.py --roster=politicians.txt
+    python calculate_v30_scores.py --all
+
+    # 증분 집계 기반 (빠름) / 집계 재구성
+    python calculate_v30_scores.py --all --from-aggregates
+    python calculate_v30_scores.py --rebuild-aggregates
 """
 
-import os
-import sys
+import time
 import argparse
+from array import array
 from datetime import datetime
-from supabase import create_client
-from dotenv import load_dotenv
+import numpy as np
+from engine_v30 import CATEGORIES, EVALUATION_AIS, load_env, configure_stdout
+from repository_v30 import (
+    get_client, iter_evaluations, iter_rows, chunks, upsert_rows,
+    TABLE_EVAL_AGGREGATES, COLUMNS_EVAL_SCORE, COLUMNS_EVAL_SCORE_ROSTER, COLUMNS_EVAL_AGGREGATE
+)
 
 # UTF-8 출력 설정
-if sys.platform == 'win32':
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+configure_stdout()
 
 # 환경 변수 로드
-load_dotenv(override=True)
-
-# Supabase 클라이언트
-supabase = create_client(
-    os.getenv('SUPABASE_URL'),
-    os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-)
+load_env()
 
 # 테이블명
 TABLE_EVALUATIONS = "evaluations_v30"
 TABLE_CATEGORY_SCORES = "ai_category_scores_v30"
 TABLE_FINAL_SCORES = "ai_final_scores_v30"
+CATEGORY_SCORES_UNIQUE_KEY = "politician_id,category"  # idx_v30_cat_scores_unique
+FINAL_SCORES_UNIQUE_KEY = "politician_id"              # idx_v30_final_unique
 
 # 점수 계산 상수
 PRIOR = 6.0
 COEFFICIENT = 0.5
 
-# 카테고리 정의 (V28.3 기준)
-CATEGORIES = [
-    ("expertise", "전문성"),
-    ("leadership", "리더십"),
-    ("vision", "비전"),
-    ("integrity", "청렴성"),
-    ("ethics", "윤리성"),
-    ("accountability", "책임감"),
-    ("transparency", "투명성"),
-    ("communication", "소통능력"),
-    ("responsiveness", "대응성"),
-    ("publicinterest", "공익성")
-]
-
-# 평가 AI (4개)
-EVALUATION_AIS = ["Claude", "ChatGPT", "Gemini", "Grok"]
+# 카테고리 / 평가 AI: engine_v30 (단계 공용)
 
 # V30 등급 체계 (+4 ~ -4) → 점수 변환
 RATING_TO_SCORE = {
@@ -107,17 +105,9 @@ def get_grade(score):
 
 
 def get_evaluations(politician_id, category=None):
-    """평가 결과 조회"""
+    """평가 결과 조회 (키셋 페이지네이션, 점수 계산용 컬럼만)"""
     try:
-        query = supabase.table(TABLE_EVALUATIONS)\
-            .select('*')\
-            .eq('politician_id', politician_id)
-
-        if category:
-            query = query.eq('category', category.lower())
-
-        result = query.execute()
-        return result.data if result.data else []
+        return list(iter_evaluations(politician_id, category=category, columns=COLUMNS_EVAL_SCORE))
     except Exception as e:
         print(f"  ⚠️ 평가 조회 실패: {e}")
         return []
@@ -137,83 +127,254 @@ def calculate_category_score(avg_score):
     return max(20, min(100, round(score)))
 
 
-def calculate_scores(politician_id, politician_name):
-    """전체 점수 계산"""
+# ============================================================
+# 벡터화 점수 계산 (명단 전체를 한 번에)
+# ============================================================
+
+def load_evaluation_arrays(politicians=None):
+    """평가 결과 → 압축 배열 (정치인/카테고리/AI 코드 + int8 점수)
+
+    Args:
+        politicians: [(politician_id, politician_name)] - None이면 평가가 있는 전체 정치인
+
+    Returns:
+        (politicians, pol_codes, cat_codes, ai_codes, scores)
+    """
+    cat_index = {cat_name: i for i, (cat_name, _k) in enumerate(CATEGORIES)}
+    ai_index = {ai_name: i for i, ai_name in enumerate(EVALUATION_AIS)}
+
+    pol_codes, cat_codes, ai_codes, scores = array('i'), array('b'), array('b'), array('b')
+
+    if politicians is None:
+        politicians = []
+        pol_index = {}
+        row_sources = [iter_rows(TABLE_EVALUATIONS, COLUMNS_EVAL_SCORE_ROSTER)]
+    else:
+        politicians = list(politicians)
+        pol_index = {politician_id: i for i, (politician_id, _name) in enumerate(politicians)}
+        row_sources = [
+            iter_rows(TABLE_EVALUATIONS, COLUMNS_EVAL_SCORE, {'politician_id': chunk})
+            for chunk in chunks(list(pol_index))
+        ]
+
+    for rows in row_sources:
+        for row in rows:
+            cat = cat_index.get(row.get('category'))
+            ai = ai_index.get(row.get('evaluator_ai'))
+            if cat is None or ai is None:
+                continue
+
+            politician_id = row.get('politician_id')
+            pol = pol_index.get(politician_id)
+            if pol is None:
+                pol = pol_index[politician_id] = len(politicians)
+                politicians.append((politician_id, row.get('politician_name') or politician_id))
+
+            # score가 없으면 rating에서 계산
+            score = row.get('score')
+            if score is None:
+                score = RATING_TO_SCORE.get(row.get('rating', '+1'), 2)
+
+            pol_codes.append(pol)
+            cat_codes.append(cat)
+            ai_codes.append(ai)
+            scores.append(int(score))
+
+    return (
+        politicians,
+        np.frombuffer(pol_codes, dtype=np.int32) if pol_codes else np.zeros(0, dtype=np.int32),
+        np.frombuffer(cat_codes, dtype=np.int8) if cat_codes else np.zeros(0, dtype=np.int8),
+        np.frombuffer(ai_codes, dtype=np.int8) if ai_codes else np.zeros(0, dtype=np.int8),
+        np.frombuffer(scores, dtype=np.int8) if scores else np.zeros(0, dtype=np.int8),
+    )
+
+
+def category_score_array(avg_scores):
+    """calculate_category_score의 배열 버전 (반올림 규칙 동일: 짝수 반올림)"""
+    return np.clip(np.round((PRIOR + avg_scores * COEFFICIENT) * 10), 20, 100).astype(np.int32)
+
+
+def grade_index_array(scores):
+    """점수 배열 → GRADE_BOUNDARIES 인덱스 배열"""
+    mins = np.array([b[0] for b in GRADE_BOUNDARIES][::-1])
+    idx = np.searchsorted(mins, scores, side='right') - 1
+    return len(GRADE_BOUNDARIES) - 1 - np.clip(idx, 0, None)
+
+
+def group_totals(n_politicians, pol_codes, cat_codes, ai_codes, scores):
+    """(정치인, 카테고리, AI) 그룹별 점수 합계/건수 → (sums, counts) (P,C,A) 배열"""
+    n_cat, n_ai = len(CATEGORIES), len(EVALUATION_AIS)
+    shape = (n_politicians, n_cat, n_ai)
+    size = n_politicians * n_cat * n_ai
+
+    group = (pol_codes.astype(np.int64) * n_cat + cat_codes) * n_ai + ai_codes
+    counts = np.bincount(group, minlength=size).reshape(shape)
+    sums = np.bincount(group, weights=scores.astype(np.float64), minlength=size).reshape(shape)
+    return sums, counts
+
+
+def load_aggregate_totals(politicians=None):
+    """evaluation_aggregates_v30 → (politicians, sums, counts)
+
+    원본 평가 대신 트리거가 유지하는 합계/건수를 읽음 (정치인당 최대 카테고리 × AI 행)
+    """
+    cat_index = {cat_name: i for i, (cat_name, _k) in enumerate(CATEGORIES)}
+    ai_index = {ai_name: i for i, ai_name in enumerate(EVALUATION_AIS)}
+
+    if politicians is None:
+        politicians = []
+        pol_index = {}
+        row_sources = [iter_rows(TABLE_EVAL_AGGREGATES, COLUMNS_EVAL_AGGREGATE)]
+    else:
+        politicians = list(politicians)
+        pol_index = {politician_id: i for i, (politician_id, _name) in enumerate(politicians)}
+        row_sources = [
+            iter_rows(TABLE_EVAL_AGGREGATES, COLUMNS_EVAL_AGGREGATE, {'politician_id': chunk})
+            for chunk in chunks(list(pol_index))
+        ]
+
+    entries = []
+    for rows in row_sources:
+        for row in rows:
+            cat = cat_index.get(row.get('category'))
+            ai = ai_index.get(row.get('evaluator_ai'))
+            if cat is None or ai is None or not row.get('eval_count'):
+                continue
+
+            politician_id = row.get('politician_id')
+            pol = pol_index.get(politician_id)
+            if pol is None:
+                pol = pol_index[politician_id] = len(politicians)
+                politicians.append((politician_id, row.get('politician_name') or politician_id))
+            entries.append((pol, cat, ai, row['sum_score'], row['eval_count']))
+
+    shape = (len(politicians), len(CATEGORIES), len(EVALUATION_AIS))
+    sums = np.zeros(shape)
+    counts = np.zeros(shape, dtype=np.int64)
+    if entries:
+        pol, cat, ai, sum_score, eval_count = (np.array(col) for col in zip(*entries))
+        sums[pol, cat, ai] = sum_score
+        counts[pol, cat, ai] = eval_count
+    return politicians, sums, counts
+
+
+def rebuild_aggregates(politician_id=None):
+    """evaluation_aggregates_v30 재구성 (원본 평가에서 처음부터), 재구성된 행 수 반환"""
+    result = get_client().rpc('rebuild_evaluation_aggregates_v30', {'p_politician_id': politician_id}).execute()
+    return result.data
+
+
+def compute_score_arrays(n_politicians, pol_codes, cat_codes, ai_codes, scores):
+    """(정치인, 카테고리, AI) 그룹 평균 → 전체 점수 배열 (한 번의 벡터 연산)"""
+    sums, counts = group_totals(n_politicians, pol_codes, cat_codes, ai_codes, scores)
+    return scores_from_totals(sums, counts)
+
+
+def scores_from_totals(sums, counts):
+    """그룹 합계/건수 (P,C,A) → 전체 점수 배열
+
+    Returns: dict
+        ai_avg (P,C,A), has_ai (P,C,A), ai_category (P,C,A),
+        category_avg (P,C), has_category (P,C), category (P,C),
+        ai_final (P,A), final (P), grade_idx (P)
+    """
+    shape = sums.shape
+
+    # AI별 카테고리 평균 → AI별 카테고리 점수
+    has_ai = counts > 0
+    ai_avg = np.divide(sums, counts, out=np.zeros(shape), where=has_ai)
+    ai_category = category_score_array(ai_avg)
+
+    # 카테고리 점수: 평가한 AI 평균들의 평균 (평가 없으면 60점)
+    n_evaluators = has_ai.sum(axis=2)
+    has_category = n_evaluators > 0
+    category_avg = np.divide(np.where(has_ai, ai_avg, 0.0).sum(axis=2), n_evaluators,
+                             out=np.zeros(shape[:2]), where=has_category)
+    category = np.where(has_category, category_score_array(category_avg), 60)
+
+    # AI별 최종 점수: 평가한 카테고리 점수 합계 (평가 없으면 600점)
+    ai_total = np.where(has_ai, ai_category, 0).sum(axis=1)
+    ai_final = np.where(has_ai.any(axis=1), np.clip(ai_total, 200, 1000), 600)
+
+    final = np.clip(category.sum(axis=1), 200, 1000)
+
+    return {
+        'ai_avg': ai_avg, 'has_ai': has_ai, 'ai_category': ai_category,
+        'category_avg': category_avg, 'has_category': has_category, 'category': category,
+        'ai_final': ai_final, 'final': final, 'grade_idx': grade_index_array(final)
+    }
+
+
+def build_score_results(politicians, arrays):
+    """점수 배열 → 정치인별 결과 dict (calculate_scores 반환 형식)"""
+    results = []
+    for p, (politician_id, politician_name) in enumerate(politicians):
+        ai_category_scores = {ai: {} for ai in EVALUATION_AIS}
+        ai_category_details = {}
+        category_scores = {}
+        category_averages = {}
+
+        for c, (cat_name, _cat_korean) in enumerate(CATEGORIES):
+            category_scores[cat_name] = int(arrays['category'][p, c])
+            if not arrays['has_category'][p, c]:
+                continue
+            category_averages[cat_name] = float(arrays['category_avg'][p, c])
+            ai_category_details[cat_name] = {}
+            for a, ai_name in enumerate(EVALUATION_AIS):
+                if arrays['has_ai'][p, c, a]:
+                    ai_category_details[cat_name][ai_name] = float(arrays['ai_avg'][p, c, a])
+                    ai_category_scores[ai_name][cat_name] = int(arrays['ai_category'][p, c, a])
+
+        _min, _max, grade_code, grade_name = GRADE_BOUNDARIES[arrays['grade_idx'][p]]
+        results.append({
+            'politician_id': politician_id,
+            'politician_name': politician_name,
+            'category_scores': category_scores,
+            'category_averages': category_averages,
+            'ai_category_details': ai_category_details,
+            'ai_category_scores': ai_category_scores,
+            'ai_final_scores': {ai: int(arrays['ai_final'][p, a]) for a, ai in enumerate(EVALUATION_AIS)},
+            'final_score': int(arrays['final'][p]),
+            'grade_code': grade_code,
+            'grade_name': grade_name
+        })
+    return results
+
+
+def score_politicians(politicians=None, from_aggregates=False):
+    """정치인 목록(None이면 전체) 점수 계산 → 결과 dict 목록
+
+    from_aggregates=True면 원본 평가 대신 evaluation_aggregates_v30 사용
+    """
+    if from_aggregates:
+        politicians, sums, counts = load_aggregate_totals(politicians)
+        return build_score_results(politicians, scores_from_totals(sums, counts))
+
+    politicians, pol_codes, cat_codes, ai_codes, scores = load_evaluation_arrays(politicians)
+    arrays = compute_score_arrays(len(politicians), pol_codes, cat_codes, ai_codes, scores)
+    return build_score_results(politicians, arrays)
+
+
+def calculate_scores(politician_id, politician_name, from_aggregates=False):
+    """전체 점수 계산 (정치인 1명, 상세 출력)"""
     print(f"\n{'#'*60}")
     print(f"# V30 점수 계산: {politician_name} ({politician_id})")
     print(f"# 등급 체계: +4 ~ -4 (V28 기준)")
     print(f"{'#'*60}")
 
-    category_scores = {}
-    ai_category_details = {}
-    ai_category_scores = {ai: {} for ai in EVALUATION_AIS}  # AI별 카테고리 점수
+    result = score_politicians([(politician_id, politician_name)], from_aggregates)[0]
+    category_scores = result['category_scores']
+    ai_final_scores = result['ai_final_scores']
 
-    # 카테고리별 점수 계산
+    # 카테고리별 점수
     for cat_name, cat_korean in CATEGORIES:
-        print(f"\n[{cat_korean}] 점수 계산 중...")
-
-        evaluations = get_evaluations(politician_id, cat_name)
-
-        if not evaluations:
+        print(f"\n[{cat_korean}] 점수 계산 결과")
+        if cat_name not in result['ai_category_details']:
             print(f"  ⚠️ 평가 데이터 없음, 기본값 사용 (60점)")
-            category_scores[cat_name] = 60  # 중립 기본값
             continue
-
-        # AI별 점수 수집
-        ai_scores = {}
-        for eval_data in evaluations:
-            ai_name = eval_data.get('evaluator_ai')
-            rating = eval_data.get('rating', '+1')
-            score = eval_data.get('score')
-
-            # score가 없으면 rating에서 계산
-            if score is None:
-                score = RATING_TO_SCORE.get(rating, 2)
-
-            if ai_name not in ai_scores:
-                ai_scores[ai_name] = []
-            ai_scores[ai_name].append({
-                'rating': rating,
-                'score': score
-            })
-
-        # AI별 평균 계산 및 AI별 카테고리 점수 계산
-        ai_averages = {}
-        for ai_name, scores in ai_scores.items():
-            avg = sum(s['score'] for s in scores) / len(scores)
-            ai_averages[ai_name] = avg
-            # AI별 카테고리 점수 계산
-            ai_cat_score = calculate_category_score(avg)
-            ai_category_scores[ai_name][cat_name] = ai_cat_score
-            print(f"  [{ai_name}] 평균: {avg:+.2f}점 → {ai_cat_score}점")
-
-        # 전체 평균 (4개 AI 평균의 평균)
-        if ai_averages:
-            overall_avg = sum(ai_averages.values()) / len(ai_averages)
-        else:
-            overall_avg = 0.0  # 기본값 (중립)
-
-        # 카테고리 점수 계산
-        cat_score = calculate_category_score(overall_avg)
-        category_scores[cat_name] = cat_score
-        ai_category_details[cat_name] = ai_averages
-
-        print(f"  📊 전체 평균: {overall_avg:+.2f} → 카테고리 점수: {cat_score}점")
-
-    # AI별 최종 점수 계산
-    ai_final_scores = {}
-    for ai_name in EVALUATION_AIS:
-        if ai_category_scores[ai_name]:
-            ai_total = sum(ai_category_scores[ai_name].values())
-            ai_total = max(200, min(1000, ai_total))
-            ai_final_scores[ai_name] = ai_total
-        else:
-            ai_final_scores[ai_name] = 600  # 기본값
-
-    # 최종 점수 계산
-    final_score = sum(category_scores.values())
-    final_score = max(200, min(1000, final_score))  # 200~1000 범위
-    grade_code, grade_name = get_grade(final_score)
+        for ai_name, avg in result['ai_category_details'][cat_name].items():
+            print(f"  [{ai_name}] 평균: {avg:+.2f}점 → {result['ai_category_scores'][ai_name][cat_name]}점")
+        print(f"  📊 전체 평균: {result['category_averages'][cat_name]:+.2f} → 카테고리 점수: {category_scores[cat_name]}점")
 
     print(f"\n{'='*60}")
     print(f"📊 카테고리별 점수")
@@ -233,88 +394,105 @@ def calculate_scores(politician_id, politician_name):
     print(f"\n{'='*60}")
     print(f"🏆 최종 결과 (4 AIs 평균)")
     print(f"{'='*60}")
-    print(f"  최종 점수: {final_score}점")
-    print(f"  등급: {grade_code} ({grade_name})")
+    print(f"  최종 점수: {result['final_score']}점")
+    print(f"  등급: {result['grade_code']} ({result['grade_name']})")
 
     # DB 저장
-    save_scores_to_db(politician_id, politician_name, category_scores, ai_category_details,
-                      ai_category_scores, ai_final_scores, final_score, grade_code, grade_name)
+    save_scores_bulk([result])
 
-    return {
-        'politician_id': politician_id,
-        'politician_name': politician_name,
-        'category_scores': category_scores,
-        'ai_category_scores': ai_category_scores,
-        'ai_final_scores': ai_final_scores,
-        'final_score': final_score,
-        'grade_code': grade_code,
-        'grade_name': grade_name
-    }
+    return result
+
+
+def calculate_all_scores(politicians=None, from_aggregates=False):
+    """명단 전체 점수 계산 (벡터화 1회 + 벌크 저장)"""
+    started = time.time()
+    results = score_politicians(politicians, from_aggregates)
+    computed = time.time()
+
+    print(f"\n{'='*60}")
+    print(f"🏆 전체 점수 계산: {len(results)}명 ({computed - started:.1f}초)")
+    print(f"{'='*60}")
+    for result in sorted(results, key=lambda r: -r['final_score']):
+        print(f"  {result['politician_name']:10} {result['final_score']:4}점 ({result['grade_code']} - {result['grade_name']})")
+
+    save_scores_bulk(results)
+    print(f"  ⏱️ 총 {time.time() - started:.1f}초 (저장 {time.time() - computed:.1f}초)")
+    return results
 
 
-def save_scores_to_db(politician_id, politician_name, category_scores, ai_details,
-                      ai_category_scores, ai_final_scores, final_score, grade_code, grade_name):
-    """점수를 DB에 저장"""
+def save_scores_bulk(results):
+    """점수를 DB에 일괄 저장 (유니크 키 기준 청크 upsert, 저장 중 실패해도 기존 점수는 유지)"""
+    if not results:
+        return
     timestamp = datetime.now().isoformat()
 
     # 카테고리별 점수 저장
-    for cat_name, score in category_scores.items():
-        try:
-            # 기존 데이터 삭제
-            supabase.table(TABLE_CATEGORY_SCORES)\
-                .delete()\
-                .eq('politician_id', politician_id)\
-                .eq('category', cat_name)\
-                .execute()
-
-            # 새 데이터 삽입
-            record = {
-                'politician_id': politician_id,
-                'politician_name': politician_name,
+    try:
+        upsert_rows(TABLE_CATEGORY_SCORES, [
+            {
+                'politician_id': r['politician_id'],
+                'politician_name': r['politician_name'],
                 'category': cat_name,
                 'score': score,
-                'ai_details': ai_details.get(cat_name, {}),
+                'ai_details': r['ai_category_details'].get(cat_name, {}),
                 'calculated_at': timestamp
             }
-            supabase.table(TABLE_CATEGORY_SCORES).insert(record).execute()
-        except Exception as e:
-            print(f"  ⚠️ 카테고리 점수 저장 실패 ({cat_name}): {e}")
+            for r in results for cat_name, score in r['category_scores'].items()
+        ], on_conflict=CATEGORY_SCORES_UNIQUE_KEY)
+    except Exception as e:
+        print(f"  ⚠️ 카테고리 점수 저장 실패: {e}")
 
     # 최종 점수 저장
     try:
-        # 기존 데이터 삭제
-        supabase.table(TABLE_FINAL_SCORES)\
-            .delete()\
-            .eq('politician_id', politician_id)\
-            .execute()
-
-        # 새 데이터 삽입
-        record = {
-            'politician_id': politician_id,
-            'politician_name': politician_name,
-            'final_score': final_score,
-            'grade': grade_code,
-            'grade_name': grade_name,
-            'category_scores': category_scores,
-            'ai_category_scores': ai_category_scores,
-            'ai_final_scores': ai_final_scores,
-            'calculated_at': timestamp,
-            'version': 'V30'
-        }
-        supabase.table(TABLE_FINAL_SCORES).insert(record).execute()
-        print(f"\n  ✅ 최종 점수 저장 완료")
+        upsert_rows(TABLE_FINAL_SCORES, [
+            {
+                'politician_id': r['politician_id'],
+                'politician_name': r['politician_name'],
+                'final_score': r['final_score'],
+                'grade': r['grade_code'],
+                'grade_name': r['grade_name'],
+                'category_scores': r['category_scores'],
+                'ai_category_scores': r['ai_category_scores'],
+                'ai_final_scores': r['ai_final_scores'],
+                'calculated_at': timestamp,
+                'version': 'V30'
+            }
+            for r in results
+        ], on_conflict=FINAL_SCORES_UNIQUE_KEY)
+        print(f"\n  ✅ 최종 점수 저장 완료 ({len(results)}명)")
     except Exception as e:
         print(f"  ❌ 최종 점수 저장 실패: {e}")
 
 
 def main():
     parser = argparse.ArgumentParser(description='V30 점수 계산')
-    parser.add_argument('--politician_id', required=True, help='정치인 ID')
-    parser.add_argument('--politician_name', required=True, help='정치인 이름')
+    parser.add_argument('--politician_id', help='정치인 ID')
+    parser.add_argument('--politician_name', help='정치인 이름')
+    parser.add_argument('--roster', action='append',
+                        help='명단 파일 ("이름<TAB>ID" 형식, 여러 번 지정 가능) - 명단 전체 재계산')
+    parser.add_argument('--all', action='store_true', help='평가가 있는 전체 정치인 재계산')
+    parser.add_argument('--from-aggregates', action='store_true',
+                        help='원본 평가 대신 evaluation_aggregates_v30(증분 집계)에서 계산')
+    parser.add_argument('--rebuild-aggregates', action='store_true',
+                        help='evaluation_aggregates_v30을 원본 평가에서 재구성 (--politician_id 지정 시 1명만)')
 
     args = parser.parse_args()
 
-    calculate_scores(args.politician_id, args.politician_name)
+    if args.rebuild_aggregates:
+        rebuilt = rebuild_aggregates(args.politician_id)
+        print(f"✅ 평가 집계 재구성 완료: {rebuilt}행")
+        if not (args.all or args.roster or args.politician_name):
+            return
+
+    if args.all:
+        calculate_all_scores(from_aggregates=args.from_aggregates)
+    elif args.roster:
+        from scheduler_v30 import load_roster
+        calculate_all_scores(load_roster(args.roster), args.from_aggregates)
+    elif args.politician_id and args.politician_name:
+        calculate_scores(args.politician_id, args.politician_name, args.from_aggregates)
+    else:
+        parser.error('--politician_id/--politician_name, --roster, --all 중 하나가 필요합니다')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+V30 비동기 수집 엔진 (asyncio)
+
+collect_v30.py의 순차 수집(AI × 카테고리 × data_type × sentiment, 키워드별 호출 후 0.3초 대기)을
+asyncio 기반으로 동시에 실행합니다.
+
+핵심:
+1. 독립적인 수집 단위를 모두 동시에 실행
+   - 정치인 × AI × 카테고리 × data_type × sentiment
+   - 단위 안에서는 키워드 프롬프트를 "웨이브" 단위로 동시 호출
+     (남은 목표 ÷ 프롬프트당 최대 5개 + 1개만큼만 발사 → 목표 초과 호출 방지)
+2. AI별 동시 호출 수 제한 (asyncio.Semaphore)
+3. AI별 분당 토큰(TPM) 예산 (Gemini, Grok) - rate_limiter_v30 공유 토큰 버킷
+   (429 발생 시 AIMD로 동시성 자동 감소 + Retry-After 쿨다운)
+4. 기존과 동일한 의미 유지
+   - 목표 수량: DB 기존 개수 확인 후 부족분만 수집 (get_remaining_target)
+   - 단위 내 URL 중복 제거 + 목표 도달 시 즉시 중단 (add_unique_items)
+   - 저장 시 같은 AI + 같은 URL 중복 스킵 (save_collected_items, URL 인덱스 + 벌크 upsert)
+     → 같은 정치인 + 같은 AI 저장은 순서대로 실행 (중복 체크 경쟁 방지)
+
+사용법:
+    # 1명 (비동기)
+    python collect_v30.py --politician_id=62e7b453 --politician_name="오세훈" --async
+
+    # 전체 정치인 일괄 (비동기, AI별 동시 호출 수/TPM 지정)
+    python collect_v30.py --all --async --concurrency Gemini=16,Grok=4 --tpm Gemini=1000000,Grok=200000
+"""
+
+import asyncio
+import contextvars
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import collect_v30 as cv
+from rate_limiter_v30 import configure_limiter, get_limiter_stats
+from telemetry_v30 import telemetry_context
+
+# AI별 기본 동시 호출 수
+DEFAULT_CONCURRENCY = {
+    "Gemini": 8,
+    "Grok": 4,
+}
+
+# AI별 기본 분당 토큰 예산 (TPM) - None이면 제한 없음
+DEFAULT_TPM = {
+    "Gemini": 1_000_000,
+    "Grok": 200_000,
+}
+
+# 프롬프트당 최대 수집 개수 (build_search_prompt의 min(remaining, 5)와 동일)
+ITEMS_PER_PROMPT = 5
+
+# 카테고리 단위 최대 재시도 (collect_all_for_politician 병렬 모드와 동일)
+MAX_CATEGORY_RETRIES = 3
+
+
+def parse_limits(spec, defaults):
+    """'Gemini=8,Grok=4' 형식 문자열을 AI별 dict로 변환"""
+    limits = dict(defaults)
+    if not spec:
+        return limits
+    for part in spec.split(','):
+        if '=' not in part:
+            continue
+        ai_name, value = part.split('=', 1)
+        ai_name = ai_name.strip()
+        value = value.strip()
+        limits[ai_name] = None if value.lower() in ('none', '0', '') else int(value)
+    return limits
+
+
+class AsyncCollector:
+    """비동기 수집 엔진 (AI별 동시성 + TPM 제한)"""
+
+    def __init__(self, concurrency=None, tpm=None, test_mode=False):
+        self.concurrency = dict(DEFAULT_CONCURRENCY)
+        self.concurrency.update(concurrency or {})
+        tpm_limits = dict(DEFAULT_TPM)
+        tpm_limits.update(tpm or {})
+        self.test_mode = test_mode
+
+        self.semaphores = {
+            ai_name: asyncio.Semaphore(limit or 1)
+            for ai_name, limit in self.concurrency.items()
+        }
+        # 실제 호출 속도는 공유 리미터가 제어 (동시성 상한 + TPM 토큰 버킷)
+        for ai_name, limit in self.concurrency.items():
+            configure_limiter(ai_name, max_concurrency=limit, tpm=tpm_limits.get(ai_name))
+        self.save_locks = {}  # (politician_id, ai_name) → asyncio.Lock
+
+        # 동기 SDK 호출용 스레드 풀 (AI별 동시 호출 수 합계)
+        workers = sum(limit or 1 for limit in self.concurrency.values())
+        self.call_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="collect-call")
+        self.db_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="collect-db")
+
+        self.stats = {'calls': 0, 'saved': 0, 'failed_categories': 0}
+
+    def close(self):
+        self.call_executor.shutdown(wait=True)
+        self.db_executor.shutdown(wait=True)
+
+    async def _run_db(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.db_executor, func, *args)
+
+    async def call(self, ai_name, client, prompt, data_type, use_cache=True):
+        """AI 호출 1회 (동시성 제한, TPM은 call_ai 내부 리미터가 적용)"""
+        semaphore = self.semaphores.setdefault(ai_name, asyncio.Semaphore(1))
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            self.stats['calls'] += 1
+            # run_in_executor는 contextvars를 넘기지 않음 → 계측 문맥(단계/정치인/카테고리) 복사
+            return await loop.run_in_executor(
+                self.call_executor, contextvars.copy_context().run,
+                cv.call_ai, ai_name, client, prompt, data_type, use_cache
+            )
+
+    async def collect_unit(self, ai_name, client, politician_id, politician_full,
+                           category_name, data_type, topic_mode, target_count):
+        """collect_data_type의 비동기 버전 (같은 목표/중복 제거 규칙)"""
+        actual_target = await self._run_db(
+            cv.get_remaining_target, ai_name, politician_id, category_name,
+            data_type, topic_mode, target_count
+        )
+        if actual_target <= 0:
+            return []
+
+        MAX_RETRIES = 5
+        collected = []
+        collected_urls = await self._run_db(cv.get_persisted_urls, politician_id, ai_name)
+        category_items = cv.get_category_items(category_name)
+        round_configs = cv.get_round_configs(data_type)
+
+        retry_count = 0
+        while len(collected) < actual_target and retry_count < MAX_RETRIES:
+            for year_hint, extra_keyword in round_configs:
+                pending = list(category_items)
+
+                while pending and len(collected) < actual_target:
+                    remaining = actual_target - len(collected)
+                    # 남은 목표를 채울 만큼만 동시 발사 (+1: 중복/빈 응답 여유)
+                    wave_size = min(len(pending), math.ceil(remaining / ITEMS_PER_PROMPT) + 1)
+                    wave, pending = pending[:wave_size], pending[wave_size:]
+
+                    prompts = []
+                    for _item_name, item_keywords in wave:
+                        prompt = cv.build_search_prompt(
+                            ai_name, data_type, topic_mode, politician_full,
+                            item_keywords, remaining, year_hint, extra_keyword
+                        )
+                        if prompt:
+                            prompts.append(prompt)
+
+                    with telemetry_context(retries=retry_count):
+                        results = await asyncio.gather(
+                            *(self.call(ai_name, client, prompt, data_type, retry_count == 0) for prompt in prompts)
+                        )
+
+                    # 키워드 순서대로 병합 (순차 수집과 같은 우선순위)
+                    for result in results:
+                        if len(collected) >= actual_target:
+                            break
+                        if result:
+                            items = cv.parse_json_response(result)
+                            cv.add_unique_items(
+                                items, collected, collected_urls, actual_target,
+                                ai_name, data_type, topic_mode
+                            )
+
+                if len(collected) >= actual_target:
+                    break
+
+            if len(collected) < actual_target:
+                retry_count += 1
+            else:
+                break
+
+        return collected
+
+    async def collect_category(self, ai_name, politician_id, politician_name, category_name, category_korean):
+        """AI 1개 × 카테고리 1개 수집 + 저장 (collect_with_ai의 비동기 버전)"""
+        pol_info = await self._run_db(cv.get_politician_info, politician_id)
+        politician_full = pol_info['search_string'] if pol_info['search_string'] else politician_name
+
+        sentiment_dist = cv.TEST_SENTIMENT_DISTRIBUTION[ai_name] if self.test_mode else cv.SENTIMENT_DISTRIBUTION[ai_name]
+        client = cv.init_ai_client(ai_name)
+
+        with telemetry_context(stage="collect", politician_id=politician_id, category=category_name):
+            unit_results = await asyncio.gather(*(
+                self.collect_unit(
+                    ai_name, client, politician_id, politician_full,
+                    category_name, data_type, topic_mode, count
+                )
+                for data_type, topic_mode, count in cv.iter_collection_units(sentiment_dist)
+            ))
+        all_items = [item for items in unit_results for item in items]
+
+        # 같은 정치인 + 같은 AI 저장은 순서대로 (DB 중복 체크 경쟁 방지)
+        lock = self.save_locks.setdefault((politician_id, ai_name), asyncio.Lock())
+        async with lock:
+            saved = await self._run_db(
+                cv.save_collected_items, ai_name, politician_id, politician_name,
+                category_name, category_korean, all_items
+            )
+        self.stats['saved'] += saved
+        return saved
+
+    async def collect_category_with_retry(self, ai_name, politician_id, politician_name, category_name, category_korean):
+        """카테고리 단위 재시도 (Exponential backoff)"""
+        for attempt in range(1, MAX_CATEGORY_RETRIES + 1):
+            try:
+                return await self.collect_category(
+                    ai_name, politician_id, politician_name, category_name, category_korean
+                )
+            except Exception as e:
+                print(f"  ⚠️ [{politician_name}][{ai_name}] {category_korean} 시도 {attempt}/{MAX_CATEGORY_RETRIES} 실패: {e}")
+                if attempt < MAX_CATEGORY_RETRIES:
+                    await asyncio.sleep(2 ** (attempt - 1))
+
+        self.stats['failed_categories'] += 1
+        print(f"  ❌ [{politician_name}][{ai_name}] {category_korean} 최종 실패 - 재수집 필요")
+        return 0
+
+    async def collect_politician(self, politician_id, politician_name, collect_ais, categories):
+        """정치인 1명 전체 수집 (모든 AI × 카테고리 동시)"""
+        start_time = time.time()
+        counts = await asyncio.gather(*(
+            self.collect_category_with_retry(ai_name, politician_id, politician_name, cat_name, cat_korean)
+            for ai_name in collect_ais
+            for cat_name, cat_korean in categories
+        ))
+        total = sum(counts)
+        elapsed = time.time() - start_time
+        print(f"✅ {politician_name}: {total}개 저장 ({elapsed:.1f}초)")
+        return total
+
+
+async def _collect_politicians(politicians, target_ai, target_category, test_mode, concurrency, tpm):
+    collect_ais = [target_ai] if target_ai else ["Grok", "Gemini"]
+    categories = cv.CATEGORIES
+    if target_category:
+        categories = [cv.CATEGORIES[target_category - 1]]
+
+    collector = AsyncCollector(concurrency=concurrency, tpm=tpm, test_mode=test_mode)
+    try:
+        results = await asyncio.gather(*(
+            collector.collect_politician(p['id'], p['name'], collect_ais, categories)
+            for p in politicians
+        ))
+    finally:
+        collector.close()
+
+    return dict(zip((p['id'] for p in politicians), results)), collector.stats
+
+
+def collect_politicians_async(politicians, target_ai=None, target_category=None, test_mode=False,
+                              concurrency=None, tpm=None):
+    """여러 정치인 동시 수집
+
+    Args:
+        politicians: [{'id': ..., 'name': ...}, ...]
+        concurrency: AI별 동시 호출 수 (예: {'Gemini': 16, 'Grok': 4})
+        tpm: AI별 분당 토큰 예산 (예: {'Gemini': 1000000})
+
+    Returns:
+        {politician_id: 저장 개수}
+    """
+    mode_str = "[미니 테스트]" if test_mode else ""
+    limits = dict(DEFAULT_CONCURRENCY)
+    limits.update(concurrency or {})
+
+    print(f"\n{'#'*60}")
+    print(f"# V30 {mode_str}비동기 수집: {len(politicians)}명")
+    print(f"# 동시 호출: " + ", ".join(f"{ai} {n}" for ai, n in limits.items()))
+    print(f"{'#'*60}")
+
+    start_time = time.time()
+    saved_by_politician, stats = asyncio.run(
+        _collect_politicians(politicians, target_ai, target_category, test_mode, concurrency, tpm)
+    )
+    elapsed = time.time() - start_time
+
+    print(f"\n{'='*60}")
+    print(f"✅ V30 {mode_str}비동기 수집 완료")
+    print(f"   정치인: {len(politicians)}명")
+    print(f"   총 저장: {stats['saved']}개 (AI 호출 {stats['calls']}회)")
+    for ai_name, limiter_stats in get_limiter_stats().items():
+        print(f"   [{ai_name}] 429 {limiter_stats['rate_limited']}회, "
+              f"대기 {limiter_stats['waited_seconds']:.1f}초, 동시성 {limiter_stats['concurrency']}")
+    if stats['failed_categories']:
+        print(f"   ⚠️ 실패 카테고리: {stats['failed_categories']}개 (재수집 필요)")
+    print(f"   소요 시간: {elapsed:.1f}초 ({elapsed/60:.1f}분)")
+    print(f"{'='*60}")
+
+    return saved_by_politician
@@ -38,6 +38,15 @@ V30 2개 AI 분담 웹검색 수집 스크립트 (비용 최적화 버전)
 
     # 미니 테스트 (카테고리당 10개)
     python collect_v30.py --politician_id=62e7b453 --politician_name="오세훈" --parallel --test
+
+    # 비동기 수집 (모든 수집 단위 동시 실행, collect_async_v30.py)
+    python collect_v30.py --all --async --concurrency Gemini=16,Grok=4
+
+    # 응답 캐시 없이 (같은 검색 프롬프트도 항상 새로 호출)
+    python collect_v30.py --politician_id=62e7b453 --politician_name="오세훈" --no-cache
+
+    # 스트리밍 없이 (Gemini/Grok 응답 전체 대기, 기본은 Grok 목표 도달 시 스트림 중단 - Gemini는 grounding 확인 위해 끝까지)
+    python collect_v30.py --politician_id=62e7b453 --politician_name="오세훈" --no-stream
 """
 
 import os
@@ -47,21 +56,25 @@ import re
 import argparse
 import time
 import random
-import requests
+import threading
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from supabase import create_client
-from dotenv import load_dotenv
+from engine_v30 import CATEGORIES, init_ai_client, model_configs, load_env, configure_stdout
+from rate_limiter_v30 import get_limiter, estimate_tokens, settle_usage
+from llm_cache_v30 import get_response_cache, disable_response_cache
+from stream_json_v30 import JsonItemParser, stream_text, streaming_enabled, disable_streaming
+from structured_output_v30 import COLLECTION_SCHEMA, request_kwargs, load_json, disable_structured_output
+from politician_profiles_v30 import get_profile_cache
+from progress_v30 import get_progress, add_saved_collected
+from near_dup_v30 import assign_record_clusters
+from digest_v30 import assign_record_digests
+from url_canonical_v30 import canonicalize_url, canonicalize_records, canonical_key, with_canonical_column
+from repository_v30 import supabase, iter_collected_data, COLUMNS_COLLECTED_URL
+from telemetry_v30 import (span, start_span, telemetry_context, record_tokens, usage_tokens, mark_error,
+                           print_summary, disable_telemetry)
 
 # UTF-8 출력 설정
-if sys.platform == 'win32':
-    import io
-    try:
-        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
-    except AttributeError:
-        # 이미 설정되어 있거나 buffer가 없는 경우 무시
-        pass
+configure_stdout()
 
 # ============================================================
 # topic_mode → DB sentiment 매핑
@@ -89,33 +102,16 @@ def topic_mode_to_sentiment(topic_mode):
 
 
 # 환경 변수 로드
-load_dotenv(override=True)
-
-# Supabase 클라이언트
-supabase = create_client(
-    os.getenv('SUPABASE_URL'),
-    os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-)
+load_env()
 
 # V30 테이블명
 TABLE_COLLECTED_DATA = "collected_data_v30"
 
-# AI 클라이언트 캐시
-ai_clients = {}
-
-# 카테고리 정의 (V30 - V28.3 기준)
-CATEGORIES = [
-    ("expertise", "전문성"),
-    ("leadership", "리더십"),
-    ("vision", "비전"),
-    ("integrity", "청렴성"),
-    ("ethics", "윤리성"),
-    ("accountability", "책임감"),
-    ("transparency", "투명성"),
-    ("communication", "소통능력"),
-    ("responsiveness", "대응성"),
-    ("publicinterest", "공익성")
-]
+# 저장/중복 체크 설정 (migrations/add_collected_data_unique_url_v30.sql 유니크 키)
+UNIQUE_URL_KEY = "politician_id,collector_ai,source_url"
+SAVE_CHUNK_SIZE = 200        # 벌크 upsert 1회당 행 수
+
+# AI 클라이언트 캐시 (engine_v30.ai_clients), 카테고리 정의 (engine_v30.CATEGORIES)
 
 # V30 수집 비율 (카테고리당 100개) - 비용 최적화 버전
 # ⚠️ Claude/ChatGPT = 수집 제외 (웹검색 비용 문제)
@@ -197,27 +193,14 @@ TEST_SENTIMENT_DISTRIBUTION = {
     }
 }
 
-# AI 모델 설정
-AI_CONFIGS = {
-    "Claude": {
-        "model": "claude-3-5-haiku-20241022",
-        "env_key": "ANTHROPIC_API_KEY"
-    },
-    "ChatGPT": {
-        "model": "gpt-4o-mini",
-        "env_key": "OPENAI_API_KEY"
-    },
-    "Grok": {
-        "model": "grok-2",
-        "env_key": "XAI_API_KEY",
-        "base_url": "https://api.x.ai/v1"
-    },
-    "Gemini": {
-        "model": "gemini-2.0-flash",
-        "env_key": "GEMINI_API_KEY"
-    }
+# AI 모델 설정 (env_key / base_url은 engine_v30.AI_PROVIDERS)
+AI_CONFIGS = model_configs({
+    "Claude": "claude-3-5-haiku-20241022",
+    "ChatGPT": "gpt-4o-mini",
+    "Grok": "grok-2",
+    "Gemini": "gemini-2.0-flash",
     # Perplexity: 제거 (401 에러 + 비용 폭탄)
-}
+})
 
 # 공식 데이터 도메인 (Gemini OFFICIAL 소스)
 OFFICIAL_DOMAINS = [
@@ -247,36 +230,9 @@ OFFICIAL_DOMAINS = [
     "humanrights.go.kr"
 ]
 
-# 정치인 상세 정보 캐시
-_politician_info_cache = {}
-
 def get_politician_info(politician_id):
-    """정치인 상세 정보 조회 (동명이인 구분용)"""
-    if politician_id in _politician_info_cache:
-        return _politician_info_cache[politician_id]
-
-    try:
-        result = supabase.table('politicians').select('*').eq('id', politician_id).execute()
-        if result.data:
-            p = result.data[0]
-            birth_year = ""
-            if p.get('birth_date'):
-                birth_year = str(p.get('birth_date'))[:4] + "년생"
-
-            info = {
-                'name': p.get('name', ''),
-                'party': p.get('party', ''),
-                'position': p.get('position', '국회의원'),
-                'district': p.get('district', ''),
-                'birth_year': birth_year,
-                'search_string': f"{p.get('party', '')} {p.get('name', '')} {p.get('position', '국회의원')}" + (f" ({birth_year})" if birth_year else "")
-            }
-            _politician_info_cache[politician_id] = info
-            return info
-    except Exception as e:
-        print(f"  ⚠️ 정치인 정보 조회 실패: {e}")
-
-    return {'name': '', 'party': '', 'position': '국회의원', 'district': '', 'birth_year': '', 'search_string': ''}
+    """정치인 상세 정보 조회 (동명이인 구분용, 프로세스 공용 캐시)"""
+    return get_profile_cache().get_search_info(politician_id)
 
 # 카테고리별 10개 항목 (V28.3 기준 중립화)
 CATEGORY_ITEMS = {
@@ -471,47 +427,6 @@ def check_politician_exists(politician_id):
         return False, None
 
 
-def init_ai_client(ai_name):
-    """AI 클라이언트 초기화"""
-    global ai_clients
-
-    if ai_name in ai_clients:
-        return ai_clients[ai_name]
-
-    config = AI_CONFIGS.get(ai_name)
-    if not config:
-        raise ValueError(f"알 수 없는 AI: {ai_name}")
-
-    api_key = os.getenv(config['env_key'])
-    if not api_key:
-        raise ValueError(f"{config['env_key']} 환경변수가 설정되지 않았습니다.")
-
-    if ai_name == "Perplexity":
-        from openai import OpenAI
-        ai_clients[ai_name] = OpenAI(
-            api_key=api_key,
-            base_url=config['base_url']
-        )
-    elif ai_name == "Claude":
-        import anthropic
-        ai_clients[ai_name] = anthropic.Anthropic(api_key=api_key)
-    elif ai_name == "ChatGPT":
-        from openai import OpenAI
-        ai_clients[ai_name] = OpenAI(api_key=api_key)
-    elif ai_name == "Grok":
-        from openai import OpenAI
-        ai_clients[ai_name] = OpenAI(
-            api_key=api_key,
-            base_url=config['base_url']
-        )
-    elif ai_name == "Gemini":
-        from google import genai
-        client = genai.Client(api_key=api_key)
-        ai_clients[ai_name] = client
-
-    return ai_clients[ai_name]
-
-
 def get_date_range():
     """V30 기간 제한 계산"""
     evaluation_date = datetime.now()
@@ -682,13 +597,16 @@ def call_perplexity(client, prompt, data_type):
     messages = [{"role": "user", "content": prompt}]
 
     try:
-        response = client.chat.completions.create(
-            model=config['model'],
-            messages=messages,
-            max_tokens=8000
-        )
+        with get_limiter("Perplexity").request(tokens=estimate_tokens(prompt)):
+            response = client.chat.completions.create(
+                model=config['model'],
+                messages=messages,
+                max_tokens=8000
+            )
+        record_response_usage(response)
         return response.choices[0].message.content
     except Exception as e:
+        mark_error(e)
         print(f"  ❌ Perplexity API 에러: {e}")
         return None
 
@@ -699,19 +617,21 @@ def call_claude_with_websearch(client, prompt):
 
     try:
         # beta 기능은 client.beta.messages.create() 사용
-        response = client.beta.messages.create(
-            model=config['model'],
-            max_tokens=8000,
-            betas=["web-search-2025-03-05"],
-            tools=[
-                {
-                    "type": "web_search_20250305",
-                    "name": "web_search",
-                    "max_uses": 15
-                }
-            ],
-            messages=[{"role": "user", "content": prompt}]
-        )
+        with get_limiter("Claude").request(tokens=estimate_tokens(prompt)):
+            response = client.beta.messages.create(
+                model=config['model'],
+                max_tokens=8000,
+                betas=["web-search-2025-03-05"],
+                tools=[
+                    {
+                        "type": "web_search_20250305",
+                        "name": "web_search",
+                        "max_uses": 15
+                    }
+                ],
+                messages=[{"role": "user", "content": prompt}]
+            )
+        record_response_usage(response)
 
         # 응답에서 텍스트 추출 (BetaTextBlock만)
         result_text = ""
@@ -726,10 +646,39 @@ def call_claude_with_websearch(client, prompt):
 
         return result_text if result_text else None
     except Exception as e:
+        mark_error(e)
         print(f"  ❌ Claude API 에러: {e}")
         return None
 
 
+# 구조화 출력 이름 (수집 항목 스키마, Grok만 사용)
+# Gemini는 google_search grounding과 응답 스키마를 함께 쓸 수 없어 기존 방식 유지
+COLLECTION_OUTPUT_NAME = "collected_items"
+
+
+def extract_grounding_urls(response):
+    """Gemini 응답/스트림 청크의 grounding_metadata → 실제 검색한 URL 목록"""
+    urls = []
+    sources = [getattr(response, 'grounding_metadata', None)]
+    for candidate in getattr(response, 'candidates', None) or []:
+        sources.append(getattr(candidate, 'grounding_metadata', None))
+    for grounding in sources:
+        if grounding and getattr(grounding, 'grounding_chunks', None):
+            for chunk in grounding.grounding_chunks:
+                if hasattr(chunk, 'web') and hasattr(chunk.web, 'uri'):
+                    urls.append(chunk.web.uri)
+    return urls
+
+
+def replace_ungrounded_url(item, actual_urls):
+    """검색 결과에 없는 URL → 실제 검색 URL(첫 번째)로 교체, 교체했으면 True"""
+    url = item.get('source_url', '')
+    if url and url in actual_urls:
+        return False
+    item['source_url'] = actual_urls[0]
+    return True
+
+
 def call_gemini_with_search(client, prompt):
     """Gemini API 호출 (Google Search grounding) - 신규 SDK + URL 검증"""
     try:
@@ -737,82 +686,245 @@ def call_gemini_with_search(client, prompt):
         from google.genai import types
 
         # Gemini 2.0+ google_search 도구 사용
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                tools=[types.Tool(google_search=types.GoogleSearch())]
+        with get_limiter("Gemini").request(tokens=estimate_tokens(prompt)):
+            response = client.models.generate_content(
+                model="gemini-2.0-flash",
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    tools=[types.Tool(google_search=types.GoogleSearch())]
+                )
             )
-        )
+        record_response_usage(response)
 
         if not response.text:
             return None
 
         # ✅ grounding_metadata 확인: 실제 검색한 URL 추출
-        actual_urls = []
-        if hasattr(response, 'grounding_metadata') and response.grounding_metadata:
-            grounding = response.grounding_metadata
-            if hasattr(grounding, 'grounding_chunks') and grounding.grounding_chunks:
-                for chunk in grounding.grounding_chunks:
-                    if hasattr(chunk, 'web') and hasattr(chunk.web, 'uri'):
-                        actual_urls.append(chunk.web.uri)
-
-            if actual_urls:
-                print(f"    [Gemini] 실제 검색 URL: {len(actual_urls)}개")
-            else:
-                print(f"    [Gemini] ⚠️ grounding_chunks 없음 - 검색 미수행")
+        actual_urls = extract_grounding_urls(response)
+        if actual_urls:
+            print(f"    [Gemini] 실제 검색 URL: {len(actual_urls)}개")
+        else:
+            print(f"    [Gemini] ⚠️ grounding_chunks 없음 - 검색 미수행")
 
         # JSON 파싱 및 가짜 URL 필터링
         if actual_urls:
             try:
                 items = json.loads(response.text)
                 if isinstance(items, list):
-                    verified_items = []
-                    fake_count = 0
-                    for item in items:
-                        url = item.get('source_url', '')
-                        # URL이 실제 검색 결과에 있는지 확인
-                        if url and url in actual_urls:
-                            verified_items.append(item)
-                        else:
-                            fake_count += 1
-                            # 실제 URL로 교체 시도 (첫 번째 URL 사용)
-                            if actual_urls:
-                                item['source_url'] = actual_urls[0]
-                                verified_items.append(item)
+                    # URL이 실제 검색 결과에 없으면 실제 URL로 교체 (첫 번째 URL 사용)
+                    fake_count = sum(1 for item in items if replace_ungrounded_url(item, actual_urls))
 
                     if fake_count > 0:
                         print(f"    [Gemini] 가짜 URL {fake_count}개 발견 → 실제 URL로 교체")
 
-                    return json.dumps(verified_items, ensure_ascii=False)
+                    return json.dumps(items, ensure_ascii=False)
             except json.JSONDecodeError:
                 pass  # JSON 파싱 실패 시 원본 반환
 
         return response.text
     except Exception as e:
+        mark_error(e)
         print(f"  ❌ Gemini API 에러: {e}")
         # fallback 없이 에러 반환 (환각 방지)
         return None
 
 
+def stream_gemini_with_search(client, prompt, context):
+    """Gemini 스트리밍 호출 (Google Search grounding) → 텍스트 조각
+
+    grounding URL은 청크가 도착하는 대로 context['grounding_urls']에 누적
+    """
+    from google.genai import types
+
+    grounding_urls = context.setdefault('grounding_urls', [])
+
+    def open_stream():
+        return client.models.generate_content_stream(
+            model="gemini-2.0-flash",
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                tools=[types.Tool(google_search=types.GoogleSearch())]
+            )
+        )
+
+    def extract_text(chunk):
+        for url in extract_grounding_urls(chunk):
+            if url not in grounding_urls:
+                grounding_urls.append(url)
+        if getattr(chunk, 'usage_metadata', None):
+            context['usage'] = chunk  # 누적값, 마지막 청크 기준
+        return chunk.text
+
+    return stream_text(get_limiter("Gemini"), estimate_tokens(prompt), open_stream, extract_text)
+
+
 def call_grok(client, prompt):
-    """Grok API 호출 (X/Twitter 접근)"""
+    """Grok API 호출 (X/Twitter 접근, 구조화 출력: {"items": [...]})"""
     config = AI_CONFIGS["Grok"]
 
     try:
-        response = client.chat.completions.create(
-            model=config['model'],
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=8000
-        )
+        with get_limiter("Grok").request(tokens=estimate_tokens(prompt)):
+            response = client.chat.completions.create(
+                model=config['model'],
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=8000,
+                **request_kwargs("Grok", COLLECTION_OUTPUT_NAME, COLLECTION_SCHEMA)
+            )
+        record_response_usage(response)
         return response.choices[0].message.content
     except Exception as e:
+        mark_error(e)
         print(f"  ❌ Grok API 에러: {e}")
         return None
 
 
-def call_ai(ai_name, client, prompt, data_type="public"):
-    """AI별 호출 통합 함수"""
+def stream_grok(client, prompt, context):
+    """Grok 스트리밍 호출 (X/Twitter 접근) → 텍스트 조각 (usage는 마지막 청크 → context['usage'])"""
+    config = AI_CONFIGS["Grok"]
+
+    def open_stream():
+        return client.chat.completions.create(
+            model=config['model'],
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=8000,
+            stream=True,
+            stream_options={"include_usage": True},
+            **request_kwargs("Grok", COLLECTION_OUTPUT_NAME, COLLECTION_SCHEMA)
+        )
+
+    def extract_text(chunk):
+        if getattr(chunk, 'usage', None):
+            context['usage'] = chunk
+        if chunk.choices:
+            return chunk.choices[0].delta.content
+        return None
+
+    return stream_text(get_limiter("Grok"), estimate_tokens(prompt), open_stream, extract_text)
+
+
+# 스트리밍 지원 AI → 텍스트 조각 제너레이터 (client, prompt, context)
+STREAM_CALLS = {
+    "Gemini": stream_gemini_with_search,
+    "Grok": stream_grok,
+}
+
+# grounding URL이 스트림 마지막 청크에야 오는 AI → 항목을 끝까지 모아 URL 교체 후 반환 (중간 중단 없음)
+GROUNDED_STREAMS = {"Gemini"}
+
+def call_ai(ai_name, client, prompt, data_type="public", use_cache=True):
+    """AI별 호출 통합 함수 (같은 검색 프롬프트는 응답 캐시 재사용, TTL 1일)
+
+    재시도 라운드는 새 결과가 필요하므로 use_cache=False (결과는 캐시에 덮어씀)
+    """
+    cache = get_response_cache()
+    model = AI_CONFIGS.get(ai_name, {}).get('model', ai_name)
+    key = cache.make_key("collect", model, prompt, {"data_type": data_type})
+    if use_cache:
+        cached = cache.get(key, ttl=cache.ttl_for("collect"))
+        if cached is not None:
+            return cached
+
+    with span("llm", "collect", provider=ai_name, model=model, data_type=data_type):
+        result = _call_ai(ai_name, client, prompt, data_type)
+    cache.set(key, result, namespace="collect", model=model)
+    return result
+
+
+def call_ai_items(ai_name, client, prompt, data_type="public", use_cache=True):
+    """AI 호출 → 수집 항목(dict)을 완성되는 대로 반환하는 제너레이터
+
+    - 스트리밍 지원 AI(Grok): JSON 배열의 항목이 닫히는 즉시 반환
+      호출 측이 목표 도달로 제너레이터를 닫으면 스트림도 중단 (남은 출력 토큰 미생성)
+    - Gemini(GROUNDED_STREAMS): 스트림 끝까지 받은 뒤 grounding URL로 가짜 URL 교체 후 반환
+      (grounding_metadata가 마지막 청크에 오므로 먼저 내보내면 교체가 안 됨)
+    - 그 외 / --no-stream: call_ai 결과를 parse_json_response로 파싱
+    - 캐시는 call_ai와 같은 키, 끝까지 받은 응답만 URL 교체 후 저장 (중단된 응답은 저장하지 않음)
+    """
+    stream_call = STREAM_CALLS.get(ai_name) if streaming_enabled() else None
+    if stream_call is None:
+        yield from parse_json_response(call_ai(ai_name, client, prompt, data_type, use_cache))
+        return
+
+    cache = get_response_cache()
+    model = AI_CONFIGS.get(ai_name, {}).get('model', ai_name)
+    key = cache.make_key("collect", model, prompt, {"data_type": data_type})
+    if use_cache:
+        cached = cache.get(key, ttl=cache.ttl_for("collect"))
+        if cached is not None:
+            yield from parse_json_response(cached)
+            return
+
+    context = {}
+    parser = JsonItemParser()
+    hold = ai_name in GROUNDED_STREAMS
+    held = []
+    chunks = None
+    # 제너레이터라 span 문맥 관리자 대신 수동 종료 (호출 측이 중간에 닫으면 cancelled)
+    call_span = start_span("llm", "collect", provider=ai_name, model=model, data_type=data_type, stream=True)
+    try:
+        chunks = stream_call(client, prompt, context)
+        for chunk in chunks:
+            for item in parser.feed(chunk):
+                if hold:
+                    held.append(item)
+                else:
+                    yield item
+    except GeneratorExit:
+        record_stream_usage(call_span, context, prompt, parser.text)
+        call_span.finish(cancelled=True)
+        raise
+    except Exception as e:
+        call_span.finish(error=e)
+        print(f"  ❌ {ai_name} API 에러: {e}")
+        return
+    finally:
+        if chunks is not None:
+            chunks.close()
+        if not call_span.finished:
+            record_stream_usage(call_span, context, prompt, parser.text)
+            call_span.finish()
+
+    # 끝까지 받은 응답만 처리 (항목을 하나도 못 찾았으면 기존 파서로 한 번 더 시도)
+    if parser.count == 0:
+        held = parse_json_response(parser.text)
+
+    # grounding URL 기준으로 가짜 URL 교체 (call_gemini_with_search와 같은 규칙)
+    grounding_urls = context.get('grounding_urls')
+    fake_count = 0
+    if grounding_urls:
+        fake_count = sum(1 for item in held
+                         if isinstance(item, dict) and replace_ungrounded_url(item, grounding_urls))
+    if fake_count > 0:
+        print(f"    [{ai_name}] 가짜 URL {fake_count}개 발견 → 실제 URL로 교체")
+
+    # 캐시는 교체 후 항목으로 저장 (원문을 저장하면 캐시 적중 시 가짜 URL이 그대로 나옴)
+    cache.set(key, json.dumps(held, ensure_ascii=False) if fake_count else parser.text,
+              namespace="collect", model=model)
+    yield from held
+
+
+def record_response_usage(response):
+    """응답 usage → 계측 span + 리미터 토큰 예약 정산 (예약은 추정 입력 토큰)"""
+    tokens = usage_tokens(getattr(response, 'usage', None) or getattr(response, 'usage_metadata', None))
+    if tokens is not None:
+        record_tokens(*tokens)
+        settle_usage(tokens[0], tokens[1])
+
+
+def record_stream_usage(call_span, context, prompt, text):
+    """스트림 usage(마지막 청크) → span 토큰, 중단 등으로 없으면 추정값 (estimated=True)"""
+    usage = context.get('usage')
+    if usage is not None:
+        tokens = usage_tokens(getattr(usage, 'usage', None) or getattr(usage, 'usage_metadata', None))
+        if tokens is not None:
+            call_span.add_tokens(*tokens)
+            settle_usage(tokens[0], tokens[1])
+            return
+    call_span.add_tokens(estimate_tokens(prompt), 0, estimate_tokens(text))
+    call_span.set(estimated=True)
+
+
+def _call_ai(ai_name, client, prompt, data_type):
     if ai_name == "Claude":
         return call_claude_with_websearch(client, prompt)
     elif ai_name == "Gemini":
@@ -1001,65 +1113,160 @@ def extract_url(item):
     """아이템에서 URL 추출 (타입 안전)"""
     url = item.get('source_url') or item.get('url') or ''
     if isinstance(url, list):
-        return url[0] if url else ''
+        url = url[0] if url else ''
     elif not isinstance(url, str):
-        return str(url) if url else ''
-    return url
+        url = str(url) if url else ''
+    return url.strip()
 
 
-def collect_data_type(ai_name, client, politician_id, politician_full, category_name, data_type, topic_mode, target_count):
-    """공식/공개 데이터 통합 수집 함수 (최대 5회 재시도)
+# ============================================================
+# URL 인덱스 (정치인별 기존 수집 URL, 처음 사용 시 로드 - 외부 삭제 후 invalidate_url_index)
+# ============================================================
+_url_index = {}                  # politician_id → {(collector_ai, canonical_url)}
+_url_index_lock = threading.Lock()
 
-    Args:
-        politician_id: 정치인 ID (DB 중복 확인용)
-        topic_mode: 'negative' (부정), 'positive' (긍정), 'free' (자유)
-    """
-    # ✅ V30 목표 수량 초과 방지: DB 확인 후 부족한 만큼만 수집
-    try:
-        # topic_mode를 DB sentiment로 변환
-        db_sentiment = topic_mode_to_sentiment(topic_mode)
 
-        existing = supabase.table(TABLE_COLLECTED_DATA)\
-            .select('*', count='exact')\
-            .eq('politician_id', politician_id)\
-            .eq('category', category_name.lower())\
-            .eq('data_type', data_type)\
-            .eq('collector_ai', ai_name)\
-            .eq('sentiment', db_sentiment)\
-            .execute()
+def load_url_index(politician_id):
+    """정치인의 기존 (collector_ai, canonical_url)을 키셋 페이지네이션으로 한 번에 로드"""
+    with _url_index_lock:
+        if politician_id in _url_index:
+            return _url_index[politician_id]
 
-        existing_count = existing.count or 0
+        keys = set()
+        for row in iter_collected_data(politician_id, columns=with_canonical_column(COLUMNS_COLLECTED_URL)):
+            url = canonical_key(row)
+            if url:
+                keys.add((row.get('collector_ai'), url))
 
-        if existing_count >= target_count:
-            print(f"    ℹ️ 이미 {existing_count}개 수집 완료 (목표: {target_count}개) - 건너뜀")
-            return []
+        _url_index[politician_id] = keys
+        return keys
 
-        # 부족한 만큼만 수집
-        actual_target = target_count - existing_count
-        print(f"    📊 기존 {existing_count}개 / 목표 {target_count}개 → {actual_target}개 추가 수집")
+
+def invalidate_url_index(politician_id):
+    """외부 변경(검증 단계 삭제 등) 후 다음 조회 때 다시 로드 (삭제된 URL을 중복으로 거르지 않도록)"""
+    with _url_index_lock:
+        _url_index.pop(politician_id, None)
+
+
+def get_persisted_urls(politician_id, ai_name):
+    """해당 AI가 이미 저장한 정규화 URL 집합 (수집 단계 사전 필터용 복사본)"""
+    try:
+        keys = load_url_index(politician_id)
     except Exception as e:
-        print(f"    ⚠️ DB 체크 실패, 전체 수집 진행: {e}")
-        actual_target = target_count
+        print(f"  ⚠️ URL 인덱스 로드 실패: {e}")
+        return set()
+    with _url_index_lock:
+        return {url for collector, url in keys if collector == ai_name}
+
+
+def add_unique_items(items, collected, collected_urls, actual_target, ai_name, data_type, topic_mode):
+    """정규화 URL 기준 중복을 제외하고 목표 개수까지만 추가, 추가된 개수 반환"""
+    added = 0
+    for item in items:
+        if len(collected) >= actual_target:
+            break  # 목표 도달 즉시 중단!
+        if isinstance(item, dict):
+            url = canonicalize_url(extract_url(item))
+            if url and url not in collected_urls:
+                item['data_type'] = data_type
+                item['collector_ai'] = ai_name
+                item['sentiment'] = topic_mode_to_sentiment(topic_mode)  # DB 저장용 변환
+                collected.append(item)
+                collected_urls.add(url)
+                added += 1
+    return added
+
+
+def add_streamed_items(items, collected, collected_urls, actual_target, ai_name, data_type, topic_mode):
+    """call_ai_items 항목을 도착하는 대로 중복 제거하며 추가, 목표 도달 시 스트림 중단
+
+    추가된 개수 반환
+    """
+    added = 0
+    try:
+        for item in items:
+            added += add_unique_items([item], collected, collected_urls, actual_target, ai_name, data_type, topic_mode)
+            if len(collected) >= actual_target:
+                break  # 목표 도달 → 스트림 중단 (finally에서 close)
+    finally:
+        items.close()
+    return added
 
-    MAX_RETRIES = 5
-    collected = []
-    collected_urls = set()
 
+def get_category_items(category_name):
+    """카테고리별 검색 항목 (없으면 기본 10개)"""
     category_items = CATEGORY_ITEMS.get(category_name, [])
     if not category_items:
         category_items = [(f"항목{i}", f"키워드{i}") for i in range(1, 11)]
+    return category_items
 
-    # 라운드 설정
+
+def get_round_configs(data_type):
+    """라운드 설정 (year_hint, extra_keyword)"""
     if data_type == "official":
-        round_configs = [
+        return [
             ("2024-2025년", "최신 활동"),
             ("2023년", "법안 발의"),
             ("2022-2023년", "공식 활동"),
             ("의정활동", "국회"),
             ("성과 실적", "발표"),
         ]
-    else:
-        round_configs = [("", ""), ("추가검색", "")]  # 공개는 2라운드
+    return [("", ""), ("추가검색", "")]  # 공개는 2라운드
+
+
+def iter_collection_units(sentiment_dist):
+    """수집 단위 (data_type, topic_mode, 목표 개수) 목록 - collect_with_ai와 같은 순서"""
+    for data_type in ("official", "public"):
+        for topic_mode in ("negative", "positive", "free"):
+            count = sentiment_dist[data_type][topic_mode]
+            if count > 0:
+                yield data_type, topic_mode, count
+
+
+def get_remaining_target(ai_name, politician_id, category_name, data_type, topic_mode, target_count):
+    """DB 기존 수집량을 확인해 추가로 수집할 개수 반환 (0이면 건너뜀)
+
+    기존 수집량은 진행 현황 스냅샷(progress_v30)에서 조회 (정치인당 그룹 집계 1회 + 저장 시 로컬 갱신)
+    """
+    try:
+        # topic_mode를 DB sentiment로 변환
+        db_sentiment = topic_mode_to_sentiment(topic_mode)
+
+        existing_count = get_progress(politician_id).collected_count(
+            category_name, data_type, ai_name, db_sentiment
+        )
+
+        if existing_count >= target_count:
+            print(f"    ℹ️ 이미 {existing_count}개 수집 완료 (목표: {target_count}개) - 건너뜀")
+            return 0
+
+        # 부족한 만큼만 수집
+        actual_target = target_count - existing_count
+        print(f"    📊 기존 {existing_count}개 / 목표 {target_count}개 → {actual_target}개 추가 수집")
+        return actual_target
+    except Exception as e:
+        print(f"    ⚠️ DB 체크 실패, 전체 수집 진행: {e}")
+        return target_count
+
+
+def collect_data_type(ai_name, client, politician_id, politician_full, category_name, data_type, topic_mode, target_count):
+    """공식/공개 데이터 통합 수집 함수 (최대 5회 재시도)
+
+    Args:
+        politician_id: 정치인 ID (DB 중복 확인용)
+        topic_mode: 'negative' (부정), 'positive' (긍정), 'free' (자유)
+    """
+    # ✅ V30 목표 수량 초과 방지: DB 확인 후 부족한 만큼만 수집
+    actual_target = get_remaining_target(ai_name, politician_id, category_name, data_type, topic_mode, target_count)
+    if actual_target <= 0:
+        return []
+
+    MAX_RETRIES = 5
+    collected = []
+    collected_urls = get_persisted_urls(politician_id, ai_name)  # DB에 이미 있는 URL은 처음부터 제외
+
+    category_items = get_category_items(category_name)
+    round_configs = get_round_configs(data_type)
 
     retry_count = 0
 
@@ -1085,28 +1292,13 @@ def collect_data_type(ai_name, client, politician_id, politician_full, category_
                 if not prompt:
                     continue
 
-                # AI 호출
-                result = call_ai(ai_name, client, prompt, data_type)
-
-                added = 0
-                if result:
-                    items = parse_json_response(result)
-                    for item in items:
-                        if len(collected) >= actual_target:
-                            break  # 목표 도달 즉시 중단!
-                        if isinstance(item, dict):
-                            url = extract_url(item)
-                            if url and url not in collected_urls:
-                                item['data_type'] = data_type
-                                item['collector_ai'] = ai_name
-                                item['sentiment'] = topic_mode_to_sentiment(topic_mode)  # DB 저장용 변환
-                                collected.append(item)
-                                collected_urls.add(url)
-                                added += 1
+                # AI 호출 (스트리밍: 항목이 도착하는 대로 중복 제거, 목표 도달 시 즉시 중단)
+                with telemetry_context(retries=retry_count):
+                    items = call_ai_items(ai_name, client, prompt, data_type, use_cache=(retry_count == 0))
+                    added = add_streamed_items(items, collected, collected_urls, actual_target, ai_name, data_type, topic_mode)
 
                 if added > 0 and retry_count == 0:
                     print(f"      [{item_name[:8]}] +{added}개 → 누적 {len(collected)}개")
-                time.sleep(0.3)
 
         # 목표 미달 시 재시도
         if len(collected) < actual_target:
@@ -1122,6 +1314,13 @@ def collect_data_type(ai_name, client, politician_id, politician_full, category_
 
 
 def collect_with_ai(ai_name, politician_id, politician_name, category_idx, category_name, category_korean, test_mode=False):
+    """특정 AI로 카테고리 데이터 수집 (계측 문맥: 단계/정치인/카테고리 → 하위 LLM/DB span)"""
+    with telemetry_context(stage="collect", politician_id=politician_id, category=category_name):
+        return _collect_with_ai(ai_name, politician_id, politician_name, category_idx, category_name,
+                                category_korean, test_mode)
+
+
+def _collect_with_ai(ai_name, politician_id, politician_name, category_idx, category_name, category_korean, test_mode=False):
     """특정 AI로 카테고리 데이터 수집 (리팩토링 버전)
 
     Args:
@@ -1211,83 +1410,152 @@ def collect_with_ai(ai_name, politician_id, politician_name, category_idx, categ
             print(f"    ✅ 자유 {len(collected)}개 수집 완료")
 
     # DB 저장
+    return save_collected_items(ai_name, politician_id, politician_name, category_name, category_korean, all_items)
+
+
+def build_collected_record(item, ai_name, politician_id, politician_name, category_name):
+    """수집 아이템 → collected_data_v30 레코드 변환"""
+    # 다양한 필드명 지원 (AI마다 응답 형식이 다를 수 있음)
+    title = item.get('data_title') or item.get('title') or item.get('item') or ''
+    content = item.get('data_content') or item.get('description') or item.get('content') or item.get('item') or ''
+    source_url = item.get('source_url') or item.get('url') or item.get('link') or ''
+    # URL 타입 체크 (리스트인 경우 첫 번째 요소 사용)
+    if isinstance(source_url, list):
+        source_url = source_url[0] if source_url else ''
+    elif not isinstance(source_url, str):
+        source_url = str(source_url) if source_url else ''
+    source_name = item.get('data_source') or item.get('source') or item.get('source_type') or ''
+    raw_date = item.get('data_date') or item.get('date') or item.get('published_date')
+    pub_date = normalize_date(raw_date)  # 날짜 형식 정규화
+    sentiment = item.get('sentiment') or 'free'  # sentiment added by collect_data_type()
+    # ✅ 'free' 값 그대로 유지 (DB에서 허용됨)
+
+    # title이 없으면 content 앞부분 사용
+    if not title and content:
+        title = content[:50]
+
+    return {
+        'politician_id': politician_id,
+        'politician_name': politician_name,
+        'category': category_name.lower(),
+        'data_type': item.get('data_type', 'public'),
+        'collector_ai': item.get('collector_ai', ai_name),
+        'title': str(title)[:200],
+        'content': str(content)[:2000],
+        'source_url': str(source_url).strip() if source_url else '',  # URL 정규화 (공백 제거)
+        'source_name': str(source_name),
+        'published_date': pub_date,
+        'sentiment': sentiment,
+        'is_verified': False
+    }
+
+
+def upsert_collected_chunk(records):
+    """레코드 묶음 저장 (유니크 키 충돌은 DB에서 무시), 저장된 행 목록 반환"""
+    try:
+        result = supabase.table(TABLE_COLLECTED_DATA)\
+            .upsert(records, on_conflict=UNIQUE_URL_KEY, ignore_duplicates=True)\
+            .execute()
+    except Exception as e:
+        # 유니크 인덱스 마이그레이션 전 DB (42P10) → 일반 벌크 insert
+        if '42P10' not in str(e):
+            raise
+        result = supabase.table(TABLE_COLLECTED_DATA).insert(records).execute()
+    return result.data if result.data is not None else records
+
+
+def save_collected_items(ai_name, politician_id, politician_name, category_name, category_korean, all_items):
+    """수집 결과 DB 저장 (같은 AI + 같은 정규화 URL 중복 스킵)
+
+    grounding-api-redirect 래퍼는 저장 전에 한 번에 해제하고 (영구 캐시),
+    중복은 실행 시작 시 1회 로드한 URL 인덱스로 로컬에서 거르고,
+    나머지는 SAVE_CHUNK_SIZE 단위 벌크 upsert로 저장 (아이템당 왕복 없음).
+    """
     saved_count = 0
     skipped_count = 0  # 중복 스킵 카운트
 
+    try:
+        url_index = load_url_index(politician_id)
+    except Exception as e:
+        # 인덱스 없이도 DB 유니크 키가 중복을 막음
+        print(f"  ⚠️ URL 인덱스 로드 실패 (DB 유니크 키로 중복 처리): {e}")
+        url_index = set()
+
+    candidates = []
     for item in all_items:
         try:
-            # 다양한 필드명 지원 (AI마다 응답 형식이 다를 수 있음)
-            title = item.get('data_title') or item.get('title') or item.get('item') or ''
-            content = item.get('data_content') or item.get('description') or item.get('content') or item.get('item') or ''
-            source_url = item.get('source_url') or item.get('url') or item.get('link') or ''
-            # URL 타입 체크 (리스트인 경우 첫 번째 요소 사용)
-            if isinstance(source_url, list):
-                source_url = source_url[0] if source_url else ''
-            elif not isinstance(source_url, str):
-                source_url = str(source_url) if source_url else ''
-            source_name = item.get('data_source') or item.get('source') or item.get('source_type') or ''
-            raw_date = item.get('data_date') or item.get('date') or item.get('published_date')
-            pub_date = normalize_date(raw_date)  # 날짜 형식 정규화
-            sentiment = item.get('sentiment') or 'free'  # sentiment added by collect_data_type()
-            # ✅ 'free' 값 그대로 유지 (DB에서 허용됨)
-
-            # title이 없으면 content 앞부분 사용
-            if not title and content:
-                title = content[:50]
-
-            collector = item.get('collector_ai', ai_name)
-
-            # URL 정규화 (공백 제거)
-            source_url_normalized = str(source_url).strip() if source_url else ''
-
-            # ✅ V30 중복 제거: 같은 AI가 같은 URL을 이미 수집했는지 확인
-            if source_url_normalized:  # URL이 있을 때만 체크
-                try:
-                    existing = supabase.table(TABLE_COLLECTED_DATA)\
-                        .select('id', count='exact')\
-                        .eq('politician_id', politician_id)\
-                        .eq('collector_ai', collector)\
-                        .eq('source_url', source_url_normalized)\
-                        .execute()
-
-                    if existing.count and existing.count > 0:
-                        # 중복 발견 - skip
-                        skipped_count += 1
-                        continue
-                except Exception as e:
-                    # 중복 체크 실패해도 계속 진행 (저장 시도)
-                    print(f"  ⚠️ 중복 체크 오류 ({source_url_normalized[:50]}...): {e}")
-                    pass
-
-            record = {
-                'politician_id': politician_id,
-                'politician_name': politician_name,
-                'category': category_name.lower(),
-                'data_type': item.get('data_type', 'public'),
-                'collector_ai': collector,
-                'title': str(title)[:200],
-                'content': str(content)[:2000],
-                'source_url': source_url_normalized,  # 정규화된 URL 사용
-                'source_name': str(source_name),
-                'published_date': pub_date,
-                'sentiment': sentiment,
-                'is_verified': False
-            }
-
-            supabase.table(TABLE_COLLECTED_DATA).insert(record).execute()
-            saved_count += 1
+            record = build_collected_record(item, ai_name, politician_id, politician_name, category_name)
+        except Exception as e:
+            print(f"  ⚠️ 레코드 변환 실패: {e}")
+            continue
+        if not record['source_url']:
+            skipped_count += 1  # URL 없는 항목은 저장하지 않음 (유니크 키 대상 아님)
+            continue
+        candidates.append(record)
+
+    # 리다이렉트 래퍼 해제 + canonical_url (네트워크는 인덱스 잠금 밖에서)
+    try:
+        urls = canonicalize_records(candidates)
+    except Exception as e:
+        print(f"  ⚠️ URL 정규화 실패 (원문 URL로 비교): {e}")
+        urls = [canonicalize_url(record['source_url']) for record in candidates]
+
+    records = []
+    record_keys = []
+    with _url_index_lock:
+        for record, url in zip(candidates, urls):
+            # ✅ V30 중복 제거: 같은 AI가 같은 URL을 이미 수집했는지 확인 (로컬 인덱스, 정규화 URL)
+            key = (record['collector_ai'], url)
+            if key in url_index:
+                skipped_count += 1
+                continue
+            url_index.add(key)
+            records.append(record)
+            record_keys.append(key)
+
+    # 유사 중복 묶음 ID (id를 미리 생성해 같은 묶음의 대표 행 id를 cluster_id로 기록)
+    cluster_index = assign_record_clusters(politician_id, category_name, records)
+    # 평가용 요약 (4개 평가 AI가 같은 digest를 사용, 컬럼이 있을 때만)
+    assign_record_digests(records, politician_name)
+
+    for i in range(0, len(records), SAVE_CHUNK_SIZE):
+        chunk = records[i:i + SAVE_CHUNK_SIZE]
+        chunk_keys = record_keys[i:i + SAVE_CHUNK_SIZE]
+        try:
+            saved_rows = upsert_collected_chunk(chunk)
+            add_saved_collected(saved_rows)  # 진행 현황 스냅샷 로컬 갱신
+            saved = len(saved_rows)
+            saved_count += saved
+            skipped_count += len(chunk) - saved
+            # 유니크 키 충돌로 저장되지 않은 행은 묶음 인덱스에서 제거
+            saved_ids = {row.get('id') for row in saved_rows}
+            for record in chunk:
+                if record['id'] not in saved_ids:
+                    cluster_index.discard(record['id'])
         except Exception as e:
-            print(f"  ⚠️ 저장 실패: {e}")
+            print(f"  ⚠️ 저장 실패 ({len(chunk)}개): {e}")
+            # 실패한 묶음은 인덱스에서 제거해 다음 실행에서 다시 저장되도록
+            with _url_index_lock:
+                for key in chunk_keys:
+                    url_index.discard(key)
+            for record in chunk:
+                cluster_index.discard(record['id'])
 
     print(f"  💾 [{ai_name}] {category_korean}: {saved_count}개 저장, {skipped_count}개 중복 스킵")
     return saved_count
 
 
 def parse_json_response(response_text):
-    """JSON 응답 파싱"""
+    """JSON 응답 파싱 (구조화 출력은 바로 로드, 그 외만 코드 블록 추출 + json_repair)"""
     if not response_text:
         return []
 
+    data = load_json(response_text)
+    if isinstance(data, dict) and isinstance(data.get('items'), list):
+        return data['items']
+    if isinstance(data, list):
+        return data
+
     try:
         # JSON 블록 추출
         json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
@@ -1397,10 +1665,6 @@ def collect_all_for_politician(politician_id, politician_name, target_ai=None, t
 
             print(f"\n✅ [{ai_name}] 수집 완료")
 
-            # AI 간 간격
-            if ai_name != collect_ais[-1]:
-                time.sleep(2)
-
         # ===== 2차: 실패한 작업만 순차 재시도 (안전) =====
         if failed_tasks:
             print(f"\n{'='*60}")
@@ -1451,7 +1715,6 @@ def collect_all_for_politician(politician_id, politician_name, target_ai=None, t
                     cat_idx, cat_name, cat_korean, test_mode
                 )
                 total_saved += count
-                time.sleep(1)  # API 레이트 리밋 방지
 
     elapsed = time.time() - start_time
 
@@ -1514,12 +1777,10 @@ def verify_test_results(politician_id, politician_name, categories):
     # 비율 검증
     if total > 0:
         gemini_pct = total_by_ai["Gemini"] / total * 100
-        perplexity_pct = total_by_ai["Perplexity"] / total * 100
         grok_pct = total_by_ai["Grok"] / total * 100
 
-        print(f"\n🎯 비율 검증 (목표: 60-30-10):")
-        print(f"   Gemini: {gemini_pct:.1f}% {'✅' if 50 <= gemini_pct <= 70 else '⚠️'}")
-        print(f"   Perplexity: {perplexity_pct:.1f}% {'✅' if 20 <= perplexity_pct <= 40 else '⚠️'}")
+        print(f"\n🎯 비율 검증 (목표: Gemini 90 / Grok 10, Perplexity 제거):")
+        print(f"   Gemini: {gemini_pct:.1f}% {'✅' if 80 <= gemini_pct <= 95 else '⚠️'}")
         print(f"   Grok: {grok_pct:.1f}% {'✅' if 5 <= grok_pct <= 20 else '⚠️'}")
 
     print(f"{'='*60}")
@@ -1572,16 +1833,43 @@ def collect_all_politicians(target_ai=None, target_category=None, parallel=False
             fail_count += 1
             print(f"❌ {pname}: 수집 실패 - {e}")
 
-        # 정치인 간 간격 (API 레이트 리밋 방지)
-        if i < len(politicians):
-            time.sleep(2 if not test_mode else 1)
-
     print(f"\n{'#'*60}")
     print(f"# {mode_str}전체 수집 완료")
     print(f"# 성공: {success_count}명, 실패: {fail_count}명")
     print(f"{'#'*60}")
 
 
+def run_async_collection(args):
+    """--async: 비동기 수집 엔진 실행 (collect_async_v30), 실행 여부 반환"""
+    # 스크립트 실행 시 collect_async_v30이 이 모듈을 다시 import하지 않도록 등록
+    sys.modules.setdefault('collect_v30', sys.modules[__name__])
+    from collect_async_v30 import (
+        collect_politicians_async, parse_limits, DEFAULT_CONCURRENCY, DEFAULT_TPM
+    )
+
+    if args.all:
+        politicians = get_all_politicians()
+    elif args.politician_id and args.politician_name:
+        politicians = [{'id': args.politician_id, 'name': args.politician_name}]
+    else:
+        print("❌ --politician_id와 --politician_name을 지정하거나, --all을 사용하세요.")
+        return False
+
+    if not politicians:
+        print("❌ 수집할 정치인이 없습니다.")
+        return False
+
+    collect_politicians_async(
+        politicians,
+        target_ai=args.ai,
+        target_category=args.category,
+        test_mode=args.test,
+        concurrency=parse_limits(args.concurrency, DEFAULT_CONCURRENCY),
+        tpm=parse_limits(args.tpm, DEFAULT_TPM)
+    )
+    return True
+
+
 def main():
     parser = argparse.ArgumentParser(description='V30 3개 AI 분담 웹검색 수집 (비용 최적화)')
     parser.add_argument('--politician_id', help='정치인 ID (--all과 함께 사용 불가)')
@@ -1592,9 +1880,25 @@ def main():
     parser.add_argument('--parallel', action='store_true', help='병렬 실행')
     parser.add_argument('--test', action='store_true', help='미니 테스트 모드 (카테고리당 10개, 3개 AI 병렬, 자동 검증)')
     parser.add_argument('--skip-validation', action='store_true', help='수집 후 자동 검증 건너뛰기')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='비동기 수집 엔진 (모든 수집 단위 동시 실행)')
+    parser.add_argument('--concurrency', help='AI별 동시 호출 수 (예: Gemini=16,Grok=4, --async 전용)')
+    parser.add_argument('--tpm', help='AI별 분당 토큰 예산 (예: Gemini=1000000,Grok=200000, --async 전용)')
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true', help='LLM 응답 캐시 사용 안 함')
+    parser.add_argument('--no-stream', dest='no_stream', action='store_true', help='스트리밍 없이 응답 전체 대기 (기존 방식)')
+    parser.add_argument('--no-structured', dest='no_structured', action='store_true', help='구조화 출력(JSON 스키마 강제) 없이 프롬프트 지시만 사용')
+    parser.add_argument('--no-telemetry', dest='no_telemetry', action='store_true', help='호출별 계측(JSONL/Prometheus) 기록 안 함')
 
     args = parser.parse_args()
 
+    if args.no_cache:
+        disable_response_cache()
+    if args.no_stream:
+        disable_streaming()
+    if args.no_structured:
+        disable_structured_output()
+    if args.no_telemetry:
+        disable_telemetry()
+
     # 테스트 모드 안내
     if args.test:
         print(f"\n{'='*60}")
@@ -1605,8 +1909,12 @@ def main():
         print(f"   • 완료 후 자동 검증")
         print(f"{'='*60}\n")
 
+    # 비동기 수집 엔진
+    if args.use_async:
+        if not run_async_collection(args) or args.all:
+            return
     # 전체 정치인 일괄 수집
-    if args.all:
+    elif args.all:
         collect_all_politicians(
             target_ai=args.ai,
             target_category=args.category,
@@ -1614,38 +1922,38 @@ def main():
             test_mode=args.test
         )
         return
-
-    # 개별 정치인 수집 (기존 방식)
-    if not args.politician_id or not args.politician_name:
-        print("❌ --politician_id와 --politician_name을 지정하거나, --all을 사용하세요.")
-        print("")
-        print("📋 사용 예시:")
-        print("   # 미니 테스트 (카테고리 1개, 3-5분)")
-        print("   python collect_v30.py --politician_id=xxx --politician_name=\"홍길동\" --test --category=1")
-        print("")
-        print("   # 전체 수집 (병렬)")
-        print("   python collect_v30.py --politician_id=xxx --politician_name=\"홍길동\" --parallel")
-        print("")
-        print("   # 전체 정치인 일괄")
-        print("   python collect_v30.py --all --parallel")
-        return
-
-    # 정치인 확인
-    exists, db_name = check_politician_exists(args.politician_id)
-    if not exists:
-        print(f"❌ 정치인 ID '{args.politician_id}'가 politicians 테이블에 없습니다.")
-        print("   먼저 정치인을 등록하세요.")
-        return
-
-    # 수집 실행
-    collect_all_for_politician(
-        args.politician_id,
-        args.politician_name,
-        target_ai=args.ai,
-        target_category=args.category,
-        parallel=args.parallel or args.test,
-        test_mode=args.test
-    )
+    else:
+        # 개별 정치인 수집 (기존 방식)
+        if not args.politician_id or not args.politician_name:
+            print("❌ --politician_id와 --politician_name을 지정하거나, --all을 사용하세요.")
+            print("")
+            print("📋 사용 예시:")
+            print("   # 미니 테스트 (카테고리 1개, 3-5분)")
+            print("   python collect_v30.py --politician_id=xxx --politician_name=\"홍길동\" --test --category=1")
+            print("")
+            print("   # 전체 수집 (병렬)")
+            print("   python collect_v30.py --politician_id=xxx --politician_name=\"홍길동\" --parallel")
+            print("")
+            print("   # 전체 정치인 일괄")
+            print("   python collect_v30.py --all --parallel")
+            return
+
+        # 정치인 확인
+        exists, db_name = check_politician_exists(args.politician_id)
+        if not exists:
+            print(f"❌ 정치인 ID '{args.politician_id}'가 politicians 테이블에 없습니다.")
+            print("   먼저 정치인을 등록하세요.")
+            return
+
+        # 수집 실행
+        collect_all_for_politician(
+            args.politician_id,
+            args.politician_name,
+            target_ai=args.ai,
+            target_category=args.category,
+            parallel=args.parallel or args.test,
+            test_mode=args.test
+        )
 
     # 자동 검증 트리거 (옵션 1: 메인 에이전트 방식)
     if not args.skip_validation:
@@ -1656,8 +1964,6 @@ def main():
 
         try:
             # validate_v30.py의 run_validation_pipeline 함수 임포트
-            import sys
-            import os
             script_dir = os.path.dirname(os.path.abspath(__file__))
             sys.path.insert(0, script_dir)
 
@@ -1685,3 +1991,4 @@ def main():
 
 if __name__ == "__main__":
     main()
+    print_summary()
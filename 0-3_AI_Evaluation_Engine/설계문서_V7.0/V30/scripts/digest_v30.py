@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+V30 평가용 항목 요약 (추출 요약, collected_data_v30.digest)
+
+배경:
+- evaluate_v30.build_batch_prompt: 항목마다 content[:300] + "..." 그대로 전송
+  → 앞부분이 제목 반복/도입부면 정작 수치·날짜·발언은 잘리고,
+    같은 텍스트를 4개 평가 AI가 각각 입력 토큰으로 지불
+- V26/V28 평가 스크립트도 각자 다른 길이로 잘라서 사용 (같은 항목이 평가기마다 다른 텍스트)
+- token_optimization_analysis.py 방안 2 (summarize_news): 추출 요약으로 뉴스 입력 토큰 절감
+
+핵심:
+1. 추출 요약 (로컬 계산, 네트워크 없음)
+   - 본문을 문장으로 나누고 점수: 정치인 이름 언급 / 날짜 / 숫자 / 주장·행위 표현 / 첫 문장(리드)
+   - 점수 순으로 DIGEST_MAX_CHARS까지 고른 뒤 원래 순서대로 이어 붙임 (제목과 같은 문장, 점수 0 문장 제외)
+   - 본문이 DIGEST_MAX_CHARS 이하면 공백만 정리해서 그대로 사용
+2. 저장: collected_data_v30.digest / digest_version / digest_tokens
+   (migrations/add_collected_digest_v30.sql)
+   - 수집 저장 시 함께 기록 (assign_record_digests ← collect_v30.save_collected_items)
+   - 검증 단계 끝에 미기록/이전 버전 행 채우기 (fill_digests ← validate_v30.run_validation_pipeline)
+   - 요약 규칙이 바뀌면 DIGEST_VERSION을 올림 → 이전 버전 행은 다시 계산
+3. 평가: evaluate_v30 프롬프트가 content[:300] 대신 digest 사용 (4개 평가 AI 공통)
+   - 현재 버전 digest가 없는 행은 평가 시 즉석 계산 (DB에는 기록하지 않음)
+
+환경 변수:
+    V30_DIGEST  "off"면 평가 프롬프트에 기존처럼 content[:300] 사용
+
+사용법:
+    # 기존 행 digest 채우기 (마이그레이션 적용 후)
+    python digest_v30.py --politician_id=62e7b453
+    python digest_v30.py --all --rebuild
+"""
+
+import os
+import re
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from engine_v30 import configure_stdout
+from repository_v30 import get_client, has_column, iter_collected_data, update_in, TABLE_COLLECTED_DATA
+from politician_profiles_v30 import get_profile_cache
+from rate_limiter_v30 import estimate_tokens
+from telemetry_v30 import submit_in_context
+
+# 요약 규칙 버전 (규칙을 바꾸면 +1 → fill_digests가 이전 버전 행을 다시 계산)
+DIGEST_VERSION = 1
+DIGEST_MAX_CHARS = 200
+MIN_SENTENCE_CHARS = 8
+
+# 기존 평가 프롬프트의 내용 길이 (통계 비교용)
+LEGACY_CONTENT_CHARS = 300
+
+NAME_WEIGHT = 3.0
+DATE_WEIGHT = 1.5
+NUMBER_WEIGHT = 1.0
+CLAIM_WEIGHT = 1.0
+LEAD_WEIGHT = 1.0
+
+# 주장·행위 표현 (발언, 정책 행위, 논란/사법 절차)
+CLAIM_WORDS = (
+    "발표", "밝혔", "강조", "주장", "비판", "지적", "제안", "약속", "공약", "추진", "발의", "통과",
+    "의결", "결정", "합의", "반대", "찬성", "사과", "해명", "의혹", "논란", "수사", "기소", "판결",
+    "선고", "임명", "사퇴", "당선", "예산", "법안", "조례", "정책",
+)
+
+DIGEST_COLUMNS = "digest, digest_version, digest_tokens"
+DIGEST_WRITE_WORKERS = 8      # 행별 PATCH 동시 요청 상한
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?。…])\s+|\s*\n+\s*')
+_SPACES = re.compile(r'\s+')
+_DATE = re.compile(r'\d{4}\s*[.\-/년]|\d{1,2}\s*월|\d{1,2}\s*일')
+_NUMBER = re.compile(r'\d')
+
+_enabled = os.getenv('V30_DIGEST', 'on').lower() not in ('off', '0', 'false', 'none')
+
+
+def digest_enabled():
+    return _enabled
+
+
+def disable_digest():
+    """--no-digest 옵션용"""
+    global _enabled
+    _enabled = False
+
+
+# ============================================================
+# 추출 요약
+# ============================================================
+def _compact(text):
+    return _SPACES.sub('', text or '')
+
+
+def _truncate(text, max_chars):
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+def split_sentences(text):
+    """본문 → 문장 목록 (마침표/물음표/느낌표 뒤 공백, 줄바꿈 기준)"""
+    return [s.strip() for s in _SENTENCE_SPLIT.split((text or '').strip()) if s and s.strip()]
+
+
+def score_sentence(sentence, index, names):
+    """문장 점수 (이름 > 날짜 > 숫자 / 주장 표현 / 리드 문장)"""
+    score = 0.0
+    compact = _compact(sentence)
+    if any(name in compact for name in names):
+        score += NAME_WEIGHT
+    if _DATE.search(sentence):
+        score += DATE_WEIGHT
+    elif _NUMBER.search(sentence):
+        score += NUMBER_WEIGHT
+    if any(word in sentence for word in CLAIM_WORDS):
+        score += CLAIM_WEIGHT
+    if index == 0:
+        score += LEAD_WEIGHT
+    return score
+
+
+def build_digest(title, content, politician_name='', max_chars=DIGEST_MAX_CHARS):
+    """본문 → 추출 요약 (max_chars 이내, 고른 문장은 원래 순서 유지)"""
+    text = _SPACES.sub(' ', content or '').strip()
+    if len(text) <= max_chars:
+        return text
+
+    title_key = _compact(title)
+    names = [name for name in {_compact(politician_name)} if name]
+    # (점수, 원래 위치, 문장) - 리드 가산점은 제목을 빼기 전 위치 기준
+    candidates = [
+        (score_sentence(s, i, names), i, s) for i, s in enumerate(split_sentences(content))
+        if len(s) >= MIN_SENTENCE_CHARS and _compact(s) != title_key
+    ]
+    if not candidates:
+        return _truncate(text, max_chars)
+
+    ranked = sorted(candidates, key=lambda c: (-c[0], c[1]))
+    chosen = []
+    used = 0
+    for score, i, sentence in ranked:
+        # 점수 0 문장(이름/날짜/숫자/주장 없음)은 길이가 남아도 채우지 않음
+        if score <= 0 and chosen:
+            break
+        length = len(sentence) + (1 if chosen else 0)
+        if used + length <= max_chars:
+            chosen.append((i, sentence))
+            used += length
+
+    # 가장 높은 점수의 문장 하나가 max_chars보다 길면 그 문장을 잘라서 사용
+    if not chosen:
+        return _truncate(ranked[0][2], max_chars)
+    return " ".join(sentence for _i, sentence in sorted(chosen))
+
+
+def digest_fields(item, politician_name=''):
+    """행 → {'digest', 'digest_version', 'digest_tokens'}"""
+    digest = build_digest(item.get('title'), item.get('content'), politician_name)
+    return {'digest': digest, 'digest_version': DIGEST_VERSION, 'digest_tokens': estimate_tokens(digest)}
+
+
+def is_current(item):
+    """현재 버전 digest가 기록된 행인지"""
+    return item.get('digest') is not None and item.get('digest_version') == DIGEST_VERSION
+
+
+# ============================================================
+# digest 컬럼
+# ============================================================
+def has_digest_column():
+    """collected_data_v30.digest 존재 여부 (마이그레이션 전 DB면 False, repository_v30.has_column)"""
+    return has_column(TABLE_COLLECTED_DATA, 'digest')
+
+
+def with_digest_column(columns):
+    """컬럼 세트 + digest / digest_version / digest_tokens (컬럼이 있을 때만)"""
+    return f"{columns}, {DIGEST_COLUMNS}" if has_digest_column() else columns
+
+
+def assign_record_digests(records, politician_name=''):
+    """저장 전 collected_data_v30 레코드에 digest 기록 (collect_v30.save_collected_items, 컬럼 없으면 생략)"""
+    if not has_digest_column():
+        return
+    for record in records:
+        record.update(digest_fields(record, politician_name))
+
+
+_names = {}
+_names_lock = threading.Lock()
+
+
+def _politician_name(politician_id):
+    """요약 점수용 정치인 이름 (프로필 캐시, 정치인당 1회)"""
+    with _names_lock:
+        if politician_id in _names:
+            return _names[politician_id]
+    profile = get_profile_cache().get_profile(politician_id) or {}
+    name = (profile.get('name') or '').strip()
+    with _names_lock:
+        _names[politician_id] = name
+    return name
+
+
+def attach_digests(items, politician_id):
+    """평가 대상 행에 현재 버전 digest 채우기 (기록된 값 우선, 없으면 즉석 계산 - DB 기록 안 함)
+
+    반환: 즉석 계산한 행 수
+    """
+    if not _enabled:
+        return 0
+    computed = 0
+    name = None
+    for item in items:
+        if is_current(item):
+            continue
+        if name is None:
+            name = _politician_name(politician_id)
+        item.update(digest_fields(item, name))
+        computed += 1
+    return computed
+
+
+# ============================================================
+# 기존 행 digest 채우기
+# ============================================================
+def fill_digests(politician_id, politician_name='', rebuild=False):
+    """정치인의 digest 미기록/이전 버전 행 갱신, 갱신한 행 수 반환 (rebuild=True면 전체)"""
+    if not has_digest_column():
+        print("  ⚠️ digest 컬럼 없음 - migrations/add_collected_digest_v30.sql 적용 전 (평가 시 즉석 계산)")
+        return 0
+
+    rows = list(iter_collected_data(politician_id, columns=f"id, title, content, {DIGEST_COLUMNS}"))
+    targets = rows if rebuild else [row for row in rows if not is_current(row)]
+    if not targets:
+        return 0
+
+    name = politician_name or _politician_name(politician_id)
+    digest_tokens = 0
+    legacy_tokens = 0
+    # 같은 digest 값(재수집 중복 등)은 IN 조건 1회로 묶고, 나머지 행별 PATCH는 스레드풀로 동시 전송
+    groups = {}
+    for row in targets:
+        fields = digest_fields(row, name)
+        groups.setdefault(tuple(sorted(fields.items())), []).append(row['id'])
+        digest_tokens += fields['digest_tokens']
+        legacy_tokens += estimate_tokens((row.get('content') or '')[:LEGACY_CONTENT_CHARS])
+
+    workers = min(DIGEST_WRITE_WORKERS, len(groups))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="digest-write") as executor:
+        futures = [submit_in_context(executor, update_in, TABLE_COLLECTED_DATA, dict(values), 'id', ids)
+                   for values, ids in groups.items()]
+        updated = sum(future.result() for future in futures)
+
+    saving = (1 - digest_tokens / legacy_tokens) * 100 if legacy_tokens else 0
+    print(f"  📝 평가용 요약: {len(rows)}개 중 {updated}개 기록 ({len(groups)}회 요청, v{DIGEST_VERSION}, "
+          f"항목당 평균 {digest_tokens / len(targets):.0f}토큰, content[:{LEGACY_CONTENT_CHARS}] 대비 {saving:.0f}% 절감)")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='V30 평가용 항목 요약 (기존 행 digest 채우기)')
+    parser.add_argument('--politician_id', help='정치인 ID')
+    parser.add_argument('--politician_name', default='', help='정치인 이름 (생략 시 프로필 이름)')
+    parser.add_argument('--roster', action='append', help='명단 파일 ("이름<TAB>ID" 형식, 여러 번 지정 가능)')
+    parser.add_argument('--all', action='store_true', help='전체 정치인')
+    parser.add_argument('--rebuild', action='store_true', help='현재 버전 digest가 있는 행도 다시 계산')
+    args = parser.parse_args()
+
+    if args.all:
+        result = get_client().table('politicians').select('id, name').execute()
+        politicians = [(row['id'], row.get('name') or '') for row in result.data or []]
+    elif args.roster:
+        from scheduler_v30 import load_roster
+        politicians = load_roster(args.roster)
+    elif args.politician_id:
+        politicians = [(args.politician_id, args.politician_name)]
+    else:
+        parser.error('--politician_id, --roster, --all 중 하나가 필요합니다')
+
+    total = 0
+    for politician_id, politician_name in politicians:
+        print(f"\n[{politician_name or politician_id}]")
+        total += fill_digests(politician_id, politician_name, rebuild=args.rebuild)
+    print(f"\n✅ digest 기록: {total}행 (v{DIGEST_VERSION})")
+
+
+if __name__ == "__main__":
+    configure_stdout()
+    main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+V30 평가 엔진 공용 설정 (카테고리 / AI 공급자 클라이언트 / 환경 / 단계 실행)
+
+배경:
+- collect_v30 / evaluate_v30 / validate_v30 / calculate_v30_scores / run_v30_workflow가
+  CATEGORIES, AI_CONFIGS, init_ai_client, load_dotenv, create_client를 각자 복사해서 사용
+  → 카테고리 목록이 어긋남 (validate_v30에만 consistency/crisis)
+- import 시점마다 .env 다시 읽기 + Supabase 클라이언트 생성, run_v30_workflow는 단계마다 새 프로세스
+  → 단계 전환마다 import/클라이언트 준비 비용을 다시 지불
+
+핵심:
+1. CATEGORIES / CATEGORY_MAP / EVALUATION_AIS: 단계 공용 정의 (V28.3 기준)
+2. AI_PROVIDERS: AI별 env_key / base_url / SDK, 모델은 단계별 model_configs()로 지정
+3. init_ai_client: 공급자 SDK는 해당 AI를 처음 호출할 때 import (프로세스 공용 캐시 ai_clients)
+4. load_env / configure_stdout: 프로세스당 1회만 실행
+5. run_main: 단계 스크립트 main()을 같은 프로세스에서 실행 (politician_eval_v30.py / run_v30_workflow.py)
+   Supabase 클라이언트는 repository_v30.supabase (첫 사용 시 생성, 모든 단계 공용)
+"""
+
+import os
+import sys
+import threading
+import importlib
+import traceback
+
+# 카테고리 정의 (V28.3 기준)
+CATEGORIES = [
+    ("expertise", "전문성"),
+    ("leadership", "리더십"),
+    ("vision", "비전"),
+    ("integrity", "청렴성"),
+    ("ethics", "윤리성"),
+    ("accountability", "책임감"),
+    ("transparency", "투명성"),
+    ("communication", "소통능력"),
+    ("responsiveness", "대응성"),
+    ("publicinterest", "공익성")
+]
+
+CATEGORY_MAP = {eng: kor for eng, kor in CATEGORIES}
+
+# 평가 AI (4개)
+EVALUATION_AIS = ["Claude", "ChatGPT", "Gemini", "Grok"]
+
+# AI 공급자 설정 (sdk: anthropic / openai / genai)
+AI_PROVIDERS = {
+    "Claude": {"env_key": "ANTHROPIC_API_KEY", "sdk": "anthropic"},
+    "ChatGPT": {"env_key": "OPENAI_API_KEY", "sdk": "openai"},
+    "Grok": {"env_key": "XAI_API_KEY", "sdk": "openai", "base_url": "https://api.x.ai/v1"},
+    "Gemini": {"env_key": "GEMINI_API_KEY", "sdk": "genai"},
+    "Perplexity": {"env_key": "PERPLEXITY_API_KEY", "sdk": "openai", "base_url": "https://api.perplexity.ai"},
+}
+
+# AI 클라이언트 캐시 (수집/평가/검증 모듈 공용, init_ai_client가 먼저 조회)
+ai_clients = {}
+_clients_lock = threading.Lock()
+
+_env_loaded = False
+_stdout_configured = False
+_setup_lock = threading.Lock()
+
+
+def model_configs(models):
+    """단계별 AI_CONFIGS: {AI: 모델} → 공급자 설정(env_key / base_url) + model"""
+    return {ai_name: dict(AI_PROVIDERS[ai_name], model=model) for ai_name, model in models.items()}
+
+
+def load_env():
+    """.env 로드 (프로세스당 1회, 이후 import나 단계 전환에서는 다시 읽지 않음)"""
+    global _env_loaded
+    with _setup_lock:
+        if _env_loaded:
+            return
+        from dotenv import load_dotenv
+        load_dotenv(override=True)
+        _env_loaded = True
+
+
+def configure_stdout():
+    """Windows UTF-8 출력 (1회만, 기존 스트림 재설정 → 모듈마다 감싸서 이전 래퍼가 닫히는 문제 방지)"""
+    global _stdout_configured
+    with _setup_lock:
+        if _stdout_configured or sys.platform != 'win32':
+            return
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.reconfigure(encoding='utf-8')
+            except (AttributeError, ValueError):
+                # 리다이렉트 등 reconfigure가 없는 스트림은 그대로
+                pass
+        _stdout_configured = True
+
+
+def _create_client(ai_name, config, api_key):
+    """공급자 SDK는 여기서 처음 import (수집만 하면 anthropic, 점수 계산만 하면 SDK 전부 import 안 함)"""
+    sdk = config['sdk']
+    if sdk == "anthropic":
+        import anthropic
+        return anthropic.Anthropic(api_key=api_key)
+    if sdk == "openai":
+        from openai import OpenAI
+        if config.get('base_url'):
+            return OpenAI(api_key=api_key, base_url=config['base_url'])
+        return OpenAI(api_key=api_key)
+    if sdk == "genai":
+        from google import genai
+        return genai.Client(api_key=api_key)
+    raise ValueError(f"알 수 없는 SDK: {sdk} ({ai_name})")
+
+
+def init_ai_client(ai_name):
+    """AI 클라이언트 (프로세스 공용 캐시, 스레드 안전)"""
+    client = ai_clients.get(ai_name)
+    if client is not None:
+        return client
+
+    config = AI_PROVIDERS.get(ai_name)
+    if not config:
+        raise ValueError(f"알 수 없는 AI: {ai_name}")
+
+    load_env()
+    api_key = os.getenv(config['env_key'])
+    if not api_key:
+        raise ValueError(f"{config['env_key']} 환경변수가 설정되지 않았습니다.")
+
+    with _clients_lock:
+        if ai_name not in ai_clients:
+            ai_clients[ai_name] = _create_client(ai_name, config, api_key)
+        return ai_clients[ai_name]
+
+
+def run_main(module_name, argv):
+    """단계 스크립트 main()을 같은 프로세스에서 실행 → 종료 코드 (0 = 성공)
+
+    이미 import된 모듈은 그대로 재사용 (import / .env / Supabase / SDK 준비는 프로세스당 1회)
+    """
+    module = importlib.import_module(module_name)
+    saved_argv = sys.argv
+    sys.argv = [f"{module_name}.py"] + list(argv)
+    try:
+        module.main()
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    except KeyboardInterrupt:
+        raise
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.argv = saved_argv
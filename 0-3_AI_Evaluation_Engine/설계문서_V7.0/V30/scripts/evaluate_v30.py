@@ -5,7 +5,7 @@ V30 풀링 평가 스크립트
 === 핵심 원칙 ===
 - 풀링 방식: V26에서 가져옴 (4개 AI 수집 데이터를 합쳐서 평가)
 - 등급 체계: V28에서 가져옴 (+4 ~ -4, 점수 = 등급 × 2)
-- 배치 평가: V28에서 가져옴 (10개씩 배치 평가)
+- 배치 평가: V28에서 가져옴 (배치 크기는 토큰 예산 + AI별 적응형, batch_packer_v30)
 - 정치인 프로필: V28에서 가져옴 (format_politician_profile)
 
 === V30 풀링 평가 프로세스 ===
@@ -36,158 +36,364 @@ V30 풀링 평가 스크립트
 
     # 특정 카테고리만
     python evaluate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --category=expertise
+
+    # AI당 동시 배치 수 조정 (기본 4)
+    python evaluate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --inflight=6
+
+    # 응답 캐시 없이 (항상 API 호출)
+    python evaluate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --no-cache
+
+    # 스트리밍 없이 (기본은 배치 항목 수만큼 평가가 오면 스트림 중단)
+    python evaluate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --no-stream
+
+    # 고정 10개 배치 (기본은 토큰 예산 + AI별 적응형 배치 크기)
+    python evaluate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --no-adaptive-batch
+
+    # 항목 내용을 평가용 요약(digest) 대신 기존처럼 content[:300]으로
+    python evaluate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --no-digest
+
+    # 배치 API 모드 (Claude/ChatGPT 비동기 배치, batch_evaluate_v30.py)
+    python evaluate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --batch-mode
+
+=== 파이프라인 (V30) ===
+- 배치 평가(생산자): AI별 스레드풀에서 최대 --inflight개 배치 동시 진행
+- 저장(소비자): EvaluationWriter 백그라운드 스레드가 완료된 평가를 모아 대량 upsert
+- 재개: collected_data_id 단위로 이미 저장된 평가는 건너뜀 (중단 시 미저장 배치만 재평가)
+- 응답 캐시: 같은 (모델, 프롬프트) 응답은 llm_cache_v30에서 재사용 (재실행 시 API 비용 거의 없음)
+- 스트리밍: 평가 객체를 도착하는 대로 파싱, 배치 항목 수만큼 모이면 중단 (stream_json_v30)
+- 구조화 출력: 공급자 JSON 스키마 강제 (structured_output_v30), 누락/검증 실패 항목만 재요청
+- 평가용 요약: 항목 내용은 content[:300] 대신 저장된 추출 요약 digest (4개 AI 공통, digest_v30)
+- 배치 패킹: 항목 추정 토큰으로 AI별 예산까지 묶음, 파싱 실패/누락 비율로 배치 크기 조정 (batch_packer_v30)
+- 유사 중복: 제목+내용 MinHash 묶음마다 대표 1개만 평가, 등급은 구성원 행에 복제 (near_dup_v30)
+- 프롬프트 캐싱: 평가 기준/프로필(고정 앞부분)과 데이터 목록(배치별)을 분리해
+  공급자 캐시에 태움 (Claude cache_control, OpenAI/xAI 자동 prefix, Gemini system_instruction)
 """
 
-import os
 import sys
 import json
 import re
 import argparse
 import time
+import queue
+import threading
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-from supabase import create_client
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from engine_v30 import (CATEGORIES, CATEGORY_MAP, EVALUATION_AIS, init_ai_client, model_configs,
+                        load_env, configure_stdout)
 from json_repair import repair_json  # V28에서 가져옴
+from rate_limiter_v30 import get_limiter, estimate_tokens, is_rate_limit_error, settle_usage
+from llm_cache_v30 import get_response_cache, disable_response_cache
+from stream_json_v30 import JsonItemParser, stream_text, streaming_enabled, disable_streaming
+from structured_output_v30 import (
+    EVALUATION_SCHEMA, EVALUATION_ITEM_SCHEMA, request_kwargs, message_text, load_json, schema_errors,
+    disable_structured_output
+)
+from politician_profiles_v30 import get_profile_cache
+from batch_packer_v30 import get_batch_packer, get_packer_stats, disable_adaptive_batch
+from progress_v30 import get_progress, add_saved_evaluations
+from repository_v30 import supabase, iter_collected_data, iter_evaluations, COLUMNS_COLLECTED_EVAL, COLUMNS_EVAL_KEY
+from near_dup_v30 import group_near_duplicates, with_cluster_column, disable_near_dup
+from url_canonical_v30 import canonical_key, with_canonical_column
+from relevance_v30 import is_excluded, with_relevance_column, disable_relevance
+from digest_v30 import attach_digests, with_digest_column, digest_enabled, disable_digest
+from telemetry_v30 import (span, telemetry_context, submit_in_context, record_tokens,
+                           print_summary, disable_telemetry)
 import uuid as uuid_module  # UUID 검증용
 
 # UTF-8 출력 설정
-if sys.platform == 'win32':
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+configure_stdout()
 
 # 환경 변수 로드
-load_dotenv(override=True)
-
-# Supabase 클라이언트
-supabase = create_client(
-    os.getenv('SUPABASE_URL'),
-    os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-)
+load_env()
 
 # V30 테이블명
 TABLE_COLLECTED_DATA = "collected_data_v30"
 TABLE_EVALUATIONS = "evaluations_v30"
 
-# AI 클라이언트 캐시
-ai_clients = {}
-
-# 카테고리 정의 (V28.3 기준)
-CATEGORIES = [
-    ("expertise", "전문성"),
-    ("leadership", "리더십"),
-    ("vision", "비전"),
-    ("integrity", "청렴성"),
-    ("ethics", "윤리성"),
-    ("accountability", "책임감"),
-    ("transparency", "투명성"),
-    ("communication", "소통능력"),
-    ("responsiveness", "대응성"),
-    ("publicinterest", "공익성")
-]
-
-CATEGORY_MAP = {eng: kor for eng, kor in CATEGORIES}
-
-# 평가 AI (4개)
-EVALUATION_AIS = ["Claude", "ChatGPT", "Gemini", "Grok"]
-
-# AI 모델 설정 (V28에서 가져옴)
-AI_CONFIGS = {
-    "Claude": {
-        "model": "claude-3-5-haiku-20241022",  # V28 기준
-        "env_key": "ANTHROPIC_API_KEY"
-    },
-    "ChatGPT": {
-        "model": "gpt-4o-mini",
-        "env_key": "OPENAI_API_KEY"
-    },
-    "Grok": {
-        "model": "grok-4-fast",  # V28 기준
-        "env_key": "XAI_API_KEY",
-        "base_url": "https://api.x.ai/v1"
-    },
-    "Gemini": {
-        "model": "gemini-2.0-flash",
-        "env_key": "GEMINI_API_KEY"
-    }
-}
+# AI 클라이언트 캐시 / 카테고리 / 평가 AI: engine_v30 (단계 공용)
+
+# 파이프라인 설정
+DEFAULT_INFLIGHT = 4         # AI당 동시에 진행하는 배치 수
+WRITE_BATCH_SIZE = 200       # 저장 스레드의 1회 upsert 행 수
+WRITE_FLUSH_INTERVAL = 5.0   # 버퍼가 덜 찼어도 이 시간(초)마다 저장
+EVAL_UNIQUE_KEY = "collected_data_id,evaluator_ai"  # idx_v30_eval_unique
+MAX_RATE_LIMIT_RETRIES = 10  # 429만 받은 재요청 상한 (max_retries와 별도)
+
+# AI 모델 설정 (V28에서 가져옴, env_key / base_url은 engine_v30.AI_PROVIDERS)
+AI_CONFIGS = model_configs({
+    "Claude": "claude-3-5-haiku-20241022",  # V28 기준
+    "ChatGPT": "gpt-4o-mini",
+    "Grok": "grok-4-fast",  # V28 기준
+    "Gemini": "gemini-2.0-flash",
+})
 
 # V28 등급 체계 (+4 ~ -4)
 VALID_RATINGS = ['+4', '+3', '+2', '+1', '-1', '-2', '-3', '-4']
 
+# 구조화 출력 이름 (Claude 도구 이름 / OpenAI json_schema 이름)
+EVALUATION_OUTPUT_NAME = "submit_evaluations"
+
 # 등급 → 점수 변환 (V28 기준)
 RATING_TO_SCORE = {
     '+4': 8, '+3': 6, '+2': 4, '+1': 2,
     '-1': -2, '-2': -4, '-3': -6, '-4': -8
 }
 
+# 토큰 사용량 (AI별 입력/캐시 적중/출력, 스레드 공용)
+token_usage = {}
+token_usage_lock = threading.Lock()
 
-def init_ai_client(ai_name):
-    """AI 클라이언트 초기화 (V28에서 가져옴)"""
-    global ai_clients
 
-    if ai_name in ai_clients:
-        return ai_clients[ai_name]
+def record_usage(ai_name, input_tokens, cached_tokens, output_tokens, settle=True):
+    """API 응답의 usage를 AI별로 누적 (호출 중이면 계측 span에도 기록)
 
-    config = AI_CONFIGS.get(ai_name)
-    if not config:
-        raise ValueError(f"알 수 없는 AI: {ai_name}")
+    settle=True: 방금 호출의 리미터 토큰 예약을 실제 입력 토큰으로 정산 (배치 API 결과는 False)
+    """
+    record_tokens(input_tokens, cached_tokens, output_tokens)
+    if settle:
+        settle_usage(input_tokens, cached_tokens)
+    with token_usage_lock:
+        usage = token_usage.setdefault(ai_name, {'calls': 0, 'input': 0, 'cached': 0, 'output': 0})
+        usage['calls'] += 1
+        usage['input'] += input_tokens or 0
+        usage['cached'] += cached_tokens or 0
+        usage['output'] += output_tokens or 0
+
+
+def get_cache_key(ai_name, prompt, prefix=""):
+    """평가 응답 캐시 키 (모델 + 프롬프트 + 생성 파라미터)"""
+    return get_response_cache().make_key(
+        "evaluate", AI_CONFIGS[ai_name]['model'], prefix + prompt, {"max_tokens": 4096}
+    )
 
-    api_key = os.getenv(config['env_key'])
-    if not api_key:
-        raise ValueError(f"{config['env_key']} 환경변수가 설정되지 않았습니다.")
 
-    if ai_name == "Claude":
-        import anthropic
-        ai_clients[ai_name] = anthropic.Anthropic(api_key=api_key)
-    elif ai_name == "ChatGPT":
-        from openai import OpenAI
-        ai_clients[ai_name] = OpenAI(api_key=api_key)
-    elif ai_name == "Grok":
-        from openai import OpenAI
-        ai_clients[ai_name] = OpenAI(
-            api_key=api_key,
-            base_url=config['base_url']
-        )
-    elif ai_name == "Gemini":
-        from google import genai
-        client = genai.Client(api_key=api_key)
-        ai_clients[ai_name] = client
+def call_ai_api(ai_name, prompt, use_cache=True, prefix="", expected=None):
+    """AI API 호출 (V28에서 가져옴, 응답 캐시 + 공급자별 레이트 리미터 적용)
+
+    prefix: 배치마다 같은 앞부분 (평가 기준/프로필) → 공급자 프롬프트 캐싱 대상
+    use_cache=False면 캐시를 읽지 않고 새로 호출 (결과는 캐시에 덮어씀)
+    expected: 배치 항목 수 → 스트리밍으로 받다가 평가가 expected개 완성되면 중단
+    """
+    cache = get_response_cache()
+    key = get_cache_key(ai_name, prompt, prefix)
+    if use_cache:
+        cached = cache.get(key, ttl=cache.ttl_for("evaluate"))
+        if cached is not None:
+            return cached
+
+    model = AI_CONFIGS[ai_name]['model']
+    with span("llm", "evaluate", provider=ai_name, model=model, items=expected):
+        if expected and streaming_enabled():
+            content = stream_evaluation_content(ai_name, prompt, prefix, expected)
+        else:
+            with get_limiter(ai_name).request(tokens=estimate_tokens(prefix + prompt)):
+                content = _call_ai_api(ai_name, prompt, prefix)
+
+    cache.set(key, content, namespace="evaluate", model=model)
+    return content
 
-    return ai_clients[ai_name]
 
+def _call_ai_api(ai_name, prompt, prefix=""):
+    """공급자별 호출 (prefix는 각 공급자의 프롬프트 캐싱 방식에 맞게 전달)
 
-def call_ai_api(ai_name, prompt):
-    """AI API 호출 (V28에서 가져옴)"""
+    - Claude: system 블록 + cache_control ephemeral (명시적 캐싱)
+    - ChatGPT/Grok: system 메시지로 맨 앞에 고정 (1024토큰 이상 자동 prefix 캐싱)
+    - Gemini: system_instruction으로 분리 (암시적 캐싱)
+    출력은 구조화 출력으로 EVALUATION_SCHEMA 강제 (structured_output_v30)
+    """
     client = init_ai_client(ai_name)
     config = AI_CONFIGS[ai_name]
+    structured = request_kwargs(ai_name, EVALUATION_OUTPUT_NAME, EVALUATION_SCHEMA)
 
     if ai_name == "Claude":
+        kwargs = dict(structured)
+        if prefix:
+            kwargs['system'] = [{
+                "type": "text",
+                "text": prefix,
+                "cache_control": {"type": "ephemeral"}
+            }]
         response = client.messages.create(
             model=config['model'],
             max_tokens=4096,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            **kwargs
         )
-        return response.content[0].text
+        usage = getattr(response, 'usage', None)
+        if usage:
+            cache_read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+            cache_write = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+            record_usage(ai_name, usage.input_tokens + cache_read + cache_write, cache_read, usage.output_tokens)
+        return message_text(response)
 
     elif ai_name in ["ChatGPT", "Grok"]:
+        messages = [{"role": "user", "content": prompt}]
+        if prefix:
+            messages.insert(0, {"role": "system", "content": prefix})
         response = client.chat.completions.create(
             model=config['model'],
-            messages=[{"role": "user", "content": prompt}],
+            messages=messages,
             max_tokens=4096,
-            temperature=0.7
+            temperature=0.7,
+            **structured
         )
+        usage = getattr(response, 'usage', None)
+        if usage:
+            details = getattr(usage, 'prompt_tokens_details', None)
+            cached = getattr(details, 'cached_tokens', 0) if details else 0
+            record_usage(ai_name, usage.prompt_tokens, cached, usage.completion_tokens)
         return response.choices[0].message.content
 
     elif ai_name == "Gemini":
+        kwargs = {}
+        config_fields = dict(structured)
+        if prefix:
+            config_fields['system_instruction'] = prefix
+        if config_fields:
+            from google.genai import types
+            kwargs['config'] = types.GenerateContentConfig(**config_fields)
         response = client.models.generate_content(
             model=config['model'],
-            contents=prompt
+            contents=prompt,
+            **kwargs
         )
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            record_usage(
+                ai_name,
+                getattr(usage, 'prompt_token_count', 0),
+                getattr(usage, 'cached_content_token_count', 0),
+                getattr(usage, 'candidates_token_count', 0)
+            )
         return response.text
 
 
+def _stream_ai_api(ai_name, prompt, prefix, usage):
+    """공급자별 스트리밍 호출 → 텍스트 조각 (_call_ai_api와 같은 프롬프트 캐싱 구성)
+
+    usage: 스트림 이벤트에서 받은 토큰 사용량을 채워 넣을 dict (input/cached/output)
+    구조화 출력이면 Claude는 tool_use 입력(input_json_delta)이 텍스트 조각
+    """
+    client = init_ai_client(ai_name)
+    config = AI_CONFIGS[ai_name]
+    tokens = estimate_tokens(prefix + prompt)
+    structured = request_kwargs(ai_name, EVALUATION_OUTPUT_NAME, EVALUATION_SCHEMA)
+
+    if ai_name == "Claude":
+        kwargs = dict(structured)
+        if prefix:
+            kwargs['system'] = [{
+                "type": "text",
+                "text": prefix,
+                "cache_control": {"type": "ephemeral"}
+            }]
+
+        def open_stream():
+            return client.messages.create(
+                model=config['model'],
+                max_tokens=4096,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                **kwargs
+            )
+
+        def extract_text(event):
+            if event.type == "message_start":
+                start = event.message.usage
+                cache_read = getattr(start, 'cache_read_input_tokens', 0) or 0
+                cache_write = getattr(start, 'cache_creation_input_tokens', 0) or 0
+                usage['input'] = start.input_tokens + cache_read + cache_write
+                usage['cached'] = cache_read
+            elif event.type == "message_delta":
+                usage['output'] = event.usage.output_tokens
+            elif event.type == "content_block_delta":
+                if event.delta.type == "text_delta":
+                    return event.delta.text
+                if event.delta.type == "input_json_delta":
+                    return event.delta.partial_json
+            return None
+
+    elif ai_name in ["ChatGPT", "Grok"]:
+        messages = [{"role": "user", "content": prompt}]
+        if prefix:
+            messages.insert(0, {"role": "system", "content": prefix})
+
+        def open_stream():
+            return client.chat.completions.create(
+                model=config['model'],
+                messages=messages,
+                max_tokens=4096,
+                temperature=0.7,
+                stream=True,
+                stream_options={"include_usage": True},
+                **structured
+            )
+
+        def extract_text(chunk):
+            if getattr(chunk, 'usage', None):
+                details = getattr(chunk.usage, 'prompt_tokens_details', None)
+                usage['input'] = chunk.usage.prompt_tokens
+                usage['cached'] = getattr(details, 'cached_tokens', 0) if details else 0
+                usage['output'] = chunk.usage.completion_tokens
+            if chunk.choices:
+                return chunk.choices[0].delta.content
+            return None
+
+    else:  # Gemini
+        kwargs = {}
+        config_fields = dict(structured)
+        if prefix:
+            config_fields['system_instruction'] = prefix
+        if config_fields:
+            from google.genai import types
+            kwargs['config'] = types.GenerateContentConfig(**config_fields)
+
+        def open_stream():
+            return client.models.generate_content_stream(
+                model=config['model'],
+                contents=prompt,
+                **kwargs
+            )
+
+        def extract_text(chunk):
+            metadata = getattr(chunk, 'usage_metadata', None)
+            if metadata:
+                usage['input'] = getattr(metadata, 'prompt_token_count', 0)
+                usage['cached'] = getattr(metadata, 'cached_content_token_count', 0)
+                usage['output'] = getattr(metadata, 'candidates_token_count', 0)
+            return chunk.text
+
+    return stream_text(get_limiter(ai_name), tokens, open_stream, extract_text)
+
+
+def stream_evaluation_content(ai_name, prompt, prefix, expected):
+    """스트리밍 평가 호출: 평가 객체가 expected개 완성되면 스트림 중단
+
+    중단한 경우 받은 평가로 {"evaluations": [...]}를 만들어 반환
+    (parse_evaluation_response / 응답 캐시 형식은 기존과 동일)
+    """
+    usage = {}
+    parser = JsonItemParser()
+    evaluations = []
+    chunks = _stream_ai_api(ai_name, prompt, prefix, usage)
+    try:
+        for chunk in chunks:
+            evaluations.extend(parser.feed(chunk))
+            if len(evaluations) >= expected:
+                return json.dumps({"evaluations": evaluations[:expected]}, ensure_ascii=False)
+        return parser.text
+    finally:
+        chunks.close()
+        # 중단된 스트림은 usage 이벤트가 오지 않음 → 받은 텍스트 기준 추정
+        if usage or parser.text:
+            record_usage(
+                ai_name,
+                usage.get('input') or estimate_tokens(prefix + prompt),
+                usage.get('cached', 0),
+                usage.get('output') or estimate_tokens(parser.text)
+            )
+
+
 def extract_json(text):
     """JSON 추출 및 복구 (V28에서 가져옴)"""
     if not text:
@@ -241,98 +447,18 @@ def get_politician_name(politician_id):
 
 
 def get_politician_profile(politician_id):
-    """정치인 상세 정보 조회 (V28에서 가져옴)"""
-    try:
-        result = supabase.table('politicians').select('*').eq('id', politician_id).execute()
-        if result.data and len(result.data) > 0:
-            return result.data[0]
-    except:
-        pass
-    return None
+    """정치인 상세 정보 조회 (V28에서 가져옴, 프로세스 공용 캐시)"""
+    return get_profile_cache().get_profile(politician_id)
 
 
 def get_politician_instructions(politician_name):
-    """정치인별 특별 지시사항 파일 읽기 (V28에서 가져옴, 경로 V30으로 변경)"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    instructions_path = os.path.join(
-        script_dir, '..', 'instructions_v30', '1_politicians', f'{politician_name}.md'
-    )
-
-    try:
-        if os.path.exists(instructions_path):
-            with open(instructions_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            instructions_text = ""
-
-            # 평가 시 주의점 추출
-            if "### 평가 시 주의점" in content:
-                start = content.find("### 평가 시 주의점")
-                end = content.find("###", start + 10)
-                if end == -1:
-                    end = content.find("---", start)
-                if end > start:
-                    section = content[start:end].strip()
-                    instructions_text += section + "\n\n"
-
-            # 알려진 논란/이슈 추출
-            if "### 알려진 논란/이슈" in content:
-                start = content.find("### 알려진 논란/이슈")
-                end = content.find("###", start + 10)
-                if end == -1:
-                    end = content.find("---", start)
-                if end > start:
-                    section = content[start:end].strip()
-                    instructions_text += section + "\n\n"
-
-            # 알려진 성과 추출
-            if "### 알려진 성과" in content:
-                start = content.find("### 알려진 성과")
-                end = content.find("###", start + 10)
-                if end == -1:
-                    end = content.find("---", start)
-                if end > start:
-                    section = content[start:end].strip()
-                    instructions_text += section
-
-            return instructions_text.strip() if instructions_text.strip() else None
-    except Exception as e:
-        print(f"  ⚠️ 지시사항 파일 읽기 실패: {e}")
-
-    return None
+    """정치인별 특별 지시사항 (V28에서 가져옴, 파일 mtime 기준 캐시)"""
+    return get_profile_cache().get_instructions(politician_name)
 
 
 def format_politician_profile(politician_id, politician_name):
-    """정치인 프로필을 프롬프트용 텍스트로 포맷 (V28에서 가져옴)"""
-    profile = get_politician_profile(politician_id)
-    instructions = get_politician_instructions(politician_name)
-
-    if not profile:
-        base_text = f"**대상 정치인**: {politician_name}"
-    else:
-        base_text = f"""**대상 정치인**: {politician_name}
-
-**정치인 기본 정보** (평가 시 참고):
-- 이름: {profile.get('name', politician_name)}
-- 신분: {profile.get('identity', 'N/A')}
-- 직책: {profile.get('title', profile.get('position', 'N/A'))}
-- 정당: {profile.get('party', 'N/A')}
-- 지역: {profile.get('region', 'N/A')}
-- 성별: {profile.get('gender', 'N/A')}
-
-⚠️ **중요**: 반드시 위 정보와 일치하는 "{politician_name}"에 대해 평가하세요."""
-
-    # 특별 지시사항 추가
-    if instructions:
-        base_text += f"""
-
----
-📋 **{politician_name} 평가 시 참고사항**:
-
-{instructions}
----"""
-
-    return base_text
+    """정치인 프로필을 프롬프트용 텍스트로 포맷 (V28에서 가져옴, 정치인당 1번 렌더링)"""
+    return get_profile_cache().get_prompt_header(politician_id, politician_name)
 
 
 def get_pooled_data(politician_id, category):
@@ -343,24 +469,28 @@ def get_pooled_data(politician_id, category):
     중복 제거 규칙 (V30):
     - 같은 AI가 같은 URL 2번 수집 → 1개만 유지 (중복 제거)
     - 다른 AI가 같은 URL 수집 → 모두 유지 (중복 제거 안 함)
+    - URL 비교는 정규화 URL (canonical_url, 추적 파라미터/모바일/AMP 사본은 같은 URL)
+    - 관련성 필터(relevance_v30)로 제외된 행(is_relevant = false)은 평가하지 않음
+    - 항목마다 평가용 요약(digest) 포함 (기록된 현재 버전이 없으면 즉석 계산)
     """
     try:
-        result = supabase.table(TABLE_COLLECTED_DATA)\
-            .select('*')\
-            .eq('politician_id', politician_id)\
-            .eq('category', category.lower())\
-            .execute()
-
-        if not result.data:
-            return []
+        # 키셋 페이지네이션 + 평가에 필요한 컬럼만 (1000행 제한 없음, 유사 중복 묶음 ID 포함)
+        rows = iter_collected_data(politician_id, category=category,
+                                   columns=with_digest_column(with_relevance_column(
+                                       with_canonical_column(with_cluster_column(COLUMNS_COLLECTED_EVAL)))))
 
         # AI별 URL 중복 제거 (같은 AI가 같은 URL 2번 가져온 경우만 제거)
         seen_by_ai = {}  # {ai_name: set(urls)}
         unique_items = []
+        excluded = 0
+
+        for item in rows:
+            if is_excluded(item):
+                excluded += 1
+                continue  # 동명이인/무관한 항목 → 평가 비용 없음
 
-        for item in result.data:
             ai_name = item.get('collector_ai', 'unknown')
-            url = item.get('source_url', '')
+            url = canonical_key(item)
 
             if ai_name not in seen_by_ai:
                 seen_by_ai[ai_name] = set()
@@ -374,6 +504,9 @@ def get_pooled_data(politician_id, category):
                 seen_by_ai[ai_name].add(url)
             unique_items.append(item)
 
+        if excluded:
+            print(f"    🎯 관련성 필터로 {excluded}개 평가 제외 (확인: relevance_v30.py --dry-run, 끄기: --no-relevance)")
+        attach_digests(unique_items, politician_id)
         return unique_items
 
     except Exception as e:
@@ -381,28 +514,28 @@ def get_pooled_data(politician_id, category):
         return []
 
 
-def evaluate_batch(evaluator_ai, items, category_name, politician_id, politician_name):
-    """배치 평가 (V28에서 가져옴, 최대 10개씩)"""
+# (politician_id, category) → 평가 프롬프트 고정 앞부분
+evaluation_prefixes = {}
+evaluation_prefixes_lock = threading.Lock()
+
+
+def build_evaluation_prefix(category_name, politician_id, politician_name):
+    """배치마다 같은 프롬프트 앞부분 (프로필 + 등급 체계 + 평가 기준 + 출력 형식)
+
+    정치인 × 카테고리당 1번만 만들고 재사용 → 공급자 프롬프트 캐싱 적중
+    """
+    key = (politician_id, category_name.lower())
+    with evaluation_prefixes_lock:
+        if key in evaluation_prefixes:
+            return evaluation_prefixes[key]
+
     cat_kor = CATEGORY_MAP.get(category_name.lower(), category_name)
 
     # 정치인 프로필 정보 가져오기
     profile_info = format_politician_profile(politician_id, politician_name)
 
-    # 평가할 데이터 목록 생성
-    items_text = ""
-    for i, item in enumerate(items, 1):
-        items_text += f"""
-[항목 {i}]
-- ID: {item.get('id', '')}
-- 제목: {item.get('title', 'N/A')}
-- 내용: {item.get('content', 'N/A')[:300]}...
-- 출처: {item.get('source_name', item.get('source_url', 'N/A'))}
-- 날짜: {item.get('published_date', 'N/A')}
-- 수집AI: {item.get('collector_ai', 'N/A')}
-"""
-
     # V28 등급 체계 (+4 ~ -4) 사용
-    prompt = f"""당신은 정치인 평가 전문가입니다.
+    prefix = f"""당신은 정치인 평가 전문가입니다.
 
 {profile_info}
 
@@ -427,9 +560,6 @@ def evaluate_batch(evaluator_ai, items, category_name, politician_id, politician
 - 경미한 긍정 (보통, 평범) → +1
 - 부정적 내용 (논란, 비판, 문제) → -1, -2, -3, -4 (심각도에 따라)
 
-**평가할 데이터**:
-{items_text}
-
 **반드시 모든 항목에 대해 평가하세요.**
 
 다음 JSON 형식으로 반환:
@@ -445,60 +575,188 @@ def evaluate_batch(evaluator_ai, items, category_name, politician_id, politician
 }}
 ```
 """
+    with evaluation_prefixes_lock:
+        evaluation_prefixes[key] = prefix
+    return prefix
 
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            time.sleep(1)
-            content = call_ai_api(evaluator_ai, prompt)
-
-            json_str = extract_json(content)
-            if not json_str:
-                raise json.JSONDecodeError("Empty response", "", 0)
-
-            data = json.loads(json_str)
-            evaluations = data.get('evaluations', [])
-
-            # 유효성 검증 및 ID 매칭 (V30: items와 evaluations 순서 매칭)
-            valid_evals = []
-            for idx, ev in enumerate(evaluations):
-                rating = str(ev.get('rating', '')).strip()
-                # '+' 기호 없이 숫자만 온 경우 처리
-                if rating in ['4', '3', '2', '1']:
-                    rating = '+' + rating
-                if rating in VALID_RATINGS:
-                    ev['rating'] = rating
-                    ev['score'] = RATING_TO_SCORE.get(rating, 0)
-
-                    # ✅ V30: items와 evaluations 순서 매칭하여 올바른 ID 할당
-                    # AI가 반환한 ID 대신 items에서 ID 가져오기
-                    if idx < len(items):
-                        ev['id'] = items[idx].get('id')  # 올바른 UUID 할당
-                    else:
-                        ev['id'] = None  # items보다 많은 평가는 ID 없음
-
-                    valid_evals.append(ev)
-
-            return valid_evals
-
-        except json.JSONDecodeError as e:
-            print(f"      ⚠️ JSON 파싱 실패 (시도 {attempt+1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                time.sleep(3)
+
+def item_content(item):
+    """프롬프트용 항목 내용 (평가용 요약 digest, --no-digest면 기존 content[:300])"""
+    digest = item.get('digest')
+    if digest and digest_enabled():
+        return digest
+    return f"{item.get('content', 'N/A')[:300]}..."
+
+
+def format_batch_item(index, item):
+    """데이터 목록의 항목 1개"""
+    return f"""
+[항목 {index}]
+- ID: {item.get('id', '')}
+- 제목: {item.get('title', 'N/A')}
+- 내용: {item_content(item)}
+- 출처: {item.get('source_name', item.get('source_url', 'N/A'))}
+- 날짜: {item.get('published_date', 'N/A')}
+- 수집AI: {item.get('collector_ai', 'N/A')}
+"""
+
+
+def item_prompt_tokens(item):
+    """항목 1개가 배치 프롬프트에서 차지하는 추정 토큰 (배치 패킹용)"""
+    return estimate_tokens(format_batch_item(0, item))
+
+
+def build_batch_prompt(items):
+    """배치별 프롬프트 뒷부분 (평가할 데이터 목록)"""
+    # 평가할 데이터 목록 생성
+    items_text = "".join(format_batch_item(i, item) for i, item in enumerate(items, 1))
+
+    return f"""**평가할 데이터**:
+{items_text}
+위 {len(items)}개 항목을 순서대로 모두 평가하여 JSON으로 반환하세요.
+"""
+
+
+def parse_evaluation_response(content, items):
+    """AI 응답 → 유효한 평가 목록 (파싱 실패 시 json.JSONDecodeError)
+
+    items는 'id' 키만 있으면 됨 (배치 API 결과 처리 시 ID 목록만 전달)
+    구조화 출력(순수 JSON)은 바로 로드, 그 외(이전 캐시 응답 등)만 코드 블록 추출 + json_repair
+    평가 항목은 EVALUATION_ITEM_SCHEMA로 검증 → 통과하지 못한 항목은 결과에서 빠짐 (누락 항목 재요청 대상)
+    """
+    data = load_json(content)
+    if not isinstance(data, dict):
+        json_str = extract_json(content)
+        if not json_str:
+            raise json.JSONDecodeError("Empty response", "", 0)
+        data = json.loads(json_str)
+
+    evaluations = data.get('evaluations', []) if isinstance(data, dict) else []
+    if not isinstance(evaluations, list):
+        raise json.JSONDecodeError("evaluations is not a list", "", 0)
+
+    # ID 매칭: 모델이 돌려준 id를 배치의 id와 대조 (건너뛰거나 순서를 바꿔도 다른 항목에 등급이 붙지 않음)
+    # 돌려준 id가 하나도 맞지 않을 때만 순서 매칭 (배치 mock의 "1..N" 같은 번호 id, 이전 캐시 응답)
+    batch_ids = {_id_key(item.get('id')): item.get('id') for item in items if item.get('id')}
+    by_id = any(isinstance(ev, dict) and _id_key(ev.get('id')) in batch_ids for ev in evaluations)
+
+    valid_evals = []
+    assigned = set()
+    for idx, ev in enumerate(evaluations):
+        if not isinstance(ev, dict):
             continue
-        except Exception as e:
-            error_str = str(e)
-            print(f"      ⚠️ API 에러 (시도 {attempt+1}/{max_retries}): {error_str}")
-            if "rate" in error_str.lower() or "429" in error_str:
-                print(f"      ⚠️ Rate limit, 60초 대기...")
-                time.sleep(60)
-                continue
-            if attempt < max_retries - 1:
-                time.sleep(5)
+        rating = str(ev.get('rating', '')).strip()
+        # '+' 기호 없이 숫자만 온 경우 처리
+        if rating in ['4', '3', '2', '1']:
+            rating = '+' + rating
+        if rating not in VALID_RATINGS:
+            continue
+        ev['rating'] = rating
+        ev['score'] = RATING_TO_SCORE.get(rating, 0)
+
+        # 스키마 검증은 모델이 돌려준 id 그대로 (덮어쓰기 전)
+        if schema_errors(ev, EVALUATION_ITEM_SCHEMA):
             continue
 
-    print(f"      ❌ 최종 실패: 모든 재시도 소진")
-    return []
+        if by_id:
+            item_id = batch_ids.get(_id_key(ev.get('id')))
+        else:
+            item_id = items[idx].get('id') if idx < len(items) else None
+        if not item_id or item_id in assigned:
+            continue  # 배치에 없는 id / 같은 항목 중복 평가는 버림
+
+        assigned.add(item_id)
+        ev['id'] = item_id  # 배치 원본 UUID (대소문자/공백 차이 정리)
+        valid_evals.append(ev)
+
+    return valid_evals
+
+
+def _id_key(value):
+    """ID 비교 키 (공백/대소문자 무시)"""
+    return str(value).strip().lower() if value is not None else None
+
+
+def request_batch(evaluator_ai, batch, prefix, attempt, max_retries):
+    """배치 1회 요청 → (ID가 매칭된 평가 목록, rate limit 여부) (실패 시 빈 목록)
+
+    결과(평가 수 / 파싱 실패)는 AI별 배치 패커에 반영 → 다음 배치 크기 조정
+    """
+    packer = get_batch_packer(evaluator_ai)
+    prompt = build_batch_prompt(batch)
+    try:
+        # 재시도는 캐시를 거치지 않음 (캐시된 응답이 파싱 실패 원인일 수 있음)
+        with telemetry_context(retries=attempt):
+            content = call_ai_api(evaluator_ai, prompt, use_cache=(attempt == 0), prefix=prefix,
+                                  expected=len(batch))
+        evaluations = [ev for ev in parse_evaluation_response(content, batch) if ev.get('id')]
+        packer.record(len(batch), len(evaluations))
+        return evaluations, False
+
+    except json.JSONDecodeError as e:
+        print(f"      ⚠️ JSON 파싱 실패 ({len(batch)}개, 시도 {attempt+1}/{max_retries}): {e}")
+        packer.record(len(batch), 0, parse_failed=True)
+        get_response_cache().delete(get_cache_key(evaluator_ai, prompt, prefix))
+        if attempt < max_retries - 1:
+            time.sleep(3)
+    except Exception as e:
+        error_str = str(e)
+        print(f"      ⚠️ API 에러 (시도 {attempt+1}/{max_retries}): {error_str}")
+        if is_rate_limit_error(e):
+            # 대기는 리미터가 담당 (Retry-After 쿨다운 + 동시성 감소)
+            print(f"      ⚠️ Rate limit → 리미터 쿨다운 후 재시도 (재시도 횟수에 포함 안 함)")
+            return [], True
+        if attempt < max_retries - 1:
+            time.sleep(5)
+    return [], False
+
+
+def evaluate_batch(evaluator_ai, items, category_name, politician_id, politician_name):
+    """배치 평가 (V28에서 가져옴, 배치 크기는 batch_packer_v30이 결정)
+
+    프롬프트 = 고정 앞부분(build_evaluation_prefix, 캐싱) + 배치별 데이터 목록
+    응답에서 빠졌거나 스키마 검증에 실패한 항목만 다시 요청 (배치 전체 재요청 없음)
+    재요청은 남은 항목을 현재 배치 크기로 다시 묶음 → 파싱 실패로 크기가 줄었으면 나눠서 요청
+    """
+    prefix = build_evaluation_prefix(category_name, politician_id, politician_name)
+    packer = get_batch_packer(evaluator_ai)
+    pending = list(items)
+    results = []
+
+    max_retries = 3
+    attempt = 0
+    rate_limited_passes = 0
+    first_pass = True
+    while attempt < max_retries:
+        batches = [pending] if first_pass else packer.pack(pending, cost=item_prompt_tokens)
+        first_pass = False
+        # 429는 공급자 한도 문제라 응답 품질 재시도(max_retries)와 따로 셈 (쿨다운은 리미터가 담당)
+        failed = throttled = False
+        for batch in batches:
+            evaluations, rate_limited = request_batch(evaluator_ai, batch, prefix, attempt, max_retries)
+            results.extend(evaluations)
+            throttled = throttled or rate_limited
+            failed = failed or (not rate_limited and len(evaluations) < len(batch))
+
+        evaluated_ids = {ev.get('id') for ev in results}
+        pending = [item for item in pending if item.get('id') not in evaluated_ids]
+        if not pending:
+            return results
+        if failed or not throttled:
+            attempt += 1
+        else:
+            rate_limited_passes += 1
+            if rate_limited_passes >= MAX_RATE_LIMIT_RETRIES:
+                print(f"      ⚠️ Rate limit 재시도 {MAX_RATE_LIMIT_RETRIES}회 초과")
+                break
+        if attempt < max_retries:
+            print(f"      🔁 미평가 {len(pending)}개만 다시 요청 (시도 {attempt+1}/{max_retries})")
+
+    if results:
+        print(f"      ⚠️ {len(pending)}개 미평가 (재실행 시 다시 평가)")
+    else:
+        print(f"      ❌ 최종 실패: 모든 재시도 소진")
+    return results
 
 
 def is_valid_uuid(uuid_string):
@@ -512,18 +770,33 @@ def is_valid_uuid(uuid_string):
         return False
 
 
-def save_evaluations(politician_id, politician_name, category_name, evaluator_ai, evaluations):
-    """평가 결과 저장 (evaluations_v30 테이블)
+def split_representatives(politician_id, category_name, items):
+    """유사 중복 묶음별 대표만 남김 → (대표 목록, {대표 id: [구성원 id]})"""
+    representatives = []
+    members = {}
+    for group in group_near_duplicates(politician_id, category_name, items):
+        representatives.append(group[0])
+        if len(group) > 1:
+            members[group[0].get('id')] = [item.get('id') for item in group[1:]]
+    return representatives, members
 
-    개선사항:
-    - 배치 INSERT로 네트워크 부하 감소
-    - 재시도 로직 추가 (네트워크 에러 대응)
-    - UUID 검증 추가 (V30: collected_data_id 유효성 확인)
-    """
-    if not evaluations:
-        return 0
 
-    # 배치 INSERT용 레코드 생성
+def expand_cluster_evaluations(evaluations, members):
+    """대표 평가를 같은 묶음 구성원에게 복제 (구성원마다 별도 평가 행)"""
+    if not members:
+        return evaluations
+    expanded = []
+    for ev in evaluations:
+        expanded.append(ev)
+        for member_id in members.get(ev.get('id'), ()):
+            copy = dict(ev)
+            copy['id'] = member_id
+            expanded.append(copy)
+    return expanded
+
+
+def build_evaluation_records(politician_id, politician_name, category_name, evaluator_ai, evaluations):
+    """평가 결과 → evaluations_v30 레코드 변환 (UUID 검증 포함)"""
     records = []
     skipped_count = 0
 
@@ -552,13 +825,27 @@ def save_evaluations(politician_id, politician_name, category_name, evaluator_ai
     if skipped_count > 0:
         print(f"      ⚠️ UUID 검증 실패: {skipped_count}개 항목")
 
-    # 재시도 로직 (중복 키 에러 허용)
+    return records
+
+
+def insert_evaluation_records(records, raise_on_error=False):
+    """레코드 대량 저장, 저장된 행 수 반환 (raise_on_error=True면 최종 실패 시 예외)
+
+    (collected_data_id, evaluator_ai) 유니크 키 충돌은 DB에서 무시하므로
+    큰 묶음 안에 이미 저장된 평가가 섞여 있어도 나머지는 저장됨.
+    """
+    if not records:
+        return 0
+
+    # 재시도 로직 (네트워크 에러 대응)
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            # 배치 INSERT
-            result = supabase.table(TABLE_EVALUATIONS).insert(records).execute()
+            result = supabase.table(TABLE_EVALUATIONS)\
+                .upsert(records, on_conflict=EVAL_UNIQUE_KEY, ignore_duplicates=True)\
+                .execute()
             saved_count = len(result.data) if result.data else 0
+            add_saved_evaluations(result.data)  # 진행 현황 스냅샷 로컬 갱신
             return saved_count
         except Exception as e:
             error_msg = str(e)
@@ -576,10 +863,113 @@ def save_evaluations(politician_id, politician_name, category_name, evaluator_ai
                     time.sleep(wait_time)
                     continue
             print(f"      ❌ 저장 최종 실패: {error_msg}")
+            if raise_on_error:
+                raise
+            break
 
     return 0
 
 
+def save_evaluations(politician_id, politician_name, category_name, evaluator_ai, evaluations):
+    """평가 결과 저장 (evaluations_v30 테이블)
+
+    개선사항:
+    - 배치 INSERT로 네트워크 부하 감소
+    - 재시도 로직 추가 (네트워크 에러 대응)
+    - UUID 검증 추가 (V30: collected_data_id 유효성 확인)
+    """
+    if not evaluations:
+        return 0
+
+    records = build_evaluation_records(politician_id, politician_name, category_name, evaluator_ai, evaluations)
+    return insert_evaluation_records(records)
+
+
+class EvaluationWriter:
+    """완료된 평가를 모아 백그라운드에서 대량 저장하는 소비자 스레드
+
+    - WRITE_BATCH_SIZE개가 모이거나 WRITE_FLUSH_INTERVAL초가 지나면 저장
+    - close() 시 남은 버퍼를 모두 저장하고 스레드 종료
+    """
+
+    def __init__(self, batch_size=WRITE_BATCH_SIZE, flush_interval=WRITE_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.saved = 0
+        self.queued = 0
+        self.failed = 0
+        self.thread = threading.Thread(target=self._run, name="evaluation-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, records):
+        """저장할 레코드 추가 (즉시 반환)"""
+        if records:
+            self.queued += len(records)
+            self.queue.put(records)
+
+    def _flush(self, buffer):
+        while buffer:
+            chunk = buffer[:self.batch_size]
+            del buffer[:self.batch_size]
+            try:
+                self.saved += insert_evaluation_records(chunk, raise_on_error=True)
+            except Exception:
+                self.failed += len(chunk)
+
+    def _run(self):
+        buffer = []
+        last_flush = time.time()
+        closed = False
+        while not closed:
+            timeout = max(0.1, self.flush_interval - (time.time() - last_flush))
+            try:
+                records = self.queue.get(timeout=timeout)
+                if records is None:
+                    closed = True
+                else:
+                    buffer.extend(records)
+            except queue.Empty:
+                pass
+
+            if closed or len(buffer) >= self.batch_size or time.time() - last_flush >= self.flush_interval:
+                self._flush(buffer)
+                last_flush = time.time()
+
+    def close(self):
+        """남은 버퍼 저장 후 종료, 저장된 총 행 수 반환"""
+        self.queue.put(None)
+        self.thread.join()
+        return self.saved
+
+
+# (AI, inflight)별 배치 실행기 (카테고리가 병렬로 돌아도 AI당 동시 배치 수는 inflight로 제한)
+_batch_executors = {}
+_batch_executors_lock = threading.Lock()
+
+
+def get_batch_executor(evaluator_ai, inflight=DEFAULT_INFLIGHT):
+    """AI별 배치 평가 스레드풀 (프로세스 내 공유, inflight 값마다 별도 풀 → 요청한 동시 배치 수 그대로 적용)"""
+    key = (evaluator_ai, inflight)
+    with _batch_executors_lock:
+        executor = _batch_executors.get(key)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=inflight,
+                                          thread_name_prefix=f"eval-{evaluator_ai}-{inflight}")
+            _batch_executors[key] = executor
+        return executor
+
+
+def get_evaluated_ids(politician_id, evaluator_ai, category_name):
+    """이미 저장된 평가의 collected_data_id 집합 (재개용)"""
+    return {
+        row['collected_data_id']
+        for row in iter_evaluations(politician_id, category=category_name,
+                                    evaluator_ai=evaluator_ai, columns=COLUMNS_EVAL_KEY)
+        if row.get('collected_data_id')
+    }
+
+
 def check_already_evaluated(politician_id, evaluator_ai, category_name):
     """이미 평가된 데이터인지 확인
 
@@ -589,21 +979,10 @@ def check_already_evaluated(politician_id, evaluator_ai, category_name):
     - 90% 이상 평가되었으면 완료로 간주 (일부 오류 허용)
     """
     try:
-        # 평가된 개수 확인
-        eval_result = supabase.table(TABLE_EVALUATIONS).select('id', count='exact').eq(
-            'politician_id', politician_id
-        ).eq('evaluator_ai', evaluator_ai).eq(
-            'category', category_name.lower()
-        ).execute()
-
-        evaluated_count = eval_result.count if eval_result.count else 0
-
-        # 수집된 데이터 개수 확인
-        collected_result = supabase.table(TABLE_COLLECTED_DATA).select('id', count='exact').eq(
-            'politician_id', politician_id
-        ).eq('category', category_name.lower()).execute()
-
-        collected_count = collected_result.count if collected_result.count else 0
+        # 평가/수집 개수: 진행 현황 스냅샷 (정치인당 그룹 집계 1회, count 조회 없음)
+        progress = get_progress(politician_id)
+        evaluated_count = progress.evaluated_count(category_name, evaluator_ai)
+        collected_count = progress.collected_count(category_name)
 
         # 수집된 데이터가 없으면 완료로 간주
         if collected_count == 0:
@@ -622,14 +1001,23 @@ def check_already_evaluated(politician_id, evaluator_ai, category_name):
         return False
 
 
-def evaluate_category(evaluator_ai, politician_id, politician_name, category_name, category_korean):
-    """카테고리별 풀링 평가 (V26 풀링 방식 + V28 등급 체계 + V28 배치 평가)"""
-    print(f"  [{evaluator_ai}] {category_korean} 평가 중...")
+def evaluate_category(evaluator_ai, politician_id, politician_name, category_name, category_korean,
+                      writer=None, inflight=DEFAULT_INFLIGHT):
+    """카테고리별 풀링 평가 (계측 문맥: 단계/정치인/카테고리 → 배치 LLM/DB span)"""
+    with telemetry_context(stage="evaluate", politician_id=politician_id, category=category_name):
+        return _evaluate_category(evaluator_ai, politician_id, politician_name, category_name,
+                                  category_korean, writer, inflight)
 
-    # 이미 평가되었는지 확인
-    if check_already_evaluated(politician_id, evaluator_ai, category_name):
-        print(f"    ⏭️ 이미 평가 완료")
-        return 0
+
+def _evaluate_category(evaluator_ai, politician_id, politician_name, category_name, category_korean,
+                       writer=None, inflight=DEFAULT_INFLIGHT):
+    """카테고리별 풀링 평가 (V26 풀링 방식 + V28 등급 체계 + V28 배치 평가)
+
+    배치는 AI별 실행기에서 동시에 진행되고, 완료 순서대로 writer에 넘겨 저장.
+    writer가 없으면 자체 writer를 만들어 끝날 때 저장까지 마침.
+    반환값: 이 카테고리에서 생성된 평가 수
+    """
+    print(f"  [{evaluator_ai}] {category_korean} 평가 중...")
 
     # 풀링된 데이터 조회 (4개 AI 수집 데이터 통합)
     items = get_pooled_data(politician_id, category_name)
@@ -638,19 +1026,53 @@ def evaluate_category(evaluator_ai, politician_id, politician_name, category_nam
         print(f"    ⚠️ 평가할 데이터 없음")
         return 0
 
-    print(f"    📊 데이터 {len(items)}개 로드")
+    # 재개: 이미 평가된 collected_data_id는 제외 (미저장 배치만 다시 평가)
+    try:
+        evaluated_ids = get_evaluated_ids(politician_id, evaluator_ai, category_name)
+    except Exception as e:
+        print(f"    ⚠️ 기존 평가 조회 실패 (전체 평가, 중복은 DB 유니크 키로 무시): {e}")
+        evaluated_ids = set()
 
-    # 배치 평가 (V28 방식: 10개씩)
-    total_evaluated = 0
-    batch_size = 10
+    pending = [item for item in items if item.get('id') not in evaluated_ids]
+    if not pending:
+        print(f"    ⏭️ 이미 평가 완료 ({len(items)}개)")
+        return 0
 
-    for i in range(0, len(items), batch_size):
-        batch = items[i:i+batch_size]
-        evaluations = evaluate_batch(evaluator_ai, batch, category_name, politician_id, politician_name)
+    if evaluated_ids:
+        print(f"    📊 데이터 {len(items)}개 중 {len(pending)}개 미평가 → 이어서 평가")
+    else:
+        print(f"    📊 데이터 {len(items)}개 로드")
+
+    # 유사 중복 묶음: 대표만 평가하고 등급은 구성원에게 복제
+    representatives, members = split_representatives(politician_id, category_name, pending)
+    if members:
+        print(f"    🧬 유사 중복 {len(pending) - len(representatives)}개 → 대표 {len(representatives)}개만 평가")
+
+    own_writer = writer is None
+    if own_writer:
+        writer = EvaluationWriter()
+
+    # 배치 평가 (토큰 예산 + AI별 적응형 크기로 묶음, AI당 최대 inflight개 동시 진행)
+    batches = get_batch_packer(evaluator_ai).pack(representatives, cost=item_prompt_tokens)
+    executor = get_batch_executor(evaluator_ai, inflight)
+    futures = [
+        submit_in_context(executor, evaluate_batch, evaluator_ai, batch,
+                          category_name, politician_id, politician_name)
+        for batch in batches
+    ]
 
-        if evaluations:
-            saved = save_evaluations(politician_id, politician_name, category_name, evaluator_ai, evaluations)
-            total_evaluated += saved
+    total_evaluated = 0
+    try:
+        for future in as_completed(futures):
+            evaluations = expand_cluster_evaluations(future.result(), members)
+            if evaluations:
+                writer.put(build_evaluation_records(
+                    politician_id, politician_name, category_name, evaluator_ai, evaluations
+                ))
+                total_evaluated += len(evaluations)
+    finally:
+        if own_writer:
+            writer.close()
 
     if total_evaluated > 0:
         print(f"    ✅ {total_evaluated}개 평가 완료")
@@ -660,8 +1082,9 @@ def evaluate_category(evaluator_ai, politician_id, politician_name, category_nam
     return total_evaluated
 
 
-def evaluate_all(politician_id, politician_name, target_ai=None, target_category=None, parallel=False):
-    """전체 평가 수행 (V30 풀링 평가)"""
+def evaluate_all(politician_id, politician_name, target_ai=None, target_category=None, parallel=False,
+                 inflight=DEFAULT_INFLIGHT):
+    """전체 평가 수행 (V30 풀링 평가, 저장은 EvaluationWriter 1개로 모아서 처리)"""
     if not politician_name:
         politician_name = get_politician_name(politician_id)
 
@@ -692,6 +1115,7 @@ def evaluate_all(politician_id, politician_name, target_ai=None, target_category
 
     results = []
     total_evaluated = 0
+    writer = EvaluationWriter()
 
     if parallel:
         # ===== V30 하이브리드 실행: 1차 병렬 + 2차 순차 재시도 =====
@@ -704,7 +1128,7 @@ def evaluate_all(politician_id, politician_name, target_ai=None, target_category
                     future = executor.submit(
                         evaluate_category,
                         ai_name, politician_id, politician_name,
-                        cat_name, cat_korean
+                        cat_name, cat_korean, writer, inflight
                     )
                     tasks.append({
                         'future': future,
@@ -745,7 +1169,7 @@ def evaluate_all(politician_id, politician_name, target_ai=None, target_category
 
                         count = evaluate_category(
                             task['ai_name'], politician_id, politician_name,
-                            task['cat_name'], task['cat_korean']
+                            task['cat_name'], task['cat_korean'], writer, inflight
                         )
                         total_evaluated += count
                         retry_success.append(task)
@@ -773,16 +1197,33 @@ def evaluate_all(politician_id, politician_name, target_ai=None, target_category
             for ai_name in eval_ais:
                 count = evaluate_category(
                     ai_name, politician_id, politician_name,
-                    cat_name, cat_korean
+                    cat_name, cat_korean, writer, inflight
                 )
                 total_evaluated += count
-                time.sleep(1)
+
+    # 남은 평가 저장 (writer 버퍼 flush)
+    saved = writer.close()
+    cache_stats = get_response_cache().stats()
 
     # 결과 요약
     print(f"\n{'='*60}")
     print(f"✅ V30 풀링 평가 완료: {politician_name}")
-    print(f"   총 평가: {total_evaluated}건")
+    print(f"   총 평가: {total_evaluated}건 (저장: {saved}건)")
+    print(f"   응답 캐시: {cache_stats['hits']}회 재사용 / {cache_stats['misses']}회 API 호출")
+    with token_usage_lock:
+        for ai_name, usage in token_usage.items():
+            hit_rate = usage['cached'] / usage['input'] * 100 if usage['input'] else 0
+            print(f"   [{ai_name}] 토큰: 입력 {usage['input']:,} (프롬프트 캐시 {usage['cached']:,}, {hit_rate:.0f}%)"
+                  f" / 출력 {usage['output']:,} / 호출 {usage['calls']}회")
+    for ai_name, stats in get_packer_stats().items():
+        if stats['batches']:
+            print(f"   [{ai_name}] 배치: {stats['batches']}회, 평균 {stats['items'] / stats['batches']:.1f}개"
+                  f" (평가율 {stats['evaluated'] / stats['items'] * 100:.0f}%, 파싱 실패 {stats['parse_failures']}회)"
+                  f" / 현재 크기 {stats['size']}")
+    if writer.failed:
+        print(f"   ⚠️ 저장 실패: {writer.failed}건 (재실행 시 해당 항목만 재평가)")
     print(f"{'='*60}")
+    print_summary()
 
     return total_evaluated
 
@@ -794,9 +1235,50 @@ def main():
     parser.add_argument('--ai', choices=EVALUATION_AIS, help='특정 AI만 평가')
     parser.add_argument('--category', help='특정 카테고리만 (이름 또는 숫자 1-10)')
     parser.add_argument('--parallel', action='store_true', help='병렬 실행')
+    parser.add_argument('--inflight', type=int, default=DEFAULT_INFLIGHT,
+                        help=f'AI당 동시 배치 수 (기본 {DEFAULT_INFLIGHT})')
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true',
+                        help='LLM 응답 캐시 사용 안 함')
+    parser.add_argument('--no-stream', dest='no_stream', action='store_true',
+                        help='스트리밍 없이 응답 전체 대기 (기존 방식)')
+    parser.add_argument('--no-structured', dest='no_structured', action='store_true',
+                        help='구조화 출력(JSON 스키마 강제) 없이 프롬프트 지시만 사용 (기존 방식)')
+    parser.add_argument('--no-near-dup', dest='no_near_dup', action='store_true',
+                        help='유사 중복 묶음 없이 항목마다 평가 (기존 방식)')
+    parser.add_argument('--no-relevance', dest='no_relevance', action='store_true',
+                        help='관련성 필터로 제외된 항목도 평가 (기존 방식)')
+    parser.add_argument('--no-telemetry', dest='no_telemetry', action='store_true',
+                        help='호출별 계측(JSONL/Prometheus) 기록 안 함')
+    parser.add_argument('--no-digest', dest='no_digest', action='store_true',
+                        help='항목 내용을 평가용 요약 대신 content[:300]으로 전송 (기존 방식)')
+    parser.add_argument('--no-adaptive-batch', dest='no_adaptive_batch', action='store_true',
+                        help='항상 10개씩 배치 평가 (기존 방식)')
+    parser.add_argument('--batch-mode', dest='batch_mode', action='store_true',
+                        help='공급자 배치 API로 평가 (Claude/ChatGPT, 나머지는 동기 평가)')
+    parser.add_argument('--poll-interval', dest='poll_interval', type=int, default=60,
+                        help='배치 상태 확인 간격 초 (--batch-mode 전용, 기본 60)')
+    parser.add_argument('--no-wait', dest='no_wait', action='store_true',
+                        help='배치 제출만 하고 종료 (--batch-mode 전용, 재실행 시 결과 저장)')
 
     args = parser.parse_args()
 
+    if args.no_cache:
+        disable_response_cache()
+    if args.no_stream:
+        disable_streaming()
+    if args.no_structured:
+        disable_structured_output()
+    if args.no_near_dup:
+        disable_near_dup()
+    if args.no_relevance:
+        disable_relevance()
+    if args.no_telemetry:
+        disable_telemetry()
+    if args.no_adaptive_batch:
+        disable_adaptive_batch()
+    if args.no_digest:
+        disable_digest()
+
     # 카테고리 파라미터 처리
     target_category = None
     if args.category:
@@ -805,12 +1287,27 @@ def main():
         else:
             target_category = args.category
 
+    if args.batch_mode:
+        # 스크립트 실행 시 batch_evaluate_v30이 같은 모듈 인스턴스를 쓰도록 등록
+        sys.modules.setdefault('evaluate_v30', sys.modules[__name__])
+        from batch_evaluate_v30 import run_batch_mode
+        run_batch_mode(
+            args.politician_id,
+            args.politician_name,
+            target_ai=args.ai,
+            target_category=target_category,
+            poll_interval=args.poll_interval,
+            wait=not args.no_wait
+        )
+        return
+
     evaluate_all(
         args.politician_id,
         args.politician_name,
         target_ai=args.ai,
         target_category=target_category,
-        parallel=args.parallel
+        parallel=args.parallel,
+        inflight=args.inflight
     )
 
 
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+V30 LLM 응답 캐시 (SQLite, 내용 주소 기반)
+
+배경:
+- 같은 수집 데이터를 같은 프롬프트로 다시 평가하는 경우가 많음
+  (run_v30_workflow 재평가, 재시도, 부분 실패 후 evaluate_v30.py 재실행)
+- 매번 API를 다시 호출 → 비용/시간 낭비
+
+핵심:
+1. 키 = sha256(namespace, 모델, 프롬프트, 파라미터)  → 같은 요청은 같은 키
+2. TTL: 만료된 응답은 조회 시 무시 (namespace별 TTL)
+3. 크기 제한: 전체 크기가 max_bytes를 넘으면 가장 오래 안 쓴 응답부터 삭제
+4. 스레드 안전 (단일 연결 + Lock, WAL 모드)
+
+환경 변수:
+    V30_LLM_CACHE          캐시 파일 경로 ("off"면 비활성화)
+    V30_LLM_CACHE_MAX_MB   최대 크기 (기본 500MB)
+
+사용법:
+    from llm_cache_v30 import get_response_cache
+
+    cache = get_response_cache()
+    key = cache.make_key("evaluate", "gpt-4o-mini", prompt, {"max_tokens": 4096})
+    text = cache.get(key, ttl=cache.ttl_for("evaluate"))
+    if text is None:
+        text = call_api(...)
+        cache.set(key, text)
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+from telemetry_v30 import record_cache
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "llm_responses_v30.sqlite3"
+)
+DEFAULT_MAX_MB = 500
+
+# namespace별 TTL (초)
+# - evaluate: 같은 프롬프트 = 같은 평가 대상 → 길게
+# - collect: 웹검색 결과는 시간이 지나면 바뀜 → 짧게
+NAMESPACE_TTL = {
+    "evaluate": 30 * 24 * 3600,
+    "collect": 24 * 3600,
+}
+DEFAULT_TTL = 7 * 24 * 3600
+
+EVICT_CHECK_INTERVAL = 100  # set() 100회마다 크기 점검
+
+
+class ResponseCache:
+    """SQLite 기반 LLM 응답 캐시"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                model TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(namespace, model, prompt, params=None):
+        """(namespace, 모델, 프롬프트, 파라미터) → sha256 키"""
+        payload = json.dumps(
+            [namespace, model, prompt, params or {}],
+            ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def ttl_for(namespace):
+        return NAMESPACE_TTL.get(namespace, DEFAULT_TTL)
+
+    def get(self, key, ttl=DEFAULT_TTL):
+        """캐시 조회 (없거나 만료면 None)"""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (ttl and now - row[1] > ttl):
+                self.misses += 1
+                record_cache("llm", misses=1)
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+        record_cache("llm", hits=1)
+        return row[0]
+
+    def set(self, key, response, namespace="", model=""):
+        """응답 저장 (빈 응답은 저장하지 않음)"""
+        if not response:
+            return
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, namespace, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, namespace, model, response, len(response.encode('utf-8')), now, now)
+            )
+            self.conn.commit()
+            self.writes += 1
+            if self.writes % EVICT_CHECK_INTERVAL == 0:
+                self._evict()
+
+    def delete(self, key):
+        """잘못된 응답(파싱 실패 등) 제거"""
+        with self.lock:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def _evict(self):
+        """만료 항목 삭제 후, 크기 초과 시 가장 오래 안 쓴 항목부터 삭제 (lock 보유 상태에서 호출)"""
+        now = time.time()
+        for namespace, ttl in NAMESPACE_TTL.items():
+            self.conn.execute(
+                "DELETE FROM responses WHERE namespace = ? AND created_at < ?", (namespace, now - ttl)
+            )
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            freed = 0
+            keys = []
+            for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                keys.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            self.conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        self.conn.commit()
+
+    def evict(self):
+        with self.lock:
+            self._evict()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes}
+
+
+class _NullCache:
+    """캐시 비활성화 시 사용 (항상 miss)"""
+
+    make_key = staticmethod(ResponseCache.make_key)
+    ttl_for = staticmethod(ResponseCache.ttl_for)
+
+    def get(self, key, ttl=DEFAULT_TTL):
+        return None
+
+    def set(self, key, response, namespace="", model=""):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def evict(self):
+        pass
+
+    def stats(self):
+        return {'hits': 0, 'misses': 0, 'writes': 0}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """프로세스 공용 캐시 (V30_LLM_CACHE=off면 비활성화)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            path = os.getenv('V30_LLM_CACHE', DEFAULT_CACHE_PATH)
+            if path.lower() in ('off', '0', 'false', 'none'):
+                _cache = _NullCache()
+            else:
+                max_mb = float(os.getenv('V30_LLM_CACHE_MAX_MB', DEFAULT_MAX_MB))
+                try:
+                    _cache = ResponseCache(path, int(max_mb * 1024 * 1024))
+                except Exception as e:
+                    print(f"⚠️ LLM 캐시 초기화 실패 (캐시 없이 진행): {e}")
+                    _cache = _NullCache()
+        return _cache
+
+
+def disable_response_cache():
+    """--no-cache 옵션용"""
+    global _cache
+    with _cache_lock:
+        _cache = _NullCache()
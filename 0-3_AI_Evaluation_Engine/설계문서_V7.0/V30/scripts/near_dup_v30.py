@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+V30 유사 중복 묶음 (MinHash-LSH, 정치인 × 카테고리)
+
+배경:
+- 중복 판정은 같은 AI + 같은 URL 기준뿐 (collect_with_ai / get_pooled_data / validate_v30.check_duplicate)
+- 같은 기사가 다른 URL로 재배포되거나 Gemini/Grok이 같은 내용을 다시 요약하면
+  사본마다 4개 AI가 각각 평가 → 평가 호출 = 묶음 크기 × 4
+
+핵심:
+1. 서명: 제목+내용 정규화(소문자, 공백/기호 제거) → 3글자 shingle → MinHash NUM_PERM개 (numpy)
+2. LSH: BANDS × ROWS 밴드 버킷으로 후보만 비교, 서명 일치율 ≥ THRESHOLD면 같은 묶음
+3. 묶음 ID = 대표 행 id (collected_data_v30.cluster_id, NULL이면 자기 자신이 대표)
+   - 수집 저장 시 증분으로 추가 (assign_record_clusters: id를 미리 생성해 대표 id를 바로 기록)
+   - 이미 기록된 묶음은 그대로 두고, 새 행만 가장 비슷한 기존 묶음에 합류
+4. 평가: 묶음마다 대표 1개만 평가하고 등급을 나머지 행에 복제 (group_near_duplicates)
+   - 행은 그대로 유지 → 여러 AI가 같은 내용을 수집한 자연 가중치는 점수에 그대로 반영
+
+환경 변수:
+    V30_NEAR_DUP            "off"면 묶음 없이 항목마다 평가
+    V30_NEAR_DUP_THRESHOLD  묶음 기준 유사도 (기본 0.8, 서명 일치율 ≈ shingle Jaccard)
+
+사용법:
+    # 기존 행 cluster_id 채우기 (migrations/add_collected_cluster_id_v30.sql 적용 후)
+    python near_dup_v30.py --politician_id=62e7b453
+    python near_dup_v30.py --all
+"""
+
+import os
+import re
+import zlib
+import uuid
+import argparse
+import threading
+
+import numpy as np
+
+from engine_v30 import configure_stdout
+from repository_v30 import (
+    get_client, has_column, iter_collected_data, update_in, TABLE_COLLECTED_DATA, COLUMNS_COLLECTED_CLUSTER
+)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+THRESHOLD = float(os.getenv('V30_NEAR_DUP_THRESHOLD', '0.8'))
+
+_enabled = os.getenv('V30_NEAR_DUP', 'on').lower() not in ('off', '0', 'false', 'none')
+
+# MinHash 순열 (a·x + b) mod p - 시드 고정 (프로세스/실행이 달라도 같은 서명)
+_PRIME = np.uint64(4294967311)   # 2^32보다 큰 소수 (a, x < 2^32 → a·x + b < 2^64)
+_rng = np.random.default_rng(20261018)
+_A = _rng.integers(1, 2 ** 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 32, NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def near_dup_enabled():
+    return _enabled
+
+
+def disable_near_dup():
+    """--no-near-dup 옵션용"""
+    global _enabled
+    _enabled = False
+
+
+def item_text(item):
+    """묶음 판정용 텍스트 (제목 + 내용)"""
+    return f"{item.get('title') or ''} {item.get('content') or ''}"
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """소문자 + 공백/기호 제거 후 size글자 shingle 집합 (한글은 음절 단위)"""
+    normalized = _NON_WORD.sub('', (text or '').lower())
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def minhash_signature(text):
+    """MinHash 서명 (NUM_PERM개 uint64), 텍스트가 비어 있으면 None"""
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def similarity(sig_a, sig_b):
+    """서명 일치율 (shingle Jaccard 추정치)"""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+class NearDupIndex:
+    """정치인 × 카테고리 MinHash-LSH 인덱스 (스레드 안전)"""
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.signatures = {}   # 행 id → 서명 (None 가능)
+        self.clusters = {}     # 행 id → 묶음 ID (대표 행 id)
+        self.buckets = {}      # (밴드, 밴드 값) → [행 id]
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+    def _best_match(self, signature):
+        best_id, best_score = None, self.threshold
+        seen = set()
+        for key in self._band_keys(signature):
+            for other_id in self.buckets.get(key, ()):
+                if other_id in seen:
+                    continue
+                seen.add(other_id)
+                score = similarity(signature, self.signatures[other_id])
+                if score >= best_score:
+                    best_id, best_score = other_id, score
+        return best_id
+
+    def add(self, row_id, text, cluster_id=None):
+        """행 추가 → 묶음 ID
+
+        cluster_id가 주어지면 그대로 사용 (DB에 기록된 묶음), 아니면 가장 비슷한 기존 행의 묶음
+        (없으면 자기 자신이 대표)
+        """
+        with self.lock:
+            if row_id in self.clusters:
+                return self.clusters[row_id]
+
+            signature = minhash_signature(text)
+            if cluster_id is None:
+                match = self._best_match(signature) if signature is not None else None
+                cluster_id = self.clusters[match] if match else row_id
+
+            self.signatures[row_id] = signature
+            self.clusters[row_id] = cluster_id
+            if signature is not None:
+                for key in self._band_keys(signature):
+                    self.buckets.setdefault(key, []).append(row_id)
+            return cluster_id
+
+    def discard(self, row_id):
+        """저장 실패한 행 제거"""
+        with self.lock:
+            signature = self.signatures.pop(row_id, None)
+            self.clusters.pop(row_id, None)
+            if signature is not None:
+                for key in self._band_keys(signature):
+                    bucket = self.buckets.get(key)
+                    if bucket and row_id in bucket:
+                        bucket.remove(row_id)
+
+    def cluster_of(self, row_id):
+        with self.lock:
+            return self.clusters.get(row_id, row_id)
+
+    def __contains__(self, row_id):
+        with self.lock:
+            return row_id in self.clusters
+
+    def load_rows(self, rows):
+        """DB 행 일괄 추가 (기록된 묶음 먼저 고정, 나머지는 유사도로 배정), 새로 배정된 행 id 목록 반환"""
+        rows = [row for row in rows if row.get('id') and row.get('id') not in self]
+        leaders = {row.get('cluster_id') for row in rows if row.get('cluster_id')}
+
+        # 1) 기록된 묶음 (구성원 + 다른 행이 가리키는 대표)
+        pending = []
+        for row in rows:
+            if row.get('cluster_id'):
+                self.add(row['id'], item_text(row), row['cluster_id'])
+            elif row['id'] in leaders:
+                self.add(row['id'], item_text(row), row['id'])
+            else:
+                pending.append(row)
+
+        # 2) 묶음 미기록 행
+        for row in pending:
+            self.add(row['id'], item_text(row))
+        return [row['id'] for row in pending]
+
+
+# ============================================================
+# cluster_id 컬럼 / 프로세스 공용 인덱스
+# ============================================================
+_indexes = {}                 # (politician_id, category) → NearDupIndex
+_indexes_lock = threading.Lock()
+
+
+def has_cluster_column():
+    """collected_data_v30.cluster_id 존재 여부 (마이그레이션 전 DB면 False, repository_v30.has_column)"""
+    return has_column(TABLE_COLLECTED_DATA, 'cluster_id')
+
+
+def with_cluster_column(columns):
+    """컬럼 세트 + cluster_id (컬럼이 있을 때만)"""
+    return f"{columns}, cluster_id" if has_cluster_column() else columns
+
+
+def get_near_dup_index(politician_id, category, rows=None):
+    """정치인 × 카테고리 인덱스 (처음 요청 시 rows 또는 DB에서 로드, 이후 새 행만 추가)"""
+    key = (politician_id, category.lower())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        created = index is None
+        if created:
+            index = _indexes[key] = NearDupIndex()
+
+    if rows is not None:
+        index.load_rows(rows)
+    elif created:
+        try:
+            index.load_rows(iter_collected_data(
+                politician_id, category=category, columns=with_cluster_column(COLUMNS_COLLECTED_CLUSTER)
+            ))
+        except Exception as e:
+            print(f"  ⚠️ 유사 중복 인덱스 로드 실패 (새 항목만 묶음): {e}")
+    return index
+
+
+def invalidate_near_dup_indexes(politician_id):
+    """외부 변경(검증 단계 삭제 등) 후 정치인의 카테고리별 인덱스를 다음 요청 때 다시 로드
+    (삭제된 행이 대표로 남아 새 행의 cluster_id가 없는 행을 가리키지 않도록)"""
+    with _indexes_lock:
+        for key in [key for key in _indexes if key[0] == politician_id]:
+            del _indexes[key]
+
+
+def assign_record_clusters(politician_id, category, records):
+    """저장 전 collected_data_v30 레코드에 id / cluster_id 부여 (collect_v30.save_collected_items)
+
+    id를 미리 생성해야 같은 저장 묶음 안의 새 행끼리도 대표 id를 가리킬 수 있음
+    cluster_id는 대표가 자기 자신이 아닐 때만 기록 (NULL = 자기 자신)
+    """
+    index = get_near_dup_index(politician_id, category)
+    write_column = has_cluster_column()
+    for record in records:
+        record.setdefault('id', str(uuid.uuid4()))
+        cluster_id = index.add(record['id'], item_text(record))
+        if write_column and cluster_id != record['id']:
+            record['cluster_id'] = cluster_id
+    return index
+
+
+def group_near_duplicates(politician_id, category, items):
+    """평가 대상 항목 → 묶음 목록 [[대표, 구성원...], ...] (items 순서 유지, 대표 = 묶음의 첫 항목)
+
+    items에 없는 행은 인덱스에 먼저 추가 (cluster_id 컬럼이 있으면 기록된 묶음 사용)
+    """
+    if not near_dup_enabled():
+        return [[item] for item in items]
+
+    index = get_near_dup_index(politician_id, category, rows=items)
+    groups = {}
+    for item in items:
+        groups.setdefault(index.cluster_of(item.get('id')), []).append(item)
+    return list(groups.values())
+
+
+# ============================================================
+# 기존 행 cluster_id 채우기
+# ============================================================
+def backfill_clusters(politician_id):
+    """정치인의 묶음 미기록 행에 cluster_id 기록, 기록한 행 수 반환"""
+    if not has_cluster_column():
+        print("  ❌ cluster_id 컬럼 없음 - migrations/add_collected_cluster_id_v30.sql 먼저 적용")
+        return 0
+
+    by_category = {}
+    for row in iter_collected_data(politician_id, columns=f"{COLUMNS_COLLECTED_CLUSTER}, category, cluster_id"):
+        by_category.setdefault(row.get('category'), []).append(row)
+
+    updated = 0
+    for category, rows in by_category.items():
+        index = NearDupIndex()
+        assigned = index.load_rows(rows)
+
+        # 대표 id별로 묶어서 IN 조건 업데이트 (자기 자신이 대표인 행은 NULL 유지)
+        members = {}
+        for row_id in assigned:
+            cluster_id = index.cluster_of(row_id)
+            if cluster_id != row_id:
+                members.setdefault(cluster_id, []).append(row_id)
+        for cluster_id, ids in members.items():
+            update_in(TABLE_COLLECTED_DATA, {'cluster_id': cluster_id}, 'id', ids)
+            updated += len(ids)
+
+        with _indexes_lock:
+            _indexes[(politician_id, category)] = index
+        if members:
+            print(f"  🧬 {category}: {len(rows)}개 중 {sum(len(ids) for ids in members.values())}개 → {len(members)}개 묶음에 합류")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='V30 유사 중복 묶음 (기존 행 cluster_id 채우기)')
+    parser.add_argument('--politician_id', help='정치인 ID')
+    parser.add_argument('--roster', action='append', help='명단 파일 ("이름<TAB>ID" 형식, 여러 번 지정 가능)')
+    parser.add_argument('--all', action='store_true', help='전체 정치인')
+    args = parser.parse_args()
+
+    if args.all:
+        result = get_client().table('politicians').select('id').execute()
+        politician_ids = [row['id'] for row in result.data or []]
+    elif args.roster:
+        from scheduler_v30 import load_roster
+        politician_ids = [pid for pid, _name in load_roster(args.roster)]
+    elif args.politician_id:
+        politician_ids = [args.politician_id]
+    else:
+        parser.error('--politician_id, --roster, --all 중 하나가 필요합니다')
+
+    total = 0
+    for politician_id in politician_ids:
+        print(f"\n[{politician_id}]")
+        total += backfill_clusters(politician_id)
+    print(f"\n✅ cluster_id 기록: {total}행")
+
+
+if __name__ == "__main__":
+    configure_stdout()
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+V30 평가 엔진 단일 실행 진입점 (politician-eval)
+
+각 단계 스크립트의 main()을 같은 프로세스에서 실행합니다 (engine_v30.run_main).
+- 단계 옵션은 스크립트와 동일: politician-eval evaluate --help
+- 필요한 모듈만 import (score만 실행하면 수집/평가 모듈과 AI SDK는 import 안 함)
+- workflow는 수집 → 검증 → 관련성 → 평가 → 점수를 한 프로세스에서 순서대로 실행
+
+설치:
+    cd V30 && pip install -e .          # politician-eval 명령 등록 (pyproject.toml)
+    python scripts/politician_eval_v30.py <명령> ...   # 설치 없이
+
+사용법:
+    politician-eval workflow --politician_id=62e7b453 --politician_name="오세훈" --on-fail=continue
+    politician-eval collect --politician_id=62e7b453 --politician_name="오세훈" --parallel
+    politician-eval evaluate --politician_id=62e7b453 --category=1
+    politician-eval --timing score --all          # 준비(import) / 실행 시간 출력
+"""
+
+import sys
+import time
+import argparse
+import importlib
+
+from engine_v30 import run_main, configure_stdout
+
+# 명령 → (모듈, 설명, 실행 후 계측 요약 출력 여부)
+COMMANDS = {
+    "collect": ("collect_v30", "데이터 수집", True),
+    "validate": ("validate_v30", "데이터 검증 / 중복 제거 / 재수집", True),
+    "relevance": ("relevance_v30", "관련성 필터 (평가 제외 태그)", False),
+    "evaluate": ("evaluate_v30", "데이터 평가 (요약은 evaluate_all이 출력)", False),
+    "score": ("calculate_v30_scores", "점수 계산", False),
+    "workflow": ("run_v30_workflow", "정치인 1명 전체 워크플로우", False),
+    "schedule": ("scheduler_v30", "다중 정치인 작업 큐", False),
+    "near-dup": ("near_dup_v30", "유사 중복 묶음 채우기", False),
+    "canonical": ("url_canonical_v30", "정규 URL 키 채우기", False),
+    "digest": ("digest_v30", "평가용 요약(digest) 채우기", False),
+    "telemetry": ("telemetry_v30", "계측 JSONL 요약", False),
+}
+
+
+def command_help():
+    lines = ["명령:"]
+    for name, (module_name, description, _summary) in COMMANDS.items():
+        lines.append(f"  {name:<10} {module_name + '.py':<26} {description}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='politician-eval',
+        description='V30 정치인 AI 평가 엔진 (단계를 같은 프로세스에서 실행)',
+        epilog=command_help(),
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--timing', action='store_true', help='준비(import) / 실행 시간 출력')
+    parser.add_argument('command', choices=list(COMMANDS), metavar='command', help='실행할 명령 (아래 목록)')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='명령 옵션 (스크립트와 동일)')
+    args = parser.parse_args(argv)
+
+    configure_stdout()
+    module_name, _description, summary = COMMANDS[args.command]
+
+    started = time.perf_counter()
+    importlib.import_module(module_name)
+    prepared = time.perf_counter()
+    exit_code = run_main(module_name, args.args)
+    finished = time.perf_counter()
+
+    if summary:
+        from telemetry_v30 import print_summary
+        print_summary()
+    if args.timing:
+        print(f"\n⏱️ {args.command}: 준비 {(prepared - started) * 1000:.0f}ms, 실행 {finished - prepared:.1f}초 "
+              f"(종료 코드 {exit_code})")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+V30 정치인 프로필 / 지시사항 캐시 (프로세스 공용, 스레드 안전)
+
+배경:
+- evaluate_v30.format_politician_profile: 호출마다 politicians 조회 + 지시사항 .md 읽기/파싱
+- collect_v30.get_politician_info: 스레드 간 공유되는 dict를 락 없이 사용
+- 스케줄러는 정치인 여러 명 × 4개 AI × 10개 카테고리를 한 프로세스에서 실행
+
+핵심:
+1. 프로필: politician_id → politicians 행 (PROFILE_TTL 동안 재사용)
+   - prefetch_profiles(ids): 명단 전체를 IN 조건 한 번으로 미리 로드
+2. 지시사항: instructions_v30/1_politicians/<이름>.md 파싱 결과를 파일 mtime과 함께 캐시
+   (파일이 바뀌면 다음 조회 때 다시 읽음)
+3. 프롬프트 헤더: 정치인당 1번 렌더링 (프로필/지시사항이 바뀌면 다시 렌더링)
+4. 수집용 검색 정보 (동명이인 구분): get_search_info
+
+사용법:
+    from politician_profiles_v30 import get_profile_cache
+
+    cache = get_profile_cache()
+    cache.prefetch([pid for pid, _name in roster])
+    header = cache.get_prompt_header(politician_id, politician_name)
+"""
+
+import os
+import time
+import threading
+from repository_v30 import get_client, chunks
+
+TABLE_POLITICIANS = "politicians"
+PROFILE_TTL = 3600  # DB 프로필 재사용 시간 (초)
+
+INSTRUCTIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instructions_v30', '1_politicians'
+)
+
+# 지시사항 파일에서 추출하는 섹션 (순서대로)
+INSTRUCTION_SECTIONS = ["### 평가 시 주의점", "### 알려진 논란/이슈", "### 알려진 성과"]
+
+
+def parse_politician_instructions(content):
+    """지시사항 .md 내용 → 평가용 섹션 텍스트 (없으면 None)"""
+    sections = []
+    for heading in INSTRUCTION_SECTIONS:
+        if heading not in content:
+            continue
+        start = content.find(heading)
+        end = content.find("###", start + 10)
+        if end == -1:
+            end = content.find("---", start)
+        if end > start:
+            sections.append(content[start:end].strip())
+
+    instructions_text = "\n\n".join(sections).strip()
+    return instructions_text or None
+
+
+def render_profile_header(politician_name, profile, instructions):
+    """정치인 프로필 + 지시사항 → 평가 프롬프트용 텍스트"""
+    if not profile:
+        base_text = f"**대상 정치인**: {politician_name}"
+    else:
+        base_text = f"""**대상 정치인**: {politician_name}
+
+**정치인 기본 정보** (평가 시 참고):
+- 이름: {profile.get('name', politician_name)}
+- 신분: {profile.get('identity', 'N/A')}
+- 직책: {profile.get('title', profile.get('position', 'N/A'))}
+- 정당: {profile.get('party', 'N/A')}
+- 지역: {profile.get('region', 'N/A')}
+- 성별: {profile.get('gender', 'N/A')}
+
+⚠️ **중요**: 반드시 위 정보와 일치하는 "{politician_name}"에 대해 평가하세요."""
+
+    # 특별 지시사항 추가
+    if instructions:
+        base_text += f"""
+
+---
+📋 **{politician_name} 평가 시 참고사항**:
+
+{instructions}
+---"""
+
+    return base_text
+
+
+def build_search_info(profile):
+    """politicians 행 → 수집용 검색 정보 (동명이인 구분)"""
+    if not profile:
+        return {'name': '', 'party': '', 'position': '국회의원', 'district': '', 'birth_year': '', 'search_string': ''}
+
+    birth_year = ""
+    if profile.get('birth_date'):
+        birth_year = str(profile.get('birth_date'))[:4] + "년생"
+
+    return {
+        'name': profile.get('name', ''),
+        'party': profile.get('party', ''),
+        'position': profile.get('position', '국회의원'),
+        'district': profile.get('district', ''),
+        'birth_year': birth_year,
+        'search_string': f"{profile.get('party', '')} {profile.get('name', '')} {profile.get('position', '국회의원')}"
+                         + (f" ({birth_year})" if birth_year else "")
+    }
+
+
+class ProfileCache:
+    """정치인 프로필 / 지시사항 / 프롬프트 헤더 캐시"""
+
+    def __init__(self, instructions_dir=INSTRUCTIONS_DIR, ttl=PROFILE_TTL):
+        self.instructions_dir = instructions_dir
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.profiles = {}       # politician_id → (loaded_at, row 또는 None)
+        self.instructions = {}   # 파일 경로 → (mtime, 파싱 결과)
+        self.headers = {}        # (politician_id, 이름) → (profile_loaded_at, mtime, 헤더)
+        self.queries = 0
+
+    # ---------------- 프로필 ----------------
+    def _fresh(self, politician_id):
+        entry = self.profiles.get(politician_id)
+        return entry is not None and time.time() - entry[0] <= self.ttl
+
+    def prefetch(self, politician_ids):
+        """명단 전체 프로필을 IN 조건으로 한 번에 로드, 로드한 정치인 수 반환"""
+        with self.lock:
+            missing = [pid for pid in dict.fromkeys(politician_ids) if pid and not self._fresh(pid)]
+        if not missing:
+            return 0
+
+        loaded_at = time.time()
+        rows = {}
+        try:
+            for chunk in chunks(missing):
+                result = get_client().table(TABLE_POLITICIANS).select('*').in_('id', chunk).execute()
+                self.queries += 1
+                for row in result.data or []:
+                    rows[row.get('id')] = row
+        except Exception as e:
+            print(f"  ⚠️ 정치인 프로필 일괄 조회 실패: {e}")
+            return 0
+
+        with self.lock:
+            for pid in missing:
+                self.profiles[pid] = (loaded_at, rows.get(pid))
+        return len(rows)
+
+    def _profile_entry(self, politician_id):
+        with self.lock:
+            if self._fresh(politician_id):
+                return self.profiles[politician_id]
+
+        try:
+            result = get_client().table(TABLE_POLITICIANS).select('*').eq('id', politician_id).execute()
+            self.queries += 1
+            row = result.data[0] if result.data else None
+        except Exception as e:
+            print(f"  ⚠️ 정치인 정보 조회 실패: {e}")
+            return (0, None)  # 실패는 캐시하지 않음
+
+        entry = (time.time(), row)
+        with self.lock:
+            self.profiles[politician_id] = entry
+        return entry
+
+    def get_profile(self, politician_id):
+        """politicians 행 (없으면 None)"""
+        return self._profile_entry(politician_id)[1]
+
+    def get_search_info(self, politician_id):
+        """수집용 검색 정보 (collect_v30.get_politician_info)"""
+        return build_search_info(self.get_profile(politician_id))
+
+    # ---------------- 지시사항 ----------------
+    def _instructions_entry(self, politician_name):
+        path = os.path.join(self.instructions_dir, f'{politician_name}.md')
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None, None
+
+        with self.lock:
+            cached = self.instructions.get(path)
+            if cached and cached[0] == mtime:
+                return cached
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = (mtime, parse_politician_instructions(f.read()))
+        except Exception as e:
+            print(f"  ⚠️ 지시사항 파일 읽기 실패: {e}")
+            return None, None
+
+        with self.lock:
+            self.instructions[path] = entry
+        return entry
+
+    def get_instructions(self, politician_name):
+        """정치인별 특별 지시사항 (파일 변경 시 다시 읽음, 없으면 None)"""
+        return self._instructions_entry(politician_name)[1]
+
+    # ---------------- 프롬프트 헤더 ----------------
+    def get_prompt_header(self, politician_id, politician_name):
+        """평가 프롬프트용 프로필 텍스트 (정치인당 1번 렌더링)"""
+        loaded_at, profile = self._profile_entry(politician_id)
+        mtime, instructions = self._instructions_entry(politician_name)
+
+        key = (politician_id, politician_name)
+        with self.lock:
+            cached = self.headers.get(key)
+            if cached and cached[0] == loaded_at and cached[1] == mtime:
+                return cached[2]
+
+        header = render_profile_header(politician_name, profile, instructions)
+        with self.lock:
+            self.headers[key] = (loaded_at, mtime, header)
+        return header
+
+    def clear(self):
+        with self.lock:
+            self.profiles.clear()
+            self.instructions.clear()
+            self.headers.clear()
+
+
+_profile_cache = None
+_profile_cache_lock = threading.Lock()
+
+
+def get_profile_cache():
+    """프로세스 공용 프로필 캐시"""
+    global _profile_cache
+    with _profile_cache_lock:
+        if _profile_cache is None:
+            _profile_cache = ProfileCache()
+        return _profile_cache
+
+
+def prefetch_profiles(politician_ids):
+    """명단 프로필 미리 로드 (스케줄러/명단 단위 실행 시작 시)"""
+    return get_profile_cache().prefetch(politician_ids)
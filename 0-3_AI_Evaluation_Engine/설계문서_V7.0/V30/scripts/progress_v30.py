@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+V30 진행 현황 스냅샷 (수집/평가 개수, 정치인별)
+
+배경:
+- collect_v30.get_remaining_target: 수집 단위마다 count='exact' 조회 (정치인 1명 ≈ 120회)
+- evaluate_v30.check_already_evaluated: 카테고리 × AI마다 count 조회 2회
+
+핵심:
+1. 정치인별 그룹 개수를 한 번에 로드
+   - RPC (migrations/add_progress_rpc_v30.sql): collected_progress_v30 / evaluation_progress_v30
+   - RPC가 없는 DB: 키셋 스캔(필요한 컬럼만)으로 로컬 집계
+2. 저장 성공한 행만큼 로컬에서 증가 (add_collected / add_evaluations)
+3. 삭제 등 외부 변경 후에는 invalidate_progress로 다시 로드
+
+사용법:
+    from progress_v30 import get_progress
+
+    progress = get_progress(politician_id)
+    existing = progress.collected_count('expertise', 'official', 'Gemini', 'negative')
+"""
+
+import threading
+from repository_v30 import get_client, iter_collected_data, iter_evaluations
+
+COLUMNS_COLLECTED_PROGRESS = "id, category, data_type, collector_ai, sentiment"
+COLUMNS_EVAL_PROGRESS = "id, category, evaluator_ai"
+
+
+class ProgressSnapshot:
+    """정치인 1명의 수집/평가 개수 (스레드 안전, 부분별 지연 로드)"""
+
+    def __init__(self, politician_id):
+        self.politician_id = politician_id
+        self.lock = threading.Lock()
+        self.collected = None   # (category, data_type, collector_ai, sentiment) → 개수
+        self.evaluated = None   # (category, evaluator_ai) → 개수
+
+    # ---------------- 로드 ----------------
+    def _load_collected(self):
+        counts = {}
+        try:
+            rows = get_client().rpc('collected_progress_v30', {'p_politician_id': self.politician_id}).execute().data
+            for row in rows or []:
+                key = (row['category'], row['data_type'], row['collector_ai'], row['sentiment'])
+                counts[key] = counts.get(key, 0) + row['n']
+        except Exception:
+            # RPC 마이그레이션 전 DB → 필요한 컬럼만 스캔해서 로컬 집계
+            counts = {}
+            for row in iter_collected_data(self.politician_id, columns=COLUMNS_COLLECTED_PROGRESS):
+                key = (row.get('category'), row.get('data_type'), row.get('collector_ai'), row.get('sentiment'))
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def _load_evaluated(self):
+        counts = {}
+        try:
+            rows = get_client().rpc('evaluation_progress_v30', {'p_politician_id': self.politician_id}).execute().data
+            for row in rows or []:
+                key = (row['category'], row['evaluator_ai'])
+                counts[key] = counts.get(key, 0) + row['n']
+        except Exception:
+            counts = {}
+            for row in iter_evaluations(self.politician_id, columns=COLUMNS_EVAL_PROGRESS):
+                key = (row.get('category'), row.get('evaluator_ai'))
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def _ensure_collected(self):
+        with self.lock:
+            if self.collected is None:
+                self.collected = self._load_collected()
+
+    def _ensure_evaluated(self):
+        with self.lock:
+            if self.evaluated is None:
+                self.evaluated = self._load_evaluated()
+
+    # ---------------- 조회 ----------------
+    def collected_count(self, category, data_type=None, collector_ai=None, sentiment=None):
+        """수집 개수 (None인 조건은 전체 합계)"""
+        self._ensure_collected()
+        category = category.lower()
+        with self.lock:
+            return sum(
+                n for (cat, dtype, ai, sent), n in self.collected.items()
+                if cat == category
+                and (data_type is None or dtype == data_type)
+                and (collector_ai is None or ai == collector_ai)
+                and (sentiment is None or sent == sentiment)
+            )
+
+    def evaluated_count(self, category, evaluator_ai):
+        self._ensure_evaluated()
+        with self.lock:
+            return self.evaluated.get((category.lower(), evaluator_ai), 0)
+
+    # ---------------- 로컬 갱신 ----------------
+    def add_collected(self, records):
+        """저장된 collected_data_v30 레코드만큼 증가 (아직 로드 전이면 무시)"""
+        with self.lock:
+            if self.collected is None:
+                return
+            for record in records:
+                key = (record.get('category'), record.get('data_type'),
+                       record.get('collector_ai'), record.get('sentiment'))
+                self.collected[key] = self.collected.get(key, 0) + 1
+
+    def add_evaluations(self, records):
+        """저장된 evaluations_v30 레코드만큼 증가 (아직 로드 전이면 무시)"""
+        with self.lock:
+            if self.evaluated is None:
+                return
+            for record in records:
+                key = (record.get('category'), record.get('evaluator_ai'))
+                self.evaluated[key] = self.evaluated.get(key, 0) + 1
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_progress(politician_id):
+    """정치인별 공용 스냅샷"""
+    with _snapshots_lock:
+        if politician_id not in _snapshots:
+            _snapshots[politician_id] = ProgressSnapshot(politician_id)
+        return _snapshots[politician_id]
+
+
+def _loaded_snapshots(rows):
+    """rows의 politician_id별 (이미 만들어진 스냅샷, 해당 행) 목록"""
+    by_politician = {}
+    for row in rows or []:
+        by_politician.setdefault(row.get('politician_id'), []).append(row)
+    with _snapshots_lock:
+        return [(_snapshots[pid], pid_rows) for pid, pid_rows in by_politician.items() if pid in _snapshots]
+
+
+def add_saved_collected(rows):
+    """저장된 collected_data_v30 행 반영 (스냅샷이 있는 정치인만)"""
+    for snapshot, pid_rows in _loaded_snapshots(rows):
+        snapshot.add_collected(pid_rows)
+
+
+def add_saved_evaluations(rows):
+    """저장된 evaluations_v30 행 반영 (스냅샷이 있는 정치인만)"""
+    for snapshot, pid_rows in _loaded_snapshots(rows):
+        snapshot.add_evaluations(pid_rows)
+
+
+def invalidate_progress(politician_id):
+    """외부 변경(삭제 등) 후 다음 조회 때 다시 로드"""
+    with _snapshots_lock:
+        _snapshots.pop(politician_id, None)
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""
+V30 AI 공급자별 적응형 레이트 리미터 (수집 / 검증 / 평가 공용)
+
+기존 방식의 문제:
+- collect_v30.py: time.sleep(0.3) / time.sleep(1) / time.sleep(2) 고정 대기
+- evaluate_v30.py: "429" 문자열만 보이면 무조건 60초 대기
+→ 실제 한도보다 훨씬 느리거나, 429가 반복되면 60초씩 멈춤
+
+V30 레이트 리미터:
+1. 공급자별 토큰 버킷 (Claude, ChatGPT, Gemini, Grok)
+   - 분당 요청 수 (rpm) + 분당 토큰 수 (tpm)
+2. AIMD 동시성 제어
+   - 성공: 동시 호출 한도 +1/한도 (천천히 증가)
+   - 429: 동시 호출 한도 × 0.5 (즉시 감소) + 쿨다운
+3. 응답 헤더 반영 (있을 때)
+   - Retry-After / retry-after-ms
+   - x-ratelimit-* (OpenAI, xAI), anthropic-ratelimit-* (Claude)
+4. 토큰 예약 정산
+   - 요청 시 추정 입력 토큰만 예약 (출력 max_tokens는 예약하지 않음)
+   - 응답 usage가 오면 settle_usage로 실제 입력 토큰과의 차이를 돌려주거나 더 차감
+   - Claude: 프롬프트 캐시 읽기는 입력 토큰 한도에 포함되지 않음 → 캐시 적중분 환급 (cache_reads_free)
+
+사용법:
+    from rate_limiter_v30 import get_limiter, estimate_tokens
+
+    with get_limiter("Grok").request(tokens=estimate_tokens(prompt)):
+        response = client.chat.completions.create(...)
+    settle_usage(input_tokens, cached_tokens)   # 응답 usage 기준 정산 (같은 스레드)
+
+    # 한도 조정 (환경변수 V30_RATE_LIMITS 또는 코드)
+    # V30_RATE_LIMITS='{"Gemini": {"rpm": 2000, "tpm": 4000000, "max_concurrency": 32}}'
+    configure_limiter("Gemini", rpm=2000, tpm=4000000)
+"""
+
+import os
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# 공급자별 기본 한도 (보수적 기본값, 계정 등급에 맞게 V30_RATE_LIMITS로 조정)
+PROVIDER_DEFAULTS = {
+    "Claude": {"rpm": 50, "tpm": 40_000, "max_concurrency": 4, "cache_reads_free": True},
+    "ChatGPT": {"rpm": 500, "tpm": 200_000, "max_concurrency": 8},
+    "Gemini": {"rpm": 1000, "tpm": 1_000_000, "max_concurrency": 16},
+    "Grok": {"rpm": 60, "tpm": 200_000, "max_concurrency": 4},
+    "Perplexity": {"rpm": 50, "tpm": None, "max_concurrency": 2},
+}
+
+# 429 시 헤더에 대기 시간이 없을 때의 기본 쿨다운 (초, 연속 429마다 2배, 최대 60초)
+BASE_COOLDOWN = 1.0
+MAX_COOLDOWN = 60.0
+
+
+def estimate_tokens(text):
+    """토큰 수 추정 (한글 기준 약 2자 = 1토큰, 보수적)"""
+    if not text:
+        return 0
+    return len(text) // 2 + 1
+
+
+class TokenBucket:
+    """스레드 안전 토큰 버킷 (capacity = 분당 한도, 초당 capacity/60 충전)"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def set_limit(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = min(self.tokens, self.capacity)
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount):
+        """amount만큼 꺼낼 때까지 필요한 대기 시간 (0이면 즉시 가능)"""
+        self.refill()
+        amount = min(amount, self.capacity)  # 1회 요청이 한도보다 크면 한도만큼만
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def give(self, amount):
+        """정산: 예약보다 적게 썼으면 환급(+), 더 썼으면 추가 차감(-)"""
+        self.refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self):
+        """비우기 (충전 기준 시각도 지금으로 → 다음 refill이 곧바로 채우지 않음)"""
+        self.tokens = 0.0
+        self.updated_at = time.monotonic()
+
+
+def _parse_duration(value):
+    """'1s', '6m0s', '120ms', '0.5' 형식을 초로 변환 (실패 시 None)"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total = 0.0
+    matched = False
+    for number, unit in re.findall(r'([\d.]+)(ms|h|m|s)', value):
+        matched = True
+        number = float(number)
+        total += {'h': 3600, 'm': 60, 's': 1, 'ms': 0.001}[unit] * number
+    return total if matched else None
+
+
+def _parse_reset_time(value):
+    """RFC 3339 / HTTP 날짜 → 지금부터 남은 초 (실패 시 None)"""
+    if not value:
+        return None
+    try:
+        reset_at = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            reset_at = parsedate_to_datetime(str(value))
+        except (TypeError, ValueError):
+            return None
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def get_error_headers(error):
+    """SDK 예외에서 HTTP 응답 헤더 추출 (openai / anthropic / google-genai)"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers is None:
+        headers = getattr(error, 'headers', None)
+    if not headers:
+        return {}
+    try:
+        return {str(k).lower(): v for k, v in headers.items()}
+    except AttributeError:
+        return {}
+
+
+def get_retry_after(headers):
+    """Retry-After 계열 헤더 → 대기 초 (없으면 None)"""
+    if not headers:
+        return None
+    if 'retry-after-ms' in headers:
+        seconds = _parse_duration(headers['retry-after-ms'])
+        if seconds is not None:
+            return seconds / 1000.0
+    if 'retry-after' in headers:
+        seconds = _parse_duration(headers['retry-after'])
+        if seconds is None:
+            seconds = _parse_reset_time(headers['retry-after'])
+        if seconds is not None:
+            return seconds
+    # OpenAI / xAI: x-ratelimit-reset-requests = "1s", "6m0s"
+    for key in ('x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens'):
+        if key in headers:
+            seconds = _parse_duration(headers[key])
+            if seconds is not None:
+                return seconds
+    # Anthropic: anthropic-ratelimit-*-reset = RFC 3339 시각
+    for key in ('anthropic-ratelimit-requests-reset', 'anthropic-ratelimit-tokens-reset',
+                'anthropic-ratelimit-input-tokens-reset'):
+        if key in headers:
+            seconds = _parse_reset_time(headers[key])
+            if seconds is not None:
+                return seconds
+    return None
+
+
+def is_rate_limit_error(error):
+    """429 / RESOURCE_EXHAUSTED / rate limit 예외 여부"""
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    if status == 429:
+        return True
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    message = str(error).lower()
+    return '429' in message or 'rate limit' in message or 'rate_limit' in message \
+        or 'resource_exhausted' in message or 'too many requests' in message
+
+
+class ProviderLimiter:
+    """공급자 1개의 레이트 리미터 (토큰 버킷 + AIMD 동시성 + 쿨다운)"""
+
+    def __init__(self, name, rpm=None, tpm=None, max_concurrency=8, min_concurrency=1, cache_reads_free=False):
+        self.name = name
+        self.cache_reads_free = cache_reads_free
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.consecutive_429 = 0
+        self.condition = threading.Condition()
+        self.stats = {'requests': 0, 'rate_limited': 0, 'waited_seconds': 0.0, 'refunded_tokens': 0}
+
+    def configure(self, rpm=None, tpm=None, max_concurrency=None, min_concurrency=None):
+        with self.condition:
+            if rpm:
+                if self.request_bucket:
+                    self.request_bucket.set_limit(rpm)
+                else:
+                    self.request_bucket = TokenBucket(rpm)
+            if tpm:
+                if self.token_bucket:
+                    self.token_bucket.set_limit(tpm)
+                else:
+                    self.token_bucket = TokenBucket(tpm)
+            if max_concurrency:
+                # 한도를 올리면 최근 429가 없을 때 바로 반영 (AIMD 증가를 기다리지 않음)
+                if max_concurrency > self.max_concurrency and self.consecutive_429 == 0:
+                    self.concurrency = float(max_concurrency)
+                self.max_concurrency = max_concurrency
+                self.concurrency = min(self.concurrency, max_concurrency)
+            if min_concurrency:
+                self.min_concurrency = min_concurrency
+            self.condition.notify_all()
+
+    def _wait_time(self, tokens):
+        """지금 요청 가능할 때까지 남은 시간 (0이면 가능, None이면 동시성 슬롯 대기)"""
+        now = time.monotonic()
+        if now < self.cooldown_until:
+            return self.cooldown_until - now
+        if self.in_flight >= max(self.min_concurrency, int(self.concurrency)):
+            return None
+        wait = 0.0
+        if self.request_bucket:
+            wait = max(wait, self.request_bucket.wait_time(1))
+        if self.token_bucket and tokens:
+            wait = max(wait, self.token_bucket.wait_time(tokens))
+        return wait
+
+    def acquire(self, tokens=0):
+        """요청 슬롯 확보 (필요하면 대기)"""
+        started = time.monotonic()
+        with self.condition:
+            while True:
+                wait = self._wait_time(tokens)
+                if wait == 0.0:
+                    break
+                self.condition.wait(timeout=wait)
+            if self.request_bucket:
+                self.request_bucket.take(1)
+            if self.token_bucket and tokens:
+                self.token_bucket.take(tokens)
+            self.in_flight += 1
+            self.stats['requests'] += 1
+            # 토큰 예약이 없는 호출이면 이전 호출의 예약이 잘못 정산되지 않도록 비움
+            _reservations.last = (self, min(tokens, self.token_bucket.capacity)) \
+                if (self.token_bucket and tokens) else None
+            self.stats['waited_seconds'] += time.monotonic() - started
+
+    def release(self):
+        with self.condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.condition.notify_all()
+
+    def on_success(self):
+        """Additive increase: 한도당 +1/한도 (한도 N이면 N번 성공마다 +1)"""
+        with self.condition:
+            self.consecutive_429 = 0
+            if self.concurrency < self.max_concurrency:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / max(1.0, self.concurrency))
+            self.condition.notify_all()
+
+    def on_rate_limited(self, retry_after=None):
+        """Multiplicative decrease + 쿨다운 (Retry-After 우선, 없으면 지수 백오프)"""
+        with self.condition:
+            self.stats['rate_limited'] += 1
+            self.consecutive_429 += 1
+            self.concurrency = max(float(self.min_concurrency), self.concurrency * 0.5)
+            if retry_after is None:
+                retry_after = min(MAX_COOLDOWN, BASE_COOLDOWN * (2 ** (self.consecutive_429 - 1)))
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + retry_after)
+            # 요청 버킷도 비워서 쿨다운 직후 몰림 방지
+            if self.request_bucket:
+                self.request_bucket.drain()
+            self.condition.notify_all()
+
+    def settle(self, reserved, input_tokens, cached_tokens=0):
+        """예약한 토큰을 실제 사용량으로 정산 (cache_reads_free면 캐시 읽기는 한도에서 제외)"""
+        if not self.token_bucket:
+            return
+        counted = (input_tokens or 0) - ((cached_tokens or 0) if self.cache_reads_free else 0)
+        with self.condition:
+            self.token_bucket.give(reserved - max(0, counted))
+            self.stats['refunded_tokens'] += reserved - max(0, counted)
+            self.condition.notify_all()
+
+    def update_from_headers(self, headers):
+        """x-ratelimit-limit-* / anthropic-ratelimit-*-limit 헤더로 실제 한도 반영"""
+        if not headers:
+            return
+        rpm = headers.get('x-ratelimit-limit-requests') or headers.get('anthropic-ratelimit-requests-limit')
+        tpm = headers.get('x-ratelimit-limit-tokens') or headers.get('anthropic-ratelimit-tokens-limit') \
+            or headers.get('anthropic-ratelimit-input-tokens-limit')
+        try:
+            self.configure(rpm=int(rpm) if rpm else None, tpm=int(tpm) if tpm else None)
+        except (TypeError, ValueError):
+            pass
+
+    def report_error(self, error):
+        """예외를 분석해 429면 AIMD 감소 + 쿨다운 적용, 429 여부 반환"""
+        if not is_rate_limit_error(error):
+            return False
+        headers = get_error_headers(error)
+        self.update_from_headers(headers)
+        self.on_rate_limited(get_retry_after(headers))
+        return True
+
+    @contextmanager
+    def request(self, tokens=0):
+        """with 블록 1개 = API 요청 1회 (성공/429를 자동 반영)"""
+        self.acquire(tokens)
+        try:
+            yield self
+        except Exception as e:
+            self.report_error(e)
+            raise
+        else:
+            self.on_success()
+        finally:
+            self.release()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# 스레드별 마지막 예약 (limiter, 예약 토큰) - 호출 직후 같은 스레드에서 settle_usage로 정산
+_reservations = threading.local()
+
+
+def settle_usage(input_tokens, cached_tokens=0):
+    """이 스레드의 마지막 예약을 응답 usage로 정산 (예약이 없거나 이미 정산했으면 무시)"""
+    reservation = getattr(_reservations, 'last', None)
+    if reservation is None:
+        return
+    _reservations.last = None
+    limiter, reserved = reservation
+    limiter.settle(reserved, input_tokens, cached_tokens)
+
+
+def _load_env_limits():
+    """V30_RATE_LIMITS 환경변수 (JSON) 읽기"""
+    raw = os.getenv('V30_RATE_LIMITS')
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        print(f"⚠️ V30_RATE_LIMITS 파싱 실패 (JSON 형식 필요): {raw}")
+        return {}
+
+
+def get_limiter(provider):
+    """공급자별 공유 리미터 (프로세스 내 싱글톤)"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            limits = dict(PROVIDER_DEFAULTS.get(provider, {"rpm": 60, "tpm": None, "max_concurrency": 4}))
+            limits.update(_load_env_limits().get(provider, {}))
+            _limiters[provider] = ProviderLimiter(
+                provider,
+                rpm=limits.get('rpm'),
+                tpm=limits.get('tpm'),
+                max_concurrency=limits.get('max_concurrency', 4),
+                min_concurrency=limits.get('min_concurrency', 1),
+                cache_reads_free=limits.get('cache_reads_free', False)
+            )
+        return _limiters[provider]
+
+
+def configure_limiter(provider, **limits):
+    """공급자 한도 변경 (rpm, tpm, max_concurrency, min_concurrency)"""
+    get_limiter(provider).configure(**limits)
+
+
+def get_limiter_stats():
+    """공급자별 요청/429/대기 시간 통계"""
+    with _limiters_lock:
+        return {
+            name: dict(limiter.stats, concurrency=round(limiter.concurrency, 2))
+            for name, limiter in _limiters.items()
+        }
@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+"""
+V30 관련성 사전 필터 (평가 전 단계, 로컬 점수 계산)
+
+배경:
+- 수집 시 get_politician_info의 search_string(정당, 직책, 출생연도)으로 동명이인을 피하려 하지만
+  동명이인/무관한 인물 항목도 그대로 저장됨
+- 저장된 항목은 모두 4개 유료 평가 AI(evaluate_v30)로 전달 → 무관한 항목에도 평가 비용 발생
+
+핵심:
+1. 점수 (0~1, 네트워크 없음)
+   - 이름 언급 NAME_WEIGHT (별칭/성+직책 언급은 ALIAS_WEIGHT)
+   - 정당 / 지역구·지역 / 직책 토큰 언급 각 CONTEXT_WEIGHT
+   - TF-IDF 유사도 (선택): 프로필 문서(기본 정보 + 지시사항)와 항목의 글자 2-gram 코사인 × TFIDF_WEIGHT
+     (IDF는 같은 정치인의 수집 항목 전체로 계산)
+   - 동명이인 감점: 이름 바로 앞에 다른 정당명이 붙은 경우 ("국민의힘 김민석 구의원")
+2. 제외 판정 (assess): 점수가 낮다는 것만으로는 제외하지 않음 - 무관하다는 근거가 있을 때만
+   - 제외: 임계값 미만이면서 동명이인 감점 발생(namesake) 또는 이름/별칭/정당/지역/직책 언급이 전혀 없음(no_mention)
+   - 항상 유지: 공식(official) 데이터, 정치인 본인 채널(프로필 website/SNS 계정) URL,
+     언급 없는 SNS 게시물(본인 게시물은 이름을 쓰지 않음 - 동명이인 근거가 있을 때만 제외)
+   - 제외 → collected_data_v30.is_relevant = false, 점수는 relevance_score에 기록
+     (migrations/add_collected_relevance_v30.sql)
+   - --dry-run: 기록 없이 점수 분포 / 판정별 개수 / 제외 예시 출력 (기준을 켜기 전 확인용)
+3. 평가 제외: evaluate_v30.get_pooled_data가 is_relevant = false 행을 건너뜀
+   run_v30_workflow 평가 완성도/누락 평가도 관련 항목만 기준
+4. 파이프라인: 검증(validate) 다음, 평가(evaluate) 전 단계
+   (scheduler_v30 "relevance" 단계, run_v30_workflow 단계 3-1)
+
+환경 변수:
+    V30_RELEVANCE            "off"면 평가 시 제외하지 않음 (기록된 태그 무시)
+    V30_RELEVANCE_THRESHOLD  제외 기준 점수 (기본 0.35)
+
+사용법:
+    python relevance_v30.py --politician_id=62e7b453
+    python relevance_v30.py --all --rescore
+    python relevance_v30.py --politician_id=62e7b453 --dry-run   # 기록 없이 분포만 확인
+"""
+
+import os
+import re
+import math
+import argparse
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+from repository_v30 import get_client, has_column, iter_collected_data, update_in, TABLE_COLLECTED_DATA
+from politician_profiles_v30 import get_profile_cache
+from engine_v30 import configure_stdout
+
+THRESHOLD = float(os.getenv('V30_RELEVANCE_THRESHOLD', '0.35'))
+
+NAME_WEIGHT = 0.5
+ALIAS_WEIGHT = 0.35
+CONTEXT_WEIGHT = 0.1
+TFIDF_WEIGHT = 0.2
+NAMESAKE_PENALTY = 0.3
+
+# 정당 약칭 (프로필 정당명 → 기사에서 쓰는 이름들)
+PARTY_ALIASES = {
+    "더불어민주당": ["더불어민주당", "민주당"],
+    "국민의힘": ["국민의힘", "국힘"],
+    "조국혁신당": ["조국혁신당"],
+    "개혁신당": ["개혁신당"],
+    "진보당": ["진보당"],
+    "정의당": ["정의당"],
+    "기본소득당": ["기본소득당"],
+    "사회민주당": ["사회민주당"],
+}
+
+# 성+직책 별칭용 짧은 직책명 ("김 총리", "김 의원")
+POSITION_SHORT = {
+    "국무총리": "총리",
+    "국회의원": "의원",
+    "당대표": "대표",
+    "대표": "대표",
+    "시장": "시장",
+    "도지사": "지사",
+    "구청장": "구청장",
+    "군수": "군수",
+    "장관": "장관",
+}
+
+REGION_SUFFIXES = ("특별자치시", "특별자치도", "특별시", "광역시", "시", "도", "구", "군")
+
+# 동명이인 판정: 다른 정당명과 이름 사이 최대 글자 수
+NAMESAKE_WINDOW = 4
+
+# 판정 (assess) - EXCLUDE_VERDICTS만 평가 제외
+EXCLUDE_VERDICTS = ("namesake", "no_mention")
+VERDICT_LABELS = {
+    "relevant": "기준 이상", "official": "공식 데이터", "own_channel": "본인 채널", "sns": "SNS 게시물",
+    "no_profile": "프로필 없음", "weak": "근거 부족(유지)", "namesake": "동명이인", "no_mention": "언급 없음",
+}
+
+# 정치인 본인 채널로 보는 프로필 컬럼 (URL 또는 @계정, 있는 컬럼만 사용)
+CHANNEL_FIELDS = ("website", "homepage", "blog", "sns", "sns_accounts", "twitter", "facebook", "instagram", "youtube")
+SNS_DOMAINS = ("twitter.com", "x.com", "facebook.com", "instagram.com", "youtube.com", "youtu.be", "tiktok.com",
+               "blog.naver.com")
+_SNS_SOURCE = re.compile(r'^\s*(?:x|twitter|facebook|instagram|youtube|트위터|페이스북|인스타그램|유튜브)(?![A-Za-z])'
+                         r'|@[A-Za-z0-9_.]{2,}', re.IGNORECASE)
+_HANDLE = re.compile(r'@([A-Za-z0-9_.]{2,})')
+
+_WORD = re.compile(r'[가-힣A-Za-z0-9]+')
+
+_enabled = os.getenv('V30_RELEVANCE', 'on').lower() not in ('off', '0', 'false', 'none')
+_enabled_lock = threading.Lock()
+
+
+def relevance_enabled():
+    return _enabled
+
+
+def disable_relevance():
+    """--no-relevance 옵션용"""
+    global _enabled
+    with _enabled_lock:
+        _enabled = False
+
+
+def item_text(item):
+    """항목 제목 + 내용 + 출처 (점수 계산 대상 텍스트)"""
+    return " ".join(str(item.get(key) or '') for key in ('title', 'content', 'source_name'))
+
+
+def _host(url):
+    """URL → 소문자 호스트 (www. 제외, 스킴 없는 값도 허용)"""
+    url = (url or '').strip().lower()
+    if not url:
+        return ''
+    if '//' not in url:
+        url = '//' + url
+    return urlparse(url).netloc.split('@')[-1].split(':')[0].removeprefix('www.')
+
+
+def _is_sns_host(host):
+    return any(host == domain or host.endswith('.' + domain) for domain in SNS_DOMAINS)
+
+
+def _channels(profile):
+    """프로필 → (본인 사이트 호스트 집합, 본인 SNS 계정 집합)"""
+    hosts, handles = set(), set()
+    for field in CHANNEL_FIELDS:
+        value = profile.get(field)
+        values = value if isinstance(value, (list, tuple)) else re.split(r'[,\s]+', str(value or ''))
+        for value in (str(v).strip() for v in values if v and str(v).strip()):
+            handles.update(h.lower() for h in _HANDLE.findall(value))
+            if '.' not in value:
+                continue
+            host = _host(value)
+            if not host:
+                continue
+            if _is_sns_host(host):
+                path = urlparse(value if '//' in value else '//' + value).path.strip('/').split('/')
+                if path and path[0]:
+                    handles.add(path[0].lstrip('@').lower())
+            else:
+                hosts.add(host)
+    return hosts, handles
+
+
+def _split_values(value):
+    """프로필 값(문자열/목록) → 토큰 목록"""
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in re.split(r'[,/·\s]+', str(value)) if v.strip()]
+
+
+def _region_tokens(value):
+    """"서울 영등포구 을" → {"서울", "영등포구", "영등포"} (2글자 이상, 행정구역 접미사 제거형 포함)"""
+    tokens = set()
+    for token in _split_values(value):
+        if len(token) < 2:
+            continue
+        tokens.add(token)
+        for suffix in REGION_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+                tokens.add(token[:-len(suffix)])
+                break
+    return tokens
+
+
+# ============================================================
+# TF-IDF (글자 2-gram, 형태소 분석 없이)
+# ============================================================
+def tokenize(text):
+    """단어 + 단어 안의 글자 2-gram (한글은 띄어쓰기/조사가 달라도 겹치도록)"""
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        tokens.append(word)
+        tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class TfidfModel:
+    """문서 집합의 IDF + 정규화된 희소 벡터 (dict)"""
+
+    def __init__(self, documents):
+        df = Counter()
+        for doc in documents:
+            df.update(set(tokenize(doc)))
+        n = len(documents)
+        self.idf = {token: math.log((n + 1) / (count + 1)) + 1 for token, count in df.items()}
+        self.default_idf = math.log(n + 1) + 1
+
+    def vector(self, text):
+        counts = Counter(tokenize(text))
+        vec = {token: count * self.idf.get(token, self.default_idf) for token, count in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values()))
+        return {token: v / norm for token, v in vec.items()} if norm else {}
+
+    @staticmethod
+    def cosine(a, b):
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(v * b.get(token, 0.0) for token, v in a.items())
+
+
+# ============================================================
+# 관련성 점수
+# ============================================================
+class RelevanceScorer:
+    """정치인 1명 기준 항목 관련성 점수"""
+
+    def __init__(self, profile, politician_name='', instructions=None):
+        profile = profile or {}
+        self.name = (profile.get('name') or politician_name or '').strip()
+        self.aliases = set(_split_values(profile.get('aliases'))) - {self.name}
+
+        positions = set()
+        for key in ('position', 'title', 'identity'):
+            positions.update(token for token in _split_values(profile.get(key)) if len(token) >= 2)
+        self.positions = positions
+        if self.name:
+            surname = self.name[0]
+            self.aliases.update(f"{surname} {POSITION_SHORT[p]}" for p in positions if p in POSITION_SHORT)
+
+        party = (profile.get('party') or '').strip()
+        self.parties = set(PARTY_ALIASES.get(party, [party] if party else []))
+        self.other_parties = {
+            alias for name, aliases in PARTY_ALIASES.items() if name != party for alias in aliases
+        } - self.parties
+
+        self.regions = _region_tokens(profile.get('district')) | _region_tokens(profile.get('region'))
+        self.own_hosts, self.own_handles = _channels(profile)
+
+        self.profile_text = " ".join(
+            [self.name, *self.aliases, party, *self.regions, *positions, instructions or '']
+        )
+        self.model = None
+        self.profile_vector = None
+
+        if self.name and self.other_parties:
+            parties = "|".join(sorted((re.escape(p) for p in self.other_parties), key=len, reverse=True))
+            self.namesake = re.compile(rf"(?:{parties})[^가-힣]{{0,{NAMESAKE_WINDOW}}}{re.escape(self.name)}")
+        else:
+            self.namesake = None
+
+    def fit(self, items):
+        """TF-IDF 활성화 (IDF = 프로필 + 항목 전체)"""
+        documents = [self.profile_text] + [item_text(item) for item in items]
+        self.model = TfidfModel(documents)
+        self.profile_vector = self.model.vector(self.profile_text)
+        return self
+
+    def _signals(self, item):
+        """항목 → (점수, 이름/별칭 언급 여부, 맥락 토큰 언급 수, 동명이인 감점 여부)"""
+        text = item_text(item)
+        compact = re.sub(r'\s+', '', text)
+
+        score = 0.0
+        mentioned = False
+        if self.name and self.name.replace(' ', '') in compact:
+            score += NAME_WEIGHT
+            mentioned = True
+        elif any(alias.replace(' ', '') in compact for alias in self.aliases):
+            score += ALIAS_WEIGHT
+            mentioned = True
+
+        has_party = any(party in text for party in self.parties)
+        context = sum((has_party,
+                       any(region in text for region in self.regions),
+                       any(position in text for position in self.positions)))
+        score += CONTEXT_WEIGHT * context
+
+        if self.model is not None:
+            score += TFIDF_WEIGHT * TfidfModel.cosine(self.model.vector(text), self.profile_vector)
+
+        # 다른 정당명이 이름 바로 앞에 붙고 자기 정당 언급이 없으면 동명이인 가능성
+        namesake = bool(self.namesake and not has_party and self.namesake.search(text))
+        if namesake:
+            score -= NAMESAKE_PENALTY
+
+        return round(max(0.0, min(1.0, score)), 3), mentioned, context, namesake
+
+    def score(self, item):
+        """항목 → 관련성 점수 (0~1)"""
+        return self._signals(item)[0]
+
+    def is_own_channel(self, item):
+        """출처 URL / 출처명이 정치인 본인 사이트·SNS 계정인지"""
+        url = str(item.get('source_url') or '')
+        host = _host(url)
+        if host and any(host == own or host.endswith('.' + own) for own in self.own_hosts):
+            return True
+        if not self.own_handles:
+            return False
+        haystack = f"{urlparse(url).path if host else ''} {item.get('source_name') or ''}".lower()
+        return any(re.search(rf'(?<![a-z0-9_.]){re.escape(handle)}(?![a-z0-9_])', haystack)
+                   for handle in self.own_handles)
+
+    def assess(self, item, threshold=None):
+        """항목 → (점수, 판정) - 판정이 EXCLUDE_VERDICTS일 때만 평가 제외
+
+        낮은 점수만으로는 제외하지 않음 (동명이인 감점 또는 언급 전무라는 근거가 있어야 제외)
+        """
+        threshold = THRESHOLD if threshold is None else threshold
+        score, mentioned, context, namesake = self._signals(item)
+        if not self.name:
+            return score, "no_profile"
+        if (item.get('data_type') or '').lower() == 'official':
+            return score, "official"
+        if self.is_own_channel(item):
+            return score, "own_channel"
+        if score >= threshold:
+            return score, "relevant"
+        if namesake:
+            return score, "namesake"
+        if mentioned or context:
+            return score, "weak"
+        if _is_sns_host(_host(item.get('source_url'))) or _SNS_SOURCE.search(str(item.get('source_name') or '')):
+            return score, "sns"
+        return score, "no_mention"
+
+
+def build_scorer(politician_id, politician_name='', items=None, use_tfidf=True):
+    """프로필 캐시로 점수 계산기 생성 (items가 있고 use_tfidf면 TF-IDF 포함)"""
+    cache = get_profile_cache()
+    profile = cache.get_profile(politician_id)
+    name = politician_name or (profile or {}).get('name', '')
+    scorer = RelevanceScorer(profile, name, cache.get_instructions(name) if name else None)
+    if use_tfidf and items:
+        scorer.fit(items)
+    return scorer
+
+
+# ============================================================
+# relevance 컬럼
+# ============================================================
+def has_relevance_column():
+    """collected_data_v30.is_relevant 존재 여부 (마이그레이션 전 DB면 False, repository_v30.has_column)"""
+    return has_column(TABLE_COLLECTED_DATA, 'is_relevant')
+
+
+def with_relevance_column(columns):
+    """컬럼 세트 + is_relevant (컬럼이 있을 때만)"""
+    return f"{columns}, is_relevant" if has_relevance_column() else columns
+
+
+def is_excluded(item):
+    """평가 제외 대상 여부 (관련성 필터로 is_relevant = false 태그된 행)"""
+    return _enabled and item.get('is_relevant') is False
+
+
+# ============================================================
+# 파이프라인 단계 (정치인 단위)
+# ============================================================
+def print_distribution(assessed, threshold, examples=5):
+    """--dry-run 출력: 점수 분포(0.1 구간) / 판정별 개수 / 제외 예시"""
+    buckets = Counter(min(int(score * 10), 9) for _item, score, _verdict in assessed)
+    print("  📊 점수 분포: " + " | ".join(
+        f"{b / 10:.1f}~{(b + 1) / 10:.1f} {buckets[b]}" for b in range(10) if buckets[b]
+    ) + f" (기준 {threshold})")
+    verdicts = Counter(verdict for _item, _score, verdict in assessed)
+    print("  📋 판정: " + ", ".join(
+        f"{VERDICT_LABELS.get(v, v)}{' [제외]' if v in EXCLUDE_VERDICTS else ''} {n}"
+        for v, n in verdicts.most_common()
+    ))
+    excluded = [(item, score, verdict) for item, score, verdict in assessed if verdict in EXCLUDE_VERDICTS]
+    for item, score, verdict in excluded[:examples]:
+        print(f"     - [{VERDICT_LABELS[verdict]} {score:.2f}] {(item.get('title') or '')[:50]} "
+              f"({item.get('source_name') or '-'})")
+
+
+def filter_politician(politician_id, politician_name='', rescore=False, use_tfidf=True,
+                      threshold=None, dry_run=False):
+    """정치인 수집 항목 점수 계산 + 태그 기록 → {'scored', 'relevant', 'excluded'}
+
+    rescore=False면 relevance_score가 없는 행과 현재 제외된 행만 다시 판정
+    (이전 규칙으로 잘못 제외된 행 복구, TF-IDF의 IDF는 항상 전체 항목 기준)
+    """
+    threshold = THRESHOLD if threshold is None else threshold
+    stats = {'scored': 0, 'relevant': 0, 'excluded': 0}
+
+    write = not dry_run
+    if write and not has_relevance_column():
+        print("  ❌ is_relevant 컬럼 없음 - migrations/add_collected_relevance_v30.sql 먼저 적용")
+        return stats
+
+    columns = "id, title, content, source_name, source_url, data_type"
+    if has_relevance_column():
+        columns += ", relevance_score, is_relevant"
+    items = list(iter_collected_data(politician_id, columns=columns))
+    if not items:
+        return stats
+
+    scorer = build_scorer(politician_id, politician_name, items, use_tfidf)
+    targets = items if rescore else [
+        item for item in items if item.get('relevance_score') is None or item.get('is_relevant') is False
+    ]
+
+    # (점수, 관련 여부)별로 묶어서 IN 조건 업데이트
+    groups = {}
+    assessed = []
+    for item in targets:
+        score, verdict = scorer.assess(item, threshold)
+        relevant = verdict not in EXCLUDE_VERDICTS
+        stats['scored'] += 1
+        stats['relevant' if relevant else 'excluded'] += 1
+        groups.setdefault((score, relevant), []).append(item['id'])
+        assessed.append((item, score, verdict))
+
+    if dry_run and assessed:
+        print_distribution(assessed, threshold)
+
+    if write:
+        for (score, relevant), ids in groups.items():
+            update_in(TABLE_COLLECTED_DATA, {'relevance_score': score, 'is_relevant': relevant}, 'id', ids)
+
+    print(f"  🎯 관련성: {stats['scored']}개 점수 계산 → 관련 {stats['relevant']}개, "
+          f"제외 {stats['excluded']}개 (기준 {threshold})" + (" [기록 안 함]" if not write else ""))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='V30 관련성 사전 필터 (평가 전 무관 항목 제외)')
+    parser.add_argument('--politician_id', help='정치인 ID')
+    parser.add_argument('--politician_name', default='', help='정치인 이름 (생략 시 프로필 이름)')
+    parser.add_argument('--roster', action='append', help='명단 파일 ("이름<TAB>ID" 형식, 여러 번 지정 가능)')
+    parser.add_argument('--all', action='store_true', help='전체 정치인')
+    parser.add_argument('--rescore', action='store_true', help='이미 점수가 있는 행도 다시 계산')
+    parser.add_argument('--threshold', type=float, default=None, help=f'제외 기준 점수 (기본 {THRESHOLD})')
+    parser.add_argument('--no-tfidf', action='store_true', help='TF-IDF 유사도 없이 토큰 언급만으로 계산')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='DB에 기록하지 않고 점수 분포 / 판정별 개수 / 제외 예시만 출력')
+    args = parser.parse_args()
+
+    if args.all:
+        result = get_client().table('politicians').select('id, name').execute()
+        politicians = [(row['id'], row.get('name') or '') for row in result.data or []]
+    elif args.roster:
+        from scheduler_v30 import load_roster
+        politicians = load_roster(args.roster)
+    elif args.politician_id:
+        politicians = [(args.politician_id, args.politician_name)]
+    else:
+        parser.error('--politician_id, --roster, --all 중 하나가 필요합니다')
+
+    totals = Counter()
+    for politician_id, politician_name in politicians:
+        print(f"\n[{politician_name or politician_id}]")
+        totals.update(filter_politician(
+            politician_id, politician_name, rescore=args.rescore, use_tfidf=not args.no_tfidf,
+            threshold=args.threshold, dry_run=args.dry_run
+        ))
+    print(f"\n✅ 관련성 필터: {totals['scored']}개 중 {totals['excluded']}개 평가 제외")
+
+
+if __name__ == "__main__":
+    configure_stdout()
+    main()
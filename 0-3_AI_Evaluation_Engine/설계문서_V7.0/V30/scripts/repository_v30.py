@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+V30 데이터 접근 모듈 (collected_data_v30 / evaluations_v30)
+
+배경:
+- select('*') + .execute()는 Supabase 기본 max-rows(1000)에서 조용히 잘림
+- 평가/점수 계산에 필요 없는 컬럼(content 등)까지 매번 전송
+
+핵심:
+1. 키셋 페이지네이션: id 오름차순 + id > 마지막 id (offset 없이 끝까지 스트리밍)
+2. 컬럼 프로젝션: 용도별 컬럼 세트만 조회 (COLUMNS_*)
+3. 테이블별 이터레이터: iter_collected_data / iter_evaluations
+   (행은 기존 코드와 같은 dict, 보장되는 키는 columns에 지정한 것)
+4. 벌크 쓰기: update_in / delete_in (id 목록을 IN_CHUNK_SIZE개씩 IN 조건으로), insert_rows / upsert_rows
+5. Supabase 클라이언트: get_client() / supabase (첫 사용 시 생성, 프로세스의 모든 단계 공용)
+6. 컬럼 존재 확인: has_column(table, column) (마이그레이션 전 DB 대응, 컬럼 없음 에러만 False로 캐시)
+
+사용법:
+    from repository_v30 import iter_collected_data, COLUMNS_COLLECTED_EVAL
+
+    for item in iter_collected_data(politician_id, category='expertise',
+                                    columns=COLUMNS_COLLECTED_EVAL):
+        ...
+"""
+
+import os
+import time
+import threading
+from engine_v30 import load_env
+from telemetry_v30 import instrument_supabase
+
+load_env()
+
+TABLE_COLLECTED_DATA = "collected_data_v30"
+TABLE_EVALUATIONS = "evaluations_v30"
+TABLE_EVAL_AGGREGATES = "evaluation_aggregates_v30"  # 트리거 유지 (migrations/add_evaluation_aggregates_v30.sql)
+
+PAGE_SIZE = 1000  # Supabase 기본 max-rows 이하
+IN_CHUNK_SIZE = 150  # IN 조건 id 개수 (UUID 150개 ≈ 요청 URL 6KB)
+
+# 컬럼 없음 에러 코드 (PostgreSQL undefined_column / PostgREST 스키마 캐시에 없는 컬럼)
+MISSING_COLUMN_CODES = ("42703", "PGRST204")
+COLUMN_CHECK_RETRIES = 3
+
+# ============================================================
+# 용도별 컬럼 세트
+# ============================================================
+# 평가 프롬프트 작성용 (evaluate_v30.evaluate_batch)
+COLUMNS_COLLECTED_EVAL = "id, collector_ai, category, title, content, source_name, source_url, published_date"
+# URL/날짜/중복 검증용 (validate_v30.validate_item)
+COLUMNS_COLLECTED_VALIDATE = ("id, politician_id, collector_ai, category, data_type, title, content, "
+                              "source_name, source_url, published_date, is_verified, created_at")
+# URL 인덱스/중복 체크용 (collect_v30.load_url_index)
+COLUMNS_COLLECTED_URL = "id, collector_ai, source_url"
+# 유사 중복 묶음용 (near_dup_v30, cluster_id 컬럼은 마이그레이션 적용 시에만 추가)
+COLUMNS_COLLECTED_CLUSTER = "id, collector_ai, title, content"
+# 누락 평가 탐지용 (run_v30_workflow.get_missing_evaluations)
+COLUMNS_COLLECTED_KEY = "id, collector_ai, category, data_type"
+
+# 점수 계산용 (calculate_v30_scores)
+COLUMNS_EVAL_SCORE = "id, politician_id, evaluator_ai, category, rating, score"
+# 명단 전체 점수 계산용 (calculate_v30_scores --all, 정치인 이름 포함)
+COLUMNS_EVAL_SCORE_ROSTER = "id, politician_id, politician_name, evaluator_ai, category, rating, score"
+# 증분 집계 (정치인 × 카테고리 × 평가 AI → 합계/건수)
+COLUMNS_EVAL_AGGREGATE = "id, politician_id, politician_name, category, evaluator_ai, sum_score, eval_count"
+# 재개/누락 체크용
+COLUMNS_EVAL_KEY = "id, collected_data_id, evaluator_ai, category"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Supabase 클라이언트 (프로세스 공용, 최초 호출 시 supabase 패키지 import + 생성)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from supabase import create_client
+            _client = instrument_supabase(create_client(
+                os.getenv('SUPABASE_URL'),
+                os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+            ))
+        return _client
+
+
+class _LazyClient:
+    """모듈 수준 `supabase` 대용 (첫 속성 접근 시 get_client(), import 시점에는 생성하지 않음)"""
+
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+
+# 단계 모듈 공용: from repository_v30 import supabase → supabase.table(...) 그대로 사용
+supabase = _LazyClient()
+
+_columns = {}  # (table, column) → 존재 여부
+_columns_lock = threading.Lock()
+
+
+def is_missing_column_error(error):
+    """컬럼 없음 에러인지 (42703 / PGRST204, 코드 속성이 없으면 메시지로 확인)"""
+    code = getattr(error, 'code', None)
+    if code is not None:
+        return str(code) in MISSING_COLUMN_CODES
+    return any(c in str(error) for c in MISSING_COLUMN_CODES)
+
+
+def has_column(table, column):
+    """table.column 존재 여부 (마이그레이션 전 DB면 False, 프로세스당 1회 확인)
+
+    컬럼 없음(42703 / PGRST204)만 False로 캐시하고, 네트워크 등 다른 에러는
+    COLUMN_CHECK_RETRIES회 재시도 후 그대로 raise (일시 장애를 "컬럼 없음"으로 굳히지 않음)
+    """
+    key = (table, column)
+    with _columns_lock:
+        if key in _columns:
+            return _columns[key]
+
+    for attempt in range(COLUMN_CHECK_RETRIES):
+        try:
+            get_client().table(table).select(column).limit(1).execute()
+            exists = True
+            break
+        except Exception as e:
+            if is_missing_column_error(e):
+                exists = False
+                break
+            if attempt == COLUMN_CHECK_RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+    with _columns_lock:
+        _columns[key] = exists
+    return exists
+
+
+def _with_key(columns, key):
+    """키셋 페이지네이션에 필요한 key 컬럼을 항상 포함"""
+    names = [c.strip() for c in columns.split(',')]
+    if columns.strip() != '*' and key not in names:
+        names.insert(0, key)
+    return ', '.join(names)
+
+
+def iter_rows(table, columns='*', filters=None, page_size=PAGE_SIZE, key='id'):
+    """테이블 행을 키셋 페이지네이션으로 스트리밍
+
+    Args:
+        table: 테이블명
+        columns: select 컬럼 (콤마 구분)
+        filters: {컬럼: 값} - 값이 list/tuple/set이면 IN 조건, None이면 무시
+        page_size: 페이지당 행 수
+        key: 정렬/커서 컬럼 (유니크해야 함)
+    """
+    client = get_client()
+    select_columns = _with_key(columns, key)
+    last_key = None
+
+    while True:
+        query = client.table(table).select(select_columns)
+        for column, value in (filters or {}).items():
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                query = query.in_(column, list(value))
+            else:
+                query = query.eq(column, value)
+        if last_key is not None:
+            query = query.gt(key, last_key)
+
+        result = query.order(key).limit(page_size).execute()
+        rows = result.data or []
+        for row in rows:
+            yield row
+
+        if len(rows) < page_size:
+            break
+        last_key = rows[-1][key]
+
+
+def fetch_all(table, columns='*', filters=None, page_size=PAGE_SIZE, key='id'):
+    """iter_rows 결과를 리스트로 반환"""
+    return list(iter_rows(table, columns, filters, page_size, key))
+
+
+def iter_collected_data(politician_id, category=None, collector_ai=None, data_type=None,
+                        columns=COLUMNS_COLLECTED_EVAL, page_size=PAGE_SIZE):
+    """collected_data_v30 행 스트리밍 (정치인 기준, 선택 필터)"""
+    filters = {
+        'politician_id': politician_id,
+        'category': category.lower() if isinstance(category, str) else category,
+        'collector_ai': collector_ai,
+        'data_type': data_type,
+    }
+    return iter_rows(TABLE_COLLECTED_DATA, columns, filters, page_size)
+
+
+def iter_evaluations(politician_id, category=None, evaluator_ai=None,
+                     columns=COLUMNS_EVAL_SCORE, page_size=PAGE_SIZE):
+    """evaluations_v30 행 스트리밍 (정치인 기준, 선택 필터)"""
+    filters = {
+        'politician_id': politician_id,
+        'category': category.lower() if isinstance(category, str) else category,
+        'evaluator_ai': evaluator_ai,
+    }
+    return iter_rows(TABLE_EVALUATIONS, columns, filters, page_size)
+
+
+def chunks(values, size=IN_CHUNK_SIZE):
+    """IN 조건용 id 목록 분할"""
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def update_in(table, values, column, ids, chunk_size=IN_CHUNK_SIZE):
+    """column IN ids 행을 values로 일괄 업데이트, 업데이트된 행 수 반환"""
+    client = get_client()
+    updated = 0
+    for chunk in chunks(ids, chunk_size):
+        result = client.table(table).update(values).in_(column, chunk).execute()
+        updated += len(result.data) if result.data else 0
+    return updated
+
+
+def delete_in(table, column, ids, chunk_size=IN_CHUNK_SIZE, filters=None):
+    """column IN ids 행을 일괄 삭제, 삭제된 행 수 반환
+
+    filters: 추가 조건 {컬럼: 값} (값이 list/tuple/set이면 IN 조건)
+    """
+    client = get_client()
+    deleted = 0
+    for chunk in chunks(ids, chunk_size):
+        query = client.table(table).delete().in_(column, chunk)
+        for key, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                query = query.in_(key, list(value))
+            else:
+                query = query.eq(key, value)
+        result = query.execute()
+        deleted += len(result.data) if result.data else 0
+    return deleted
+
+
+def upsert_rows(table, records, on_conflict, chunk_size=500):
+    """레코드 일괄 upsert (chunk_size개씩, on_conflict 유니크 키 충돌 시 갱신), 저장된 행 수 반환
+
+    청크마다 원자적 → 중간에 실패해도 기존 행이 지워진 채로 남지 않음 (삭제 후 insert와 다름)
+    """
+    client = get_client()
+    saved = 0
+    for chunk in chunks(records, chunk_size):
+        result = client.table(table).upsert(chunk, on_conflict=on_conflict).execute()
+        saved += len(result.data) if result.data else 0
+    return saved
+
+
+def insert_rows(table, records, chunk_size=500):
+    """레코드 일괄 insert (chunk_size개씩), 저장된 행 수 반환"""
+    client = get_client()
+    inserted = 0
+    for chunk in chunks(records, chunk_size):
+        result = client.table(table).insert(chunk).execute()
+        inserted += len(result.data) if result.data else 0
+    return inserted
@@ -11,42 +11,41 @@ V30 전체 워크플로우 자동 실행 스크립트
    - 기간 제한 검증 (공식 4년, 공개 2년)
    - 중복 데이터 자동 제거 (같은 AI + 같은 URL) ✅ 통합
    - 검증 실패 시 자동 재수집
+3-1. 관련성 필터 (relevance_v30.py): 동명이인/무관 항목 평가 제외
 4. 평가 (evaluate_v30.py)
 5. 평가 검증 (품질 기준: 97% 이상)
 6. 재평가 (누락 평가 자동 처리) ✅ 자동화
 7. 점수 계산 (calculate_v30_scores.py)
+
+무인 실행:
+    --on-fail=continue  검증 실패 시 묻지 않고 계속 진행
+    --on-fail=stop      검증 실패 시 묻지 않고 중단
+    (여러 정치인 일괄 처리는 scheduler_v30.py 사용)
+
+단계 실행:
+    기본은 같은 프로세스에서 각 스크립트의 main() 호출 (engine_v30.run_main)
+    → import / .env / Supabase 클라이언트 / AI SDK 준비를 단계마다 반복하지 않음
+    --isolated  예전처럼 단계마다 새 python 프로세스로 실행
 """
 
 import os
 import sys
+import time
 import subprocess
 import argparse
 from datetime import datetime
-from supabase import create_client
-from dotenv import load_dotenv
+from engine_v30 import EVALUATION_AIS, load_env, configure_stdout, run_main
+from repository_v30 import supabase, iter_collected_data, iter_evaluations, COLUMNS_COLLECTED_KEY, COLUMNS_EVAL_KEY
+from relevance_v30 import is_excluded, has_relevance_column, relevance_enabled, with_relevance_column
+from telemetry_v30 import print_summary
 
 # UTF-8 출력 설정
-if sys.platform == 'win32':
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+configure_stdout()
 
 # 환경 변수 로드
-load_dotenv(override=True)
-
-# Supabase 클라이언트
-supabase = create_client(
-    os.getenv('SUPABASE_URL'),
-    os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-)
+load_env()
 
-# 평가 AI (4개)
-EVALUATION_AIS = ["Claude", "ChatGPT", "Gemini", "Grok"]
-
-# 카테고리
-CATEGORIES = [
-    'expertise', 'leadership', 'vision', 'integrity', 'ethics',
-    'accountability', 'transparency', 'communication', 'responsiveness', 'publicinterest'
-]
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 def print_step(step_num, title):
@@ -57,15 +56,15 @@ def print_step(step_num, title):
 
 
 def run_command(cmd, description):
-    """명령어 실행"""
+    """명령어 실행 (cmd: 인자 목록)"""
     print(f"▶ {description}")
-    print(f"  명령어: {cmd}\n")
+    print(f"  명령어: {subprocess.list2cmdline(cmd)}\n")
 
     # UTF-8 인코딩 강제 (subprocess 자식 프로세스용)
     env = os.environ.copy()
     env['PYTHONIOENCODING'] = 'utf-8'
 
-    result = subprocess.run(cmd, shell=True, capture_output=False, text=True, env=env)
+    result = subprocess.run(cmd, capture_output=False, text=True, env=env)
 
     if result.returncode != 0:
         print(f"\n❌ 오류 발생: 명령어 실행 실패 (exit code: {result.returncode})")
@@ -75,6 +74,29 @@ def run_command(cmd, description):
     return True
 
 
+def run_stage(module_name, argv, description, isolated=False):
+    """단계 스크립트 실행 (기본: 같은 프로세스에서 main(), isolated면 새 python 프로세스)"""
+    if isolated:
+        script = os.path.join(SCRIPTS_DIR, f"{module_name}.py")
+        return run_command([sys.executable, script] + argv, description)
+
+    print(f"▶ {description}")
+    print(f"  실행: {module_name} {' '.join(argv)} (같은 프로세스)\n")
+    started = time.time()
+    exit_code = run_main(module_name, argv)
+
+    if exit_code != 0:
+        print(f"\n❌ 오류 발생: 단계 실행 실패 (exit code: {exit_code})")
+        return False
+
+    print(f"\n✅ 완료 ({time.time() - started:.1f}초)\n")
+    return True
+
+
+def politician_args(politician_id, politician_name, *extra):
+    return [f"--politician_id={politician_id}", f"--politician_name={politician_name}"] + [arg for arg in extra if arg]
+
+
 def check_collection_quality(politician_id):
     """수집 품질 확인"""
     print_step("2", "수집 검증")
@@ -106,8 +128,11 @@ def check_evaluation_quality(politician_id):
     """평가 품질 확인"""
     print_step("5", "평가 검증")
 
-    # 수집 데이터 개수
-    collected_result = supabase.table('collected_data_v30').select('id', count='exact').eq('politician_id', politician_id).execute()
+    # 수집 데이터 개수 (관련성 필터로 제외된 항목은 평가 대상 아님)
+    query = supabase.table('collected_data_v30').select('id', count='exact').eq('politician_id', politician_id)
+    if relevance_enabled() and has_relevance_column():
+        query = query.eq('is_relevant', True)
+    collected_result = query.execute()
     collected_count = collected_result.count if collected_result.count else 0
 
     # 평가 데이터 개수
@@ -119,7 +144,7 @@ def check_evaluation_quality(politician_id):
 
     completion = eval_count / expected * 100 if expected > 0 else 0
 
-    print(f"수집 데이터: {collected_count}개")
+    print(f"수집 데이터: {collected_count}개 (평가 대상)")
     print(f"평가 데이터: {eval_count}개")
     print(f"기대 평가: {expected}개 (수집 × 4 AIs)")
     print(f"완성도: {completion:.2f}%")
@@ -139,29 +164,12 @@ def get_missing_evaluations(politician_id):
 
     print("누락된 평가 조회 중...")
 
-    # 모든 수집 데이터 조회
-    all_collected = []
-    offset = 0
-    while True:
-        result = supabase.table('collected_data_v30').select('*').eq('politician_id', politician_id).range(offset, offset + 999).execute()
-        if not result.data:
-            break
-        all_collected.extend(result.data)
-        offset += 1000
-        if len(result.data) < 1000:
-            break
-
-    # 모든 평가 데이터 조회
-    all_evals = []
-    offset = 0
-    while True:
-        result = supabase.table('evaluations_v30').select('collected_data_id, evaluator_ai').eq('politician_id', politician_id).range(offset, offset + 999).execute()
-        if not result.data:
-            break
-        all_evals.extend(result.data)
-        offset += 1000
-        if len(result.data) < 1000:
-            break
+    # 모든 수집 데이터 / 평가 데이터 조회 (키셋 페이지네이션)
+    all_collected = [
+        item for item in iter_collected_data(politician_id, columns=with_relevance_column(COLUMNS_COLLECTED_KEY))
+        if not is_excluded(item)
+    ]
+    all_evals = list(iter_evaluations(politician_id, columns=COLUMNS_EVAL_KEY))
 
     # collected_data_id별로 평가한 AI 매핑
     cid_to_ais = defaultdict(set)
@@ -191,7 +199,7 @@ def get_missing_evaluations(politician_id):
     return missing
 
 
-def reevaluate_missing(politician_id, politician_name, parallel=False):
+def reevaluate_missing(politician_id, politician_name, parallel=False, isolated=False):
     """누락된 평가 재실행 (evaluate_v30.py 재실행으로 자동 처리)"""
     print_step("6", "재평가 (누락 평가 처리)")
 
@@ -205,11 +213,10 @@ def reevaluate_missing(politician_id, politician_name, parallel=False):
     print(f"재평가를 시작합니다...\n")
     print(f"▶ evaluate_v30.py를 재실행하여 누락된 평가만 처리합니다.\n")
 
-    # evaluate_v30.py 재실행 (check_already_evaluated가 100% 체크하므로 누락된 것만 평가)
-    parallel_flag = "--parallel" if parallel else ""
-    cmd = f'python evaluate_v30.py --politician_id={politician_id} --politician_name="{politician_name}" {parallel_flag}'
+    # evaluate_v30.py 재실행 (collected_data_id 단위로 저장된 평가를 건너뛰므로 누락된 것만 평가)
+    argv = politician_args(politician_id, politician_name, "--parallel" if parallel else "")
 
-    success = run_command(cmd, "evaluate_v30.py 재실행 (누락 평가 자동 처리)")
+    success = run_stage("evaluate_v30", argv, "evaluate_v30.py 재실행 (누락 평가 자동 처리)", isolated)
 
     if not success:
         print("❌ 재평가 실패\n")
@@ -229,6 +236,18 @@ def reevaluate_missing(politician_id, politician_name, parallel=False):
     return True
 
 
+def confirm_continue(on_fail):
+    """검증 실패 시 계속 진행 여부 (ask: 사용자 입력, continue/stop: 비대화형)"""
+    if on_fail == 'continue':
+        print("  → --on-fail=continue: 계속 진행")
+        return True
+    if on_fail == 'stop':
+        print("  → --on-fail=stop: 워크플로우 중단")
+        return False
+    user_input = input("계속 진행하시겠습니까? (y/n): ")
+    return user_input.lower() == 'y'
+
+
 def main():
     parser = argparse.ArgumentParser(description='V30 전체 워크플로우 자동 실행')
     parser.add_argument('--politician_id', required=True, help='정치인 ID')
@@ -236,6 +255,10 @@ def main():
     parser.add_argument('--skip_collect', action='store_true', help='수집 단계 건너뛰기')
     parser.add_argument('--skip_evaluate', action='store_true', help='평가 단계 건너뛰기')
     parser.add_argument('--parallel', action='store_true', help='병렬 실행')
+    parser.add_argument('--on-fail', dest='on_fail', choices=['ask', 'continue', 'stop'], default='ask',
+                        help='검증 실패 시 동작 (ask: 묻기, continue: 계속, stop: 중단)')
+    parser.add_argument('--isolated', action='store_true',
+                        help='단계마다 새 python 프로세스로 실행 (기본: 같은 프로세스)')
 
     args = parser.parse_args()
 
@@ -248,9 +271,8 @@ def main():
     # 1. 수집
     if not args.skip_collect:
         print_step("1", "데이터 수집")
-        parallel_flag = "--parallel" if args.parallel else ""
-        cmd = f'python collect_v30.py --politician_id={args.politician_id} --politician_name="{args.politician_name}" {parallel_flag}'
-        if not run_command(cmd, "데이터 수집 실행"):
+        argv = politician_args(args.politician_id, args.politician_name, "--parallel" if args.parallel else "")
+        if not run_stage("collect_v30", argv, "데이터 수집 실행", args.isolated):
             print("❌ 워크플로우 중단: 수집 실패")
             return
 
@@ -259,14 +281,13 @@ def main():
 
     if not collection_quality_ok:
         print("⚠️ 수집 품질 검증 실패")
-        user_input = input("계속 진행하시겠습니까? (y/n): ")
-        if user_input.lower() != 'y':
+        if not confirm_continue(args.on_fail):
             print("워크플로우 중단")
             return
 
     # 3. 데이터 검증, 중복 제거 및 재수집 (validate_v30.py)
     print_step("3", "데이터 검증, 중복 제거 및 재수집")
-    cmd = f'python validate_v30.py --politician_id={args.politician_id} --politician_name="{args.politician_name}" --mode=all'
+    argv = politician_args(args.politician_id, args.politician_name, "--mode=all")
 
     print("▶ 수집 데이터 검증 중...")
     print("  - URL 실제 존재 여부 확인")
@@ -275,19 +296,23 @@ def main():
     print("  - 중복 데이터 자동 제거 (같은 AI + 같은 URL)")
     print("  - 검증 실패 시 자동 재수집\n")
 
-    if not run_command(cmd, "데이터 검증 및 재수집 실행"):
+    if not run_stage("validate_v30", argv, "데이터 검증 및 재수집 실행", args.isolated):
         print("⚠️ 검증/재수집 중 오류 발생")
-        user_input = input("계속 진행하시겠습니까? (y/n): ")
-        if user_input.lower() != 'y':
+        if not confirm_continue(args.on_fail):
             print("워크플로우 중단")
             return
 
+    # 3-1. 관련성 필터 (평가 전 동명이인/무관 항목 제외)
+    print_step("3-1", "관련성 필터")
+    argv = politician_args(args.politician_id, args.politician_name)
+    if not run_stage("relevance_v30", argv, "관련성 점수 계산 및 평가 제외 태그", args.isolated):
+        print("⚠️ 관련성 필터 중 오류 발생 (전체 항목 평가)")
+
     # 4. 평가
     if not args.skip_evaluate:
         print_step("4", "데이터 평가")
-        parallel_flag = "--parallel" if args.parallel else ""
-        cmd = f'python evaluate_v30.py --politician_id={args.politician_id} --politician_name="{args.politician_name}" {parallel_flag}'
-        if not run_command(cmd, "데이터 평가 실행"):
+        argv = politician_args(args.politician_id, args.politician_name, "--parallel" if args.parallel else "")
+        if not run_stage("evaluate_v30", argv, "데이터 평가 실행", args.isolated):
             print("❌ 워크플로우 중단: 평가 실패")
             return
 
@@ -296,10 +321,9 @@ def main():
 
     # 6. 재평가 (누락 평가 처리)
     if needs_reevaluation:
-        if not reevaluate_missing(args.politician_id, args.politician_name, args.parallel):
+        if not reevaluate_missing(args.politician_id, args.politician_name, args.parallel, args.isolated):
             print("⚠️ 재평가 중 일부 실패")
-            user_input = input("계속 진행하시겠습니까? (y/n): ")
-            if user_input.lower() != 'y':
+            if not confirm_continue(args.on_fail):
                 print("워크플로우 중단")
                 return
 
@@ -309,8 +333,8 @@ def main():
 
     # 7. 점수 계산
     print_step("7", "점수 계산")
-    cmd = f'python calculate_v30_scores.py --politician_id={args.politician_id} --politician_name="{args.politician_name}"'
-    if not run_command(cmd, "점수 계산 실행"):
+    argv = politician_args(args.politician_id, args.politician_name)
+    if not run_stage("calculate_v30_scores", argv, "점수 계산 실행", args.isolated):
         print("❌ 워크플로우 중단: 점수 계산 실패")
         return
 
@@ -319,6 +343,7 @@ def main():
     print(f"✅ V30 전체 워크플로우 완료!")
     print(f"종료 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}\n")
+    print_summary()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,525 @@
+# -*- coding: utf-8 -*-
+"""
+V30 다중 정치인 작업 스케줄러 (SQLite 영구 작업 큐)
+
+배경:
+- run_v30_workflow.py는 정치인 1명씩 subprocess로 단계를 순서대로 실행
+- 품질 검증 실패 시 input()에서 멈춤 → 30명 무인 실행 불가
+
+핵심:
+1. 작업 단위: (정치인, 단계, AI, 카테고리) → SQLite 큐에 영구 저장
+   - collect: AI × 카테고리 (collect_with_ai)
+   - validate: 정치인 1개 (수집 품질 확인 + run_validation_pipeline)
+   - relevance: 정치인 1개 (relevance_v30.filter_politician, 무관 항목 평가 제외)
+   - evaluate: AI × 카테고리 (evaluate_category, collected_data_id 단위 재개)
+   - score: 정치인 1개 (calculate_scores)
+2. 단계 의존성: 같은 정치인의 앞 단계 작업이 모두 끝나야 다음 단계 시작
+   (정치인끼리는 독립 → 한 명이 평가 중일 때 다른 명은 수집)
+3. 단계별 워커 풀: --workers collect=4,validate=2,relevance=2,evaluate=8,score=2
+   (API 호출 속도는 rate_limiter_v30이 공급자별로 제어)
+4. 재시도: 실패 시 지수 백오프 (RETRY_BASE_DELAY × 2^시도), MAX_ATTEMPTS 초과 시 failed
+   - 예외 없이 끝나도 수집 목표 미달 / 미평가 항목이 남으면 실패 (재시도는 남은 만큼만)
+5. 비대화형 실패 정책 (--on-fail)
+   - continue: 실패한 작업은 기록만 하고 다음 단계 진행 (기본, 무인 실행용)
+   - block: 실패한 작업이 있으면 해당 정치인의 다음 단계 보류
+6. 중단 후 재실행: running 상태로 남은 작업은 pending으로 되돌려 이어서 실행
+
+사용법:
+    # 1. 명단 등록 (설계문서_V6.0/*_politician_ids.txt, "이름<TAB>ID" 형식)
+    python scheduler_v30.py --mode=enqueue --roster ../../../설계문서_V6.0/busan_politician_ids.txt
+
+    # 명단 생략 시 설계문서_V6.0/*_politician_ids.txt 전체
+    python scheduler_v30.py --mode=enqueue
+
+    # 2. 실행 (큐가 빌 때까지)
+    python scheduler_v30.py --mode=run --workers collect=4,evaluate=8
+
+    # 상태 확인 / 실패 작업 재시도
+    python scheduler_v30.py --mode=status
+    python scheduler_v30.py --mode=retry
+"""
+
+import os
+import glob
+import time
+import sqlite3
+import argparse
+import traceback
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from engine_v30 import CATEGORIES, EVALUATION_AIS, configure_stdout
+from telemetry_v30 import telemetry_context
+
+# UTF-8 출력 설정
+configure_stdout()
+
+V30_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_QUEUE_PATH = os.path.join(V30_DIR, ".cache", "scheduler_v30.sqlite3")
+DEFAULT_ROSTER_GLOB = os.path.join(V30_DIR, "..", "..", "설계문서_V6.0", "*_politician_ids.txt")
+
+STAGES = ["collect", "validate", "relevance", "evaluate", "score"]
+COLLECT_AIS = ["Grok", "Gemini"]  # collect_all_for_politician과 같은 순서 (Grok 우선)
+
+DEFAULT_WORKERS = {"collect": 4, "validate": 2, "relevance": 2, "evaluate": 8, "score": 2}
+MAX_ATTEMPTS = 4
+RETRY_BASE_DELAY = 30     # 초 (30 → 60 → 120)
+POLL_INTERVAL = 1.0       # 스케줄러 루프 간격 (초)
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+# ============================================================
+# 작업 큐 (SQLite)
+# ============================================================
+
+class JobQueue:
+    """(정치인, 단계, AI, 카테고리) 작업 큐 - 스케줄러 메인 스레드에서만 사용"""
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                politician_id TEXT NOT NULL,
+                politician_name TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                ai TEXT NOT NULL DEFAULT '',
+                category TEXT NOT NULL DEFAULT '',
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_run_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                result TEXT,
+                updated_at TEXT,
+                UNIQUE(politician_id, stage, ai, category)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, stage)")
+        self.conn.commit()
+
+    def add(self, politician_id, politician_name, stage, ai='', category='', priority=0):
+        """작업 등록 (이미 있으면 무시), 등록 여부 반환"""
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO jobs (politician_id, politician_name, stage, ai, category, priority, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (politician_id, politician_name, stage, ai, category, priority, now_str())
+        )
+        self.conn.commit()
+        return cursor.rowcount > 0
+
+    def reset_running(self):
+        """중단된 실행에서 running으로 남은 작업 복구"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+            (STATUS_PENDING, now_str(), STATUS_RUNNING)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def retry_failed(self):
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = ?, attempts = 0, next_run_at = 0, updated_at = ? WHERE status = ?",
+            (STATUS_PENDING, now_str(), STATUS_FAILED)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def blocked_politicians(self, on_fail):
+        """앞 단계가 안 끝난 정치인별 현재 단계 {politician_id: 진행 가능한 단계 index}"""
+        rows = self.conn.execute(
+            "SELECT politician_id, stage, status, COUNT(*) AS n FROM jobs GROUP BY politician_id, stage, status"
+        ).fetchall()
+        unfinished = {}   # politician_id → 끝나지 않은 가장 앞 단계 index
+        failed = {}       # politician_id → 실패가 있는 가장 앞 단계 index
+        for row in rows:
+            index = STAGES.index(row['stage'])
+            if row['status'] in (STATUS_PENDING, STATUS_RUNNING):
+                unfinished[row['politician_id']] = min(unfinished.get(row['politician_id'], index), index)
+            elif row['status'] == STATUS_FAILED:
+                failed[row['politician_id']] = min(failed.get(row['politician_id'], index), index)
+
+        allowed = {}
+        for politician_id, index in unfinished.items():
+            if on_fail == "block" and politician_id in failed:
+                index = min(index, failed[politician_id])
+            allowed[politician_id] = index
+        return allowed
+
+    def claim(self, stage, limit, allowed_stage):
+        """실행 가능한 작업을 limit개까지 running으로 변경 후 반환"""
+        if limit <= 0:
+            return []
+        stage_index = STAGES.index(stage)
+        rows = self.conn.execute(
+            "SELECT * FROM jobs WHERE stage = ? AND status = ? AND next_run_at <= ? "
+            "ORDER BY priority, id",
+            (stage, STATUS_PENDING, time.time())
+        ).fetchall()
+
+        claimed = []
+        for row in rows:
+            if len(claimed) >= limit:
+                break
+            # 같은 정치인의 앞 단계가 끝나지 않았으면 대기
+            if allowed_stage.get(row['politician_id'], stage_index) < stage_index:
+                continue
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (STATUS_RUNNING, now_str(), row['id'])
+            )
+            claimed.append(dict(row, attempts=row['attempts'] + 1))
+        self.conn.commit()
+        return claimed
+
+    def complete(self, job_id, result):
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+            (STATUS_DONE, str(result)[:500], now_str(), job_id)
+        )
+        self.conn.commit()
+
+    def fail(self, job, error):
+        """실패 기록: 재시도 가능하면 백오프 후 pending, 아니면 failed"""
+        if job['attempts'] < MAX_ATTEMPTS:
+            delay = RETRY_BASE_DELAY * (2 ** (job['attempts'] - 1))
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, next_run_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (STATUS_PENDING, time.time() + delay, error[-2000:], now_str(), job['id'])
+            )
+            status = f"재시도 대기 {delay}초"
+        else:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (STATUS_FAILED, error[-2000:], now_str(), job['id'])
+            )
+            status = "최종 실패"
+        self.conn.commit()
+        return status
+
+    def has_runnable(self, allowed_stage):
+        """지금 또는 백오프 후 실행 가능한 pending 작업이 있는지 (block 정책 보류 제외)"""
+        rows = self.conn.execute(
+            "SELECT politician_id, stage FROM jobs WHERE status = ?", (STATUS_PENDING,)
+        ).fetchall()
+        return any(
+            allowed_stage.get(row['politician_id'], STAGES.index(row['stage'])) >= STAGES.index(row['stage'])
+            for row in rows
+        )
+
+    def has_unfinished(self):
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (STATUS_PENDING, STATUS_RUNNING)
+        ).fetchone()
+        return row[0] > 0
+
+    def unfinished_politician_ids(self):
+        rows = self.conn.execute(
+            "SELECT DISTINCT politician_id FROM jobs WHERE status IN (?, ?)", (STATUS_PENDING, STATUS_RUNNING)
+        ).fetchall()
+        return [row['politician_id'] for row in rows]
+
+    def summary(self):
+        return self.conn.execute(
+            "SELECT stage, status, COUNT(*) AS n FROM jobs GROUP BY stage, status ORDER BY stage, status"
+        ).fetchall()
+
+    def politician_summary(self):
+        return self.conn.execute(
+            "SELECT politician_id, politician_name, "
+            "SUM(status = 'done') AS done, SUM(status = 'failed') AS failed, COUNT(*) AS total "
+            "FROM jobs GROUP BY politician_id, politician_name ORDER BY politician_name"
+        ).fetchall()
+
+    def failed_jobs(self):
+        return self.conn.execute(
+            "SELECT * FROM jobs WHERE status = ? ORDER BY politician_name, stage", (STATUS_FAILED,)
+        ).fetchall()
+
+
+def now_str():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+# ============================================================
+# 명단 / 작업 등록
+# ============================================================
+
+def load_roster(paths):
+    """"이름<TAB>ID" 형식 명단 파일 → [(politician_id, politician_name)]"""
+    politicians = []
+    seen = set()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.strip().split()
+                if len(parts) < 2:
+                    continue
+                name, politician_id = ' '.join(parts[:-1]), parts[-1]
+                if politician_id not in seen:
+                    seen.add(politician_id)
+                    politicians.append((politician_id, name))
+    return politicians
+
+
+def enqueue_politician(queue, politician_id, politician_name, stages=STAGES):
+    """정치인 1명의 전체 작업 등록, 새로 등록된 작업 수 반환"""
+    added = 0
+    for stage in stages:
+        if stage == "collect":
+            for ai_index, ai_name in enumerate(COLLECT_AIS):
+                for cat_name, _cat_korean in CATEGORIES:
+                    added += queue.add(politician_id, politician_name, stage, ai_name, cat_name, priority=ai_index)
+        elif stage == "evaluate":
+            for ai_name in EVALUATION_AIS:
+                for cat_name, _cat_korean in CATEGORIES:
+                    added += queue.add(politician_id, politician_name, stage, ai_name, cat_name)
+        else:
+            added += queue.add(politician_id, politician_name, stage)
+    return added
+
+
+# ============================================================
+# 작업 실행 (워커 스레드)
+# ============================================================
+
+def run_job(job, on_fail):
+    """작업 1개 실행 (예외 발생 = 실패 → 재시도 대상, 하위 호출은 작업 단위 계측 문맥으로 기록)"""
+    with telemetry_context(stage=job['stage'], politician_id=job['politician_id'],
+                           category=job.get('category'), job_attempt=job['attempts']):
+        return _run_job(job, on_fail)
+
+
+def _run_job(job, on_fail):
+    stage = job['stage']
+    politician_id = job['politician_id']
+    politician_name = job['politician_name']
+
+    if stage == "collect":
+        import collect_v30 as cv
+        category_idx, category_korean = next(
+            (i, kor) for i, (eng, kor) in enumerate(cv.CATEGORIES, 1) if eng == job['category']
+        )
+        saved = cv.collect_with_ai(
+            job['ai'], politician_id, politician_name, category_idx, job['category'], category_korean
+        )
+        # collect_with_ai는 API 실패를 삼키고 저장 수만 반환 → 목표 미달이면 실패로 돌려 재시도
+        shortfall = collect_shortfall(cv, job['ai'], politician_id, job['category'])
+        if shortfall:
+            raise RuntimeError(f"수집 목표 미달: {shortfall}개 부족 (이번 실행 {saved or 0}개 저장)")
+        return saved
+
+    if stage == "validate":
+        import run_v30_workflow as workflow
+        import validate_v30
+        if not workflow.check_collection_quality(politician_id) and on_fail == "block":
+            raise RuntimeError("수집 품질 기준 미달 (--on-fail=block)")
+        return validate_v30.run_validation_pipeline(politician_id, politician_name, mode='all')
+
+    if stage == "relevance":
+        import relevance_v30
+        return relevance_v30.filter_politician(politician_id, politician_name)
+
+    if stage == "evaluate":
+        import evaluate_v30 as ev
+        evaluated = ev.evaluate_category(
+            job['ai'], politician_id, politician_name, job['category'],
+            ev.CATEGORY_MAP.get(job['category'], job['category'])
+        )
+        # evaluate_category도 배치 실패를 삼킴 → 미평가 항목이 남았으면 실패로 돌려 재시도 (재시도는 남은 항목만)
+        remaining = unevaluated_count(ev, job['ai'], politician_id, job['category'])
+        if remaining:
+            raise RuntimeError(f"미평가 {remaining}개 남음 (이번 실행 {evaluated}개 평가)")
+        return evaluated
+
+    if stage == "score":
+        import calculate_v30_scores
+        return calculate_v30_scores.calculate_scores(politician_id, politician_name)
+
+    raise ValueError(f"알 수 없는 단계: {stage}")
+
+
+def collect_shortfall(cv, ai_name, politician_id, category_name):
+    """AI × 카테고리 수집 목표 대비 부족한 개수 (진행 현황 스냅샷 기준, 저장 시 로컬 갱신됨)"""
+    from progress_v30 import get_progress
+    progress = get_progress(politician_id)
+    shortfall = 0
+    for data_type, topic_mode, count in cv.iter_collection_units(cv.SENTIMENT_DISTRIBUTION[ai_name]):
+        existing = progress.collected_count(category_name, data_type, ai_name,
+                                            cv.topic_mode_to_sentiment(topic_mode))
+        shortfall += max(0, count - existing)
+    return shortfall
+
+
+def unevaluated_count(ev, ai_name, politician_id, category_name):
+    """평가 대상(풀링 데이터) 중 아직 평가가 저장되지 않은 개수"""
+    pooled_ids = {item.get('id') for item in ev.get_pooled_data(politician_id, category_name)}
+    return len(pooled_ids - ev.get_evaluated_ids(politician_id, ai_name, category_name))
+
+
+def describe(job):
+    parts = [job['politician_name'], job['stage']]
+    if job['ai']:
+        parts.append(job['ai'])
+    if job['category']:
+        parts.append(job['category'])
+    return "/".join(parts)
+
+
+def run_scheduler(queue, workers, on_fail):
+    """큐가 빌 때까지 단계별 워커 풀로 실행"""
+    recovered = queue.reset_running()
+    if recovered:
+        print(f"🔁 중단된 작업 {recovered}개 복구 (pending)")
+
+    # 남은 작업의 정치인 프로필을 한 번에 로드 (수집/평가 워커가 공용 캐시 사용)
+    from politician_profiles_v30 import prefetch_profiles
+    politician_ids = queue.unfinished_politician_ids()
+    if politician_ids:
+        print(f"👤 정치인 프로필 {prefetch_profiles(politician_ids)}/{len(politician_ids)}명 로드")
+
+    executors = {
+        stage: ThreadPoolExecutor(max_workers=workers[stage], thread_name_prefix=f"v30-{stage}")
+        for stage in STAGES
+    }
+    running = {}  # future → job
+
+    print(f"\n{'#'*60}")
+    print(f"# V30 스케줄러 시작: {now_str()}")
+    print(f"# 워커: " + ", ".join(f"{stage}={workers[stage]}" for stage in STAGES))
+    print(f"# 실패 정책: {on_fail}")
+    print(f"{'#'*60}\n")
+
+    try:
+        while True:
+            # 1. 끝난 작업 반영
+            for future in [f for f in running if f.done()]:
+                job = running.pop(future)
+                try:
+                    result = future.result()
+                    queue.complete(job['id'], result)
+                    print(f"✅ {describe(job)} 완료 (결과: {result})")
+                except Exception as e:
+                    error = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+                    status = queue.fail(job, error)
+                    print(f"❌ {describe(job)} 실패 ({job['attempts']}/{MAX_ATTEMPTS}회, {status}): {e}")
+
+            # 2. 단계별 빈 워커만큼 작업 배정
+            allowed = queue.blocked_politicians(on_fail)
+            for stage in STAGES:
+                busy = sum(1 for job in running.values() if job['stage'] == stage)
+                for job in queue.claim(stage, workers[stage] - busy, allowed):
+                    print(f"▶ {describe(job)} 시작 ({job['attempts']}회차)")
+                    running[executors[stage].submit(run_job, job, on_fail)] = job
+
+            if not running and not queue.has_unfinished():
+                break
+            if not running and not queue.has_runnable(allowed):
+                print("⏸️ 남은 작업은 모두 앞 단계 실패로 보류됨 (--on-fail=block)")
+                break
+            time.sleep(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        print("\n⏹️ 중단 요청 - 실행 중인 작업이 끝나면 종료합니다 (다음 실행 시 이어서 진행)")
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+        for future, job in running.items():
+            if future.done() and not future.cancelled():
+                try:
+                    queue.complete(job['id'], future.result())
+                except Exception as e:
+                    queue.fail(job, str(e))
+
+    print_status(queue)
+
+
+def print_status(queue):
+    print(f"\n{'='*60}")
+    print(f"V30 스케줄러 상태 ({now_str()})")
+    print(f"{'='*60}")
+    for row in queue.summary():
+        print(f"  {row['stage']:<10} {row['status']:<8} {row['n']:>5}개")
+
+    print(f"\n정치인별 진행:")
+    for row in queue.politician_summary():
+        mark = "✅" if row['done'] == row['total'] else ("⚠️" if row['failed'] else "⏳")
+        print(f"  {mark} {row['politician_name']} ({row['politician_id']}): {row['done']}/{row['total']}"
+              + (f" (실패 {row['failed']})" if row['failed'] else ""))
+
+    failed = queue.failed_jobs()
+    if failed:
+        print(f"\n❌ 실패 작업 {len(failed)}개 (--mode=retry로 재시도):")
+        for job in failed[:20]:
+            last_line = (job['last_error'] or '').strip().splitlines()[-1:] or ['']
+            print(f"  - {describe(job)}: {last_line[0][:100]}")
+
+
+def parse_workers(spec):
+    """"collect=4,evaluate=8" → 단계별 워커 수 (나머지는 기본값)"""
+    workers = dict(DEFAULT_WORKERS)
+    if spec:
+        for part in spec.split(','):
+            stage, _, value = part.partition('=')
+            stage = stage.strip()
+            if stage not in workers:
+                raise ValueError(f"알 수 없는 단계: {stage} (가능: {', '.join(STAGES)})")
+            workers[stage] = max(1, int(value))
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description='V30 다중 정치인 작업 스케줄러')
+    parser.add_argument('--mode', choices=['enqueue', 'run', 'status', 'retry'], default='run',
+                        help='enqueue: 명단 등록, run: 실행, status: 상태, retry: 실패 작업 재시도 등록')
+    parser.add_argument('--roster', nargs='*', help='명단 파일 ("이름<TAB>ID", 기본: 설계문서_V6.0/*_politician_ids.txt)')
+    parser.add_argument('--politician_id', help='정치인 1명만 등록')
+    parser.add_argument('--politician_name', help='정치인 이름 (--politician_id와 함께)')
+    parser.add_argument('--stages', help=f'등록할 단계 (기본: {",".join(STAGES)})')
+    parser.add_argument('--workers', help='단계별 워커 수 (예: collect=4,evaluate=8)')
+    parser.add_argument('--on-fail', dest='on_fail', choices=['continue', 'block'], default='continue',
+                        help='실패 정책 (continue: 기록 후 진행, block: 해당 정치인 다음 단계 보류)')
+    parser.add_argument('--queue', default=DEFAULT_QUEUE_PATH, help='큐 DB 경로')
+    args = parser.parse_args()
+
+    queue = JobQueue(args.queue)
+
+    if args.mode == 'enqueue':
+        stages = args.stages.split(',') if args.stages else STAGES
+        for stage in stages:
+            if stage not in STAGES:
+                parser.error(f"알 수 없는 단계: {stage}")
+
+        if args.politician_id:
+            politicians = [(args.politician_id, args.politician_name or args.politician_id)]
+        else:
+            paths = args.roster or sorted(glob.glob(DEFAULT_ROSTER_GLOB))
+            if not paths:
+                parser.error("명단 파일이 없습니다 (--roster 지정)")
+            politicians = load_roster(paths)
+
+        total = 0
+        for politician_id, politician_name in politicians:
+            added = enqueue_politician(queue, politician_id, politician_name, stages)
+            total += added
+            print(f"  + {politician_name} ({politician_id}): {added}개 작업")
+        print(f"\n✅ {len(politicians)}명, {total}개 작업 등록")
+
+    elif args.mode == 'run':
+        run_scheduler(queue, parse_workers(args.workers), args.on_fail)
+
+    elif args.mode == 'retry':
+        print(f"🔁 실패 작업 {queue.retry_failed()}개 재등록")
+
+    else:
+        print_status(queue)
+
+
+if __name__ == "__main__":
+    main()
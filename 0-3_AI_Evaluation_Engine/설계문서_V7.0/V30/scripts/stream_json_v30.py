@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+V30 LLM 스트리밍 응답 + 점진적 JSON 항목 파서
+
+배경:
+- collect_v30.collect_data_type: remaining개를 요청하고 응답 전체를 기다린 뒤 parse_json_response로 파싱,
+  목표(actual_target) 초과분과 collected_urls 중복은 받은 뒤에 버림
+- evaluate_v30.evaluate_batch: 배치 항목 수보다 많은 평가/뒤따르는 설명도 끝까지 생성됨
+- 버려지는 항목도 출력 토큰 비용 + 대기 시간은 그대로 발생
+
+핵심:
+1. JsonItemParser: 텍스트 조각을 받을 때마다 배열 안의 객체({...})가 닫히는 즉시 반환
+   - [{...}, ...] / {"items": [...]} / {"evaluations": [...]} / ```json 블록 모두 처리
+   - 문자열 안의 괄호/이스케이프는 무시, 항목 하나가 깨져도 json_repair로 복구 시도
+2. stream_text: 공급자 스트림 → 텍스트 조각 제너레이터
+   - 호출 측이 제너레이터를 닫으면 스트림 연결도 닫힘 (남은 출력 토큰 생성 중단)
+   - 레이트 리미터 슬롯은 스트림이 끝나거나 닫힐 때 반환
+3. V30_STREAMING=off 또는 --no-stream: 기존 방식(응답 전체 대기)으로 호출
+
+사용법:
+    from stream_json_v30 import JsonItemParser
+
+    parser = JsonItemParser()
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            ...
+"""
+
+import os
+import json
+import threading
+
+_streaming = os.getenv('V30_STREAMING', 'on').lower() not in ('off', '0', 'false', 'none')
+_streaming_lock = threading.Lock()
+
+
+def streaming_enabled():
+    return _streaming
+
+
+def disable_streaming():
+    """--no-stream 옵션용"""
+    global _streaming
+    with _streaming_lock:
+        _streaming = False
+
+
+def decode_item(text):
+    """항목 하나의 JSON 텍스트 → dict (실패 시 json_repair, 그래도 실패하면 None)"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            from json_repair import repair_json
+            return json.loads(repair_json(text))
+        except Exception:
+            return None
+
+
+class JsonItemParser:
+    """점진적 JSON 배열 항목 파서 (배열의 직계 객체만, 중첩 객체는 항목 안에 포함)"""
+
+    def __init__(self):
+        self.text = ""          # 지금까지 받은 전체 텍스트
+        self.pos = 0            # 다음에 검사할 위치
+        self.stack = []         # 열린 괄호 ('[' / '{')
+        self.in_string = False
+        self.escape = False
+        self.item_start = None  # 진행 중인 항목의 시작 위치
+        self.item_depth = 0     # 항목이 속한 배열의 깊이
+        self.count = 0          # 지금까지 반환한 항목 수
+
+    def feed(self, chunk):
+        """텍스트 조각 추가 → 이번에 완성된 항목 목록"""
+        items = []
+        if not chunk:
+            return items
+        self.text += chunk
+
+        text = self.text
+        for i in range(self.pos, len(text)):
+            ch = text[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+
+            if ch == '"':
+                # JSON 밖의 설명 문장은 문자열로 취급하지 않음
+                if self.stack:
+                    self.in_string = True
+            elif ch == '[' or ch == '{':
+                if ch == '{' and self.item_start is None and self.stack and self.stack[-1] == '[':
+                    self.item_start = i
+                    self.item_depth = len(self.stack)
+                self.stack.append(ch)
+            elif ch == ']' or ch == '}':
+                if not self.stack:
+                    continue
+                self.stack.pop()
+                if ch == '}' and self.item_start is not None and len(self.stack) == self.item_depth:
+                    item = decode_item(text[self.item_start:i + 1])
+                    self.item_start = None
+                    if isinstance(item, dict):
+                        items.append(item)
+                        self.count += 1
+
+        self.pos = len(text)
+        return items
+
+
+def stream_text(limiter, tokens, open_stream, extract_text):
+    """공급자 스트림 → 텍스트 조각 제너레이터
+
+    open_stream(): 공급자 스트림 객체 (반복 가능, close() 있으면 중단 시 호출)
+    extract_text(event): 이벤트/청크 → 텍스트 조각 (없으면 None, usage 등 부가 정보 수집도 여기서)
+    목표 도달로 닫힌 스트림도 정상 요청으로 리미터에 반영
+    """
+    limiter.acquire(tokens)
+    stream = None
+    try:
+        stream = open_stream()
+        for event in stream:
+            text = extract_text(event)
+            if text:
+                yield text
+    except GeneratorExit:
+        limiter.on_success()
+        raise
+    except Exception as e:
+        limiter.report_error(e)
+        raise
+    else:
+        limiter.on_success()
+    finally:
+        close = getattr(stream, 'close', None)
+        if close:
+            try:
+                close()
+            except Exception:
+                pass
+        limiter.release()
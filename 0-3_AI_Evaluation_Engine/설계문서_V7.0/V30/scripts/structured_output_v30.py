@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+V30 구조화 출력 (공급자별 JSON 스키마 강제 + 스키마 검증)
+
+배경:
+- collect_v30.parse_json_response / evaluate_v30.extract_json: 코드 블록 정규식 추출 + json_repair
+- evaluate_batch: JSONDecodeError면 배치 전체를 3초 대기 후 다시 요청
+- 프롬프트로만 "JSON으로 반환"을 요청 → 설명 문장, 코드 블록, 잘못된 등급이 섞여 옴
+
+핵심:
+1. 공급자 기능으로 스키마를 강제 (응답 = 스키마에 맞는 순수 JSON)
+   - Claude: 도구 1개 + tool_choice 강제 → tool_use.input (스트리밍은 input_json_delta)
+   - ChatGPT/Grok: response_format json_schema (strict)
+   - Gemini: response_mime_type=application/json + response_schema
+     (수집의 google_search grounding과는 함께 쓸 수 없음 → 수집 Gemini는 기존 방식)
+2. load_json: 순수 JSON이면 바로 로드 (정규식/복구 없음), 아니면 None → 호출 측이 기존 파서로 처리
+   (구조화 출력 이전에 캐시된 응답, 구조화 미지원 경로)
+3. schema_errors: 스키마 부분 검증 (type / required / enum / properties / items)
+   → 평가 항목별로 검증, 통과하지 못한 항목만 다시 요청 (evaluate_batch)
+4. V30_STRUCTURED=off 또는 --no-structured: 프롬프트 지시만으로 요청 (기존 방식)
+
+사용법:
+    from structured_output_v30 import EVALUATION_SCHEMA, request_kwargs, message_text
+
+    kwargs = request_kwargs("ChatGPT", "evaluations", EVALUATION_SCHEMA)
+    response = client.chat.completions.create(model=model, messages=messages, **kwargs)
+"""
+
+import os
+import json
+import threading
+
+_structured = os.getenv('V30_STRUCTURED', 'on').lower() not in ('off', '0', 'false', 'none')
+_structured_lock = threading.Lock()
+
+RATINGS = ['+4', '+3', '+2', '+1', '-1', '-2', '-3', '-4']
+
+EVALUATION_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "string"},
+        "rating": {"type": "string", "enum": RATINGS},
+        "rationale": {"type": "string"}
+    },
+    "required": ["id", "rating", "rationale"],
+    "additionalProperties": False
+}
+
+EVALUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "evaluations": {"type": "array", "items": EVALUATION_ITEM_SCHEMA}
+    },
+    "required": ["evaluations"],
+    "additionalProperties": False
+}
+
+COLLECTION_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "content": {"type": "string"},
+        "source": {"type": "string"},
+        "source_url": {"type": "string"},
+        "date": {"type": "string"}
+    },
+    "required": ["title", "content", "source", "source_url", "date"],
+    "additionalProperties": False
+}
+
+COLLECTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "items": {"type": "array", "items": COLLECTION_ITEM_SCHEMA}
+    },
+    "required": ["items"],
+    "additionalProperties": False
+}
+
+JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "integer": int,
+    "number": (int, float),
+}
+
+
+def structured_enabled():
+    return _structured
+
+
+def disable_structured_output():
+    """--no-structured 옵션용"""
+    global _structured
+    with _structured_lock:
+        _structured = False
+
+
+def gemini_schema(schema):
+    """Gemini response_schema용 (OpenAPI 부분집합: additionalProperties 제외)"""
+    if isinstance(schema, dict):
+        return {key: gemini_schema(value) for key, value in schema.items() if key != "additionalProperties"}
+    if isinstance(schema, list):
+        return [gemini_schema(value) for value in schema]
+    return schema
+
+
+def request_kwargs(ai_name, name, schema):
+    """공급자 호출에 추가할 구조화 출력 인자 (비활성화/미지원이면 {})
+
+    Gemini는 GenerateContentConfig 필드 (호출 측이 config에 합침)
+    """
+    if not _structured:
+        return {}
+
+    if ai_name == "Claude":
+        return {
+            "tools": [{
+                "name": name,
+                "description": f"{name} 결과를 JSON 스키마에 맞춰 제출",
+                "input_schema": schema
+            }],
+            "tool_choice": {"type": "tool", "name": name}
+        }
+    if ai_name in ("ChatGPT", "Grok"):
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": name, "strict": True, "schema": schema}
+            }
+        }
+    if ai_name == "Gemini":
+        return {
+            "response_mime_type": "application/json",
+            "response_schema": gemini_schema(schema)
+        }
+    return {}
+
+
+def _field(obj, key):
+    """SDK 객체 / dict 공용 속성 조회"""
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
+
+def message_text(message):
+    """Claude 응답 메시지 → 텍스트 (tool_use면 input을 JSON 문자열로, 아니면 첫 text 블록)"""
+    blocks = _field(message, 'content') or []
+    for block in blocks:
+        if _field(block, 'type') == "tool_use":
+            return json.dumps(_field(block, 'input'), ensure_ascii=False)
+    for block in blocks:
+        if _field(block, 'type') == "text":
+            return _field(block, 'text')
+    return None
+
+
+def load_json(content):
+    """구조화 출력(순수 JSON) → 파싱 결과, 순수 JSON이 아니면 None"""
+    if not content:
+        return None
+    try:
+        return json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def schema_errors(data, schema, path="$"):
+    """스키마 부분 검증 → 오류 목록 (빈 목록이면 통과)"""
+    expected = schema.get("type")
+    if expected:
+        python_type = JSON_TYPES.get(expected)
+        # bool은 int의 하위 타입 → integer/number에서 제외
+        if python_type and (not isinstance(data, python_type)
+                            or (expected in ("integer", "number") and isinstance(data, bool))):
+            return [f"{path}: {expected} 아님"]
+
+    errors = []
+    if "enum" in schema and data not in schema["enum"]:
+        errors.append(f"{path}: 허용되지 않은 값 {data!r}")
+
+    if isinstance(data, dict):
+        for key in schema.get("required", []):
+            if key not in data:
+                errors.append(f"{path}.{key}: 누락")
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in data:
+                errors.extend(schema_errors(data[key], sub_schema, f"{path}.{key}"))
+    elif isinstance(data, list) and "items" in schema:
+        for i, value in enumerate(data):
+            errors.extend(schema_errors(value, schema["items"], f"{path}[{i}]"))
+
+    return errors
@@ -0,0 +1,629 @@
+# -*- coding: utf-8 -*-
+"""
+V30 파이프라인 계측 (호출별 지연 시간 / 토큰 / 비용 / 캐시 적중)
+
+배경:
+- 계측은 print뿐: collect_all_for_politician은 전체 소요 시간 1개,
+  evaluate_v30은 실행 끝에 AI별 토큰 합계만 출력
+- 어느 단계/공급자/테이블이 느리거나 비용이 큰지 로그를 읽어야 알 수 있음
+
+핵심:
+1. span: 호출 1회 = 레코드 1개
+   - kind: llm (collect_v30.call_ai / call_ai_items, evaluate_v30.call_ai_api)
+           db  (Supabase 요청 전체, postgrest httpx 세션 event hook)
+           url (url_checker_v30 URL 확인 1건)
+   - 공통 필드: provider, model, stage, politician_id, category, latency_ms,
+     input/cached/output 토큰, cost_usd, retries, outcome(ok / error / rate_limited / cancelled)
+   - stage/politician_id/category/retries는 telemetry_context로 지정 (contextvars → 하위 호출에 전달)
+     스레드풀 작업은 submit_in_context로 제출해야 문맥이 이어짐
+2. 출력
+   - JSONL: V30/.cache/telemetry_v30.jsonl (V30_TELEMETRY_JSONL, "off"면 기록 안 함)
+     V30_TELEMETRY_JSONL_MAX_MB(기본 100)를 넘으면 .1 ~ .{JSONL_BACKUPS}로 회전 (가장 오래된 파일 삭제)
+   - Prometheus 텍스트: V30_METRICS_PORT 지정 시 http://127.0.0.1:<port>/metrics
+     (외부 스크레이프가 필요하면 V30_METRICS_HOST=0.0.0.0 - 라벨에 모델/단계/비용이 노출됨)
+     V30_METRICS_FILE 지정 시 종료할 때 파일로 저장 (node_exporter textfile 수집용)
+   - Prometheus 라벨에는 정치인 ID를 넣지 않음 (시계열 폭증 방지, 정치인별 분석은 JSONL)
+3. 비용: MODEL_PRICES (USD / 1M 토큰, V30_MODEL_PRICES JSON으로 덮어쓰기)
+4. V30_TELEMETRY=off 또는 --no-telemetry: 기록하지 않음
+
+사용법:
+    from telemetry_v30 import span, telemetry_context, record_tokens
+
+    with telemetry_context(stage="evaluate", politician_id=pid, category=cat):
+        with span("llm", "evaluate", provider="Claude", model=model):
+            response = client.messages.create(...)
+            record_tokens(usage.input_tokens, cache_read, usage.output_tokens)
+
+    # JSONL 분석 예: 단계/공급자별 지연 시간 합계
+    python telemetry_v30.py --summary
+"""
+
+import os
+import json
+import time
+import atexit
+import argparse
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from rate_limiter_v30 import is_rate_limit_error
+from engine_v30 import configure_stdout
+
+V30_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_JSONL_PATH = os.path.join(V30_DIR, ".cache", "telemetry_v30.jsonl")
+DEFAULT_JSONL_MAX_MB = 100
+JSONL_BACKUPS = 3
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+# USD / 1M 토큰 (입력, 캐시 적중 입력, 출력) - 공급자 공개 가격 기준, 변경 시 갱신
+MODEL_PRICES = {
+    "claude-3-5-haiku": (0.80, 0.08, 4.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "grok-4-fast": (0.20, 0.05, 0.50),
+    "grok-2": (2.00, 2.00, 10.00),
+    "gemini-2.0-flash": (0.10, 0.025, 0.40),
+}
+
+# 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_OFF = ('off', '0', 'false', 'none')
+
+_enabled = os.getenv('V30_TELEMETRY', 'on').lower() not in _OFF
+_enabled_lock = threading.Lock()
+
+_context = contextvars.ContextVar('v30_telemetry_context', default={})
+_current = contextvars.ContextVar('v30_telemetry_span', default=None)
+
+
+def telemetry_enabled():
+    return _enabled
+
+
+def disable_telemetry():
+    """--no-telemetry 옵션용"""
+    global _enabled
+    with _enabled_lock:
+        _enabled = False
+
+
+def _load_prices():
+    prices = dict(MODEL_PRICES)
+    raw = os.getenv('V30_MODEL_PRICES')
+    if raw:
+        try:
+            prices.update({model: tuple(values) for model, values in json.loads(raw).items()})
+        except (ValueError, TypeError) as e:
+            print(f"⚠️ V30_MODEL_PRICES 파싱 실패 (기본 가격 사용): {e}")
+    return prices
+
+
+_prices = _load_prices()
+
+
+def estimate_cost(model, input_tokens, cached_tokens, output_tokens):
+    """토큰 → USD (가격표에 없는 모델이면 None, input_tokens는 캐시 적중분 포함)"""
+    if not model:
+        return None
+    price = _prices.get(model) or next(
+        (values for prefix, values in _prices.items() if model.startswith(prefix)), None
+    )
+    if price is None:
+        return None
+    input_price, cached_price, output_price = price
+    cost = ((input_tokens - cached_tokens) * input_price + cached_tokens * cached_price
+            + output_tokens * output_price) / 1_000_000
+    return round(cost, 8)
+
+
+# ============================================================
+# 문맥 (단계 / 정치인 / 카테고리 / 재시도 횟수)
+# ============================================================
+@contextmanager
+def telemetry_context(**attrs):
+    """블록 안의 모든 span에 붙일 공통 속성"""
+    token = _context.set({**_context.get(), **attrs})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    """현재 문맥을 유지한 채 스레드풀에 제출 (ThreadPoolExecutor는 contextvars를 넘기지 않음)"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+# ============================================================
+# span
+# ============================================================
+class Span:
+    """호출 1회 기록 (finish 1번만 반영)"""
+
+    def __init__(self, kind, name, attrs):
+        self.kind = kind
+        self.name = name
+        self.attrs = {**_context.get(), **attrs}
+        self.input_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+        self.has_tokens = False
+        self.outcome = "ok"
+        self.error = None
+        self.started = time.perf_counter()
+        self.finished = False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add_tokens(self, input_tokens=0, cached_tokens=0, output_tokens=0):
+        self.input_tokens += input_tokens or 0
+        self.cached_tokens += cached_tokens or 0
+        self.output_tokens += output_tokens or 0
+        self.has_tokens = True
+
+    def fail(self, error):
+        """예외를 잡아서 처리하는 호출부용 (예외가 밖으로 나가면 span()이 자동 기록)"""
+        self.outcome = "rate_limited" if is_rate_limit_error(error) else "error"
+        self.error = f"{type(error).__name__}: {str(error)[:200]}"
+
+    def finish(self, error=None, cancelled=False, latency=None):
+        if self.finished:
+            return
+        self.finished = True
+        if cancelled:
+            self.outcome = "cancelled"
+        elif error is not None:
+            self.fail(error)
+        if latency is None:
+            latency = time.perf_counter() - self.started
+        if _enabled:
+            _emit(self, latency)
+
+
+def start_span(kind, name, **attrs):
+    """수동 종료 span (제너레이터처럼 문맥 관리자를 쓰기 어려운 곳, finish 필수)"""
+    return Span(kind, name, attrs)
+
+
+@contextmanager
+def span(kind, name, **attrs):
+    """블록 실행 = span 1개 (예외는 outcome에 기록 후 그대로 전달)"""
+    current = Span(kind, name, attrs)
+    token = _current.set(current)
+    try:
+        yield current
+    except GeneratorExit:
+        current.finish(cancelled=True)
+        raise
+    except BaseException as e:
+        current.finish(error=e)
+        raise
+    finally:
+        _current.reset(token)
+        current.finish()
+
+
+def current_span():
+    return _current.get()
+
+
+def record_tokens(input_tokens=0, cached_tokens=0, output_tokens=0):
+    """현재 span에 토큰 사용량 추가 (span 밖이면 무시)"""
+    current = _current.get()
+    if current is not None:
+        current.add_tokens(input_tokens, cached_tokens, output_tokens)
+
+
+def usage_tokens(usage):
+    """공급자 usage 객체 → (입력, 캐시 적중 입력, 출력) 토큰 (형식을 모르면 None)
+
+    - OpenAI 호환 (ChatGPT / Grok / Perplexity): prompt_tokens, completion_tokens, prompt_tokens_details.cached_tokens
+    - Anthropic: input_tokens(캐시 제외), cache_read_input_tokens, output_tokens
+    - Gemini: usage_metadata.prompt_token_count, cached_content_token_count, candidates_token_count
+    """
+    if usage is None:
+        return None
+    if getattr(usage, 'prompt_tokens', None) is not None:
+        details = getattr(usage, 'prompt_tokens_details', None)
+        return usage.prompt_tokens, getattr(details, 'cached_tokens', 0) or 0, usage.completion_tokens or 0
+    if getattr(usage, 'input_tokens', None) is not None:
+        cached = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        return usage.input_tokens + cached, cached, usage.output_tokens or 0
+    if getattr(usage, 'prompt_token_count', None) is not None:
+        return (usage.prompt_token_count, getattr(usage, 'cached_content_token_count', 0) or 0,
+                getattr(usage, 'candidates_token_count', 0) or 0)
+    return None
+
+
+def record_usage(response):
+    """공급자 응답(또는 스트림 마지막 청크)의 usage를 현재 span에 추가, 기록했으면 True"""
+    tokens = usage_tokens(getattr(response, 'usage', None) or getattr(response, 'usage_metadata', None))
+    if tokens is None:
+        return False
+    record_tokens(*tokens)
+    return True
+
+
+def mark_error(error):
+    """현재 span을 실패로 표시 (예외를 잡고 None을 반환하는 호출부용)"""
+    current = _current.get()
+    if current is not None:
+        current.fail(error)
+
+
+def record_cache(cache, hits=0, misses=0):
+    """캐시 조회 결과 (LLM 응답 캐시 / URL 상태 캐시 등), 현재 span에는 cache=hit/miss 표시"""
+    if not _enabled or not (hits or misses):
+        return
+    labels = {"cache": cache}
+    if hits:
+        _metrics.inc("v30_cache_lookups_total", {**labels, "result": "hit"}, hits)
+    if misses:
+        _metrics.inc("v30_cache_lookups_total", {**labels, "result": "miss"}, misses)
+    current = _current.get()
+    if current is not None and hits + misses == 1:
+        current.set(cache="hit" if hits else "miss")
+
+
+# ============================================================
+# 출력 (JSONL + Prometheus 집계)
+# ============================================================
+class Metrics:
+    """Prometheus 텍스트 형식 집계 (카운터 + 지연 시간 히스토그램)"""
+
+    HELP = {
+        "v30_calls_total": ("counter", "호출 수 (kind/provider/model/stage/outcome)"),
+        "v30_call_duration_seconds": ("histogram", "호출 지연 시간"),
+        "v30_tokens_total": ("counter", "LLM 토큰 (type: input/cached/output, input은 cached 포함)"),
+        "v30_cost_usd_total": ("counter", "LLM 추정 비용 (USD)"),
+        "v30_retries_total": ("counter", "재시도 호출 수"),
+        "v30_cache_lookups_total": ("counter", "캐시 조회 (result: hit/miss)"),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}     # name → {labels: value}
+        self.histograms = {}   # name → {labels: [bucket counts..., +Inf, sum]}
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None and v != ''))
+
+    def inc(self, name, labels, value=1):
+        key = self._key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = self._key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            buckets = series.get(key)
+            if buckets is None:
+                buckets = series[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    buckets[i] += 1
+            buckets[-2] += 1
+            buckets[-1] += value
+
+    @staticmethod
+    def _labels(key, extra=()):
+        pairs = list(key) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (
+            f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+            for k, v in pairs
+        )
+        return "{" + ",".join(escaped) + "}"
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                kind, text = self.HELP.get(name, ("counter", name))
+                lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{self._labels(key)} {value:g}")
+            for name, series in sorted(self.histograms.items()):
+                kind, text = self.HELP.get(name, ("histogram", name))
+                lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+                for key, buckets in sorted(series.items()):
+                    for bound, count in zip(LATENCY_BUCKETS, buckets):
+                        lines.append(f"{name}_bucket{self._labels(key, [('le', f'{bound:g}')])} {count}")
+                    lines.append(f"{name}_bucket{self._labels(key, [('le', '+Inf')])} {buckets[-2]}")
+                    lines.append(f"{name}_sum{self._labels(key)} {buckets[-1]:.6f}")
+                    lines.append(f"{name}_count{self._labels(key)} {buckets[-2]}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = Metrics()
+_records = deque(maxlen=200_000)   # 이번 실행의 span (실행 끝 요약용)
+_jsonl = None
+_jsonl_size = 0
+_jsonl_lock = threading.Lock()
+_server = None
+_server_lock = threading.Lock()
+
+
+def _jsonl_max_bytes():
+    try:
+        return float(os.getenv('V30_TELEMETRY_JSONL_MAX_MB', DEFAULT_JSONL_MAX_MB)) * 1024 * 1024
+    except ValueError:
+        return DEFAULT_JSONL_MAX_MB * 1024 * 1024
+
+
+def _rotate_jsonl(path):
+    """path → path.1 → ... → path.JSONL_BACKUPS (가장 오래된 파일은 삭제)"""
+    for index in range(JSONL_BACKUPS, 0, -1):
+        source = path if index == 1 else f"{path}.{index - 1}"
+        if os.path.exists(source):
+            os.replace(source, f"{path}.{index}")
+
+
+def _write_jsonl(record):
+    global _jsonl, _jsonl_size
+    path = os.getenv('V30_TELEMETRY_JSONL', DEFAULT_JSONL_PATH)
+    if path.lower() in _OFF:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _jsonl_lock:
+        if _jsonl and _jsonl_size >= _jsonl_max_bytes():
+            _jsonl.close()
+            try:
+                _rotate_jsonl(path)
+            except OSError as e:
+                print(f"⚠️ 계측 JSONL 회전 실패 (이어서 기록): {e}")
+            _jsonl = None
+        if _jsonl is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                _jsonl = open(path, 'a', encoding='utf-8', buffering=1)
+                _jsonl_size = os.path.getsize(path)
+            except OSError as e:
+                print(f"⚠️ 계측 JSONL 열기 실패 (기록 안 함): {e}")
+                _jsonl = False
+        if _jsonl:
+            _jsonl.write(line)
+            _jsonl_size += len(line.encode('utf-8'))
+
+
+def _emit(current, latency):
+    attrs = current.attrs
+    provider = attrs.get('provider')
+    model = attrs.get('model')
+    stage = attrs.get('stage')
+
+    record = {
+        "ts": datetime.now().isoformat(timespec='milliseconds'),
+        "kind": current.kind,
+        "name": current.name,
+        "latency_ms": round(latency * 1000, 2),
+        "outcome": current.outcome,
+    }
+    record.update({key: value for key, value in attrs.items() if value is not None})
+    if current.error:
+        record["error"] = current.error
+
+    cost = None
+    if current.has_tokens:
+        cost = estimate_cost(model, current.input_tokens, current.cached_tokens, current.output_tokens)
+        record.update(input_tokens=current.input_tokens, cached_tokens=current.cached_tokens,
+                      output_tokens=current.output_tokens, cost_usd=cost)
+
+    labels = {"kind": current.kind, "provider": provider, "model": model, "stage": stage}
+    _metrics.inc("v30_calls_total", {**labels, "outcome": current.outcome})
+    _metrics.observe("v30_call_duration_seconds",
+                     {"kind": current.kind, "provider": provider, "stage": stage}, latency)
+    if attrs.get('retries'):
+        _metrics.inc("v30_retries_total", {"kind": current.kind, "provider": provider, "stage": stage})
+    if current.has_tokens:
+        token_labels = {"provider": provider, "model": model, "stage": stage}
+        _metrics.inc("v30_tokens_total", {**token_labels, "type": "input"}, current.input_tokens)
+        _metrics.inc("v30_tokens_total", {**token_labels, "type": "cached"}, current.cached_tokens)
+        _metrics.inc("v30_tokens_total", {**token_labels, "type": "output"}, current.output_tokens)
+        if cost:
+            _metrics.inc("v30_cost_usd_total", token_labels, cost)
+
+    _records.append(record)
+    _write_jsonl(record)
+    _ensure_server()
+
+
+def metrics_text():
+    """현재까지 집계한 Prometheus 텍스트"""
+    return _metrics.render()
+
+
+def recorded_spans():
+    """이번 실행에서 기록한 span 레코드 (복사본, benchmark_v30 단계별 집계용)"""
+    return list(_records)
+
+
+def clear_recorded_spans():
+    _records.clear()
+
+
+def start_metrics_server(port, host=None):
+    """/metrics 엔드포인트 (백그라운드 스레드, 프로세스당 1개, 기본 127.0.0.1 - V30_METRICS_HOST로 변경)"""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # 스크레이프마다 stderr 로그 남기지 않음
+
+    with _server_lock:
+        if _server is None:
+            host = host or os.getenv('V30_METRICS_HOST', DEFAULT_METRICS_HOST)
+            _server = ThreadingHTTPServer((host, int(port)), Handler)
+            threading.Thread(target=_server.serve_forever, name="v30-metrics", daemon=True).start()
+            print(f"📈 Prometheus 메트릭: http://{host}:{port}/metrics")
+    return _server
+
+
+def _ensure_server():
+    """V30_METRICS_PORT가 있으면 첫 기록 시 엔드포인트 시작 (실패해도 파이프라인은 계속)"""
+    global _server
+    if _server is not None:
+        return
+    port = os.getenv('V30_METRICS_PORT')
+    if not port:
+        _server = False
+        return
+    try:
+        start_metrics_server(port)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 메트릭 엔드포인트 시작 실패: {e}")
+        _server = False
+
+
+def _write_metrics_file():
+    path = os.getenv('V30_METRICS_FILE')
+    if not path or not _metrics.counters:
+        return
+    try:
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(metrics_text())
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ 메트릭 파일 저장 실패: {e}")
+
+
+atexit.register(_write_metrics_file)
+
+
+# ============================================================
+# Supabase 요청 계측 (postgrest httpx 세션 event hook)
+# ============================================================
+DB_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+def _db_operation(request):
+    path = request.url.path
+    name = path.split('/rest/v1/', 1)[-1].strip('/') or path
+    if name.startswith('rpc/'):
+        return "rpc", name[4:]
+    operation = DB_OPERATIONS.get(request.method, request.method.lower())
+    if operation == "insert" and 'resolution=' in request.headers.get('prefer', ''):
+        operation = "upsert"
+    return operation, name
+
+
+def _on_db_request(request):
+    request.extensions['v30_telemetry_started'] = time.perf_counter()
+
+
+def _on_db_response(response):
+    started = response.request.extensions.get('v30_telemetry_started')
+    if started is None or not _enabled:
+        return
+    operation, table = _db_operation(response.request)
+    current = Span("db", f"{operation} {table}",
+                   {"provider": "supabase", "table": table, "operation": operation,
+                    "status": response.status_code})
+    if response.status_code >= 400:
+        current.outcome = "error"
+        current.error = f"HTTP {response.status_code}"
+    current.finish(latency=time.perf_counter() - started)
+
+
+def instrument_supabase(client):
+    """Supabase 클라이언트의 모든 REST 요청을 db span으로 기록 (구조가 다르면 그대로 반환)"""
+    try:
+        session = client.postgrest.session
+        hooks = session.event_hooks
+        if _on_db_request not in hooks.get('request', []):
+            session.event_hooks = {
+                'request': list(hooks.get('request', [])) + [_on_db_request],
+                'response': list(hooks.get('response', [])) + [_on_db_response],
+            }
+    except Exception:
+        pass
+    return client
+
+
+# ============================================================
+# 요약 (실행 끝 출력 / JSONL 분석)
+# ============================================================
+def summarize(records, top=15):
+    """span 레코드 → (kind, provider, stage, name)별 호출 수/총 지연/토큰/비용 (총 지연 큰 순)"""
+    groups = {}
+    for record in records:
+        key = (record.get('kind'), record.get('provider') or '-', record.get('stage') or '-',
+               record.get('name'))
+        group = groups.setdefault(key, {'calls': 0, 'errors': 0, 'latency': 0.0, 'tokens': 0, 'cost': 0.0})
+        group['calls'] += 1
+        group['errors'] += record.get('outcome') not in ('ok', 'cancelled')
+        group['latency'] += record.get('latency_ms', 0) / 1000
+        group['tokens'] += (record.get('input_tokens') or 0) + (record.get('output_tokens') or 0)
+        group['cost'] += record.get('cost_usd') or 0
+    return sorted(groups.items(), key=lambda kv: kv[1]['latency'], reverse=True)[:top]
+
+
+def print_summary(records=None, top=15):
+    """records 생략 시 이번 실행에서 기록한 span"""
+    rows = summarize(list(_records) if records is None else records, top)
+    if not rows:
+        return
+    print(f"\n📈 계측 요약 (총 지연 시간 상위 {len(rows)}개)")
+    for (kind, provider, stage, name), group in rows:
+        print(f"   {kind:<4} {provider:<9} {stage:<9} {name[:40]:<40} "
+              f"{group['calls']:>6}회 {group['latency']:>9.1f}초 "
+              f"(실패 {group['errors']}) 토큰 {group['tokens']:,} ${group['cost']:.4f}")
+
+
+def load_jsonl(path=None, since=None):
+    """JSONL span 레코드 목록 (회전된 .N 파일 포함, 오래된 순 / since: ISO 시각 이후만)"""
+    path = path or os.getenv('V30_TELEMETRY_JSONL', DEFAULT_JSONL_PATH)
+    paths = [f"{path}.{index}" for index in range(JSONL_BACKUPS, 0, -1)] + [path]
+    records = []
+    for file_path in paths:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if since and record.get('ts', '') < since:
+                    continue
+                records.append(record)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='V30 계측 JSONL 요약')
+    parser.add_argument('--path', help=f'JSONL 경로 (기본 {DEFAULT_JSONL_PATH})')
+    parser.add_argument('--since', help='이 시각 이후만 (예: 2026-10-18T09:00)')
+    parser.add_argument('--top', type=int, default=30, help='출력할 그룹 수')
+    parser.add_argument('--summary', action='store_true', help='(기본 동작) 총 지연 시간 상위 그룹 출력')
+    args = parser.parse_args()
+
+    records = load_jsonl(args.path, args.since)
+    print(f"span {len(records):,}개")
+    print_summary(records, args.top)
+
+
+if __name__ == "__main__":
+    configure_stdout()
+    main()
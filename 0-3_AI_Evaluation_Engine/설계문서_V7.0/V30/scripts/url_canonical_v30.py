@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+V30 URL 정규화 (canonical_url) + 리다이렉트 해제 영구 캐시
+
+배경:
+- 중복 키가 source_url.strip() 그대로 (collect_v30 URL 인덱스 / validate_v30.check_duplicate /
+  evaluate_v30.get_pooled_data)
+- 추적 파라미터(utm_*, fbclid...), 모바일 호스트(m.), AMP 사본, 끝 슬래시,
+  Gemini grounding-api-redirect 래퍼가 모두 서로 다른 URL로 취급됨
+- utils/fix_grounding_urls.py가 저장 후에 항목마다 HEAD 1회씩(블로킹) 래퍼를 해제
+
+핵심:
+1. canonicalize_url: 네트워크 없는 순수 함수 (같은 입력 → 항상 같은 키)
+   - 스킴 https 통일, 호스트 소문자 + www./m./mobile./amp. 제거, 기본 포트 제거
+   - AMP 경로(/amp, /amp/...)와 amp 파라미터 제거, 추적 파라미터 제거, 나머지 파라미터 정렬
+   - 프래그먼트, 끝 슬래시 제거 / twitter.com → x.com
+   - http(s)가 아닌 값("X/@계정명" 등)은 공백만 제거
+2. resolve_redirects: grounding-api-redirect 래퍼 → 실제 기사 URL
+   - url_checker_v30의 비동기 httpx 확인기로 한 번에 동시 해제
+   - 결과는 SQLite(url_redirects 테이블, URL 상태 캐시와 같은 파일)에 만료 없이 저장
+     (래퍼 링크는 시간이 지나면 만료되므로 한 번 해제한 결과를 계속 사용)
+3. 저장 시점 적용 (canonicalize_records): collect_v30.save_collected_items가
+   래퍼를 해제한 source_url + canonical_url을 함께 기록
+   → 수집 중복 제거 / 검증 중복 확인 / 풀링 / AI 간 중복 분석이 모두 canonical_url 하나로 비교
+4. canonical_url 컬럼: migrations/add_collected_canonical_url_v30.sql
+   (컬럼이 없는 DB에서는 source_url로 그때그때 계산)
+
+사용법:
+    from url_canonical_v30 import canonicalize_url, canonical_key
+
+    key = canonicalize_url("https://m.example.com/news/1/?utm_source=x#top")   # https://example.com/news/1
+
+    # 기존 행 canonical_url 채우기 (마이그레이션 적용 후)
+    python url_canonical_v30.py --politician_id=62e7b453
+    python url_canonical_v30.py --all
+"""
+
+import os
+import time
+import sqlite3
+import argparse
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from url_checker_v30 import get_url_checker, DEFAULT_CACHE_PATH
+from engine_v30 import configure_stdout
+from repository_v30 import get_client, has_column, iter_collected_data, update_in, TABLE_COLLECTED_DATA, COLUMNS_COLLECTED_URL
+
+REDIRECT_MARKERS = ('grounding-api-redirect',)
+
+# 호스트 앞에서 제거할 접두어 (모바일/AMP 사본 → 원본 호스트)
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+# 같은 사이트의 다른 호스트명
+HOST_ALIASES = {
+    'twitter.com': 'x.com',
+}
+
+# 추적/공유 파라미터 (내용과 무관)
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid', 'igsh',
+    'mc_cid', 'mc_eid', 'cmpid', 'ncid', 'ocid', 'spm', 'ref', 'ref_src', 'ref_url', 'referrer',
+    'share', 'sharetype', 'sns', 'from', 'feature', '_ga', '_gl',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_', 'hmb_')
+
+# 특정 호스트에서만 추적 파라미터인 것
+HOST_TRACKING_PARAMS = {
+    'x.com': {'s', 't'},
+}
+
+AMP_PARAMS = {'amp', 'outputtype'}   # ?amp=1, ?outputType=amp
+
+DEFAULT_PORTS = {':80', ':443'}
+
+
+def _canonical_host(netloc):
+    host = netloc.rsplit('@', 1)[-1].lower().rstrip('.')
+    for port in DEFAULT_PORTS:
+        if host.endswith(port):
+            host = host[:-len(port)]
+    stripped = True
+    while stripped:
+        stripped = False
+        for prefix in HOST_PREFIXES:
+            # 접두어를 떼도 도메인이 남는 경우만 (m.com 같은 도메인 자체는 유지)
+            if host.startswith(prefix) and '.' in host[len(prefix):]:
+                host = host[len(prefix):]
+                stripped = True
+    return HOST_ALIASES.get(host, host)
+
+
+def _canonical_path(path):
+    segments = [segment for segment in path.split('/') if segment]
+    if segments and segments[-1].lower() == 'amp':
+        segments = segments[:-1]
+    if segments and segments[0].lower() == 'amp':
+        segments = segments[1:]
+    return '/' + '/'.join(segments)
+
+
+def _is_tracking_param(key, host):
+    key = key.lower()
+    if key in TRACKING_PARAMS or key in AMP_PARAMS or key.startswith(TRACKING_PREFIXES):
+        return True
+    return key in HOST_TRACKING_PARAMS.get(host, ())
+
+
+def canonicalize_url(url):
+    """중복 판정용 정규화 URL (네트워크 없음, http(s)가 아니면 공백만 제거)"""
+    if not url:
+        return ''
+    url = str(url).strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if parts.scheme.lower() not in ('http', 'https') or not parts.netloc:
+        return url
+
+    host = _canonical_host(parts.netloc)
+    path = _canonical_path(parts.path)
+    params = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(key, host)
+    )
+    return urlunsplit(('https', host, path, urlencode(params), ''))
+
+
+def is_redirect_wrapper(url):
+    """grounding-api-redirect 등 리다이렉트 래퍼 URL 여부"""
+    return bool(url) and any(marker in url for marker in REDIRECT_MARKERS)
+
+
+# ============================================================
+# 리다이렉트 해제 영구 캐시
+# ============================================================
+class RedirectCache:
+    """래퍼 URL → 최종 URL 영구 캐시 (SQLite, 스레드 안전, 만료 없음)"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS url_redirects (
+                url TEXT PRIMARY KEY,
+                final_url TEXT NOT NULL,
+                resolved_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get_many(self, urls):
+        """캐시에 있는 결과 {url: final_url}"""
+        found = {}
+        urls = list(urls)
+        with self.lock:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT url, final_url FROM url_redirects WHERE url IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def set_many(self, results):
+        """{url: final_url} 저장"""
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO url_redirects (url, final_url, resolved_at) VALUES (?, ?, ?)",
+                [(url, final_url, now) for url, final_url in results.items()]
+            )
+            self.conn.commit()
+
+
+_redirects = {}               # 이번 실행 결과 (캐시 비활성화 시에도 재요청 방지)
+_redirect_cache = None
+_redirect_lock = threading.Lock()
+
+
+def get_redirect_cache():
+    """프로세스 공용 리다이렉트 캐시 (V30_URL_CACHE=off면 None)"""
+    global _redirect_cache
+    with _redirect_lock:
+        if _redirect_cache is None:
+            path = os.getenv('V30_URL_CACHE', DEFAULT_CACHE_PATH)
+            if path.lower() in ('off', '0', 'false', 'none'):
+                _redirect_cache = False
+            else:
+                try:
+                    _redirect_cache = RedirectCache(path)
+                except Exception as e:
+                    print(f"⚠️ 리다이렉트 캐시 초기화 실패 (캐시 없이 진행): {e}")
+                    _redirect_cache = False
+        return _redirect_cache or None
+
+
+def resolve_redirects(urls):
+    """래퍼 URL → {url: 최종 URL} (메모리 → 영구 캐시 → 동시 요청 순, 해제 실패 시 원본 유지)
+
+    래퍼가 아닌 URL은 결과에 포함하지 않음
+    """
+    wrappers = {url for url in urls if is_redirect_wrapper(url)}
+    with _redirect_lock:
+        known = {url: _redirects[url] for url in wrappers if url in _redirects}
+    missing = wrappers - known.keys()
+
+    cache = get_redirect_cache() if missing else None
+    if cache:
+        cached = cache.get_many(missing)
+        known.update(cached)
+        missing -= cached.keys()
+
+    if missing:
+        resolved = {}
+        for url, final_url in get_url_checker().final_urls(missing).items():
+            # 래퍼를 벗어난 경우만 저장 (실패/래퍼 그대로면 다음에 다시 시도)
+            if final_url and not is_redirect_wrapper(final_url):
+                resolved[url] = final_url
+        if cache and resolved:
+            cache.set_many(resolved)
+        known.update(resolved)
+        known.update({url: url for url in missing - resolved.keys()})
+
+    with _redirect_lock:
+        _redirects.update({url: final for url, final in known.items() if final != url})
+    return known
+
+
+def resolve_url(url):
+    """단일 URL 리다이렉트 해제 (래퍼가 아니면 그대로)"""
+    if not is_redirect_wrapper(url):
+        return url
+    return resolve_redirects([url]).get(url, url)
+
+
+# ============================================================
+# canonical_url 컬럼
+# ============================================================
+def has_canonical_column():
+    """collected_data_v30.canonical_url 존재 여부 (마이그레이션 전 DB면 False, repository_v30.has_column)"""
+    return has_column(TABLE_COLLECTED_DATA, 'canonical_url')
+
+
+def with_canonical_column(columns):
+    """컬럼 세트 + canonical_url (컬럼이 있을 때만)"""
+    return f"{columns}, canonical_url" if has_canonical_column() else columns
+
+
+def canonical_key(row):
+    """행의 중복 판정 키 (canonical_url 컬럼 값, 없으면 source_url로 계산)"""
+    return row.get('canonical_url') or canonicalize_url(row.get('source_url'))
+
+
+def canonicalize_records(records):
+    """저장 직전 레코드: 래퍼 source_url을 한 번에 해제 + canonical_url 설정 (컬럼 없으면 키 계산만)
+
+    반환: 레코드별 중복 판정 키 목록 (records 순서)
+    """
+    resolved = resolve_redirects(record['source_url'] for record in records if record.get('source_url'))
+    write_column = has_canonical_column()
+    keys = []
+    for record in records:
+        url = record.get('source_url') or ''
+        if url in resolved:
+            record['source_url'] = resolved[url]
+        key = canonicalize_url(record['source_url']) if url else ''
+        if write_column and key:
+            record['canonical_url'] = key
+        keys.append(key)
+    return keys
+
+
+# ============================================================
+# 기존 행 canonical_url 채우기
+# ============================================================
+def backfill_canonical_urls(politician_id, resolve=True):
+    """정치인의 canonical_url이 비었거나 달라진 행 갱신, 갱신한 행 수 반환"""
+    if not has_canonical_column():
+        print("  ❌ canonical_url 컬럼 없음 - migrations/add_collected_canonical_url_v30.sql 먼저 적용")
+        return 0
+
+    rows = list(iter_collected_data(politician_id, columns=f"{COLUMNS_COLLECTED_URL}, canonical_url"))
+    resolved = resolve_redirects(row.get('source_url') for row in rows) if resolve else {}
+
+    # 같은 canonical_url 값끼리 묶어서 IN 조건 업데이트
+    changes = {}
+    for row in rows:
+        url = (row.get('source_url') or '').strip()
+        if not url:
+            continue
+        key = canonicalize_url(resolved.get(url, url))
+        if key != row.get('canonical_url'):
+            changes.setdefault(key, []).append(row['id'])
+
+    for key, ids in changes.items():
+        update_in(TABLE_COLLECTED_DATA, {'canonical_url': key}, 'id', ids)
+
+    updated = sum(len(ids) for ids in changes.values())
+    if rows:
+        wrappers = sum(1 for url, final in resolved.items() if final != url)
+        print(f"  🔗 {len(rows)}개 중 {updated}개 갱신 (리다이렉트 해제 {wrappers}개)")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='V30 URL 정규화 (기존 행 canonical_url 채우기)')
+    parser.add_argument('--politician_id', help='정치인 ID')
+    parser.add_argument('--roster', action='append', help='명단 파일 ("이름<TAB>ID" 형식, 여러 번 지정 가능)')
+    parser.add_argument('--all', action='store_true', help='전체 정치인')
+    parser.add_argument('--no-resolve', action='store_true',
+                        help='grounding-api-redirect 래퍼를 해제하지 않고 문자열만 정규화')
+    args = parser.parse_args()
+
+    if args.all:
+        result = get_client().table('politicians').select('id').execute()
+        politician_ids = [row['id'] for row in result.data or []]
+    elif args.roster:
+        from scheduler_v30 import load_roster
+        politician_ids = [pid for pid, _name in load_roster(args.roster)]
+    elif args.politician_id:
+        politician_ids = [args.politician_id]
+    else:
+        parser.error('--politician_id, --roster, --all 중 하나가 필요합니다')
+
+    total = 0
+    for politician_id in politician_ids:
+        print(f"\n[{politician_id}]")
+        total += backfill_canonical_urls(politician_id, resolve=not args.no_resolve)
+    print(f"\n✅ canonical_url 기록: {total}행")
+
+
+if __name__ == "__main__":
+    configure_stdout()
+    main()
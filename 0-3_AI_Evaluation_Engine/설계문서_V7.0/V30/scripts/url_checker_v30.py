@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+V30 URL 존재 확인 (비동기 + 연결 재사용 + 영구 캐시)
+
+배경:
+- validate_v30.check_url_exists: 항목마다 requests.head → requests.get (10초 타임아웃)을
+  순차 실행, 세션 재사용 없음, 이미 확인한 URL도 매번 다시 확인
+- 1,000개 검증에 수십 분
+
+핵심:
+1. httpx.AsyncClient: 호스트별 keep-alive 연결 풀 재사용
+2. 동시성: 전체 MAX_CONNECTIONS, 호스트별 PER_HOST_LIMIT (언론사 서버 차단 방지)
+3. 영구 캐시 (SQLite): url → (valid, status, final_url, checked_at)
+   - 유효 URL은 VALID_TTL, 무효 URL은 INVALID_TTL (일시 장애 재확인)
+   - 여러 AI/정치인이 같은 URL을 수집해도 한 번만 확인
+4. 판정 규칙은 기존과 동일: HEAD < 400 → 유효, 아니면 GET < 400 → 유효
+
+사용법:
+    from url_checker_v30 import get_url_checker
+
+    checker = get_url_checker()
+    results = checker.check_urls(urls)      # {url: (valid, code)}
+    finals = checker.final_urls(urls)       # {url: 최종 URL} (url_canonical_v30 리다이렉트 해제)
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+import contextvars
+from urllib.parse import urlparse
+
+import httpx
+
+from telemetry_v30 import span, record_cache
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "url_status_v30.sqlite3"
+)
+
+MAX_CONNECTIONS = 64
+PER_HOST_LIMIT = 4
+REQUEST_TIMEOUT = 10
+VALID_TTL = 14 * 24 * 3600    # 유효 URL: 14일
+INVALID_TTL = 24 * 3600       # 무효 URL: 1일 (일시 장애 가능성)
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+class UrlStatusCache:
+    """URL 확인 결과 영구 캐시 (SQLite, 스레드 안전)"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS url_status (
+                url TEXT PRIMARY KEY,
+                valid INTEGER NOT NULL,
+                status INTEGER,
+                final_url TEXT,
+                checked_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get_many(self, urls):
+        """캐시에 있고 만료되지 않은 결과 {url: (valid, status, final_url)}"""
+        now = time.time()
+        found = {}
+        urls = list(urls)
+        with self.lock:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT url, valid, status, final_url, checked_at FROM url_status WHERE url IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for url, valid, status, final_url, checked_at in rows:
+                    ttl = VALID_TTL if valid else INVALID_TTL
+                    if now - checked_at <= ttl:
+                        found[url] = (bool(valid), status, final_url)
+        return found
+
+    def set_many(self, results):
+        """{url: (valid, status, final_url)} 저장"""
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO url_status (url, valid, status, final_url, checked_at) VALUES (?, ?, ?, ?, ?)",
+                [(url, int(valid), status, final_url, now) for url, (valid, status, final_url) in results.items()]
+            )
+            self.conn.commit()
+
+
+class UrlChecker:
+    """비동기 URL 존재 확인기"""
+
+    def __init__(self, cache=None, max_connections=MAX_CONNECTIONS, per_host=PER_HOST_LIMIT,
+                 timeout=REQUEST_TIMEOUT):
+        self.cache = cache
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.memory = {}   # 이번 실행 결과 (캐시 비활성화 시에도 중복 확인 방지)
+        self.lock = threading.Lock()
+        self.stats = {'cached': 0, 'checked': 0}
+
+    async def _check_one(self, client, host_limits, url):
+        host = urlparse(url).netloc.lower()
+        semaphore = host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            with span("url", "check", provider="http", host=host) as call:
+                result = await self._request(client, url)
+                call.set(status=result[1], valid=result[0])
+                if result[1] is None:
+                    call.outcome = "error"
+        return url, result
+
+    async def _request(self, client, url):
+        # HEAD 요청 먼저 시도
+        try:
+            response = await client.head(url)
+            if response.status_code < 400:
+                return True, response.status_code, str(response.url)
+        except Exception:
+            pass
+
+        # HEAD 실패 시 GET 시도 (본문은 받지 않음)
+        try:
+            async with client.stream("GET", url) as response:
+                return response.status_code < 400, response.status_code, str(response.url)
+        except Exception:
+            return False, None, None
+
+    async def _check_all(self, urls):
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_connections)
+        host_limits = {}
+        async with httpx.AsyncClient(headers=HEADERS, timeout=self.timeout, limits=limits,
+                                     follow_redirects=True) as client:
+            results = await asyncio.gather(*(self._check_one(client, host_limits, url) for url in urls))
+        return dict(results)
+
+    def _lookup(self, urls):
+        """URL 목록 → {url: (valid, status, final_url)} (메모리 → 영구 캐시 → 네트워크 순)"""
+        urls = {url for url in urls if url}
+        with self.lock:
+            known = {url: self.memory[url] for url in urls if url in self.memory}
+        missing = urls - known.keys()
+
+        if missing and self.cache:
+            cached = self.cache.get_many(missing)
+            known.update(cached)
+            missing -= cached.keys()
+            self.stats['cached'] += len(cached)
+            record_cache("url", hits=len(cached), misses=len(missing))
+
+        if missing:
+            checked = run_async(self._check_all(sorted(missing)))
+            self.stats['checked'] += len(checked)
+            if self.cache:
+                self.cache.set_many(checked)
+            known.update(checked)
+
+        with self.lock:
+            self.memory.update(known)
+        return known
+
+    def check_urls(self, urls):
+        """URL 목록 확인 → {url: (valid, code)} (code: VALID / INVALID_URL)"""
+        known = self._lookup(urls)
+        return {url: (valid, "VALID" if valid else "INVALID_URL") for url, (valid, _s, _f) in known.items()}
+
+    def final_urls(self, urls):
+        """URL 목록 → {url: 리다이렉트 후 최종 URL (확인 실패 시 None)} (check_urls와 같은 캐시)"""
+        return {url: final_url for url, (_v, _s, final_url) in self._lookup(urls).items()}
+
+    def check_url(self, url):
+        return self.check_urls([url]).get(url, (False, "INVALID_URL"))
+
+
+def run_async(coro):
+    """이벤트 루프 안/밖 어디서든 코루틴 실행 (루프 안이면 별도 스레드)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def runner():
+        result['value'] = asyncio.run(coro)
+
+    # 계측 문맥(단계/정치인)을 새 스레드로 복사
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(runner,))
+    thread.start()
+    thread.join()
+    return result['value']
+
+
+_checker = None
+_checker_lock = threading.Lock()
+
+
+def get_url_checker():
+    """프로세스 공용 URL 확인기 (V30_URL_CACHE=off면 영구 캐시 없이)"""
+    global _checker
+    with _checker_lock:
+        if _checker is None:
+            path = os.getenv('V30_URL_CACHE', DEFAULT_CACHE_PATH)
+            cache = None
+            if path.lower() not in ('off', '0', 'false', 'none'):
+                try:
+                    cache = UrlStatusCache(path)
+                except Exception as e:
+                    print(f"⚠️ URL 캐시 초기화 실패 (캐시 없이 진행): {e}")
+            _checker = UrlChecker(cache)
+        return _checker
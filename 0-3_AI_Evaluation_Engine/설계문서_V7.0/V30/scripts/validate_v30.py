@@ -3,18 +3,25 @@
 V30 검증, 중복 제거 및 재수집 스크립트
 
 핵심 (V30 검증):
-1. URL 실제 존재 여부 확인 (HEAD/GET 요청)
+1. URL 실제 존재 여부 확인 (HEAD/GET 요청, 동시 확인 + 결과 캐시)
 2. source_type 규칙 검증 (OFFICIAL/PUBLIC 도메인 매칭)
 3. 필수 필드 검증 (title, content, source_url)
 4. 기간 제한 검증 (OFFICIAL 4년, PUBLIC 2년)
 5. 중복 데이터 자동 제거 (같은 AI + 같은 URL) ✅ 통합
 6. 검증 실패 항목 자동 재수집
 
+검증 방식 (기본: 집합 기반):
+- 정치인 데이터를 한 번에 읽고 모든 규칙을 메모리에서 검사
+- 중복은 (collector_ai, 정규화 URL) 그룹으로 판정 (항목별 count 조회 없음)
+- 결과는 IN 조건 벌크 update/delete로 반영 (1,000개 기준 수천 회 → 수십 회 요청)
+- --per-item: 기존 항목별 검증 (항목마다 중복 조회 + update/delete)
+
 프로세스:
 [1] 검증 (validate): 수집된 데이터 유효성 검사
     - 중복 발견 시 자동 삭제 (evaluations 포함)
 [2] 재수집 (recollect): 검증 실패분 해당 AI로 재수집
 [3] 재검증: 재수집 데이터 다시 검증
+[4] 평가용 요약: digest 미기록/이전 버전 행 채우기 (재수집 행, 마이그레이션 전 행 → digest_v30)
 
 사용법:
     # 전체 검증 + 재수집
@@ -28,39 +35,32 @@ V30 검증, 중복 제거 및 재수집 스크립트
 
     # 특정 AI만
     python validate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --ai=Perplexity
+
+    # 기존 항목별 검증
+    python validate_v30.py --politician_id=62e7b453 --politician_name="오세훈" --mode=validate --per-item
 """
 
-import os
-import sys
 import json
 import re
 import argparse
 import time
-import requests
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from supabase import create_client
-from dotenv import load_dotenv
+from engine_v30 import CATEGORIES, load_env, configure_stdout
+from repository_v30 import supabase, iter_collected_data, update_in, delete_in, COLUMNS_COLLECTED_VALIDATE
+from url_checker_v30 import get_url_checker
+from url_canonical_v30 import canonicalize_url, canonical_key, has_canonical_column, with_canonical_column
+from progress_v30 import invalidate_progress
+from near_dup_v30 import invalidate_near_dup_indexes
+from telemetry_v30 import telemetry_context
+from digest_v30 import fill_digests
 
 # UTF-8 출력 설정
-if sys.platform == 'win32':
-    import io
-    try:
-        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
-    except AttributeError:
-        # 이미 설정되어 있거나 buffer가 없는 경우 무시
-        pass
+configure_stdout()
 
 # 환경 변수 로드
-load_dotenv(override=True)
-
-# Supabase 클라이언트
-supabase = create_client(
-    os.getenv('SUPABASE_URL'),
-    os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-)
+load_env()
 
 # V30 테이블명
 TABLE_COLLECTED_DATA = "collected_data_v30"
@@ -105,20 +105,6 @@ SNS_DOMAINS = [
     "tiktok.com"
 ]
 
-# 카테고리 정의
-CATEGORIES = [
-    ("expertise", "전문성"),
-    ("leadership", "리더십"),
-    ("vision", "비전"),
-    ("integrity", "청렴성"),
-    ("ethics", "윤리성"),
-    ("consistency", "일관성"),
-    ("crisis", "위기대응"),
-    ("communication", "소통능력"),
-    ("responsiveness", "대응성"),
-    ("publicinterest", "공익성")
-]
-
 # 검증 결과 코드
 VALIDATION_CODES = {
     "VALID": "유효",
@@ -193,7 +179,7 @@ def is_fake_url_pattern(url):
 
 
 def check_url_exists(url, timeout=10):
-    """URL 실제 존재 여부 확인"""
+    """URL 실제 존재 여부 확인 (url_checker_v30: 연결 재사용 + 영구 캐시)"""
     if not url or url.strip() == '':
         return False, "EMPTY_URL"
 
@@ -205,32 +191,41 @@ def check_url_exists(url, timeout=10):
     if is_fake_url_pattern(url):
         return False, "FAKE_URL"
 
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+    # prefetch_url_status로 미리 확인된 URL이면 네트워크 요청 없이 반환
+    return get_url_checker().check_url(url.strip())
 
-        # HEAD 요청 먼저 시도
-        try:
-            response = requests.head(url, headers=headers, timeout=timeout, allow_redirects=True)
-            if response.status_code < 400:
-                return True, "VALID"
-        except:
-            pass
 
-        # HEAD 실패 시 GET 시도
-        response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
-        if response.status_code < 400:
-            return True, "VALID"
-        else:
-            return False, "INVALID_URL"
+def get_url_to_check(item):
+    """네트워크 확인이 필요한 URL (validate_item의 URL 검증 규칙과 동일, 없으면 None)"""
+    url = item.get('source_url', '')
+    collector_ai = item.get('collector_ai', '').lower()
 
-    except requests.exceptions.Timeout:
-        return False, "INVALID_URL"
-    except requests.exceptions.ConnectionError:
-        return False, "INVALID_URL"
-    except Exception as e:
-        return False, "INVALID_URL"
+    if not url or is_sns_url(url):
+        return None
+
+    # V30 규정: Grok의 X/트위터 데이터는 URL 필요 없음 ("X/@계정명" 형식 허용)
+    if collector_ai == 'grok' and (url.startswith('X/@') or url.startswith('x.com') or url.startswith('twitter.com')):
+        return None
+
+    if url.strip() == '' or is_fake_url_pattern(url):
+        return None
+
+    return url.strip()
+
+
+def prefetch_url_status(items):
+    """검증 대상 URL을 한 번에 동시 확인 (중복 URL은 1회, 캐시된 URL은 요청 없음)"""
+    urls = {url for url in (get_url_to_check(item) for item in items) if url}
+    if not urls:
+        return
+
+    checker = get_url_checker()
+    before = dict(checker.stats)
+    started = time.time()
+    results = checker.check_urls(urls)
+    invalid = sum(1 for valid, _code in results.values() if not valid)
+    print(f"  🌐 URL 확인: {len(urls)}개 (캐시 {checker.stats['cached'] - before['cached']}개, "
+          f"요청 {checker.stats['checked'] - before['checked']}개, 무효 {invalid}개) - {time.time() - started:.1f}초")
 
 
 def validate_source_type(item):
@@ -310,20 +305,25 @@ def validate_date_range(item):
         return True, "VALID"  # 파싱 실패면 패스
 
 
+def normalize_url(url):
+    """중복 판정용 URL 정규화 (url_canonical_v30: 추적 파라미터/모바일 호스트/AMP/끝 슬래시 제거)"""
+    return canonicalize_url(url)
+
+
 def check_duplicate(item):
     """중복 데이터 검증
 
     규칙: 같은 AI가 같은 URL을 이미 수집했는지 확인
-    - 같은 politician_id + 같은 collector_ai + 같은 source_url = 중복
+    - 같은 politician_id + 같은 collector_ai + 같은 정규화 URL = 중복
     - 다른 AI가 같은 URL 수집 = 중복 아님 (자연 가중치)
+    - canonical_url 컬럼이 없는 DB면 source_url 원문으로 비교
     """
     politician_id = item.get('politician_id')
     collector_ai = item.get('collector_ai')
     source_url = item.get('source_url', '')
     item_id = item.get('id')  # 자기 자신 제외용
 
-    # URL 정규화 (공백 제거)
-    source_url_normalized = str(source_url).strip() if source_url else ''
+    source_url_normalized = item.get('canonical_url') or normalize_url(source_url)
 
     if not source_url_normalized:  # URL 없으면 중복 체크 불가능
         return True, "VALID"
@@ -333,8 +333,12 @@ def check_duplicate(item):
         query = supabase.table(TABLE_COLLECTED_DATA)\
             .select('id', count='exact')\
             .eq('politician_id', politician_id)\
-            .eq('collector_ai', collector_ai)\
-            .eq('source_url', source_url_normalized)
+            .eq('collector_ai', collector_ai)
+
+        if has_canonical_column():
+            query = query.eq('canonical_url', source_url_normalized)
+        else:
+            query = query.eq('source_url', str(source_url).strip())
 
         # 자기 자신 제외
         if item_id:
@@ -351,10 +355,8 @@ def check_duplicate(item):
         return True, "VALID"  # 오류 시 패스
 
 
-def validate_item(item):
-    """단일 항목 종합 검증"""
-    results = []
-
+def validate_item_rules(item):
+    """단일 항목 검증 (중복 제외 규칙 1~4, DB 조회 없음)"""
     # 1. 필수 필드 검증
     valid, code = validate_required_fields(item)
     if not valid:
@@ -364,21 +366,12 @@ def validate_item(item):
     url = item.get('source_url', '')
     collector_ai = item.get('collector_ai', '').lower()
 
-    # V30 규정: Grok의 X/트위터 데이터는 URL 필요 없음
-    if collector_ai == 'grok':
-        # X/트위터는 URL 없음 또는 "X/@계정명" 형식 허용
-        if not url or url.startswith('X/@') or url.startswith('x.com') or url.startswith('twitter.com'):
-            pass  # 유효 - URL 검증 건너뛰기
-        elif url and not is_sns_url(url):
-            valid, code = check_url_exists(url)
-            if not valid:
-                return False, code
-    else:
-        # Gemini, Perplexity는 정상 URL 검증
-        if url and not is_sns_url(url):
-            valid, code = check_url_exists(url)
-            if not valid:
-                return False, code
+    # V30 규정: Grok의 X/트위터 데이터는 URL 필요 없음 ("X/@계정명" 형식 허용)
+    grok_sns = collector_ai == 'grok' and (url.startswith('X/@') or url.startswith('x.com') or url.startswith('twitter.com'))
+    if url and not grok_sns and not is_sns_url(url):
+        valid, code = check_url_exists(url)
+        if not valid:
+            return False, code
 
     # 3. source_type 검증
     valid, code = validate_source_type(item)
@@ -390,6 +383,15 @@ def validate_item(item):
     if not valid:
         return False, code
 
+    return True, "VALID"
+
+
+def validate_item(item):
+    """단일 항목 종합 검증"""
+    valid, code = validate_item_rules(item)
+    if not valid:
+        return False, code
+
     # 5. 중복 검증
     valid, code = check_duplicate(item)
     if not valid:
@@ -399,28 +401,112 @@ def validate_item(item):
 
 
 def get_collected_data(politician_id, ai_name=None, category=None):
-    """수집된 데이터 조회"""
+    """수집된 데이터 조회 (키셋 페이지네이션, 검증용 컬럼만)"""
     try:
-        query = supabase.table(TABLE_COLLECTED_DATA)\
-            .select('*')\
-            .eq('politician_id', politician_id)
-
-        if ai_name:
-            query = query.eq('collector_ai', ai_name.lower())
-
-        if category:
-            query = query.eq('category', category.lower())
-
-        result = query.execute()
-        return result.data if result.data else []
+        return list(iter_collected_data(
+            politician_id,
+            category=category,
+            collector_ai=ai_name.lower() if ai_name else None,
+            columns=with_canonical_column(COLUMNS_COLLECTED_VALIDATE)
+        ))
 
     except Exception as e:
         print(f"  ⚠️ 데이터 조회 실패: {e}")
         return []
 
 
-def validate_collected_data(politician_id, politician_name, ai_name=None, category=None):
-    """수집된 데이터 검증"""
+def find_duplicate_ids(items, results):
+    """(collector_ai, 정규화 URL) 그룹에서 가장 먼저 저장된 행만 남기고 나머지 id 집합 반환
+
+    - 규칙 1~4를 통과한 행끼리만 비교 (results에 없는 행은 통과로 간주)
+    - 남길 행: (created_at, id)가 가장 작은 행 (migrations/add_collected_data_unique_url_v30.sql과 동일)
+    - 정규화 URL 기준 (canonical_url 컬럼 값, 없으면 source_url로 계산)
+    """
+    groups = {}
+    for item in items:
+        url = canonical_key(item)
+        if not url or not results.get(item.get('id'), (True, "VALID"))[0]:
+            continue
+        groups.setdefault((item.get('collector_ai'), url), []).append(item)
+
+    duplicate_ids = set()
+    for rows in groups.values():
+        if len(rows) < 2:
+            continue
+        rows.sort(key=lambda r: (r.get('created_at') or '', r.get('id') or ''))
+        duplicate_ids.update(row.get('id') for row in rows[1:])
+    return duplicate_ids
+
+
+def validate_collected_data_bulk(politician_id, politician_name, ai_name=None, category=None):
+    """수집된 데이터 검증 (집합 기반: 1회 조회 → 메모리 검증 → 벌크 반영)"""
+    print(f"\n{'='*60}")
+    print(f"[검증] {politician_name} ({politician_id})")
+    print(f"{'='*60}")
+
+    # 중복은 카테고리와 무관하게 같은 AI + 같은 URL이므로 카테고리 필터 없이 조회
+    rows = get_collected_data(politician_id, ai_name)
+    items = [item for item in rows if not category or item.get('category') == category.lower()]
+    print(f"총 {len(items)}개 항목 검증 시작...")
+
+    # 1~4. URL 존재(동시 확인) + 규칙 검증
+    prefetch_url_status(items)
+    results = {item.get('id'): validate_item_rules(item) for item in items}
+
+    # 5. 중복 검증
+    target_ids = set(results)
+    duplicate_ids = find_duplicate_ids(rows, results) & target_ids
+    for item_id in duplicate_ids:
+        results[item_id] = (False, "DUPLICATE")
+
+    # 결과 반영 (벌크)
+    verify_ids = [item.get('id') for item in items
+                  if results[item.get('id')][0] and not item.get('is_verified')]
+    valid_count = sum(1 for valid, _code in results.values() if valid)
+
+    if verify_ids:
+        try:
+            update_in(TABLE_COLLECTED_DATA, {'is_verified': True}, 'id', verify_ids)
+        except Exception as e:
+            print(f"  ⚠️ is_verified 업데이트 실패: {e}")
+
+    duplicate_removed = 0
+    if duplicate_ids:
+        try:
+            # evaluations 먼저 삭제 → collected_data 삭제
+            eval_deleted = delete_in(TABLE_EVALUATIONS, 'collected_data_id', duplicate_ids)
+            delete_in(TABLE_COLLECTED_DATA, 'id', duplicate_ids)
+            duplicate_removed = len(duplicate_ids)
+            print(f"  중복 제거: {duplicate_removed}개 (evaluations {eval_deleted}개 포함)")
+        except Exception as e:
+            print(f"  ⚠️ 중복 제거 실패: {e}")
+
+    invalid_items = [
+        {
+            'id': item.get('id'),
+            'title': item.get('title', '')[:30],
+            'code': results[item.get('id')][1],
+            'reason': VALIDATION_CODES.get(results[item.get('id')][1], results[item.get('id')][1]),
+            'collector_ai': item.get('collector_ai'),
+            'category': item.get('category'),
+            'data_type': item.get('data_type'),
+            'source_url': item.get('source_url', '')[:50]
+        }
+        for item in items
+        if not results[item.get('id')][0] and item.get('id') not in duplicate_ids
+    ]
+
+    if duplicate_ids:
+        invalidate_collected_caches(politician_id)  # 삭제 반영 (진행 현황 / URL·유사 중복 인덱스 다시 로드)
+
+    return report_validation_result(len(items), valid_count, duplicate_removed, invalid_items)
+
+
+def validate_collected_data(politician_id, politician_name, ai_name=None, category=None, bulk=True):
+    """수집된 데이터 검증 (bulk=False면 항목별 검증)"""
+    if bulk:
+        return validate_collected_data_bulk(politician_id, politician_name, ai_name, category)
+
     print(f"\n{'='*60}")
     print(f"[검증] {politician_name} ({politician_id})")
     print(f"{'='*60}")
@@ -428,6 +514,9 @@ def validate_collected_data(politician_id, politician_name, ai_name=None, catego
     items = get_collected_data(politician_id, ai_name, category)
     print(f"총 {len(items)}개 항목 검증 시작...")
 
+    # URL 존재 확인은 항목 루프 전에 동시 처리
+    prefetch_url_status(items)
+
     valid_count = 0
     invalid_items = []
     duplicate_removed = 0  # 중복 제거 카운트
@@ -489,6 +578,11 @@ def validate_collected_data(politician_id, politician_name, ai_name=None, catego
         if (i + 1) % 100 == 0:
             print(f"  진행: {i+1}/{len(items)} ({valid_count}개 유효)")
 
+    return report_validation_result(len(items), valid_count, duplicate_removed, invalid_items)
+
+
+def report_validation_result(total, valid_count, duplicate_removed, invalid_items):
+    """검증 결과 출력 + 결과 dict 반환"""
     invalid_count = len(invalid_items)
     print(f"\n검증 완료:")
     print(f"  ✅ 유효: {valid_count}개")
@@ -518,28 +612,31 @@ def validate_collected_data(politician_id, politician_name, ai_name=None, catego
             print(f"  - {ai}: {count}개")
 
     return {
-        'total': len(items),
+        'total': total,
         'valid': valid_count,
         'invalid': invalid_count,
         'invalid_items': invalid_items
     }
 
 
+def invalidate_collected_caches(politician_id):
+    """collected_data_v30 삭제/재수집 후 프로세스 캐시 무효화 (진행 현황, 수집 URL 인덱스, 유사 중복 인덱스)"""
+    from collect_v30 import invalidate_url_index
+    invalidate_progress(politician_id)
+    invalidate_url_index(politician_id)
+    invalidate_near_dup_indexes(politician_id)
+
+
 def delete_invalid_items(invalid_items):
-    """무효 항목 삭제"""
+    """무효 항목 삭제 (IN 조건 벌크 삭제)"""
     if not invalid_items:
         return 0
 
-    deleted = 0
-    for item in invalid_items:
-        try:
-            supabase.table(TABLE_COLLECTED_DATA)\
-                .delete()\
-                .eq('id', item['id'])\
-                .execute()
-            deleted += 1
-        except Exception as e:
-            print(f"  ⚠️ 삭제 실패 ({item['id']}): {e}")
+    try:
+        deleted = delete_in(TABLE_COLLECTED_DATA, 'id', [item['id'] for item in invalid_items])
+    except Exception as e:
+        print(f"  ⚠️ 삭제 실패: {e}")
+        return 0
 
     print(f"  🗑️ {deleted}개 무효 항목 삭제")
     return deleted
@@ -640,6 +737,9 @@ def recollect_invalid(politician_id, politician_name, invalid_items):
             groups[key] = 0
         groups[key] += 1
 
+    # 앞 단계 삭제 반영 (삭제된 URL이 재수집에서 중복으로 걸러지지 않도록)
+    invalidate_collected_caches(politician_id)
+
     total_recollected = 0
 
     for (ai_name, category, data_type), count in groups.items():
@@ -653,13 +753,29 @@ def recollect_invalid(politician_id, politician_name, invalid_items):
                 data_type
             )
             total_recollected += recollected
-            time.sleep(1)
+
+    # 무효 항목 삭제 + 재수집 반영 (진행 현황 / URL·유사 중복 인덱스 다시 로드)
+    invalidate_collected_caches(politician_id)
 
     print(f"\n재수집 완료: {total_recollected}개")
     return total_recollected
 
 
-def run_validation_pipeline(politician_id, politician_name, mode='all', ai_name=None, max_iterations=3):
+def run_validation_pipeline(politician_id, politician_name, mode='all', ai_name=None, max_iterations=3,
+                            bulk=True):
+    """검증 + 재수집 파이프라인 (계측 문맥: 단계/정치인 → 하위 DB/URL span)"""
+    with telemetry_context(stage="validate", politician_id=politician_id):
+        result = _run_validation_pipeline(politician_id, politician_name, mode, ai_name, max_iterations, bulk)
+        # 남은 행의 평가용 요약 (수집 시 기록된 현재 버전 행은 건너뜀)
+        try:
+            fill_digests(politician_id, politician_name)
+        except Exception as e:
+            print(f"  ⚠️ 평가용 요약 기록 실패 (평가 시 즉석 계산): {e}")
+        return result
+
+
+def _run_validation_pipeline(politician_id, politician_name, mode='all', ai_name=None, max_iterations=3,
+                             bulk=True):
     """검증 + 재수집 파이프라인"""
     print(f"\n{'#'*60}")
     print(f"# V30 검증 파이프라인: {politician_name}")
@@ -668,7 +784,7 @@ def run_validation_pipeline(politician_id, politician_name, mode='all', ai_name=
 
     if mode == 'validate':
         # 검증만
-        result = validate_collected_data(politician_id, politician_name, ai_name)
+        result = validate_collected_data(politician_id, politician_name, ai_name, bulk=bulk)
         return result
 
     elif mode == 'recollect':
@@ -696,7 +812,7 @@ def run_validation_pipeline(politician_id, politician_name, mode='all', ai_name=
             print(f"{'='*60}")
 
             # 1. 검증
-            result = validate_collected_data(politician_id, politician_name, ai_name)
+            result = validate_collected_data(politician_id, politician_name, ai_name, bulk=bulk)
 
             if result['invalid'] == 0:
                 print(f"\n✅ 모든 데이터 유효! 검증 완료.")
@@ -705,17 +821,14 @@ def run_validation_pipeline(politician_id, politician_name, mode='all', ai_name=
             # 2. 무효 항목 삭제
             delete_invalid_items(result['invalid_items'])
 
-            # 3. 재수집
+            # 3. 재수집 (호출 속도는 rate_limiter_v30이 제어)
             recollect_invalid(politician_id, politician_name, result['invalid_items'])
 
-            # 잠시 대기
-            time.sleep(2)
-
         # 최종 검증
         print(f"\n{'='*60}")
         print(f"[최종 검증]")
         print(f"{'='*60}")
-        final_result = validate_collected_data(politician_id, politician_name, ai_name)
+        final_result = validate_collected_data(politician_id, politician_name, ai_name, bulk=bulk)
 
         return final_result
 
@@ -730,6 +843,8 @@ def main():
                        help='특정 AI만 검증')
     parser.add_argument('--max_iterations', type=int, default=3,
                        help='최대 반복 횟수 (기본: 3)')
+    parser.add_argument('--per-item', action='store_true',
+                       help='항목별 검증 (기본: 집합 기반 벌크 검증)')
 
     args = parser.parse_args()
 
@@ -738,7 +853,8 @@ def main():
         args.politician_name,
         mode=args.mode,
         ai_name=args.ai,
-        max_iterations=args.max_iterations
+        max_iterations=args.max_iterations,
+        bulk=not args.per_item
     )
 
 
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+V30 오프라인 벤치마크 (수집 → 검증 → 평가 처리량)
+
+비용/실서비스 없이 collect_v30 / validate_v30 / evaluate_v30을 그대로 실행해
+성능 회귀를 운영 실행 전에 확인합니다.
+
+구성 (모두 이 프로세스 안의 스레드):
+- mock_postgrest_v30: Supabase REST 대역 (politicians / collected_data_v30 / evaluations_v30)
+- mock_llm_server_v30: OpenAI 호환(Grok/ChatGPT) / Anthropic / Gemini API 대역
+  + HTTP 프록시로 기사 URL 확인 응답 (외부 네트워크 요청 없음)
+- .env는 읽지 않음 (운영 DB/API 키 차단), 단계 모듈의 Supabase 주소가 mock이 아니면 중단
+
+단계별 보고:
+- 소요 시간, 처리 항목 수, items/sec
+- LLM 호출 수 / 정치인당 호출 수, 429/500 응답 수
+- span 종류별(llm/db/url) p50 / p95 지연 (telemetry_v30)
+- DB 요청 수 (메서드/테이블별), Mock LLM 요청 수
+
+사용법:
+    python benchmark_v30.py                                   # 정치인 2명, 카테고리 1개, 미니 테스트 모드
+    python benchmark_v30.py --politicians 3 --categories 2 --latency 800 --rate-limit-rate 0.05
+    python benchmark_v30.py --replay ../.cache/llm_responses_v30.sqlite3 --output bench.json
+    python benchmark_v30.py --compare bench.json --tolerance 15   # 기준 대비 회귀면 종료 코드 1
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(os.path.dirname(UTILS_DIR), 'scripts')
+sys.path.insert(0, UTILS_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+from mock_postgrest_v30 import MockStore, MockPostgrestServer
+from engine_v30 import configure_stdout
+from mock_llm_server_v30 import MockLLMState, MockLLMServer, ReplayStore, add_arguments, settings_from_args
+
+# UTF-8 출력 설정
+configure_stdout()
+
+STAGES = ("collect", "validate", "evaluate")
+SPAN_KINDS = ("llm", "db", "url")
+MOCK_KEY = "mock.mock.mock"   # supabase-py 키 형식 검사 통과용
+
+# 가상 정치인 (politicians 테이블 초기 데이터)
+SURNAMES = ["김", "이", "박", "최", "정", "강", "조", "윤", "장", "임"]
+GIVEN_NAMES = ["벤치", "시험", "측정", "모의", "검증"]
+PARTIES = ["가나당", "다라당", "마바당"]
+REGIONS = [("서울", "종로구"), ("부산", "해운대구"), ("경기", "수원시"), ("대구", "수성구"), ("광주", "북구")]
+
+
+def make_politicians(count):
+    politicians = []
+    for i in range(count):
+        region, district = REGIONS[i % len(REGIONS)]
+        politicians.append({
+            "id": f"be{i:06x}",
+            "name": SURNAMES[i % len(SURNAMES)] + GIVEN_NAMES[(i // len(SURNAMES)) % len(GIVEN_NAMES)],
+            "party": PARTIES[i % len(PARTIES)],
+            "position": "국회의원",
+            "title": "국회의원",
+            "identity": "현직",
+            "region": region,
+            "district": district,
+            "gender": "남" if i % 2 else "여",
+        })
+    return politicians
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def diff_counts(after, before):
+    return {key: value - before.get(key, 0) for key, value in after.items() if value - before.get(key, 0)}
+
+
+# ============================================================
+# 환경 준비
+# ============================================================
+def configure_environment(pg_url, llm_url, workdir, args):
+    """단계 모듈 import 전에 호출 (모듈 수준 Supabase 클라이언트가 mock으로 생성되도록)"""
+    os.environ.update({
+        "SUPABASE_URL": pg_url,
+        "SUPABASE_SERVICE_ROLE_KEY": MOCK_KEY,
+        "ANTHROPIC_API_KEY": "mock",
+        "OPENAI_API_KEY": "mock",
+        "XAI_API_KEY": "mock",
+        "GEMINI_API_KEY": "mock",
+        "PERPLEXITY_API_KEY": "mock",
+        # 기사 URL 확인은 Mock LLM 서버가 프록시로 응답, mock 서버 자체는 직접 연결
+        "HTTP_PROXY": llm_url,
+        "HTTPS_PROXY": llm_url,
+        "NO_PROXY": "127.0.0.1,localhost",
+        "V30_URL_CACHE": os.path.join(workdir, "url_cache.sqlite3"),
+        "V30_LLM_CACHE": "off" if args.no_cache else os.path.join(workdir, "llm_responses.sqlite3"),
+        "V30_TELEMETRY": "on",
+        "V30_TELEMETRY_JSONL": os.path.join(args.output_dir, "benchmark_spans.jsonl") if args.output_dir else "off",
+    })
+    for key in ("http_proxy", "https_proxy", "no_proxy", "ALL_PROXY", "all_proxy", "GOOGLE_API_KEY", "V30_METRICS_PORT"):
+        os.environ.pop(key, None)
+
+
+def load_stage_modules(pg_url):
+    """.env 무시하고 단계 모듈 import → Supabase 주소 확인"""
+    import dotenv
+    dotenv.load_dotenv = lambda *args, **kwargs: False
+
+    import collect_v30
+    import validate_v30
+    import evaluate_v30
+    import repository_v30
+
+    clients = {
+        "collect_v30": collect_v30.supabase,
+        "validate_v30": validate_v30.supabase,
+        "evaluate_v30": evaluate_v30.supabase,
+        "repository_v30": repository_v30.get_client(),
+    }
+    for name, client in clients.items():
+        url = getattr(client, 'supabase_url', '')
+        if not url.startswith(pg_url):
+            raise RuntimeError(f"{name} Supabase 주소가 mock이 아님 ({url}) - 중단")
+    return collect_v30, validate_v30, evaluate_v30
+
+
+def build_ai_clients(llm_url):
+    """SDK 클라이언트를 Mock LLM 서버로 (설치 안 된 SDK는 건너뜀)"""
+    clients = {}
+    try:
+        from openai import OpenAI
+        for ai_name in ("ChatGPT", "Grok", "Perplexity"):
+            clients[ai_name] = OpenAI(api_key="mock", base_url=f"{llm_url}/v1")
+    except ImportError:
+        print("⚠️ openai SDK 없음 - ChatGPT/Grok 호출 불가")
+    try:
+        import anthropic
+        clients["Claude"] = anthropic.Anthropic(api_key="mock", base_url=llm_url)
+    except ImportError:
+        print("⚠️ anthropic SDK 없음 - Claude 호출 불가")
+    try:
+        from google import genai
+        from google.genai import types
+        clients["Gemini"] = genai.Client(api_key="mock", http_options=types.HttpOptions(base_url=llm_url))
+    except ImportError:
+        print("⚠️ google-genai SDK 없음 - Gemini 호출 불가")
+    return clients
+
+
+# ============================================================
+# 단계 실행 / 집계
+# ============================================================
+def stage_items(stage, store, ids):
+    """단계 처리 대상 행 수 (collect/evaluate는 증가분, validate는 실행 전 수집 행 수)"""
+    table = "evaluations_v30" if stage == "evaluate" else "collected_data_v30"
+    return sum(store.count(table, politician_id=pid) for pid in ids)
+
+
+def summarize_spans(spans):
+    summary = {}
+    for kind in SPAN_KINDS:
+        records = [record for record in spans if record.get('kind') == kind]
+        latencies = [record.get('latency_ms', 0) for record in records]
+        summary[kind] = {
+            "count": len(records),
+            "errors": sum(1 for record in records if record.get('outcome') not in ('ok', 'cancelled')),
+            "rate_limited": sum(1 for record in records if record.get('outcome') == 'rate_limited'),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+        }
+    tokens = [record for record in spans if record.get('kind') == 'llm']
+    summary["tokens"] = {
+        "input": sum(record.get('input_tokens') or 0 for record in tokens),
+        "cached": sum(record.get('cached_tokens') or 0 for record in tokens),
+        "output": sum(record.get('output_tokens') or 0 for record in tokens),
+    }
+    return summary
+
+
+def run_stage(stage, run_one, politicians, store, llm_state, log):
+    """정치인마다 run_one(id, name) 실행 → 단계 지표"""
+    from telemetry_v30 import telemetry_context, recorded_spans, clear_recorded_spans
+
+    ids = [politician['id'] for politician in politicians]
+    clear_recorded_spans()
+    db_before = store.snapshot()
+    llm_before = llm_state.snapshot()
+    rows_before = stage_items(stage, store, ids)
+    failures = 0
+
+    started = time.time()
+    for politician in politicians:
+        with redirect_stdout(log), redirect_stderr(log), telemetry_context(stage=stage):
+            try:
+                run_one(politician['id'], politician['name'])
+            except Exception:
+                failures += 1
+                traceback.print_exc(file=log)
+    wall = time.time() - started
+
+    rows_after = stage_items(stage, store, ids)
+    items = rows_before if stage == "validate" else rows_after - rows_before
+    spans = summarize_spans(recorded_spans())
+    db_after = store.snapshot()
+    llm_stats = diff_counts(llm_state.snapshot(), llm_before)
+    return {
+        "wall_sec": round(wall, 3),
+        "items": items,
+        "items_per_sec": round(items / wall, 3) if wall else None,
+        "rows_removed": rows_before - rows_after if stage == "validate" else 0,
+        "failures": failures,
+        "llm_calls": spans["llm"]["count"],
+        "calls_per_politician": round(spans["llm"]["count"] / len(politicians), 2),
+        "spans": spans,
+        "db_requests": diff_counts(db_after["requests"], db_before["requests"]),
+        "db_rows_read": db_after["rows_read"] - db_before["rows_read"],
+        "db_rows_written": db_after["rows_written"] - db_before["rows_written"],
+        "mock_llm": llm_stats,
+    }
+
+
+def _ms(value):
+    return f"{value:.0f}" if value is not None else "-"
+
+
+def print_report(results, politicians):
+    print(f"\n📊 벤치마크 결과 (정치인 {politicians}명)")
+    print(f"   {'단계':<9}{'시간(s)':>9}{'항목':>7}{'items/s':>9}{'LLM호출':>8}{'호출/인':>8}"
+          f"{'llm p50':>9}{'llm p95':>9}{'db p50':>8}{'db p95':>8}{'url p95':>9}{'DB요청':>8}{'429':>5}{'500':>5}")
+    for stage, result in results.items():
+        spans = result["spans"]
+        mock = result["mock_llm"]
+        status_429 = sum(value for key, value in mock.items() if key.endswith('.status.429'))
+        status_500 = sum(value for key, value in mock.items() if key.endswith('.status.500'))
+        print(f"   {stage:<9}{result['wall_sec']:>9.1f}{result['items']:>7}{result['items_per_sec'] or 0:>9.2f}"
+              f"{result['llm_calls']:>8}{result['calls_per_politician']:>8.1f}"
+              f"{_ms(spans['llm']['p50_ms']):>9}{_ms(spans['llm']['p95_ms']):>9}"
+              f"{_ms(spans['db']['p50_ms']):>8}{_ms(spans['db']['p95_ms']):>8}{_ms(spans['url']['p95_ms']):>9}"
+              f"{sum(result['db_requests'].values()):>8}{status_429:>5}{status_500:>5}")
+        if result['failures']:
+            print(f"   ⚠️ {stage}: 정치인 {result['failures']}명 실패 (로그 확인)")
+
+    for stage, result in results.items():
+        requests = ", ".join(f"{key} {value}" for key, value in sorted(result['db_requests'].items()))
+        print(f"   [{stage}] DB 요청: {requests or '-'}")
+        providers = ", ".join(f"{key} {value}" for key, value in sorted(result['mock_llm'].items())
+                              if key.endswith(('.requests', '.cancelled')))
+        if providers:
+            print(f"   [{stage}] LLM 요청: {providers}")
+
+
+def compare_results(results, baseline, tolerance):
+    """기준 결과 대비 회귀 목록 (items/s 감소, p95 증가, 정치인당 호출 증가가 tolerance% 초과)"""
+    regressions = []
+    limit = tolerance / 100
+    for stage, result in results.items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base:
+            continue
+        if base.get("items_per_sec") and result["items_per_sec"] is not None:
+            if result["items_per_sec"] < base["items_per_sec"] * (1 - limit):
+                regressions.append(f"{stage} items/s {base['items_per_sec']} → {result['items_per_sec']}")
+        if base.get("calls_per_politician"):
+            if result["calls_per_politician"] > base["calls_per_politician"] * (1 + limit):
+                regressions.append(f"{stage} 호출/정치인 {base['calls_per_politician']} → "
+                                   f"{result['calls_per_politician']}")
+        for kind in SPAN_KINDS:
+            before = base.get("spans", {}).get(kind, {}).get("p95_ms")
+            after = result["spans"][kind]["p95_ms"]
+            if before and after and after > before * (1 + limit):
+                regressions.append(f"{stage} {kind} p95 {before:.0f}ms → {after:.0f}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='V30 오프라인 벤치마크 (Mock LLM + Mock Supabase)')
+    parser.add_argument('--politicians', type=int, default=2, help='가상 정치인 수 (기본 2)')
+    parser.add_argument('--categories', type=int, default=1, help='카테고리 수 (1~10, 기본 1)')
+    parser.add_argument('--stages', default=",".join(STAGES), help='실행 단계 (기본 collect,validate,evaluate)')
+    parser.add_argument('--full', action='store_true', help='운영 목표량으로 수집 (기본: 미니 테스트 모드)')
+    parser.add_argument('--parallel', action='store_true', help='AI 병렬 실행 (collect/evaluate --parallel)')
+    parser.add_argument('--validate-mode', dest='validate_mode', default='validate',
+                        help="검증 파이프라인 모드 (기본 validate, 'all'이면 재수집 포함)")
+    parser.add_argument('--db-latency', dest='db_latency', type=float, default=5.0, help='DB 요청당 지연 (밀리초)')
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true', help='LLM 응답 캐시 끄기')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    parser.add_argument('--output-dir', dest='output_dir', help='span JSONL / 실행 로그 저장 디렉토리')
+    parser.add_argument('--compare', help='기준 결과 JSON (회귀면 종료 코드 1)')
+    parser.add_argument('--tolerance', type=float, default=10.0, help='회귀 판정 허용 범위 %% (기본 10)')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix="v30_bench_")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    log_path = os.path.join(args.output_dir or workdir, "benchmark.log")
+
+    politicians = make_politicians(args.politicians)
+    store = MockStore()
+    store.load({"politicians": politicians})
+    pg_server = MockPostgrestServer(store, latency_ms=args.db_latency).start()
+    replay = ReplayStore(args.replay) if args.replay else None
+    llm_state = MockLLMState(settings_from_args(args), replay, seed=args.seed)
+    llm_server = MockLLMServer(llm_state).start()
+
+    print(f"🧪 V30 벤치마크: 정치인 {len(politicians)}명 × 카테고리 {args.categories}개, 단계 {', '.join(stages)}")
+    print(f"   Mock PostgREST {pg_server.url} (지연 {args.db_latency:g}ms) / Mock LLM {llm_server.url} "
+          f"(지연 {args.latency:g}ms, 429 {args.rate_limit_rate:.0%}, 500 {args.error_rate:.0%})")
+    if replay:
+        print(f"   재생: {replay.counts()}")
+
+    configure_environment(pg_server.url, llm_server.url, workdir, args)
+    try:
+        cv, vv, ev = load_stage_modules(pg_server.url)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    # 수집/평가 모듈 공용 클라이언트 캐시 (init_ai_client가 먼저 조회)
+    import engine_v30
+    engine_v30.ai_clients.update(build_ai_clients(llm_server.url))
+
+    categories = range(1, max(1, min(args.categories, len(ev.CATEGORIES))) + 1)
+    runners = {
+        "collect": lambda pid, name: [
+            cv.collect_all_for_politician(pid, name, target_category=c, parallel=args.parallel, test_mode=not args.full)
+            for c in categories
+        ],
+        "validate": lambda pid, name: vv.run_validation_pipeline(pid, name, mode=args.validate_mode),
+        "evaluate": lambda pid, name: [
+            ev.evaluate_all(pid, name, target_category=ev.CATEGORIES[c - 1][0], parallel=args.parallel)
+            for c in categories
+        ],
+    }
+
+    results = {}
+    with open(log_path, 'a', encoding='utf-8') as log:
+        for stage in stages:
+            print(f"▶ {stage} ...", flush=True)
+            results[stage] = run_stage(stage, runners[stage], politicians, store, llm_state, log)
+            print(f"   {results[stage]['wall_sec']:.1f}초, {results[stage]['items']}개")
+
+    llm_server.stop()
+    pg_server.stop()
+    print_report(results, len(politicians))
+    print(f"\n📝 실행 로그: {log_path}")
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        "stages": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ 성능 회귀 ({args.tolerance:g}% 초과):")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"\n✅ 기준 대비 회귀 없음 (허용 {args.tolerance:g}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,10 @@ Grounding Redirect URL 수정 스크립트
 grounding-api-redirect URL을 최종 리다이렉트 URL로 변환하고
 올바른 data_type (OFFICIAL/PUBLIC)을 설정합니다.
 
+리다이렉트 해제는 scripts/url_canonical_v30.resolve_redirects 사용
+(비동기 동시 요청 + 영구 캐시, 수집 저장 시 해제한 결과 재사용)
+canonical_url 컬럼이 있으면 함께 갱신합니다.
+
 사용법:
     python fix_grounding_urls.py --politician_id=f9e00370 --politician_name="김민석"
 """
@@ -12,11 +16,14 @@ grounding-api-redirect URL을 최종 리다이렉트 URL로 변환하고
 import os
 import sys
 import argparse
-import requests
 from urllib.parse import urlparse
 from supabase import create_client
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# scripts/ 공용 모듈 (repository_v30, url_canonical_v30)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+from repository_v30 import iter_collected_data
+from url_canonical_v30 import is_redirect_wrapper, resolve_redirects, canonicalize_url, has_canonical_column
 
 # UTF-8 출력 설정
 if sys.platform == 'win32':
@@ -65,24 +72,14 @@ OFFICIAL_DOMAINS = [
 
 def is_grounding_redirect(url):
     """grounding-api-redirect URL 여부 확인"""
-    return 'grounding-api-redirect' in url if url else False
+    return is_redirect_wrapper(url)
 
 
-def get_final_url(url, timeout=10):
-    """리다이렉트 최종 URL 가져오기"""
+def get_final_url(url):
+    """리다이렉트 최종 URL 가져오기 (실패 시 원본 URL 유지)"""
     if not url or not is_grounding_redirect(url):
         return url
-
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.head(url, headers=headers, timeout=timeout, allow_redirects=True)
-        final_url = response.url
-        return final_url
-    except Exception as e:
-        # 리다이렉트 실패 시 원본 URL 유지
-        return url
+    return resolve_redirects([url]).get(url, url)
 
 
 def is_official_domain(url):
@@ -105,8 +102,8 @@ def determine_data_type(url):
         return 'public'
 
 
-def fix_item(item):
-    """단일 항목 수정"""
+def fix_item(item, final_urls):
+    """단일 항목 수정 (final_urls: resolve_redirects 결과)"""
     item_id = item.get('id')
     original_url = item.get('source_url', '')
     original_type = item.get('data_type', '')
@@ -114,8 +111,8 @@ def fix_item(item):
     if not is_grounding_redirect(original_url):
         return None  # 수정 불필요
 
-    # 최종 URL 가져오기
-    final_url = get_final_url(original_url)
+    # 최종 URL (해제 실패 시 원본)
+    final_url = final_urls.get(original_url, original_url)
 
     # data_type 결정
     correct_type = determine_data_type(final_url)
@@ -137,7 +134,8 @@ def main():
     parser = argparse.ArgumentParser(description='Grounding Redirect URL 수정')
     parser.add_argument('--politician_id', required=True, help='정치인 ID')
     parser.add_argument('--politician_name', required=True, help='정치인 이름')
-    parser.add_argument('--max_workers', type=int, default=10, help='병렬 처리 스레드 수')
+    parser.add_argument('--max_workers', type=int, default=10,
+                        help='(사용 안 함, 호환용) 동시 요청 수는 url_checker_v30 설정을 따름')
 
     args = parser.parse_args()
 
@@ -147,12 +145,10 @@ def main():
 
     # 1. grounding redirect URL 항목 조회
     print("1️⃣ grounding redirect URL 항목 조회 중...")
-    result = supabase.table(TABLE_COLLECTED_DATA)\
-        .select('*')\
-        .eq('politician_id', args.politician_id)\
-        .execute()
-
-    all_items = result.data
+    all_items = list(iter_collected_data(
+        args.politician_id,
+        columns="id, source_url, data_type"
+    ))
     grounding_items = [item for item in all_items if is_grounding_redirect(item.get('source_url', ''))]
 
     print(f"   전체: {len(all_items)}개")
@@ -162,22 +158,14 @@ def main():
         print("\n✅ 수정할 항목이 없습니다.")
         return
 
-    # 2. 최종 URL 및 data_type 확인
-    print(f"\n2️⃣ 최종 URL 확인 중 ({args.max_workers}개 병렬 처리)...")
+    # 2. 최종 URL 및 data_type 확인 (한 번에 동시 해제, 캐시된 URL은 요청 없음)
+    print("\n2️⃣ 최종 URL 확인 중...")
+    final_urls = resolve_redirects(item.get('source_url') for item in grounding_items)
     fixes = []
-
-    with ThreadPoolExecutor(max_workers=args.max_workers) as executor:
-        futures = {executor.submit(fix_item, item): item for item in grounding_items}
-
-        completed = 0
-        for future in as_completed(futures):
-            completed += 1
-            if completed % 50 == 0:
-                print(f"   진행: {completed}/{len(grounding_items)}")
-
-            result = future.result()
-            if result:
-                fixes.append(result)
+    for item in grounding_items:
+        result = fix_item(item, final_urls)
+        if result:
+            fixes.append(result)
 
     print(f"   완료: {len(grounding_items)}개 확인")
     print(f"   수정 필요: {len(fixes)}개")
@@ -210,14 +198,18 @@ def main():
     print(f"\n4️⃣ DB 업데이트 중...")
     updated = 0
     failed = 0
+    write_canonical = has_canonical_column()
 
     for fix in fixes:
+        values = {
+            'source_url': fix['final_url'],
+            'data_type': fix['correct_type']
+        }
+        if write_canonical:
+            values['canonical_url'] = canonicalize_url(fix['final_url'])
         try:
             supabase.table(TABLE_COLLECTED_DATA)\
-                .update({
-                    'source_url': fix['final_url'],
-                    'data_type': fix['correct_type']
-                })\
+                .update(values)\
                 .eq('id', fix['id'])\
                 .execute()
             updated += 1
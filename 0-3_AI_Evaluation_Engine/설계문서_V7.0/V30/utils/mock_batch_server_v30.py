@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 Mock 배치 API 서버 (evaluate_v30.py --batch-mode 테스트용)
+
+실제 API 비용 없이 배치 제출 → 폴링 → 결과 저장 흐름을 확인합니다.
+Anthropic Message Batches / OpenAI Files + Batches 엔드포인트 중
+batch_evaluate_v30.py가 쓰는 부분만 흉내 냅니다.
+
+- 프롬프트의 [항목 N] 개수만큼 평가를 만들어 반환 (등급은 +4 ~ -4 순환)
+- 구조화 출력 요청이면 Claude는 tool_use 블록, OpenAI는 순수 JSON으로 반환
+- 배치는 생성 후 --delay초 동안 처리 중, 이후 완료 상태
+
+사용법:
+    python mock_batch_server_v30.py --port 8089 --delay 2
+
+    # 다른 터미널 (scripts/)
+    ANTHROPIC_BASE_URL=http://localhost:8089 OPENAI_BASE_URL=http://localhost:8089/v1 \\
+        python evaluate_v30.py --politician_id=62e7b453 --batch-mode --poll-interval=1
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+from engine_v30 import configure_stdout
+
+RATINGS = ['+4', '+3', '+2', '+1', '-1', '-2', '-3', '-4']
+
+files = {}      # file_id → 내용 (str)
+batches = {}    # batch_id → {'kind', 'created', 'results': [...], ...}
+lock = threading.Lock()
+settings = {'delay': 2.0}
+
+
+def fake_evaluations(prompt):
+    """프롬프트의 항목 수만큼 평가 생성"""
+    count = len(re.findall(r'\[항목 \d+\]', prompt))
+    return {"evaluations": [
+        {"id": str(i + 1), "rating": RATINGS[i % len(RATINGS)], "rationale": "mock 평가"}
+        for i in range(count)
+    ]}
+
+
+def fake_evaluation_text(prompt, structured=False):
+    """평가 JSON 텍스트 (구조화 출력이면 순수 JSON, 아니면 코드 블록)"""
+    text = json.dumps(fake_evaluations(prompt), ensure_ascii=False)
+    return text if structured else "```json\n" + text + "\n```"
+
+
+def fake_claude_content(params):
+    """Claude 응답 content (tool_choice 강제면 tool_use 블록)"""
+    prompt = user_prompt(params['messages'])
+    tool_choice = params.get('tool_choice') or {}
+    if tool_choice.get('type') == 'tool':
+        return [{"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:24]}",
+                 "name": tool_choice.get('name'), "input": fake_evaluations(prompt)}]
+    return [{"type": "text", "text": fake_evaluation_text(prompt)}]
+
+
+def user_prompt(messages):
+    for message in messages:
+        if message.get('role') == 'user':
+            content = message.get('content')
+            if isinstance(content, list):
+                return "".join(block.get('text', '') for block in content)
+            return content or ''
+    return ''
+
+
+def parse_multipart_file(body, content_type):
+    """multipart/form-data에서 file 파트 내용 추출"""
+    boundary = content_type.split('boundary=')[-1].strip('"').encode()
+    for part in body.split(b'--' + boundary):
+        if b'name="file"' in part:
+            content = part.split(b'\r\n\r\n', 1)[1]
+            return content.rsplit(b'\r\n', 1)[0].decode('utf-8')
+    return ''
+
+
+class MockBatchHandler(BaseHTTPRequestHandler):
+    def log_message(self, fmt, *args):
+        print(f"  [mock] {self.command} {self.path}")
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, text, content_type='application/jsonl'):
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length) if length else b''
+
+    def _base_url(self):
+        return f"http://{self.headers.get('Host')}"
+
+    # ---------------- Anthropic ----------------
+    def _anthropic_batch(self, batch_id):
+        batch = batches[batch_id]
+        ended = time.time() - batch['created'] >= settings['delay']
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else len(batch['results']),
+                "succeeded": len(batch['results']) if ended else 0,
+                "errored": 0, "canceled": 0, "expired": 0
+            },
+            "created_at": "2026-01-01T00:00:00Z",
+            "expires_at": "2026-01-02T00:00:00Z",
+            "ended_at": "2026-01-01T00:01:00Z" if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self._base_url()}/v1/messages/batches/{batch_id}/results" if ended else None
+        }
+
+    def _anthropic_create(self, payload):
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        results = []
+        for request in payload.get('requests', []):
+            params = request['params']
+            results.append({
+                "custom_id": request['custom_id'],
+                "result": {
+                    "type": "succeeded",
+                    "message": {
+                        "id": f"msg_{uuid.uuid4().hex[:24]}",
+                        "type": "message",
+                        "role": "assistant",
+                        "model": params.get('model'),
+                        "content": fake_claude_content(params),
+                        "stop_reason": "tool_use" if params.get('tool_choice') else "end_turn",
+                        "stop_sequence": None,
+                        "usage": {"input_tokens": 200, "output_tokens": 300,
+                                  "cache_read_input_tokens": 1500, "cache_creation_input_tokens": 0}
+                    }
+                }
+            })
+        with lock:
+            batches[batch_id] = {'kind': 'anthropic', 'created': time.time(), 'results': results}
+        return self._anthropic_batch(batch_id)
+
+    # ---------------- OpenAI ----------------
+    def _openai_batch(self, batch_id):
+        batch = batches[batch_id]
+        done = time.time() - batch['created'] >= settings['delay']
+        if done and not batch.get('output_file_id'):
+            output_id = f"file-{uuid.uuid4().hex[:24]}"
+            files[output_id] = "\n".join(json.dumps(r, ensure_ascii=False) for r in batch['results']) + "\n"
+            batch['output_file_id'] = output_id
+        return {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": batch['input_file_id'],
+            "completion_window": "24h",
+            "status": "completed" if done else "in_progress",
+            "output_file_id": batch.get('output_file_id'),
+            "error_file_id": None,
+            "created_at": int(batch['created']),
+            "request_counts": {"total": len(batch['results']),
+                               "completed": len(batch['results']) if done else 0, "failed": 0}
+        }
+
+    def _openai_create(self, payload):
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        results = []
+        for line in files.get(payload['input_file_id'], '').splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            results.append({
+                "id": f"batch_req_{uuid.uuid4().hex[:16]}",
+                "custom_id": request['custom_id'],
+                "response": {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": {
+                        "id": f"chatcmpl-{uuid.uuid4().hex[:16]}",
+                        "object": "chat.completion",
+                        "model": request['body'].get('model'),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant",
+                                        "content": fake_evaluation_text(
+                                            user_prompt(request['body']['messages']),
+                                            structured='response_format' in request['body'])},
+                            "finish_reason": "stop"
+                        }],
+                        "usage": {"prompt_tokens": 1700, "completion_tokens": 300,
+                                  "prompt_tokens_details": {"cached_tokens": 1280}}
+                    }
+                },
+                "error": None
+            })
+        with lock:
+            batches[batch_id] = {'kind': 'openai', 'created': time.time(), 'results': results,
+                                 'input_file_id': payload['input_file_id']}
+        return self._openai_batch(batch_id)
+
+    # ---------------- 라우팅 ----------------
+    def do_POST(self):
+        body = self._read_body()
+        path = self.path.split('?')[0]
+
+        if path == '/v1/messages/batches':
+            return self._send_json(self._anthropic_create(json.loads(body)))
+
+        if path == '/v1/files':
+            file_id = f"file-{uuid.uuid4().hex[:24]}"
+            files[file_id] = parse_multipart_file(body, self.headers.get('Content-Type', ''))
+            return self._send_json({"id": file_id, "object": "file", "bytes": len(files[file_id]),
+                                    "created_at": int(time.time()), "filename": "batch.jsonl",
+                                    "purpose": "batch", "status": "processed"})
+
+        if path == '/v1/batches':
+            return self._send_json(self._openai_create(json.loads(body)))
+
+        self._send_json({"error": {"message": f"unknown path {path}"}}, status=404)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+
+        match = re.fullmatch(r'/v1/messages/batches/([\w-]+)/results', path)
+        if match and match.group(1) in batches:
+            results = batches[match.group(1)]['results']
+            return self._send_text("\n".join(json.dumps(r, ensure_ascii=False) for r in results) + "\n")
+
+        match = re.fullmatch(r'/v1/messages/batches/([\w-]+)', path)
+        if match and match.group(1) in batches:
+            return self._send_json(self._anthropic_batch(match.group(1)))
+
+        match = re.fullmatch(r'/v1/batches/([\w-]+)', path)
+        if match and match.group(1) in batches:
+            return self._send_json(self._openai_batch(match.group(1)))
+
+        match = re.fullmatch(r'/v1/files/([\w-]+)/content', path)
+        if match and match.group(1) in files:
+            return self._send_text(files[match.group(1)])
+
+        self._send_json({"error": {"message": f"unknown path {path}"}}, status=404)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 Mock 배치 API 서버 (Anthropic/OpenAI)')
+    parser.add_argument('--port', type=int, default=8089, help='포트 (기본 8089)')
+    parser.add_argument('--delay', type=float, default=2.0, help='배치 완료까지 걸리는 시간(초)')
+    args = parser.parse_args()
+
+    settings['delay'] = args.delay
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), MockBatchHandler)
+    print(f"🧪 Mock 배치 서버: http://localhost:{args.port} (완료 지연 {args.delay}초)")
+    print(f"   ANTHROPIC_BASE_URL=http://localhost:{args.port}")
+    print(f"   OPENAI_BASE_URL=http://localhost:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n종료")
+
+
+if __name__ == "__main__":
+    configure_stdout()
+    main()
@@ -0,0 +1,699 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 Mock LLM API 서버 (동기/스트리밍 호출, benchmark_v30.py / 오프라인 테스트용)
+
+실제 API 비용 없이 collect_v30 / evaluate_v30 / validate_v30의 호출 흐름과 처리량을 확인합니다.
+(배치 API는 mock_batch_server_v30.py)
+
+엔드포인트:
+- OpenAI 호환 (ChatGPT / Grok / Perplexity): POST /v1/chat/completions (stream, include_usage)
+- Anthropic: POST /v1/messages (stream: message_start ~ message_stop SSE, tool_use / input_json_delta)
+- Gemini: POST /v1beta/models/<model>:generateContent / :streamGenerateContent?alt=sse
+  (google_search 도구 요청이면 groundingMetadata에 항목 URL 포함)
+- 기사 URL 확인 (validate_v30): HTTP_PROXY로 이 서버를 지정하면 http:// 기사 URL HEAD/GET에 응답
+  (--dead-url-rate 비율은 404, URL별로 고정), https CONNECT는 거부 → 외부 네트워크 요청 없음
+
+응답 내용:
+- 평가 프롬프트([항목 N]): 항목 수만큼 평가 생성 (- ID: 줄의 ID 사용)
+- 수집 프롬프트: "개수: N개"만큼 기사 항목 생성 (URL은 실행 중 고유)
+- --replay: 기록된 응답 재생
+  * LLM 응답 캐시 (V30/.cache/llm_responses_v30.sqlite3, llm_cache_v30)
+  * JSONL ({"namespace": "collect" | "evaluate", "response": "..."})
+  수집 응답은 URL을 http://로 바꾸고 재사용 시 bench 파라미터로 고유화,
+  평가 응답은 등급/근거만 가져와 프롬프트의 항목 ID에 순서대로 배정
+
+지연/오류:
+- 응답 지연 = --latency(첫 토큰까지, ±--jitter) + 출력 토큰 / --tokens-per-sec
+  스트리밍은 청크 단위로 나눠 전송 (클라이언트가 중간에 닫으면 cancelled 집계)
+- --error-rate 비율은 500, --rate-limit-rate 비율은 429 (Retry-After: --retry-after초)
+- 같은 system/prefix가 반복되면 캐시 적중 토큰으로 보고 (공급자 프롬프트 캐싱 흉내)
+
+사용법:
+    python mock_llm_server_v30.py --port 8091 --latency 800 --tokens-per-sec 150 \\
+        --rate-limit-rate 0.02 --error-rate 0.01 --replay ../.cache/llm_responses_v30.sqlite3
+
+    # 통계: curl http://localhost:8091/__stats
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import zlib
+import random
+import sqlite3
+import string
+import argparse
+import threading
+from datetime import date, timedelta
+from urllib.parse import urlsplit, urlunsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+from engine_v30 import configure_stdout
+from mock_batch_server_v30 import RATINGS, user_prompt
+
+DEFAULT_SETTINGS = {
+    'latency': 0.8,          # 첫 토큰까지 (초)
+    'jitter': 0.3,           # 지연 변동 비율 (±)
+    'tokens_per_sec': 150,   # 출력 속도
+    'error_rate': 0.0,       # 500 비율
+    'rate_limit_rate': 0.0,  # 429 비율
+    'retry_after': 1,        # 429 Retry-After (초)
+    'dead_url_rate': 0.05,   # 기사 URL 404 비율
+    'url_latency': 0.05,     # 기사 URL 응답 지연 (초)
+    'chunk_chars': 40,       # 스트리밍 청크 크기 (문자)
+}
+
+PROVIDERS = ("openai", "anthropic", "gemini")
+
+# 수집 항목 생성용 어휘
+WORDS = ["예산", "조례", "국정감사", "공약", "지역구", "간담회", "정책", "토론회", "법안", "위원회",
+         "주민", "현안", "예결위", "청년", "복지", "교통", "재개발", "일자리", "교육", "안전",
+         "환경", "의정활동", "기자회견", "협의", "개정안", "현장", "점검", "지원", "확대", "추진"]
+PRESS = ["연합뉴스", "한국일보", "경향신문", "중앙일보", "한겨레", "동아일보", "서울신문", "뉴시스"]
+OFFICIAL_HOSTS = ["www.assembly.go.kr", "likms.assembly.go.kr", "www.mois.go.kr", "www.nec.go.kr"]
+PUBLIC_HOSTS = ["www.yna.co.kr", "www.hankookilbo.com", "www.khan.co.kr", "www.hani.co.kr", "www.newsis.com"]
+
+
+def estimate_tokens(text):
+    """rate_limiter_v30.estimate_tokens와 같은 추정 (한글 약 2자 = 1토큰)"""
+    return len(text) // 2 + 1 if text else 0
+
+
+def _slug(rng, length=10):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def requested_count(prompt, default=5):
+    """수집 프롬프트의 요청 개수 ("개수: 5개" / "게시물 5개")"""
+    match = re.search(r'개수:\s*(?:최대\s*)?(\d+)\s*개', prompt) or re.search(r'게시물\s*(\d+)\s*개', prompt)
+    return int(match.group(1)) if match else default
+
+
+def prompt_ids(prompt):
+    """평가 프롬프트의 항목 ID 목록 (없으면 [항목 N] 번호)"""
+    ids = re.findall(r'^- ID:\s*(\S+)', prompt, re.MULTILINE)
+    if ids:
+        return ids
+    return [str(i + 1) for i in range(len(re.findall(r'\[항목 \d+\]', prompt)))]
+
+
+def extract_items(text):
+    """기록된 수집 응답 → 항목 목록 (배열 / {"items": [...]} / 코드 블록)"""
+    candidates = [text]
+    match = re.search(r'\[[\s\S]*\]', text or '')
+    if match:
+        candidates.append(match.group(0))
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except (ValueError, TypeError):
+            continue
+        if isinstance(data, dict):
+            data = data.get('items') or data.get('results') or []
+        if isinstance(data, list):
+            return [item for item in data if isinstance(item, dict)]
+    return []
+
+
+def extract_evaluations(text):
+    try:
+        data = json.loads(text)
+    except (ValueError, TypeError):
+        match = re.search(r'\{[\s\S]*\}', text or '')
+        if not match:
+            return []
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return []
+    evaluations = data.get('evaluations', []) if isinstance(data, dict) else []
+    return [ev for ev in evaluations if isinstance(ev, dict) and ev.get('rating')]
+
+
+class ReplayStore:
+    """기록된 응답 (namespace별 순환 재생)"""
+
+    def __init__(self, path=None):
+        self.responses = {'collect': [], 'evaluate': []}
+        self.positions = {}
+        self.lock = threading.Lock()
+        if path:
+            self.load(path)
+
+    def load(self, path):
+        if path.endswith(('.sqlite3', '.sqlite', '.db')):
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                for namespace, response in conn.execute("SELECT namespace, response FROM responses"):
+                    self._add(namespace, response)
+            finally:
+                conn.close()
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._add(record.get('namespace'), record.get('response'))
+
+    def _add(self, namespace, response):
+        if namespace == 'collect' and extract_items(response):
+            self.responses['collect'].append(response)
+        elif namespace == 'evaluate' and extract_evaluations(response):
+            self.responses['evaluate'].append(response)
+
+    def counts(self):
+        return {namespace: len(items) for namespace, items in self.responses.items()}
+
+    def next(self, namespace):
+        """(응답, 재사용 횟수) - 기록이 없으면 (None, 0)"""
+        items = self.responses.get(namespace)
+        if not items:
+            return None, 0
+        with self.lock:
+            position = self.positions.get(namespace, 0)
+            self.positions[namespace] = position + 1
+        return items[position % len(items)], position // len(items)
+
+
+class MockLLMState:
+    """서버 공용 상태 (설정, 재생 데이터, 통계, 프롬프트 캐시)"""
+
+    def __init__(self, settings=None, replay=None, seed=None):
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.replay = replay or ReplayStore()
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.prefixes = set()   # 이미 본 system/prefix (캐시 적중 흉내)
+        self.sequence = 0
+        self.base_url = ""
+
+    def count(self, key, value=1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + value
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats)
+
+    def random(self):
+        with self.lock:
+            return self.rng.random()
+
+    def next_sequence(self):
+        with self.lock:
+            self.sequence += 1
+            return self.sequence
+
+    def cached_tokens(self, prefix):
+        """prefix가 이전 요청과 같으면 prefix 토큰 수 (공급자 최소 캐시 길이 1024토큰 이상만)"""
+        tokens = estimate_tokens(prefix)
+        if not prefix or tokens < 1024:
+            return 0
+        key = zlib.crc32(prefix.encode('utf-8'))
+        with self.lock:
+            seen = key in self.prefixes
+            self.prefixes.add(key)
+        return tokens if seen else 0
+
+    def delay(self):
+        jitter = self.settings['jitter']
+        with self.lock:
+            factor = 1 + self.rng.uniform(-jitter, jitter)
+        return max(0.0, self.settings['latency'] * factor)
+
+    def url_status(self, url):
+        """기사 URL 상태 (URL별 고정: dead_url_rate 비율만 404)"""
+        bucket = zlib.crc32(url.encode('utf-8')) % 10000
+        return 404 if bucket < self.settings['dead_url_rate'] * 10000 else 200
+
+    # ---------------- 응답 내용 ----------------
+    def evaluation_object(self, prompt):
+        ids = prompt_ids(prompt)
+        recorded, _reuse = self.replay.next('evaluate')
+        source = extract_evaluations(recorded) if recorded else []
+        evaluations = []
+        for i, item_id in enumerate(ids):
+            if source:
+                ev = source[i % len(source)]
+                rating, rationale = str(ev.get('rating')), str(ev.get('rationale') or ev.get('reasoning') or '')
+            else:
+                rating, rationale = RATINGS[(self.next_sequence()) % len(RATINGS)], "mock 평가 근거"
+            evaluations.append({"id": item_id, "rating": rating, "rationale": rationale})
+        return {"evaluations": evaluations}
+
+    def collection_items(self, prompt):
+        count = requested_count(prompt)
+        grok = "X(트위터) 게시물" in prompt or "X(트위터) 전담" in prompt
+        official = "공식 활동" in prompt or "공적활동" in prompt
+
+        recorded, reuse = self.replay.next('collect')
+        if recorded:
+            items = extract_items(recorded)[:count]
+            for item in items:
+                item['source_url'] = self._replay_url(item.get('source_url', ''), reuse)
+            if items:
+                return items
+
+        items = []
+        today = date.today()
+        with self.lock:
+            rng = random.Random(self.rng.random())
+        for _ in range(count):
+            words = rng.sample(WORDS, 6)
+            if grok:
+                url = f"X/@bench_{_slug(rng, 8)}"
+                source = "X"
+            else:
+                host = rng.choice(OFFICIAL_HOSTS if official else PUBLIC_HOSTS)
+                url = f"http://{host}/news/{_slug(rng)}"
+                source = host if official else rng.choice(PRESS)
+            items.append({
+                "title": f"{words[0]} {words[1]} 관련 {words[2]} 논의",
+                "content": " ".join(rng.sample(WORDS, 12)) + f" ({_slug(rng, 6)})",
+                "source": source,
+                "source_url": url,
+                "date": (today - timedelta(days=rng.randint(1, 300))).isoformat(),
+            })
+        return items
+
+    def _replay_url(self, url, reuse):
+        """기록된 URL → http:// (프록시로 이 서버가 응답), 재사용이면 bench 파라미터로 고유화"""
+        if not url.startswith(('http://', 'https://')):
+            return url
+        parts = urlsplit(url)
+        query = parts.query
+        if reuse:
+            query = f"{query}&bench={reuse}" if query else f"bench={reuse}"
+        return urlunsplit(('http', parts.netloc, parts.path, query, ''))
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    state = None          # MockLLMState (서버별 하위 클래스에서 지정)
+    verbose = False
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, fmt, *args):
+        if self.verbose:
+            print(f"  [mock-llm] {self.command} {self.path}")
+
+    # ---------------- 전송 ----------------
+    def _send_json(self, data, status=200, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_sse(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+    def _sse(self, data, event=None):
+        payload = (f"event: {event}\n" if event else "") + f"data: {data}\n\n"
+        self.wfile.write(payload.encode('utf-8'))
+        self.wfile.flush()
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _chunks(self, text):
+        size = self.state.settings['chunk_chars']
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    def _pace(self, text):
+        """청크 1개 출력 시간만큼 대기"""
+        tps = self.state.settings['tokens_per_sec']
+        if tps:
+            time.sleep(estimate_tokens(text) / tps)
+
+    def _inject_failure(self, provider):
+        """오류/429 주입 → 응답을 보냈으면 True"""
+        settings = self.state.settings
+        roll = self.state.random()
+        if roll < settings['rate_limit_rate']:
+            status, message = 429, "Rate limit exceeded (mock)"
+        elif roll < settings['rate_limit_rate'] + settings['error_rate']:
+            status, message = 500, "Internal server error (mock)"
+        else:
+            return False
+
+        self.state.count(f"{provider}.status.{status}")
+        headers = {'Retry-After': str(settings['retry_after'])} if status == 429 else {}
+        if provider == "anthropic":
+            kind = "rate_limit_error" if status == 429 else "api_error"
+            body = {"type": "error", "error": {"type": kind, "message": message}}
+        elif provider == "gemini":
+            body = {"error": {"code": status, "message": message,
+                              "status": "RESOURCE_EXHAUSTED" if status == 429 else "INTERNAL"}}
+        else:
+            body = {"error": {"message": message, "type": "rate_limit_exceeded" if status == 429 else "server_error",
+                              "code": None, "param": None}}
+        time.sleep(min(self.state.delay(), 0.2))
+        self._send_json(body, status=status, headers=headers)
+        return True
+
+    # ---------------- 내용 ----------------
+    def _content(self, prompt, evaluate, structured, wrapper):
+        """(응답 객체, 텍스트) - structured면 순수 JSON, wrapper는 수집 구조화 출력 래퍼 키"""
+        if evaluate:
+            data = self.state.evaluation_object(prompt)
+            text = json.dumps(data, ensure_ascii=False)
+            return data, text if structured else "```json\n" + text + "\n```"
+        items = self.state.collection_items(prompt)
+        if structured:
+            data = {wrapper or "items": items}
+            return data, json.dumps(data, ensure_ascii=False)
+        return items, json.dumps(items, ensure_ascii=False, indent=1)
+
+    def _finish(self, provider, output_text, cancelled=False):
+        self.state.count(f"{provider}.output_tokens", estimate_tokens(output_text))
+        self.state.count(f"{provider}.status.200")
+        if cancelled:
+            self.state.count(f"{provider}.cancelled")
+
+    def _stream(self, provider, frames):
+        """frames: (텍스트 조각, 이벤트 전송 함수) 제너레이터, 클라이언트가 닫으면 중단"""
+        sent = ""
+        try:
+            for piece, send in frames:
+                if piece:
+                    self._pace(piece)
+                send()
+                sent += piece or ""
+        except (BrokenPipeError, ConnectionResetError):
+            self._finish(provider, sent, cancelled=True)
+            return
+        self._finish(provider, sent)
+
+    # ---------------- OpenAI 호환 ----------------
+    def _openai(self, body):
+        provider = "openai"
+        messages = body.get('messages', [])
+        prompt = user_prompt(messages)
+        prefix = "".join(str(m.get('content', '')) for m in messages if m.get('role') == 'system')
+        response_format = body.get('response_format') or {}
+        structured = response_format.get('type') in ('json_schema', 'json_object')
+        wrapper = "items" if (response_format.get('json_schema') or {}).get('name') == "collected_items" else None
+        evaluate = bool(prompt_ids(prompt))
+        _data, text = self._content(prompt, evaluate, structured, wrapper)
+
+        input_tokens = estimate_tokens(prefix + prompt)
+        cached = self.state.cached_tokens(prefix)
+        usage = {"prompt_tokens": input_tokens, "completion_tokens": estimate_tokens(text),
+                 "total_tokens": input_tokens + estimate_tokens(text),
+                 "prompt_tokens_details": {"cached_tokens": cached}}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:16]}"
+        model = body.get('model')
+        time.sleep(self.state.delay())
+
+        if not body.get('stream'):
+            self._pace(text)
+            self._finish(provider, text)
+            return self._send_json({
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                             "finish_reason": "stop", "logprobs": None}],
+                "usage": usage
+            })
+
+        self.state.count(f"{provider}.stream")
+        include_usage = (body.get('stream_options') or {}).get('include_usage')
+
+        def chunk(delta, finish=None, usage_value=None, choices=True):
+            data = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}] if choices else []}
+            if usage_value is not None:
+                data["usage"] = usage_value
+            return json.dumps(data, ensure_ascii=False)
+
+        def frames():
+            yield None, lambda: self._sse(chunk({"role": "assistant", "content": ""}))
+            for piece in self._chunks(text):
+                yield piece, (lambda p=piece: self._sse(chunk({"content": p})))
+            yield None, lambda: self._sse(chunk({}, finish="stop"))
+            if include_usage:
+                yield None, lambda: self._sse(chunk(None, usage_value=usage, choices=False))
+            yield None, lambda: self._sse("[DONE]")
+
+        self._start_sse()
+        self._stream(provider, frames())
+
+    # ---------------- Anthropic ----------------
+    def _anthropic(self, body):
+        provider = "anthropic"
+        prompt = user_prompt(body.get('messages', []))
+        system = body.get('system') or ''
+        prefix = "".join(block.get('text', '') for block in system) if isinstance(system, list) else system
+        tool_choice = body.get('tool_choice') or {}
+        structured = tool_choice.get('type') == 'tool'
+        evaluate = bool(prompt_ids(prompt))
+        wrapper = "items" if tool_choice.get('name') == "collected_items" else None
+        data, text = self._content(prompt, evaluate, structured, wrapper)
+
+        cached = self.state.cached_tokens(prefix)
+        created = 0 if cached or estimate_tokens(prefix) < 1024 else estimate_tokens(prefix)
+        usage = {"input_tokens": estimate_tokens(prefix + prompt) - cached - created,
+                 "output_tokens": estimate_tokens(text),
+                 "cache_read_input_tokens": cached, "cache_creation_input_tokens": created}
+        if structured:
+            block = {"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:24]}", "name": tool_choice.get('name'),
+                     "input": data}
+        else:
+            block = {"type": "text", "text": text}
+        message = {"id": f"msg_{uuid.uuid4().hex[:24]}", "type": "message", "role": "assistant",
+                   "model": body.get('model'), "content": [block],
+                   "stop_reason": "tool_use" if structured else "end_turn", "stop_sequence": None, "usage": usage}
+        time.sleep(self.state.delay())
+
+        if not body.get('stream'):
+            self._pace(text)
+            self._finish(provider, text)
+            return self._send_json(message)
+
+        self.state.count(f"{provider}.stream")
+        start_block = dict(block, input={}) if structured else dict(block, text="")
+        delta_type = "input_json_delta" if structured else "text_delta"
+        delta_key = "partial_json" if structured else "text"
+
+        def event(kind, payload):
+            return lambda: self._sse(json.dumps(dict(payload, type=kind), ensure_ascii=False), event=kind)
+
+        def frames():
+            start_usage = dict(usage, output_tokens=1)
+            yield None, event("message_start", {"message": dict(message, content=[], stop_reason=None,
+                                                                usage=start_usage)})
+            yield None, event("content_block_start", {"index": 0, "content_block": start_block})
+            for piece in self._chunks(text):
+                yield piece, event("content_block_delta", {"index": 0, "delta": {"type": delta_type, delta_key: piece}})
+            yield None, event("content_block_stop", {"index": 0})
+            yield None, event("message_delta", {"delta": {"stop_reason": message['stop_reason'], "stop_sequence": None},
+                                                "usage": {"output_tokens": usage['output_tokens']}})
+            yield None, event("message_stop", {})
+
+        self._start_sse()
+        self._stream(provider, frames())
+
+    # ---------------- Gemini ----------------
+    def _gemini(self, body, stream):
+        provider = "gemini"
+        contents = body.get('contents') or []
+        prompt = "".join(part.get('text', '') for content in contents for part in content.get('parts', []))
+        system = body.get('systemInstruction') or body.get('system_instruction') or {}
+        prefix = "".join(part.get('text', '') for part in system.get('parts', [])) if isinstance(system, dict) else ''
+        config = body.get('generationConfig') or {}
+        structured = config.get('responseMimeType') == 'application/json'
+        grounding = any('googleSearch' in tool or 'google_search' in tool for tool in body.get('tools') or [])
+        evaluate = bool(prompt_ids(prompt))
+        data, text = self._content(prompt, evaluate, structured, "items")
+
+        cached = self.state.cached_tokens(prefix)
+        usage = {"promptTokenCount": estimate_tokens(prefix + prompt), "cachedContentTokenCount": cached,
+                 "candidatesTokenCount": estimate_tokens(text),
+                 "totalTokenCount": estimate_tokens(prefix + prompt) + estimate_tokens(text)}
+        grounding_metadata = None
+        if grounding and not evaluate:
+            items = data.get('items', []) if isinstance(data, dict) else data
+            grounding_metadata = {"groundingChunks": [
+                {"web": {"uri": item['source_url'], "title": item.get('source', '')}}
+                for item in items if str(item.get('source_url', '')).startswith('http')
+            ]}
+        model = self.path.split('/models/', 1)[-1].split(':', 1)[0]
+        time.sleep(self.state.delay())
+
+        def response(piece, final):
+            candidate = {"content": {"role": "model", "parts": [{"text": piece}]}, "index": 0}
+            if final:
+                candidate["finishReason"] = "STOP"
+                if grounding_metadata:
+                    candidate["groundingMetadata"] = grounding_metadata
+            return {"candidates": [candidate], "usageMetadata": usage, "modelVersion": model}
+
+        if not stream:
+            self._pace(text)
+            self._finish(provider, text)
+            return self._send_json(response(text, True))
+
+        self.state.count(f"{provider}.stream")
+        pieces = self._chunks(text)
+
+        def frames():
+            for i, piece in enumerate(pieces):
+                payload = json.dumps(response(piece, i == len(pieces) - 1), ensure_ascii=False)
+                yield piece, (lambda p=payload: self._sse(p))
+
+        self._start_sse()
+        self._stream(provider, frames())
+
+    # ---------------- 기사 URL (프록시) ----------------
+    def _article(self, send_body):
+        url = self.path
+        self.state.count("url.requests")
+        time.sleep(self.state.settings['url_latency'])
+        status = self.state.url_status(url.split('://', 1)[-1])
+        self.state.count(f"url.status.{status}")
+        body = b"<html><body>mock article</body></html>" if status == 200 else b"not found"
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    # ---------------- 라우팅 ----------------
+    def do_POST(self):
+        path = self.path.split('?')[0]
+        if path.endswith('/chat/completions'):
+            provider, handler = "openai", lambda body: self._openai(body)
+        elif path.endswith('/v1/messages'):
+            provider, handler = "anthropic", lambda body: self._anthropic(body)
+        elif ':generateContent' in path or ':streamGenerateContent' in path:
+            stream = ':streamGenerateContent' in path
+            provider, handler = "gemini", lambda body: self._gemini(body, stream)
+        else:
+            return self._send_json({"error": {"message": f"unknown path {path}"}}, status=404)
+
+        body = self._read_json()
+        self.state.count(f"{provider}.requests")
+        if self._inject_failure(provider):
+            return
+        handler(body)
+
+    def do_GET(self):
+        if self.path.startswith('http://'):
+            return self._article(send_body=True)
+        if self.path.split('?')[0] == '/__stats':
+            return self._send_json(self.state.snapshot())
+        self._send_json({"error": {"message": f"unknown path {self.path}"}}, status=404)
+
+    def do_HEAD(self):
+        if self.path.startswith('http://'):
+            return self._article(send_body=False)
+        self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_CONNECT(self):
+        # https 기사 URL은 터널을 열지 않음 (외부 네트워크 요청 방지)
+        self.state.count("url.connect_refused")
+        self.send_response(403)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class MockLLMServer:
+    """백그라운드 스레드 Mock LLM 서버 (port=0이면 빈 포트 자동 선택)"""
+
+    def __init__(self, state=None, host='127.0.0.1', port=0, verbose=False):
+        self.state = state or MockLLMState()
+        handler = type('Handler', (MockLLMHandler,), {'state': self.state, 'verbose': verbose})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+        self.state.base_url = self.url
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-llm", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_arguments(parser):
+    """지연/오류/재생 옵션 (benchmark_v30.py와 공용)"""
+    parser.add_argument('--latency', type=float, default=DEFAULT_SETTINGS['latency'] * 1000,
+                        help='첫 토큰까지 지연 (밀리초, 기본 800)')
+    parser.add_argument('--jitter', type=float, default=DEFAULT_SETTINGS['jitter'], help='지연 변동 비율 (기본 0.3)')
+    parser.add_argument('--tokens-per-sec', dest='tokens_per_sec', type=float,
+                        default=DEFAULT_SETTINGS['tokens_per_sec'], help='출력 속도 (0이면 즉시)')
+    parser.add_argument('--error-rate', dest='error_rate', type=float, default=0.0, help='500 응답 비율')
+    parser.add_argument('--rate-limit-rate', dest='rate_limit_rate', type=float, default=0.0, help='429 응답 비율')
+    parser.add_argument('--retry-after', dest='retry_after', type=int, default=DEFAULT_SETTINGS['retry_after'],
+                        help='429 Retry-After 초')
+    parser.add_argument('--dead-url-rate', dest='dead_url_rate', type=float,
+                        default=DEFAULT_SETTINGS['dead_url_rate'], help='기사 URL 404 비율')
+    parser.add_argument('--url-latency', dest='url_latency', type=float,
+                        default=DEFAULT_SETTINGS['url_latency'] * 1000, help='기사 URL 응답 지연 (밀리초)')
+    parser.add_argument('--replay', help='기록된 응답 (LLM 캐시 .sqlite3 또는 JSONL)')
+    parser.add_argument('--seed', type=int, help='난수 시드 (같은 시드 = 같은 오류/지연 순서)')
+
+
+def settings_from_args(args):
+    return {
+        'latency': args.latency / 1000,
+        'jitter': args.jitter,
+        'tokens_per_sec': args.tokens_per_sec,
+        'error_rate': args.error_rate,
+        'rate_limit_rate': args.rate_limit_rate,
+        'retry_after': args.retry_after,
+        'dead_url_rate': args.dead_url_rate,
+        'url_latency': args.url_latency / 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 Mock LLM API 서버 (OpenAI 호환 / Anthropic / Gemini)')
+    parser.add_argument('--port', type=int, default=8091, help='포트 (기본 8091)')
+    parser.add_argument('--verbose', action='store_true', help='요청마다 로그 출력')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    replay = ReplayStore(args.replay) if args.replay else None
+    state = MockLLMState(settings_from_args(args), replay, seed=args.seed)
+    server = MockLLMServer(state, port=args.port, verbose=args.verbose)
+    print(f"🧪 Mock LLM 서버: {server.url} (지연 {args.latency:g}ms, 429 {args.rate_limit_rate:.0%}, "
+          f"500 {args.error_rate:.0%})")
+    if replay:
+        print(f"   재생: {replay.counts()} ({os.path.basename(args.replay)})")
+    print(f"   OpenAI 호환: base_url={server.url}/v1 / Anthropic: base_url={server.url} / "
+          f"Gemini: http_options.base_url={server.url}")
+    print(f"   기사 URL 확인: HTTP_PROXY={server.url} NO_PROXY=127.0.0.1,localhost")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n종료")
+
+
+if __name__ == "__main__":
+    configure_stdout()
+    main()
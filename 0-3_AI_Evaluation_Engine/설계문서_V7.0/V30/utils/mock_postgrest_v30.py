@@ -0,0 +1,555 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 Mock PostgREST 서버 (Supabase REST 대역, benchmark_v30.py / 오프라인 테스트용)
+
+supabase-py(postgrest-py)가 V30 스크립트에서 보내는 요청만 메모리 테이블로 흉내 냅니다.
+실제 DB 없이 collected_data_v30 / evaluations_v30 / politicians 왕복 횟수와 지연을 재현합니다.
+
+지원 범위:
+- GET/HEAD: select(컬럼 목록, *), 필터 eq/neq/gt/gte/lt/lte/like/ilike/in/is (+ not. 부정),
+  order, limit, offset, Range 헤더, Prefer count=exact → Content-Range
+- POST: insert / upsert (Prefer resolution=merge|ignore-duplicates, on_conflict)
+  유니크 키 위반은 23505 (409), 같은 배치 전체 실패 (실제 PostgREST와 동일)
+- PATCH / DELETE: 필터에 맞는 행 갱신/삭제, return=representation이면 행 반환
+- RPC: collected_progress_v30 / evaluation_progress_v30 (migrations/add_progress_rpc_v30.sql)
+  그 외 함수는 PGRST202 (404) → 호출 측 대체 경로 실행
+- 마이그레이션 전 DB 흉내: --missing-columns collected_data_v30.canonical_url (조회/저장 시 42703)
+- 요청마다 --latency 밀리초 지연 (네트워크 왕복 + 쿼리 시간)
+
+사용법:
+    python mock_postgrest_v30.py --port 8090 --latency 20 --data seed.json
+
+    # 다른 터미널 (scripts/)
+    SUPABASE_URL=http://localhost:8090 SUPABASE_SERVICE_ROLE_KEY=mock.mock.mock \\
+        python evaluate_v30.py --politician_id=62e7b453 --category=1
+
+    # 통계: curl http://localhost:8090/__stats
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import fnmatch
+import argparse
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+from engine_v30 import configure_stdout
+
+# 기본값 (Database/create_v30_tables.sql, migrations/*_v30.sql)
+DEFAULTS = {
+    "collected_data_v30": {"is_verified": False, "is_relevant": True, "created_at": "now"},
+    "evaluations_v30": {"evaluated_at": "now"},
+    "politicians": {"created_at": "now"},
+}
+
+# 유니크 키 (기본 키 id 외)
+UNIQUE_KEYS = {
+    "collected_data_v30": [("politician_id", "collector_ai", "source_url")],   # add_collected_data_unique_url_v30.sql
+    "evaluations_v30": [("collected_data_id", "evaluator_ai")],                  # idx_v30_eval_unique
+}
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+class PostgrestError(Exception):
+    """PostgREST 오류 응답 (status + code + message)"""
+
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+    def body(self):
+        return {"code": self.code, "message": self.message, "details": None, "hint": None}
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _text(value):
+    """행 값 → PostgREST 필터 비교용 문자열"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _equals(cell, operand):
+    """eq 비교 (불리언은 대소문자 무시: postgrest-py는 True를 'True'로 보냄)"""
+    if isinstance(cell, bool):
+        return _text(cell) == operand.lower()
+    return _text(cell) == operand
+
+
+def _compare(cell, operand):
+    """대소 비교 (둘 다 숫자면 숫자, 아니면 문자열), cell이 NULL이면 None"""
+    if cell is None:
+        return None
+    try:
+        left, right = float(cell), float(operand)
+    except (TypeError, ValueError):
+        left, right = _text(cell), operand
+    return (left > right) - (left < right)
+
+
+def _parse_in_list(raw):
+    """'(a,"b,c",d)' → ['a', 'b,c', 'd']"""
+    raw = raw.strip()
+    if raw.startswith("(") and raw.endswith(")"):
+        raw = raw[1:-1]
+    return [m.group(1) if m.group(1) is not None else m.group(2)
+            for m in re.finditer(r'"((?:[^"\\]|\\.)*)"|([^,]+)', raw)]
+
+
+def _like(pattern, value, ignore_case=False):
+    if value is None:
+        return False
+    pattern = pattern.replace("%", "*")
+    if ignore_case:
+        return fnmatch.fnmatchcase(value.lower(), pattern.lower())
+    return fnmatch.fnmatchcase(value, pattern)
+
+
+def make_filter(column, expression):
+    """'eq.value' / 'not.in.(a,b)' → 행 판정 함수"""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, operand = expression.partition(".")
+
+    if op == "eq":
+        test = lambda cell: _equals(cell, operand)
+    elif op == "neq":
+        test = lambda cell: cell is not None and not _equals(cell, operand)
+    elif op in ("gt", "gte", "lt", "lte"):
+        def test(cell):
+            result = _compare(cell, operand)
+            if result is None:
+                return False
+            return {"gt": result > 0, "gte": result >= 0, "lt": result < 0, "lte": result <= 0}[op]
+    elif op == "in":
+        values = set(_parse_in_list(operand))
+        test = lambda cell: _text(cell) in values
+    elif op == "is":
+        expected = {"null": None, "true": True, "false": False}.get(operand.lower(), operand)
+        test = lambda cell: cell is expected if expected is None or isinstance(expected, bool) else cell == expected
+    elif op in ("like", "ilike"):
+        test = lambda cell: _like(operand, _text(cell), ignore_case=(op == "ilike"))
+    else:
+        raise PostgrestError(400, "PGRST100", f"지원하지 않는 연산자: {op}")
+
+    if negate:
+        return lambda row: not test(row.get(column))
+    return lambda row: test(row.get(column))
+
+
+def _sort_key(value):
+    """NULL은 마지막, 숫자/문자열 혼재 방지"""
+    if value is None:
+        return (2, "")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    return (1, _text(value))
+
+
+class MockStore:
+    """메모리 테이블 저장소 (스레드 안전)"""
+
+    def __init__(self, missing_columns=None, enable_rpc=True):
+        self.tables = {}
+        self.lock = threading.Lock()
+        self.missing = {}   # table → 없는 컬럼 집합 (마이그레이션 전 DB 흉내)
+        for spec in missing_columns or []:
+            table, _, column = spec.partition(".")
+            self.missing.setdefault(table, set()).add(column)
+        self.enable_rpc = enable_rpc
+        self.stats = {}     # "METHOD table" → 요청 수
+        self.rows_read = 0
+        self.rows_written = 0
+
+    # ---------------- 데이터 ----------------
+    def load(self, data):
+        """{table: [rows]} 추가 (id 없으면 생성)"""
+        with self.lock:
+            for table, rows in data.items():
+                target = self.tables.setdefault(table, [])
+                for row in rows:
+                    target.append(self._with_defaults(table, dict(row)))
+
+    def dump(self):
+        with self.lock:
+            return {table: [dict(row) for row in rows] for table, rows in self.tables.items()}
+
+    def count(self, table, **filters):
+        with self.lock:
+            return sum(1 for row in self.tables.get(table, [])
+                       if all(row.get(key) == value for key, value in filters.items()))
+
+    def record(self, method, table):
+        key = f"{method} {table}"
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {"requests": dict(self.stats), "rows_read": self.rows_read,
+                    "rows_written": self.rows_written,
+                    "tables": {table: len(rows) for table, rows in self.tables.items()}}
+
+    def _with_defaults(self, table, row):
+        row.setdefault("id", str(uuid.uuid4()))
+        for column, value in DEFAULTS.get(table, {}).items():
+            if column not in row and column not in self.missing.get(table, ()):
+                row[column] = _now() if value == "now" else value
+        return row
+
+    def _check_columns(self, table, columns):
+        missing = self.missing.get(table, set()).intersection(columns)
+        if missing:
+            raise PostgrestError(400, "42703", f"column {table}.{sorted(missing)[0]} does not exist")
+
+    # ---------------- 조회 ----------------
+    def _matcher(self, table, params):
+        filters = []
+        for column, expression in params:
+            if column in RESERVED_PARAMS:
+                continue
+            if column in ("or", "and"):
+                raise PostgrestError(400, "PGRST100", "or/and 필터는 지원하지 않음")
+            self._check_columns(table, [column])
+            filters.append(make_filter(column, expression))
+        return lambda row: all(f(row) for f in filters)
+
+    @staticmethod
+    def _columns(select):
+        if not select or select.strip() == "*":
+            return None
+        columns = []
+        for column in select.split(","):
+            column = column.strip().split("::")[0]   # 형변환(::text)은 무시
+            if column:
+                alias, _, name = column.rpartition(":")
+                columns.append((alias or name, name))
+        return columns
+
+    @staticmethod
+    def _order(rows, order):
+        for part in reversed([p for p in (order or "").split(",") if p]):
+            column, *modifiers = part.split(".")
+            desc = "desc" in modifiers
+            nulls_first = "nullsfirst" in modifiers
+            present = [r for r in rows if r.get(column) is not None]
+            nulls = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: _sort_key(r.get(column)), reverse=desc)
+            rows = nulls + present if nulls_first else present + nulls
+        return rows
+
+    def select(self, table, params, range_header=None):
+        """→ (행 목록, 필터에 맞는 전체 행 수, 시작 offset)"""
+        query = dict(params)
+        columns = self._columns(query.get("select"))
+        if columns:
+            self._check_columns(table, [name for _alias, name in columns])
+        matcher = self._matcher(table, params)
+
+        with self.lock:
+            rows = [row for row in self.tables.get(table, []) if matcher(row)]
+        total = len(rows)
+        rows = self._order(rows, query.get("order"))
+
+        offset = int(query.get("offset", 0))
+        limit = int(query["limit"]) if "limit" in query else None
+        if range_header:
+            match = re.match(r"(\d+)-(\d*)", range_header)
+            if match:
+                offset = int(match.group(1))
+                if match.group(2):
+                    limit = int(match.group(2)) - offset + 1
+        rows = rows[offset:offset + limit if limit is not None else None]
+
+        if columns:
+            rows = [{alias: row.get(name) for alias, name in columns} for row in rows]
+        else:
+            rows = [dict(row) for row in rows]
+        with self.lock:
+            self.rows_read += len(rows)
+        return rows, total, offset
+
+    # ---------------- 쓰기 ----------------
+    def _conflict(self, table, rows, row, keys):
+        """row와 keys 값이 같은 기존 행 (없으면 None)"""
+        if any(row.get(key) is None for key in keys):
+            return None   # NULL은 유니크 비교 대상 아님
+        values = tuple(_text(row.get(key)) for key in keys)
+        for existing in rows:
+            if tuple(_text(existing.get(key)) for key in keys) == values:
+                return existing
+        return None
+
+    def insert(self, table, records, on_conflict=None, resolution=None):
+        """insert / upsert → 반환 행 (ignore-duplicates면 새로 들어간 행만)"""
+        if isinstance(records, dict):
+            records = [records]
+        for record in records:
+            self._check_columns(table, record.keys())
+
+        unique_keys = [("id",)] + UNIQUE_KEYS.get(table, [])
+        conflict_keys = tuple(c.strip() for c in on_conflict.split(",")) if on_conflict else ("id",)
+
+        with self.lock:
+            rows = self.tables.setdefault(table, [])
+            staged = list(rows)
+            returned = []
+            inserted = []
+            for record in records:
+                record = dict(record)
+                existing = self._conflict(table, staged, record, conflict_keys) if resolution else None
+                if existing is not None:
+                    if resolution == "merge":
+                        existing.update(record)
+                        returned.append(dict(existing))
+                    continue
+                row = self._with_defaults(table, record)
+                for keys in unique_keys:
+                    if self._conflict(table, staged, row, keys) is not None:
+                        raise PostgrestError(409, "23505",
+                                             f'duplicate key value violates unique constraint ({", ".join(keys)})')
+                staged.append(row)
+                inserted.append(row)
+                returned.append(dict(row))
+            rows.extend(inserted)
+            self.rows_written += len(returned)
+        return returned
+
+    def update(self, table, values, params):
+        self._check_columns(table, values.keys())
+        matcher = self._matcher(table, params)
+        with self.lock:
+            updated = []
+            for row in self.tables.get(table, []):
+                if matcher(row):
+                    row.update(values)
+                    updated.append(dict(row))
+            self.rows_written += len(updated)
+        return updated
+
+    def delete(self, table, params):
+        matcher = self._matcher(table, params)
+        with self.lock:
+            rows = self.tables.get(table, [])
+            deleted = [dict(row) for row in rows if matcher(row)]
+            self.tables[table] = [row for row in rows if not matcher(row)]
+            self.rows_written += len(deleted)
+        return deleted
+
+    # ---------------- RPC ----------------
+    def rpc(self, name, args):
+        function = RPC_FUNCTIONS.get(name) if self.enable_rpc else None
+        if function is None:
+            raise PostgrestError(404, "PGRST202", f"Could not find the function public.{name}")
+        with self.lock:
+            return function(self.tables, **args)
+
+
+def _group_count(rows, columns):
+    counts = {}
+    for row in rows:
+        key = tuple(row.get(column) for column in columns)
+        counts[key] = counts.get(key, 0) + 1
+    return [dict(zip(columns, key), n=n) for key, n in counts.items()]
+
+
+def collected_progress_v30(tables, p_politician_id):
+    rows = [r for r in tables.get("collected_data_v30", []) if r.get("politician_id") == p_politician_id]
+    return _group_count(rows, ("category", "data_type", "collector_ai", "sentiment"))
+
+
+def evaluation_progress_v30(tables, p_politician_id):
+    rows = [r for r in tables.get("evaluations_v30", []) if r.get("politician_id") == p_politician_id]
+    return _group_count(rows, ("category", "evaluator_ai"))
+
+
+RPC_FUNCTIONS = {
+    "collected_progress_v30": collected_progress_v30,
+    "evaluation_progress_v30": evaluation_progress_v30,
+}
+
+
+class MockPostgrestHandler(BaseHTTPRequestHandler):
+    store = None       # MockStore (서버별 하위 클래스에서 지정)
+    latency = 0.0      # 요청당 지연 (초)
+    verbose = False
+
+    def log_message(self, fmt, *args):
+        if self.verbose:
+            print(f"  [postgrest] {self.command} {self.path}")
+
+    def _send_json(self, data, status=200, headers=None, body=True):
+        payload = json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(payload) if body else 0))
+        self.end_headers()
+        if body:
+            self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _prefer(self):
+        prefer = {}
+        for part in (self.headers.get('Prefer') or '').split(','):
+            key, _, value = part.strip().partition('=')
+            if key:
+                prefer[key] = value
+        return prefer
+
+    def _route(self):
+        """→ (kind, name, params): kind = table / rpc / stats"""
+        parts = urlsplit(self.path)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        path = parts.path.rstrip('/')
+        if path == '/__stats':
+            return 'stats', None, params
+        name = path.split('/rest/v1/', 1)[-1] if '/rest/v1/' in path else path.lstrip('/')
+        if name.startswith('rpc/'):
+            return 'rpc', name[4:], params
+        return 'table', name, params
+
+    def _handle(self, method):
+        kind, name, params = self._route()
+        if kind == 'stats':
+            return self._send_json(self.store.snapshot())
+
+        self.store.record(method, f"rpc/{name}" if kind == 'rpc' else name)
+        if self.latency:
+            time.sleep(self.latency)
+
+        prefer = self._prefer()
+        try:
+            if kind == 'rpc':
+                return self._send_json(self.store.rpc(name, self._read_json()))
+
+            if method in ('GET', 'HEAD'):
+                rows, total, offset = self.store.select(name, params, self.headers.get('Range'))
+                headers = {}
+                if prefer.get('count'):
+                    end = f"{offset}-{offset + len(rows) - 1}" if rows else "*"
+                    headers['Content-Range'] = f"{end}/{total}"
+                return self._send_json(rows, headers=headers, body=(method == 'GET'))
+
+            if method == 'POST':
+                resolution = prefer.get('resolution', '').replace('-duplicates', '') or None
+                rows = self.store.insert(name, self._read_json(), dict(params).get('on_conflict'), resolution)
+                status = 201
+            elif method == 'PATCH':
+                rows = self.store.update(name, self._read_json(), params)
+                status = 200
+            else:  # DELETE
+                rows = self.store.delete(name, params)
+                status = 200
+
+            headers = {'Content-Range': f"*/{len(rows)}"} if prefer.get('count') else {}
+            if prefer.get('return') == 'minimal':
+                self.send_response(204)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                return
+            return self._send_json(rows, status=status, headers=headers)
+        except PostgrestError as e:
+            return self._send_json(e.body(), status=e.status)
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send_json({"code": "PGRST100", "message": str(e), "details": None, "hint": None},
+                                   status=400)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_HEAD(self):
+        self._handle('HEAD')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+class MockPostgrestServer:
+    """백그라운드 스레드 Mock PostgREST (port=0이면 빈 포트 자동 선택)"""
+
+    def __init__(self, store=None, host='127.0.0.1', port=0, latency_ms=0.0, verbose=False):
+        self.store = store or MockStore()
+        handler = type('Handler', (MockPostgrestHandler,), {
+            'store': self.store, 'latency': latency_ms / 1000, 'verbose': verbose
+        })
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-postgrest", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 Mock PostgREST 서버 (Supabase REST 대역)')
+    parser.add_argument('--port', type=int, default=8090, help='포트 (기본 8090)')
+    parser.add_argument('--latency', type=float, default=0.0, help='요청당 지연 (밀리초)')
+    parser.add_argument('--data', help='초기 데이터 JSON ({테이블: [행...]})')
+    parser.add_argument('--save', help='종료 시 전체 테이블을 저장할 JSON 경로')
+    parser.add_argument('--missing-columns', dest='missing_columns', default='',
+                        help='없는 것으로 취급할 컬럼 (예: collected_data_v30.canonical_url,collected_data_v30.cluster_id)')
+    parser.add_argument('--no-rpc', dest='no_rpc', action='store_true', help='RPC 없는 DB 흉내 (모든 RPC 404)')
+    parser.add_argument('--verbose', action='store_true', help='요청마다 로그 출력')
+    args = parser.parse_args()
+
+    store = MockStore([c for c in args.missing_columns.split(',') if c], enable_rpc=not args.no_rpc)
+    if args.data:
+        with open(args.data, 'r', encoding='utf-8') as f:
+            store.load(json.load(f))
+
+    server = MockPostgrestServer(store, port=args.port, latency_ms=args.latency, verbose=args.verbose)
+    print(f"🧪 Mock PostgREST: {server.url} (지연 {args.latency:g}ms)")
+    print(f"   SUPABASE_URL={server.url} SUPABASE_SERVICE_ROLE_KEY=mock.mock.mock")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n종료")
+    finally:
+        if args.save:
+            with open(args.save, 'w', encoding='utf-8') as f:
+                json.dump(store.dump(), f, ensure_ascii=False, default=str)
+            print(f"💾 저장: {args.save}")
+
+
+if __name__ == "__main__":
+    configure_stdout()
+    main()
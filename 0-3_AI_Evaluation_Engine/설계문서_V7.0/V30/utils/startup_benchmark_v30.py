@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+V30 단계 시작 비용 벤치마크 (새 프로세스 vs 같은 프로세스)
+
+run_v30_workflow.py --isolated (단계마다 새 python 프로세스)와
+politician-eval workflow (engine_v30.run_main, 같은 프로세스)의 단계 전환 비용을 비교합니다.
+
+단계 시작 비용 = 인터프리터 시작 + 모듈 import + Supabase 클라이언트 생성 + 단계가 쓰는 AI SDK 클라이언트 생성
+- 새 프로세스: 단계마다 위 비용 전체를 다시 지불 (단계별 자식 프로세스 전체 시간)
+- 같은 프로세스: 자식 프로세스 1개에서 단계 순서대로 준비 → 단계별 증분 시간
+  (앞 단계에서 import/생성한 모듈·클라이언트는 재사용)
+
+네트워크 요청은 없음 (클라이언트 생성만, API 키가 없으면 가짜 키 사용)
+
+사용법:
+    python startup_benchmark_v30.py                 # 3회 반복 중앙값
+    python startup_benchmark_v30.py --repeat 5 --output startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+
+# 워크플로우 순서 (run_v30_workflow.main) → 단계가 쓰는 AI
+STAGES = [
+    ("collect_v30", ["Grok", "Gemini"]),
+    ("validate_v30", []),
+    ("relevance_v30", []),
+    ("evaluate_v30", ["Claude", "ChatGPT", "Gemini", "Grok"]),
+    ("calculate_v30_scores", []),
+]
+
+# 자식 프로세스: stages를 순서대로 준비하고 단계별 (import, client, sdk) 시간 출력
+CHILD_CODE = """
+import sys, time, json, importlib
+sys.path.insert(0, {scripts!r})
+results = []
+for module_name, ais in {stages!r}:
+    t0 = time.perf_counter()
+    importlib.import_module(module_name)
+    t1 = time.perf_counter()
+    from repository_v30 import get_client
+    get_client()
+    t2 = time.perf_counter()
+    from engine_v30 import init_ai_client
+    missing = []
+    for ai_name in ais:
+        try:
+            init_ai_client(ai_name)
+        except ImportError:
+            missing.append(ai_name)
+    t3 = time.perf_counter()
+    results.append({{"module": module_name, "import": t1 - t0, "client": t2 - t1, "sdk": t3 - t2,
+                    "missing_sdk": missing}})
+print("@@" + json.dumps(results))
+"""
+
+# 키가 없으면 클라이언트 생성만 가능한 가짜 값 (.env가 있으면 load_env가 덮어씀)
+DUMMY_ENV = {
+    "SUPABASE_URL": "http://127.0.0.1:54321",
+    "SUPABASE_SERVICE_ROLE_KEY": "mock.mock.mock",
+    "ANTHROPIC_API_KEY": "mock",
+    "OPENAI_API_KEY": "mock",
+    "XAI_API_KEY": "mock",
+    "GEMINI_API_KEY": "mock",
+}
+
+
+def run_child(stages):
+    """자식 프로세스 1개 실행 → (전체 시간 초, 단계별 결과)"""
+    env = dict(os.environ)
+    for key, value in DUMMY_ENV.items():
+        env.setdefault(key, value)
+    env.setdefault('V30_TELEMETRY_JSONL', 'off')
+    env['PYTHONIOENCODING'] = 'utf-8'
+
+    code = CHILD_CODE.format(scripts=SCRIPTS_DIR, stages=stages)
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, encoding='utf-8',
+                            env=env, cwd=SCRIPTS_DIR)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "자식 프로세스 실패")
+    payload = next(line for line in result.stdout.splitlines() if line.startswith("@@"))
+    return wall, json.loads(payload[2:])
+
+
+def measure(repeat):
+    isolated = {module_name: [] for module_name, _ais in STAGES}
+    shared = {module_name: [] for module_name, _ais in STAGES}
+    details = {}
+    missing = set()
+
+    for _ in range(repeat):
+        # 새 프로세스: 단계마다 자식 프로세스 전체 시간
+        for module_name, ais in STAGES:
+            wall, [stage] = run_child([(module_name, ais)])
+            isolated[module_name].append(wall)
+            details.setdefault(module_name, []).append(stage)
+            missing.update(stage['missing_sdk'])
+
+        # 같은 프로세스: 자식 1개에서 순서대로, 단계별 증분 (첫 단계는 인터프리터 시작 포함)
+        wall, stages = run_child(STAGES)
+        interpreter = wall - sum(stage['import'] + stage['client'] + stage['sdk'] for stage in stages)
+        for i, stage in enumerate(stages):
+            elapsed = stage['import'] + stage['client'] + stage['sdk'] + (interpreter if i == 0 else 0)
+            shared[stage['module']].append(elapsed)
+
+    rows = []
+    for module_name, _ais in STAGES:
+        breakdown = details[module_name]
+        rows.append({
+            "module": module_name,
+            "isolated_ms": statistics.median(isolated[module_name]) * 1000,
+            "shared_ms": statistics.median(shared[module_name]) * 1000,
+            "import_ms": statistics.median(stage['import'] for stage in breakdown) * 1000,
+            "client_ms": statistics.median(stage['client'] for stage in breakdown) * 1000,
+            "sdk_ms": statistics.median(stage['sdk'] for stage in breakdown) * 1000,
+        })
+    return rows, sorted(missing)
+
+
+def print_report(rows, missing, repeat):
+    print(f"\n⏱️ 단계 시작 비용 (중앙값, {repeat}회)")
+    print(f"   {'단계':<22}{'새 프로세스':>12}{'(import':>10}{'client':>9}{'SDK)':>8}{'같은 프로세스':>14}")
+    for row in rows:
+        print(f"   {row['module']:<22}{row['isolated_ms']:>10.0f}ms{row['import_ms']:>9.0f}"
+              f"{row['client_ms']:>9.0f}{row['sdk_ms']:>8.0f}{row['shared_ms']:>12.0f}ms")
+    total_isolated = sum(row['isolated_ms'] for row in rows)
+    total_shared = sum(row['shared_ms'] for row in rows)
+    print(f"   {'합계':<22}{total_isolated:>10.0f}ms{'':>26}{total_shared:>12.0f}ms")
+    if total_shared:
+        print(f"   → 같은 프로세스 실행 시 단계 전환 비용 {total_isolated / total_shared:.1f}배 감소")
+    if missing:
+        print(f"   ⚠️ SDK 미설치로 제외: {', '.join(missing)} (실제 실행 시 해당 AI 첫 호출에 추가)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='V30 단계 시작 비용 벤치마크 (새 프로세스 vs 같은 프로세스)')
+    parser.add_argument('--repeat', type=int, default=3, help='반복 횟수 (중앙값, 기본 3)')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    rows, missing = measure(max(1, args.repeat))
+    print_report(rows, missing, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"repeat": args.repeat, "stages": rows, "missing_sdk": missing}, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
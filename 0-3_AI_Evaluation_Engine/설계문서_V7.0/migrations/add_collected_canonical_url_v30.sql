@@ -0,0 +1,64 @@
+-- ============================================================
+-- collected_data_v30 정규화 URL (canonical_url)
+-- ============================================================
+-- 작성일: 2026-10-18
+-- 이유: 중복 키가 source_url 원문 그대로라
+--       추적 파라미터(utm_*, fbclid), 모바일 호스트(m.), AMP 사본, 끝 슬래시,
+--       Gemini grounding-api-redirect 래퍼가 모두 다른 기사로 취급됨
+--
+-- 배경:
+-- - V30/scripts/url_canonical_v30.py: canonicalize_url (네트워크 없는 정규화)
+--   + 리다이렉트 해제 영구 캐시 (SQLite)
+-- - collect_v30.py 저장 시 래퍼를 해제한 source_url과 canonical_url을 함께 기록
+-- - 수집 중복 제거 / validate_v30 중복 확인 / evaluate_v30 풀링이 모두 canonical_url로 비교
+-- - 같은 AI + 같은 source_url 유니크 키(add_collected_data_unique_url_v30.sql)는 그대로 유지
+--   (canonical_url 중복은 저장 전 로컬 인덱스와 validate_v30 중복 검증에서 처리)
+--
+-- 기존 행 채우기:
+--   1) 아래 3번에서 source_url 원문으로 먼저 채움 (대부분의 행은 정규화해도 같음)
+--   2) python url_canonical_v30.py --all   (정규화로 달라지는 행 + 래퍼 해제)
+-- ============================================================
+
+-- 1. 컬럼 추가
+ALTER TABLE collected_data_v30 ADD COLUMN IF NOT EXISTS canonical_url TEXT;
+
+COMMENT ON COLUMN collected_data_v30.canonical_url IS '중복 판정용 정규화 URL (url_canonical_v30.canonicalize_url)';
+
+-- 2. 인덱스
+-- 같은 AI 중복 확인 (validate_v30.check_duplicate)
+CREATE INDEX IF NOT EXISTS idx_v30_collected_canonical_ai
+ON collected_data_v30(politician_id, collector_ai, canonical_url);
+
+-- AI 간 중복 분석 (같은 기사를 여러 AI가 수집)
+CREATE INDEX IF NOT EXISTS idx_v30_collected_canonical
+ON collected_data_v30(politician_id, canonical_url);
+
+-- 3. 기존 행 1차 채우기 (원문 공백 제거)
+UPDATE collected_data_v30
+SET canonical_url = btrim(source_url)
+WHERE canonical_url IS NULL AND source_url IS NOT NULL AND btrim(source_url) <> '';
+
+-- 4. AI 간 URL 중복 뷰 (2개 이상 AI가 수집한 기사만)
+CREATE OR REPLACE VIEW v30_url_overlap AS
+SELECT
+    politician_id,
+    canonical_url,
+    COUNT(*) AS row_count,
+    COUNT(DISTINCT collector_ai) AS collector_count,
+    ARRAY_AGG(DISTINCT collector_ai ORDER BY collector_ai) AS collectors
+FROM collected_data_v30
+WHERE canonical_url IS NOT NULL
+GROUP BY politician_id, canonical_url
+HAVING COUNT(DISTINCT collector_ai) > 1;
+
+COMMENT ON VIEW v30_url_overlap IS 'V30 AI 간 중복 수집 기사 (정규화 URL 기준)';
+
+-- 5. 검증
+DO $$
+DECLARE
+  filled INTEGER;
+BEGIN
+  SELECT COUNT(*) INTO filled FROM collected_data_v30 WHERE canonical_url IS NOT NULL;
+  RAISE NOTICE '✅ collected_data_v30.canonical_url 추가 완료 (%행 1차 채움)', filled;
+  RAISE NOTICE '   정규화/래퍼 해제: python url_canonical_v30.py --all';
+END $$;
@@ -0,0 +1,52 @@
+-- ============================================================
+-- collected_data_v30 유사 중복 묶음 ID (cluster_id)
+-- ============================================================
+-- 작성일: 2026-10-18
+-- 이유: 중복 판정이 같은 AI + 같은 URL 기준뿐이라
+--       같은 기사가 다른 URL로 재배포되거나 Gemini/Grok이 같은 내용을 다시 요약해도
+--       각각 4개 AI가 따로 평가 (묶음 크기 × 4회 호출)
+--
+-- 배경:
+-- - V30/scripts/near_dup_v30.py: 제목+내용 MinHash-LSH 인덱스 (정치인 × 카테고리)
+-- - collect_v30.py 저장 시 묶음 ID를 함께 기록 (id도 클라이언트에서 생성)
+-- - cluster_id = 묶음 대표 행의 id, NULL이면 자기 자신이 대표 (단독 묶음)
+--   → 유효 묶음 ID = COALESCE(cluster_id, id)
+-- - evaluate_v30.py: 묶음마다 대표 1개만 평가하고 등급을 나머지 행에 복제 저장
+--   (다른 AI가 같은 내용을 수집한 자연 가중치는 행 단위로 그대로 유지)
+--
+-- 기존 행 채우기:
+--   python near_dup_v30.py --politician_id=62e7b453
+--   python near_dup_v30.py --all
+-- ============================================================
+
+-- 1. 컬럼 추가
+ALTER TABLE collected_data_v30 ADD COLUMN IF NOT EXISTS cluster_id UUID;
+
+COMMENT ON COLUMN collected_data_v30.cluster_id IS '유사 중복 묶음 대표 행 id (NULL = 자기 자신이 대표)';
+
+-- 2. 묶음 조회용 인덱스
+CREATE INDEX IF NOT EXISTS idx_v30_collected_cluster
+ON collected_data_v30(politician_id, category, cluster_id)
+WHERE cluster_id IS NOT NULL;
+
+-- 3. 묶음 현황 뷰 (2개 이상 묶인 것만)
+CREATE OR REPLACE VIEW v30_collected_clusters AS
+SELECT
+    politician_id,
+    category,
+    COALESCE(cluster_id, id) AS cluster_id,
+    COUNT(*) AS member_count,
+    COUNT(DISTINCT collector_ai) AS collector_count,
+    MIN(title) AS sample_title
+FROM collected_data_v30
+GROUP BY politician_id, category, COALESCE(cluster_id, id)
+HAVING COUNT(*) > 1;
+
+COMMENT ON VIEW v30_collected_clusters IS 'V30 유사 중복 묶음 (대표 id, 묶음 크기, 수집 AI 수)';
+
+-- 4. 검증
+DO $$
+BEGIN
+  RAISE NOTICE '✅ collected_data_v30.cluster_id 추가 완료';
+  RAISE NOTICE '   기존 행 채우기: python near_dup_v30.py --all';
+END $$;
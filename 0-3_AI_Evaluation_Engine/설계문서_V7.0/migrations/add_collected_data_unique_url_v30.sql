@@ -0,0 +1,31 @@
+-- ============================================================
+-- collected_data_v30 (politician_id, collector_ai, source_url) 유니크 키
+-- ============================================================
+-- 작성일: 2026-10-18
+-- 이유: collect_v30.py 저장을 아이템당 중복 조회 + 단건 insert에서
+--       URL 인덱스 사전 로드 + 벌크 upsert(ON CONFLICT DO NOTHING)로 변경
+--
+-- 배경:
+-- - 기존: 아이템마다 count 조회 1회 + insert 1회 (정치인당 약 2,000회 왕복)
+-- - 수정: 정치인당 URL 인덱스 1회 로드, 200개 단위 upsert
+--         (동시 실행 시 남는 중복은 이 유니크 키가 차단)
+-- ============================================================
+
+-- 1. 기존 중복 정리 (같은 정치인 + 같은 AI + 같은 URL 중 가장 먼저 저장된 행만 유지)
+DELETE FROM collected_data_v30 a
+USING collected_data_v30 b
+WHERE a.politician_id = b.politician_id
+  AND a.collector_ai = b.collector_ai
+  AND a.source_url = b.source_url
+  AND (a.created_at, a.id) > (b.created_at, b.id);
+
+-- 2. 유니크 인덱스 추가 (upsert on_conflict 대상)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_v30_collected_unique_url
+ON collected_data_v30(politician_id, collector_ai, source_url);
+
+-- 3. 검증
+DO $$
+BEGIN
+  RAISE NOTICE '✅ collected_data_v30 유니크 키 추가 완료';
+  RAISE NOTICE '   (politician_id, collector_ai, source_url)';
+END $$;
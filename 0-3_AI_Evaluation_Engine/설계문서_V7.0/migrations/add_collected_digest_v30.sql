@@ -0,0 +1,49 @@
+-- ============================================================
+-- collected_data_v30 평가용 항목 요약 (digest)
+-- ============================================================
+-- 작성일: 2026-10-18
+-- 이유: 평가 프롬프트가 항목마다 content[:300]을 그대로 보내
+--       앞부분 도입부/제목 반복에 토큰을 쓰고 수치·날짜·발언은 잘리기도 함,
+--       같은 텍스트를 4개 평가 AI가 각각 입력 토큰으로 지불
+--
+-- 배경:
+-- - V30/scripts/digest_v30.py: 본문 추출 요약 (이름/날짜/숫자/주장 문장 우선, 최대 200자)
+-- - collect_v30.py 저장 시 함께 기록, validate_v30.py 끝에 미기록/이전 버전 행 채우기
+-- - evaluate_v30.py: 프롬프트 항목 내용 = digest (4개 평가 AI 공통)
+-- - digest_version: 요약 규칙 버전 (digest_v30.DIGEST_VERSION과 다르면 다시 계산)
+-- - digest_tokens: digest 추정 토큰 수 (rate_limiter_v30.estimate_tokens)
+--
+-- 기존 행 채우기:
+--   python digest_v30.py --politician_id=62e7b453
+--   python digest_v30.py --all
+-- ============================================================
+
+-- 1. 컬럼 추가
+ALTER TABLE collected_data_v30 ADD COLUMN IF NOT EXISTS digest TEXT;
+ALTER TABLE collected_data_v30 ADD COLUMN IF NOT EXISTS digest_version SMALLINT;
+ALTER TABLE collected_data_v30 ADD COLUMN IF NOT EXISTS digest_tokens INTEGER;
+
+COMMENT ON COLUMN collected_data_v30.digest IS '평가용 추출 요약 (evaluate_v30 프롬프트 항목 내용)';
+COMMENT ON COLUMN collected_data_v30.digest_version IS '요약 규칙 버전 (digest_v30.DIGEST_VERSION)';
+COMMENT ON COLUMN collected_data_v30.digest_tokens IS 'digest 추정 토큰 수';
+
+-- 2. 요약 현황 뷰 (정치인별 기록 비율 / 평균 토큰)
+CREATE OR REPLACE VIEW v30_collected_digest_stats AS
+SELECT
+    politician_id,
+    digest_version,
+    COUNT(*) AS item_count,
+    ROUND(AVG(digest_tokens), 1) AS avg_digest_tokens,
+    ROUND(AVG(LENGTH(digest)), 1) AS avg_digest_chars,
+    ROUND(AVG(LEAST(LENGTH(content), 300)), 1) AS avg_legacy_chars
+FROM collected_data_v30
+GROUP BY politician_id, digest_version;
+
+COMMENT ON VIEW v30_collected_digest_stats IS 'V30 평가용 요약 현황 (버전별 항목 수, 평균 토큰/길이, 기존 content[:300] 길이)';
+
+-- 3. 검증
+DO $$
+BEGIN
+  RAISE NOTICE '✅ collected_data_v30.digest / digest_version / digest_tokens 추가 완료';
+  RAISE NOTICE '   기존 행 채우기: python digest_v30.py --all';
+END $$;
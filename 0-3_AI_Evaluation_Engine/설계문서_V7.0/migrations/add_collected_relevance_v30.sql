@@ -0,0 +1,36 @@
+-- ============================================================
+-- collected_data_v30 관련성 태그 (relevance_score, is_relevant)
+-- ============================================================
+-- 작성일: 2026-10-18
+-- 이유: 동명이인/무관한 인물 항목도 모두 4개 유료 평가 AI로 전달됨
+--
+-- 배경:
+-- - V30/scripts/relevance_v30.py: 이름/별칭, 정당, 지역구, 직책 언급 + TF-IDF 프로필 유사도
+--   → 0~1 점수, 기준(V30_RELEVANCE_THRESHOLD, 기본 0.35) 미만은 is_relevant = false
+-- - 검증(validate) 다음, 평가(evaluate) 전 단계로 실행 (scheduler_v30 "relevance" 단계)
+-- - evaluate_v30.get_pooled_data: is_relevant = false 행은 평가하지 않음
+-- - relevance_score NULL = 아직 점수 없음 (is_relevant 기본값 true → 평가 대상)
+--
+-- 기존 행 채우기:
+--   python relevance_v30.py --politician_id=62e7b453
+--   python relevance_v30.py --all
+-- ============================================================
+
+-- 1. 컬럼 추가
+ALTER TABLE collected_data_v30 ADD COLUMN IF NOT EXISTS relevance_score REAL;
+ALTER TABLE collected_data_v30 ADD COLUMN IF NOT EXISTS is_relevant BOOLEAN NOT NULL DEFAULT TRUE;
+
+COMMENT ON COLUMN collected_data_v30.relevance_score IS '관련성 점수 0~1 (relevance_v30, NULL = 미계산)';
+COMMENT ON COLUMN collected_data_v30.is_relevant IS '평가 대상 여부 (false = 관련성 필터로 평가 제외)';
+
+-- 2. 제외 항목 조회용 인덱스 (제외 행은 소수)
+CREATE INDEX IF NOT EXISTS idx_v30_collected_irrelevant
+ON collected_data_v30(politician_id, category)
+WHERE is_relevant = FALSE;
+
+-- 3. 검증
+DO $$
+BEGIN
+  RAISE NOTICE '✅ collected_data_v30.relevance_score / is_relevant 추가 완료';
+  RAISE NOTICE '   기존 행 점수 계산: python relevance_v30.py --all';
+END $$;
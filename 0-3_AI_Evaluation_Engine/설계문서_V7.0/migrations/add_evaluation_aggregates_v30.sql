@@ -0,0 +1,188 @@
+-- ============================================================
+-- evaluations_v30 증분 집계 테이블 + 트리거 + 실시간 점수 뷰
+-- ============================================================
+-- 작성일: 2026-10-18
+-- 이유: calculate_v30_scores.py가 매번 평가 원본 행 전체를 다시 읽어 계산
+--       (reevaluate_missing으로 몇 건만 추가돼도 정치인 전체 재계산)
+--
+-- 배경:
+-- - 점수 공식은 (정치인, 카테고리, 평가 AI)별 평균만 필요
+--   → 합계(sum_score)와 건수(eval_count)만 유지하면 원본 없이 계산 가능
+-- - evaluations_v30 INSERT / DELETE / UPDATE 시 문장 단위 트리거가 집계 갱신
+--   (evaluate_v30 벌크 upsert, validate_v30 벌크 삭제, 배치 모드 모두 자동 반영)
+-- - 집계가 어긋나면 rebuild_evaluation_aggregates_v30()으로 처음부터 재구성
+--
+-- 사용:
+--   python calculate_v30_scores.py --all --from-aggregates
+--   python calculate_v30_scores.py --rebuild-aggregates
+--   SELECT * FROM v30_live_final_scores ORDER BY final_score DESC;   -- 프론트엔드
+-- ============================================================
+
+-- 1. 집계 테이블
+CREATE TABLE IF NOT EXISTS evaluation_aggregates_v30 (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY,     -- 키셋 페이지네이션용
+    politician_id TEXT NOT NULL,
+    politician_name TEXT,
+    category TEXT NOT NULL,
+    evaluator_ai TEXT NOT NULL,
+    sum_score BIGINT NOT NULL DEFAULT 0,
+    eval_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (politician_id, category, evaluator_ai)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_v30_eval_agg_id ON evaluation_aggregates_v30(id);
+
+COMMENT ON TABLE evaluation_aggregates_v30 IS 'V30 평가 증분 집계 (정치인 × 카테고리 × 평가 AI → 합계/건수)';
+COMMENT ON COLUMN evaluation_aggregates_v30.sum_score IS 'evaluations_v30.score 합계 (score = 등급 × 2)';
+
+
+-- 2. 트리거 함수 (문장 단위, 전이 테이블 사용)
+CREATE OR REPLACE FUNCTION apply_evaluation_aggregates_v30()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO evaluation_aggregates_v30 AS a
+            (politician_id, politician_name, category, evaluator_ai, sum_score, eval_count, updated_at)
+        SELECT politician_id, MAX(politician_name), category, evaluator_ai, SUM(score), COUNT(*), NOW()
+        FROM new_rows
+        GROUP BY politician_id, category, evaluator_ai
+        ON CONFLICT (politician_id, category, evaluator_ai) DO UPDATE
+        SET sum_score = a.sum_score + EXCLUDED.sum_score,
+            eval_count = a.eval_count + EXCLUDED.eval_count,
+            politician_name = COALESCE(EXCLUDED.politician_name, a.politician_name),
+            updated_at = NOW();
+
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE evaluation_aggregates_v30 a
+        SET sum_score = a.sum_score - d.sum_score,
+            eval_count = a.eval_count - d.eval_count,
+            updated_at = NOW()
+        FROM (
+            SELECT politician_id, category, evaluator_ai, SUM(score) AS sum_score, COUNT(*) AS eval_count
+            FROM old_rows
+            GROUP BY politician_id, category, evaluator_ai
+        ) d
+        WHERE a.politician_id = d.politician_id
+          AND a.category = d.category
+          AND a.evaluator_ai = d.evaluator_ai;
+
+        DELETE FROM evaluation_aggregates_v30 WHERE eval_count <= 0;
+
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO evaluation_aggregates_v30 AS a
+            (politician_id, politician_name, category, evaluator_ai, sum_score, eval_count, updated_at)
+        SELECT politician_id, MAX(politician_name), category, evaluator_ai, SUM(score), SUM(n), NOW()
+        FROM (
+            SELECT politician_id, politician_name, category, evaluator_ai, score, 1 AS n FROM new_rows
+            UNION ALL
+            SELECT politician_id, NULL, category, evaluator_ai, -score, -1 FROM old_rows
+        ) delta
+        GROUP BY politician_id, category, evaluator_ai
+        ON CONFLICT (politician_id, category, evaluator_ai) DO UPDATE
+        SET sum_score = a.sum_score + EXCLUDED.sum_score,
+            eval_count = a.eval_count + EXCLUDED.eval_count,
+            politician_name = COALESCE(EXCLUDED.politician_name, a.politician_name),
+            updated_at = NOW();
+
+        DELETE FROM evaluation_aggregates_v30 WHERE eval_count <= 0;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_v30_eval_agg_insert ON evaluations_v30;
+CREATE TRIGGER trg_v30_eval_agg_insert
+    AFTER INSERT ON evaluations_v30
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION apply_evaluation_aggregates_v30();
+
+DROP TRIGGER IF EXISTS trg_v30_eval_agg_delete ON evaluations_v30;
+CREATE TRIGGER trg_v30_eval_agg_delete
+    AFTER DELETE ON evaluations_v30
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION apply_evaluation_aggregates_v30();
+
+DROP TRIGGER IF EXISTS trg_v30_eval_agg_update ON evaluations_v30;
+CREATE TRIGGER trg_v30_eval_agg_update
+    AFTER UPDATE ON evaluations_v30
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION apply_evaluation_aggregates_v30();
+
+
+-- 3. 재구성 함수 (전체 또는 정치인 1명)
+CREATE OR REPLACE FUNCTION rebuild_evaluation_aggregates_v30(p_politician_id TEXT DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    rebuilt INTEGER;
+BEGIN
+    DELETE FROM evaluation_aggregates_v30
+    WHERE p_politician_id IS NULL OR politician_id = p_politician_id;
+
+    INSERT INTO evaluation_aggregates_v30
+        (politician_id, politician_name, category, evaluator_ai, sum_score, eval_count, updated_at)
+    SELECT politician_id, MAX(politician_name), category, evaluator_ai, SUM(score), COUNT(*), NOW()
+    FROM evaluations_v30
+    WHERE p_politician_id IS NULL OR politician_id = p_politician_id
+    GROUP BY politician_id, category, evaluator_ai;
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_evaluation_aggregates_v30();
+
+
+-- 4. 실시간 점수 뷰 (calculate_v30_scores.py와 같은 공식)
+-- 카테고리 점수 = (6.0 + AI별 평균의 평균 × 0.5) × 10, 20~100 (반올림: 짝수 반올림, Python round와 동일)
+CREATE OR REPLACE VIEW v30_live_category_scores AS
+SELECT
+    politician_id,
+    MAX(politician_name) AS politician_name,
+    category,
+    AVG(sum_score::float8 / eval_count) AS avg_score,
+    GREATEST(20, LEAST(100, ROUND((6.0 + AVG(sum_score::float8 / eval_count) * 0.5) * 10)))::INTEGER AS score,
+    jsonb_object_agg(evaluator_ai, sum_score::float8 / eval_count) AS ai_details,
+    SUM(eval_count) AS eval_count,
+    MAX(updated_at) AS updated_at
+FROM evaluation_aggregates_v30
+WHERE eval_count > 0
+  AND category IN ('expertise', 'leadership', 'vision', 'integrity', 'ethics',
+                   'accountability', 'transparency', 'communication', 'responsiveness', 'publicinterest')
+GROUP BY politician_id, category;
+
+-- 최종 점수 = 10개 카테고리 합계 (평가 없는 카테고리 60점), 200~1000
+CREATE OR REPLACE VIEW v30_live_final_scores AS
+SELECT
+    s.politician_id,
+    s.politician_name,
+    s.final_score,
+    g.grade,
+    g.grade_name,
+    s.category_scores,
+    s.updated_at
+FROM (
+    SELECT
+        politician_id,
+        MAX(politician_name) AS politician_name,
+        GREATEST(200, LEAST(1000, SUM(score) + 60 * (10 - COUNT(*))))::INTEGER AS final_score,
+        jsonb_object_agg(category, score) AS category_scores,
+        MAX(updated_at) AS updated_at
+    FROM v30_live_category_scores
+    GROUP BY politician_id
+) s
+LEFT JOIN grade_reference_v30 g
+    ON s.final_score BETWEEN g.min_score AND g.max_score;
+
+COMMENT ON VIEW v30_live_category_scores IS 'V30 실시간 카테고리 점수 (evaluation_aggregates_v30 기반)';
+COMMENT ON VIEW v30_live_final_scores IS 'V30 실시간 최종 점수/등급 (evaluation_aggregates_v30 기반)';
+
+
+-- 5. 검증
+DO $$
+BEGIN
+  RAISE NOTICE '✅ evaluation_aggregates_v30 + 트리거 + 실시간 점수 뷰 생성 완료';
+  RAISE NOTICE '   집계 재구성: SELECT rebuild_evaluation_aggregates_v30();';
+END $$;
@@ -0,0 +1,42 @@
+-- ============================================================
+-- V30 진행 현황 집계 RPC (수집/평가 개수를 그룹별로 한 번에)
+-- ============================================================
+-- 작성일: 2026-10-18
+-- 이유: collect_v30.get_remaining_target이 수집 단위마다 count='exact' 조회
+--       (2개 AI × 10개 카테고리 × 2개 data_type × 3개 sentiment ≈ 120회)
+--       evaluate_v30.check_already_evaluated도 카테고리 × AI마다 count 조회 2회
+--
+-- 해결:
+-- - 실행 시작 시 정치인 1명의 그룹별 개수를 RPC 1회로 조회 (progress_v30.py)
+-- - 이후 저장된 행만큼 로컬에서 갱신 → 계획/재개 확인은 DB 왕복 없음
+--
+-- 사용 (supabase-py):
+--   supabase.rpc('collected_progress_v30', {'p_politician_id': '62e7b453'}).execute()
+--   supabase.rpc('evaluation_progress_v30', {'p_politician_id': '62e7b453'}).execute()
+-- ============================================================
+
+-- 1. 수집 현황: (category, data_type, collector_ai, sentiment) → 개수
+CREATE OR REPLACE FUNCTION collected_progress_v30(p_politician_id TEXT)
+RETURNS TABLE (category TEXT, data_type TEXT, collector_ai TEXT, sentiment TEXT, n BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT c.category, c.data_type, c.collector_ai, c.sentiment, COUNT(*)
+    FROM collected_data_v30 c
+    WHERE c.politician_id = p_politician_id
+    GROUP BY c.category, c.data_type, c.collector_ai, c.sentiment;
+$$;
+
+-- 2. 평가 현황: (category, evaluator_ai) → 개수
+CREATE OR REPLACE FUNCTION evaluation_progress_v30(p_politician_id TEXT)
+RETURNS TABLE (category TEXT, evaluator_ai TEXT, n BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT e.category, e.evaluator_ai, COUNT(*)
+    FROM evaluations_v30 e
+    WHERE e.politician_id = p_politician_id
+    GROUP BY e.category, e.evaluator_ai;
+$$;
+
+-- 3. 검증
+DO $$
+BEGIN
+  RAISE NOTICE '✅ collected_progress_v30 / evaluation_progress_v30 RPC 생성 완료';
+END $$;